@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+"""
+Benchmark ImprovedDataPreprocessor fit time and peak memory on synthetic listings
+
+Usage:
+    python benchmark_preprocessor.py --rows 1000000 --rows 10000000
+
+Each measurement runs in a fresh subprocess so peak RSS is not shared between
+runs. The in-memory fit is skipped for row counts above --max-in-memory-rows.
+"""
+
+import argparse
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+# Add the project root to the path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import numpy as np
+import pandas as pd
+
+STATES = ['Kuala Lumpur', 'Selangor', 'Penang', 'Johor', 'Sabah', 'Sarawak', 'Perak', 'Melaka']
+NEIGHBOURHOODS = ['Mont Kiara', 'Cheras', 'Petaling Jaya', 'Georgetown', 'Johor Bahru', 'Kuching', 'Ipoh', 'Ayer Keroh']
+
+
+def generate_csv(path, rows, chunksize=1_000_000, seed=42):
+    """Write a synthetic raw listings CSV with the training column formats"""
+    rng = np.random.default_rng(seed)
+    for start in range(0, rows, chunksize):
+        n = min(chunksize, rows - start)
+        bedrooms = rng.integers(0, 8, n)
+        area = rng.integers(150, 6000, n)
+        price = (300 + area * 1.2 + bedrooms * 150 + rng.normal(0, 400, n)).clip(200).round()
+        location = (pd.Series(rng.choice(NEIGHBOURHOODS, n)) + ', ' + pd.Series(rng.choice(STATES, n)))
+        chunk = pd.DataFrame({
+            'price': 'RM ' + pd.Series(price.astype(np.int64)).map('{:,}'.format),
+            'property_type': rng.choice(['Apartment', 'Condo', 'House', 'Townhouse', 'Penthouse'], n),
+            'bedrooms': bedrooms,
+            'bathrooms': np.clip(bedrooms - rng.integers(0, 2, n), 1, 6),
+            'area': pd.Series(area).astype(str) + ' sqft',
+            'furnished': rng.choice(['Fully Furnished', 'Partly Furnished', 'Unfurnished'], n),
+            'location': location
+        })
+        chunk.to_csv(path, mode='w' if start == 0 else 'a', header=start == 0, index=False)
+
+
+def peak_rss_mb():
+    """Peak resident memory of this process in MB"""
+    # VmHWM is reset on exec, unlike ru_maxrss which a child inherits from its parent
+    try:
+        with open('/proc/self/status') as status:
+            for line in status:
+                if line.startswith('VmHWM:'):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def run_fit(path, mode, chunksize):
+    """Fit once in this process and return timings and peak memory"""
+    from rentverse.utils.preprocessor import ImprovedDataPreprocessor
+
+    preprocessor = ImprovedDataPreprocessor(verbose=False)
+    start = time.perf_counter()
+    if mode == 'in-memory':
+        df = pd.read_csv(path)
+        loaded = time.perf_counter()
+        preprocessor.fit(df)
+    else:
+        loaded = start
+        preprocessor.fit_csv(path, chunksize=chunksize)
+    end = time.perf_counter()
+
+    return {
+        'mode': mode,
+        'read_seconds': round(loaded - start, 2),
+        'fit_seconds': round(end - loaded, 2),
+        'total_seconds': round(end - start, 2),
+        'peak_rss_mb': round(peak_rss_mb(), 1),
+        'price_upper_bound': float(preprocessor.price_upper_bound),
+        'area_upper_bound': float(preprocessor.area_upper_bound)
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, action='append', help='Row counts to benchmark (repeatable)')
+    parser.add_argument('--chunksize', type=int, default=200_000, help='Rows per chunk for the chunked fit')
+    parser.add_argument('--max-in-memory-rows', type=int, default=2_000_000,
+                        help='Skip the in-memory fit above this many rows')
+    parser.add_argument('--worker', nargs=2, metavar=('CSV', 'MODE'), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        print(json.dumps(run_fit(args.worker[0], args.worker[1], args.chunksize)))
+        return
+
+    print("🧪 Benchmarking ImprovedDataPreprocessor fit")
+    print("=" * 50)
+
+    for rows in args.rows or [1_000_000, 10_000_000]:
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'listings.csv')
+            print(f"\n📊 {rows:,} rows: generating data...")
+            generate_csv(path, rows)
+            print(f"   - CSV size: {os.path.getsize(path) / 1024 ** 2:,.0f} MB")
+
+            modes = ['chunked'] if rows > args.max_in_memory_rows else ['in-memory', 'chunked']
+            for mode in modes:
+                output = subprocess.run(
+                    [sys.executable, __file__, '--worker', path, mode, '--chunksize', str(args.chunksize)],
+                    check=True, capture_output=True, text=True
+                ).stdout
+                result = json.loads(output.strip().splitlines()[-1])
+                print(f"   - {mode}: fit {result['fit_seconds']}s (read {result['read_seconds']}s), "
+                      f"peak RSS {result['peak_rss_mb']:,} MB, "
+                      f"bounds price={result['price_upper_bound']:,.1f} area={result['area_upper_bound']:,.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,284 @@
+#!/usr/bin/env python3
+"""
+Benchmark columnar prediction throughput per transport encoding
+
+Usage:
+    python benchmark_serving.py --rows 1000 --rows 100000
+    python benchmark_serving.py --url http://localhost:8000 --encoding arrow
+    python benchmark_serving.py --soak 1000000 --sample-every 20000
+    python benchmark_serving.py --soak 2000000 --url http://localhost:8000 --admin-token $ADMIN_TOKEN
+
+Sends synthetic listings to /api/v1/predict/columnar as JSON, MessagePack
+and Arrow IPC (those whose library is installed) and reports, per encoding,
+the body sizes, the time spent encoding and decoding on both sides (codec)
+and the end-to-end throughput. Without --url the service runs in-process,
+so the numbers exclude the network but include the ASGI stack and the model.
+
+--soak N instead sends N requests across the single, price, batch and
+columnar routes, with locations the service has never seen mixed in, and
+samples the service's RSS as it goes. Growth after the warm-up beyond
+--max-growth-mb is flagged as a suspected leak (exit status 1), along with
+the allocation sites that grew most since the warm-up when --tracemalloc
+is given. A remote service needs ADMIN_TOKEN set and --admin-token.
+"""
+
+import argparse
+import json
+import os
+import itertools
+import statistics
+import sys
+import time
+
+# Add the project root to the path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import numpy as np
+
+from rentverse.api.encoding import ARROW, JSON, MSGPACK, available_media_types, decode_columns, encode_columns, msgpack, pa
+
+ENCODINGS = {'json': JSON, 'msgpack': MSGPACK, 'arrow': ARROW}
+PROPERTY_TYPES = ['Apartment', 'Condominium', 'Service Residence', 'Townhouse']
+FURNISHED = ['Yes', 'No', 'Partial', 'Fully Furnished', 'Partially Furnished', 'Unfurnished']
+LOCATIONS = ['KLCC, Kuala Lumpur', 'Mont Kiara, Kuala Lumpur', 'Cheras, Kuala Lumpur', 'Petaling Jaya, Selangor',
+             'Shah Alam, Selangor', 'Georgetown, Penang', 'Johor Bahru, Johor', 'Kuching, Sarawak']
+
+
+def generate_columns(rows, seed=42):
+    """Synthetic listings as columns within the API's validation rules"""
+    rng = np.random.default_rng(seed)
+    bedrooms = rng.integers(0, 6, rows)
+    return {
+        'property_type': rng.choice(PROPERTY_TYPES, rows).astype(object),
+        'bedrooms': bedrooms,
+        'bathrooms': np.clip(bedrooms - rng.integers(0, 2, rows), 1, 5),
+        'area': rng.integers(300, 4000, rows).astype(np.float64),
+        'furnished': rng.choice(FURNISHED, rows).astype(object),
+        'location': rng.choice(LOCATIONS, rows).astype(object)
+    }
+
+
+def encode_request(columns, media_type):
+    """Client side: encode the request columns"""
+    if media_type == ARROW:
+        table = pa.table(columns)
+        sink = pa.BufferOutputStream()
+        with pa.ipc.new_stream(sink, table.schema) as writer:
+            writer.write_table(table)
+        return sink.getvalue().to_pybytes()
+    payload = {name: values.tolist() for name, values in columns.items()}
+    if media_type == MSGPACK:
+        return msgpack.packb(payload, use_bin_type=True)
+    return json.dumps(payload).encode('utf-8')
+
+
+def decode_response(body, media_type):
+    """Client side: decode the predicted prices of a response"""
+    if media_type == ARROW:
+        return pa.ipc.open_stream(body).read_all().column('predicted_price').to_numpy()
+    payload = msgpack.unpackb(body, raw=False) if media_type == MSGPACK else json.loads(body)
+    return np.asarray(payload['predicted_price'])
+
+
+def codec_ms(columns, media_type, repeat):
+    """Median time of a full encode/decode round trip of request and response, without the model"""
+    rows = len(columns['location'])
+    result = {
+        'predicted_price': np.linspace(1000, 5000, rows), 'confidence_score': np.full(rows, 0.8),
+        'price_min': np.linspace(900, 4500, rows), 'price_max': np.linspace(1100, 5500, rows),
+        'quantiles': {'0.1': np.linspace(900, 4500, rows), '0.9': np.linspace(1100, 5500, rows)},
+        'interval_method': 'residual', 'model_version': 'benchmark', 'count': rows
+    }
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        decode_columns(encode_request(columns, media_type), media_type)
+        decode_response(encode_columns(result, media_type), media_type)
+        times.append((time.perf_counter() - start) * 1000)
+    return statistics.median(times)
+
+
+def run(client, rows, name, media_type, repeat):
+    columns = generate_columns(rows)
+    body = encode_request(columns, media_type)
+    headers = {'Content-Type': media_type, 'Accept': media_type}
+
+    times, response_bytes = [], 0
+    for _ in range(repeat):
+        start = time.perf_counter()
+        response = client.post('/api/v1/predict/columnar', content=encode_request(columns, media_type), headers=headers)
+        if response.status_code != 200:
+            raise RuntimeError(f"{name}: HTTP {response.status_code}: {response.text[:300]}")
+        prices = decode_response(response.content, media_type)
+        times.append((time.perf_counter() - start) * 1000)
+        response_bytes = len(response.content)
+    assert len(prices) == rows
+
+    total = statistics.median(times)
+    return {
+        'rows': rows,
+        'encoding': name,
+        'request_kb': round(len(body) / 1024, 1),
+        'response_kb': round(response_bytes / 1024, 1),
+        'codec_ms': round(codec_ms(columns, media_type, repeat), 2),
+        'total_ms': round(total, 2),
+        'rows_per_s': round(rows / total * 1000)
+    }
+
+
+def soak_requests(seed=7):
+    """Endless mix of single, price, batch and columnar requests; 1 in 10 has a new location"""
+    rng = np.random.default_rng(seed)
+    for i in itertools.count():
+        columns = generate_columns(10, seed=int(rng.integers(1 << 31)))
+        if i % 10 == 0:
+            columns['location'][0] = f"Jalan Soak {i}, Kuala Lumpur"
+        rows = [{name: values[j].item() if hasattr(values[j], 'item') else values[j]
+                 for name, values in columns.items()} for j in range(10)]
+        kind = i % 4
+        if kind == 0:
+            yield '/api/v1/predict/single', rows[0]
+        elif kind == 1:
+            yield '/api/v1/classify/price', rows[0]
+        elif kind == 2:
+            yield '/api/v1/predict/batch', {'properties': rows}
+        else:
+            yield '/api/v1/predict/columnar', {name: [row[name] for row in rows] for name in columns}
+
+
+class MemoryProbe:
+    """RSS and tracemalloc snapshots of the service, in-process or through the admin endpoints"""
+
+    def __init__(self, client, remote, admin_token=None):
+        self.client = client
+        self.remote = remote
+        self.headers = {'X-Admin-Token': admin_token} if admin_token else {}
+
+    def _admin(self, method, path, **params):
+        response = self.client.request(method, f'/api/v1/admin/memory{path}', params=params, headers=self.headers)
+        if response.status_code != 200:
+            raise RuntimeError(f"Admin endpoint {path or '/'}: HTTP {response.status_code}: {response.text[:300]}")
+        return response.json()
+
+    def rss(self):
+        if self.remote:
+            return self._admin('GET', '')['process']['rss_bytes']
+        from rentverse.utils.memory import process_memory
+        return process_memory()['rss_bytes']
+
+    def snapshot(self, label):
+        if self.remote:
+            return self._admin('POST', '/snapshots', label=label)
+        from rentverse.utils.memory import get_allocation_tracker
+        return get_allocation_tracker().take(label)
+
+    def diff(self, base, limit=10):
+        if self.remote:
+            return self._admin('GET', '/diff', base=base, limit=limit)
+        from rentverse.utils.memory import get_allocation_tracker
+        return get_allocation_tracker().diff(base, limit=limit)
+
+    def stop(self):
+        if self.remote:
+            return self._admin('DELETE', '/snapshots')
+        from rentverse.utils.memory import get_allocation_tracker
+        return get_allocation_tracker().stop()
+
+
+def soak(client, probe, total, sample_every, warmup, max_growth_mb, trace):
+    """Send total requests, sampling RSS; returns the summary with leak_suspected set on growth"""
+    requests = soak_requests()
+    samples = []
+    start = time.perf_counter()
+    failures = 0
+    for sent in range(1, total + 1):
+        path, body = next(requests)
+        if client.post(path, json=body).status_code != 200:
+            failures += 1
+        if sent == warmup and trace:
+            probe.snapshot('soak-warmup')
+        if sent % sample_every == 0 or sent in (warmup, total):
+            elapsed = time.perf_counter() - start
+            samples.append((sent, probe.rss()))
+            print(json.dumps({'requests': sent, 'rss_mb': round(samples[-1][1] / 1024 ** 2, 1),
+                              'elapsed_s': round(elapsed, 1), 'requests_per_s': round(sent / elapsed),
+                              'failures': failures}), flush=True)
+
+    steady = [(sent, rss) for sent, rss in samples if sent >= warmup] or samples[-1:]
+    growth = steady[-1][1] - steady[0][1]
+    slope = 0.0
+    if len(steady) > 1:
+        x = np.array([sent for sent, _ in steady], dtype=float)
+        y = np.array([rss for _, rss in steady], dtype=float)
+        slope = float(np.polyfit(x, y, 1)[0])
+    summary = {
+        'requests': total,
+        'warmup': warmup,
+        'failures': failures,
+        'rss_start_mb': round(steady[0][1] / 1024 ** 2, 1),
+        'rss_end_mb': round(steady[-1][1] / 1024 ** 2, 1),
+        'growth_mb': round(growth / 1024 ** 2, 2),
+        'slope_kb_per_100k_requests': round(slope * 100000 / 1024, 1),
+        'max_growth_mb': max_growth_mb,
+        'leak_suspected': growth > max_growth_mb * 1024 ** 2
+    }
+    if trace and total >= warmup:
+        summary['top_growth'] = probe.diff('soak-warmup')['top']
+        probe.stop()
+    return summary
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, action='append', help='Rows per request (repeatable, default 1000 and 100000)')
+    parser.add_argument('--encoding', choices=list(ENCODINGS), action='append', help='Encodings (default: all installed)')
+    parser.add_argument('--repeat', type=int, default=5, help='Requests per measurement; the median is reported')
+    parser.add_argument('--url', default=None, help='Benchmark a running service instead of an in-process one')
+    parser.add_argument('--model-dir', default=None, help='Model directory for the in-process service')
+    parser.add_argument('--soak', type=int, default=None, metavar='N', help='Soak test with N mixed requests instead')
+    parser.add_argument('--sample-every', type=int, default=10000, help='Requests between RSS samples while soaking')
+    parser.add_argument('--warmup', type=int, default=None, help='Requests before growth is measured (default N/10)')
+    parser.add_argument('--max-growth-mb', type=float, default=20.0, help='RSS growth after the warm-up flagged as a leak')
+    parser.add_argument('--tracemalloc', action='store_true', help='Report the allocation sites that grew while soaking')
+    parser.add_argument('--admin-token', default=os.environ.get('ADMIN_TOKEN'), help='Admin token of a remote service')
+    args = parser.parse_args()
+
+    if args.soak and args.url and not args.admin_token:
+        parser.error('--soak with --url needs --admin-token to read the service memory')
+
+    installed = available_media_types()
+    encodings = [name for name in (args.encoding or ENCODINGS) if ENCODINGS[name] in installed]
+    skipped = sorted(set(args.encoding or ENCODINGS) - set(encodings))
+    if skipped:
+        print(f"Skipping encodings whose library is not installed: {', '.join(skipped)}", file=sys.stderr)
+
+    if args.url:
+        import httpx
+        client = httpx.Client(base_url=args.url, timeout=300)
+    else:
+        import logging
+        from fastapi.testclient import TestClient
+        from rentverse.main import app
+        from rentverse.models.ml_models import reload_ml_model
+
+        logging.disable(logging.INFO)
+        if args.model_dir:
+            reload_ml_model(args.model_dir)
+        client = TestClient(app)
+
+    # The in-process client runs the service lifespan (model, audit log) and keeps one event loop
+    with client:
+        if args.soak:
+            probe = MemoryProbe(client, remote=bool(args.url), admin_token=args.admin_token)
+            warmup = args.warmup if args.warmup is not None else max(args.soak // 10, 1)
+            summary = soak(client, probe, args.soak, args.sample_every, warmup, args.max_growth_mb, args.tracemalloc)
+            print(json.dumps(summary))
+            sys.exit(1 if summary['leak_suspected'] else 0)
+
+        for rows in args.rows or [1000, 100000]:
+            for name in encodings:
+                print(json.dumps(run(client, rows, name, ENCODINGS[name], args.repeat)))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,429 @@
+"""
+Admission control, load shedding and priority lanes for RentVerse AI Service.
+
+Inference requests must obtain one of a fixed number of execution slots
+before they run. Every request belongs to a priority lane (interactive,
+bulk or background) with its own wait queue, and the time requests wait in
+a lane (queueing delay) drives a CoDel-style controller for that lane:
+
+- While the smallest queueing delay seen over an interval stays below the
+  lane's target, a request may wait up to one interval for a slot.
+- Once even the best request of an interval waited longer than the target,
+  the queue is standing rather than absorbing a burst; requests then wait at
+  most the target before they are shed.
+
+A freed slot goes to the highest priority lane with a waiter. Some slots
+are reserved for the interactive lane, so bulk and background work can use
+the remaining capacity but never crowd out interactive requests.
+
+Shed requests get 503 with Retry-After, so clients back off instead of
+timing out on work the server would have finished too late. An optional
+token bucket per client answers 429 to clients exceeding their rate.
+"""
+
+import asyncio
+import math
+import threading
+import time
+from collections import deque
+from typing import Any, Callable, Deque, Dict, Optional, Sequence, Tuple
+
+from fastapi.responses import JSONResponse
+from starlette.datastructures import Headers, MutableHeaders
+
+from ..utils.sketches import QuantileSketch
+
+CLIENT_ID_HEADER = "X-Client-Id"
+PRIORITY_HEADER = "X-Priority"
+MAX_TRACKED_CLIENTS = 10000
+
+INTERACTIVE = "interactive"
+BULK = "bulk"
+BACKGROUND = "background"
+
+# Routes scheduled as bulk work unless the request asks for background
+BULK_ROUTE_SUFFIXES = ("/predict/batch", "/predict/columnar", "/predict/explain/batch", "/classify/approval/batch")
+
+
+class AdmissionRejected(Exception):
+    """Raised when a request is not admitted."""
+
+    def __init__(self, status_code: int, reason: str, retry_after: float):
+        self.status_code = status_code
+        self.reason = reason
+        self.retry_after = retry_after
+        super().__init__(reason)
+
+
+class Lane:
+    """
+    One priority class: its wait queue, CoDel state and counters.
+
+    Parameters:
+    -----------
+    name : str
+        Lane name used in headers and statistics
+    priority : int
+        Lower values are served first
+    target_ms : float
+        Acceptable standing queueing delay
+    interval_ms : float
+        Window over which the minimum queueing delay is tracked; also the
+        longest wait while the lane is not overloaded
+    max_queue : int
+        Requests waiting in this lane before new ones are shed immediately
+    """
+
+    def __init__(self, name: str, priority: int, target_ms: float, interval_ms: float, max_queue: int):
+        self.name = name
+        self.priority = priority
+        self.target = target_ms / 1000
+        self.interval = interval_ms / 1000
+        self.max_queue = max_queue
+
+        self.active = 0
+        self.waiters: Deque[Tuple[asyncio.Future, float]] = deque()
+        self.overloaded = False
+        self._interval_end = 0.0
+        self._interval_min = math.inf
+
+        self.admitted = 0
+        self.rejected = {'queue_full': 0, 'queue_timeout': 0, 'rate_limited': 0}
+        self.queue_delay_ms = QuantileSketch(relative_accuracy=0.01)
+
+    @property
+    def retry_after(self) -> float:
+        """Seconds a shed client should wait before retrying."""
+        return self.interval
+
+    @property
+    def wait_timeout(self) -> float:
+        """Longest wait allowed to a request joining the queue now."""
+        return self.target if self.overloaded else self.interval
+
+    def record_delay(self, delay: float, now: float) -> None:
+        """Track queueing delay and update the overload state once per interval."""
+        self.queue_delay_ms.add(delay * 1000)
+        if now >= self._interval_end:
+            self.overloaded = self._interval_min > self.target if self._interval_min != math.inf else False
+            self._interval_min = math.inf
+            self._interval_end = now + self.interval
+        self._interval_min = min(self._interval_min, delay)
+
+    def has_waiters(self) -> bool:
+        """Drop waiters that gave up from the head and report whether any remain."""
+        while self.waiters and self.waiters[0][0].done():
+            self.waiters.popleft()
+        return bool(self.waiters)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get this lane's usage, counters and queueing delay percentiles."""
+        delays = self.queue_delay_ms
+        has_delays = delays.count > 0
+        return {
+            'priority': self.priority,
+            'active': self.active,
+            'queued': len(self.waiters),
+            'overloaded': self.overloaded,
+            'max_queue': self.max_queue,
+            'target_ms': self.target * 1000,
+            'interval_ms': self.interval * 1000,
+            'admitted': self.admitted,
+            'rejected': dict(self.rejected),
+            'queue_delay_ms': {
+                'p50': delays.quantile(0.5) if has_delays else None,
+                'p99': delays.quantile(0.99) if has_delays else None
+            }
+        }
+
+
+def default_lanes(
+    max_queue: int = 64,
+    target_ms: float = 50.0,
+    interval_ms: float = 500.0,
+    bulk_target_ms: float = 500.0,
+    bulk_interval_ms: float = 2000.0
+) -> Sequence[Lane]:
+    """Interactive, bulk and background lanes; background shares the bulk delay budget."""
+    return (
+        Lane(INTERACTIVE, 0, target_ms, interval_ms, max_queue),
+        Lane(BULK, 1, bulk_target_ms, bulk_interval_ms, max_queue),
+        Lane(BACKGROUND, 2, bulk_target_ms, bulk_interval_ms, max(1, max_queue // 4))
+    )
+
+
+class AdmissionController:
+    """
+    Bounded execution slots shared by priority lanes with CoDel-controlled queues.
+
+    Must be used from a single event loop. Slots are handed directly from a
+    finishing request to the oldest waiter of the highest priority lane that
+    may use it.
+
+    Parameters:
+    -----------
+    max_concurrency : int, default=4
+        Requests executing at once
+    interactive_reserved : int, default=1
+        Slots only the interactive lane may use
+    lanes : Sequence[Lane], optional
+        Priority lanes; default_lanes() if not given
+    client_rate : float, optional
+        Sustained requests per second allowed per client (None disables)
+    client_burst : int, default=20
+        Token bucket size per client
+    """
+
+    def __init__(
+        self,
+        max_concurrency: int = 4,
+        interactive_reserved: int = 1,
+        lanes: Optional[Sequence[Lane]] = None,
+        client_rate: Optional[float] = None,
+        client_burst: int = 20
+    ):
+        if max_concurrency < 1:
+            raise ValueError("max_concurrency must be at least 1")
+        if not 0 <= interactive_reserved < max_concurrency:
+            raise ValueError("interactive_reserved must leave at least one shared slot")
+        self.max_concurrency = max_concurrency
+        self.interactive_reserved = interactive_reserved
+        self.client_rate = client_rate
+        self.client_burst = client_burst
+
+        lanes = lanes if lanes is not None else default_lanes()
+        self.lanes: Dict[str, Lane] = {lane.name: lane for lane in sorted(lanes, key=lambda lane: lane.priority)}
+        if INTERACTIVE not in self.lanes:
+            raise ValueError(f"An '{INTERACTIVE}' lane is required")
+        self._buckets: Dict[str, Tuple[float, float]] = {}
+
+    @property
+    def active(self) -> int:
+        return sum(lane.active for lane in self.lanes.values())
+
+    def _can_start(self, lane: Lane) -> bool:
+        """Whether a free slot may be used by this lane."""
+        if self.active >= self.max_concurrency:
+            return False
+        if lane.name == INTERACTIVE:
+            return True
+        shared_active = self.active - self.lanes[INTERACTIVE].active
+        return shared_active < self.max_concurrency - self.interactive_reserved
+
+    def _take_token(self, client: str, now: float) -> Optional[float]:
+        """Spend one of a client's tokens; returns seconds until the next one if none is left."""
+        if self.client_rate is None:
+            return None
+        tokens, last = self._buckets.get(client, (float(self.client_burst), now))
+        tokens = min(float(self.client_burst), tokens + (now - last) * self.client_rate)
+        if tokens < 1:
+            self._buckets[client] = (tokens, now)
+            return (1 - tokens) / self.client_rate
+
+        self._buckets[client] = (tokens - 1, now)
+        if len(self._buckets) > MAX_TRACKED_CLIENTS:
+            # Forget clients whose bucket would be full again by now
+            refill = self.client_burst / self.client_rate
+            self._buckets = {c: b for c, b in self._buckets.items() if now - b[1] < refill}
+        return None
+
+    def _grant_next(self) -> bool:
+        """Start the next waiter that may use a free slot, highest priority first."""
+        for lane in self.lanes.values():
+            if not lane.has_waiters() or not self._can_start(lane):
+                continue
+            future, enqueued = lane.waiters.popleft()
+            now = time.monotonic()
+            lane.record_delay(now - enqueued, now)
+            lane.active += 1
+            future.set_result(None)
+            return True
+        return False
+
+    async def acquire(self, client: str = "unknown", lane_name: str = INTERACTIVE) -> None:
+        """
+        Wait for an execution slot in a lane.
+
+        Raises:
+            AdmissionRejected: 429 if the client is over its rate, 503 if the
+            lane's queue is full or the request waited longer than allowed
+        """
+        lane = self.lanes[lane_name]
+        now = time.monotonic()
+        wait = self._take_token(client, now)
+        if wait is not None:
+            lane.rejected['rate_limited'] += 1
+            raise AdmissionRejected(429, 'rate_limited', wait)
+
+        ahead = any(other.has_waiters() for other in self.lanes.values() if other.priority <= lane.priority)
+        if not ahead and self._can_start(lane):
+            lane.active += 1
+            lane.admitted += 1
+            lane.record_delay(0.0, now)
+            return
+
+        if len(lane.waiters) >= lane.max_queue:
+            lane.rejected['queue_full'] += 1
+            raise AdmissionRejected(503, 'queue_full', lane.retry_after)
+
+        future = asyncio.get_running_loop().create_future()
+        entry = (future, now)
+        lane.waiters.append(entry)
+
+        try:
+            await asyncio.wait({future}, timeout=lane.wait_timeout)
+        except asyncio.CancelledError:
+            if future.done():
+                # Granted a slot just as the client went away
+                self.release(lane_name)
+            else:
+                future.cancel()
+                lane.waiters.remove(entry)
+            raise
+
+        if future.done():
+            lane.admitted += 1
+            return
+
+        future.cancel()
+        lane.waiters.remove(entry)
+        timed_out = time.monotonic()
+        lane.record_delay(timed_out - now, timed_out)
+        lane.rejected['queue_timeout'] += 1
+        raise AdmissionRejected(503, 'queue_timeout', lane.retry_after)
+
+    def release(self, lane_name: str = INTERACTIVE) -> None:
+        """Free a lane's slot and hand free slots to waiters."""
+        self.lanes[lane_name].active -= 1
+        # A freed shared slot may also unblock a waiter in a different lane
+        while self._grant_next():
+            pass
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get slot usage and per lane shedding counters and queueing delay."""
+        return {
+            'active': self.active,
+            'max_concurrency': self.max_concurrency,
+            'interactive_reserved': self.interactive_reserved,
+            'client_rate': self.client_rate,
+            'tracked_clients': len(self._buckets),
+            'lanes': {name: lane.get_stats() for name, lane in self.lanes.items()}
+        }
+
+
+def request_lane(path: str, headers: Headers, lanes: Sequence[str]) -> str:
+    """
+    Lane of a request: bulk for batch routes, interactive otherwise.
+
+    The X-Priority header may move a request to a lower priority lane (e.g.
+    background for shadow traffic or warmup) but never to a higher one.
+    """
+    lane = BULK if path.rstrip('/').endswith(BULK_ROUTE_SUFFIXES) else INTERACTIVE
+    requested = headers.get(PRIORITY_HEADER, '').strip().lower()
+    if requested in lanes and list(lanes).index(requested) > list(lanes).index(lane):
+        return requested
+    return lane
+
+
+class AdmissionMiddleware:
+    """
+    ASGI middleware applying an AdmissionController to inference requests.
+
+    A request holds its slot until the last chunk of its response body has
+    been sent, so streamed bodies count against the concurrency limit and
+    the queueing delay of the requests behind them. The slot is released
+    early if the application raises or returns without finishing the body.
+    """
+
+    def __init__(
+        self,
+        app,
+        get_controller: Callable[[], AdmissionController],
+        path_prefixes: Sequence[str] = ("/api/v1/predict", "/api/v1/classify"),
+        methods: Sequence[str] = ("POST",)
+    ):
+        self.app = app
+        self.get_controller = get_controller
+        self.path_prefixes = tuple(path_prefixes)
+        self.methods = set(methods)
+
+    def _applies(self, scope) -> bool:
+        """Whether a request is subject to admission control."""
+        return scope["type"] == "http" and scope["method"] in self.methods and \
+            scope["path"].startswith(self.path_prefixes)
+
+    async def __call__(self, scope, receive, send):
+        """Admit, queue or shed the request."""
+        if not self._applies(scope):
+            await self.app(scope, receive, send)
+            return
+
+        controller = self.get_controller()
+        headers = Headers(scope=scope)
+        client = headers.get(CLIENT_ID_HEADER) or (scope["client"][0] if scope.get("client") else "unknown")
+        lane = request_lane(scope["path"], headers, list(controller.lanes))
+        try:
+            await controller.acquire(client, lane)
+        except AdmissionRejected as e:
+            response = JSONResponse(
+                status_code=e.status_code,
+                content={
+                    "error": "Too many requests" if e.status_code == 429 else "Service overloaded",
+                    "detail": e.reason,
+                    "lane": lane,
+                    "code": e.status_code,
+                    "status": "error",
+                    "timestamp": time.time()
+                },
+                headers={"Retry-After": str(max(1, math.ceil(e.retry_after)))}
+            )
+            await response(scope, receive, send)
+            return
+
+        held = True
+
+        def release():
+            nonlocal held
+            if held:
+                held = False
+                controller.release(lane)
+
+        async def send_releasing(message):
+            if message["type"] == "http.response.start":
+                message["headers"] = list(message.get("headers", []))
+                MutableHeaders(scope=message)[PRIORITY_HEADER] = lane
+            await send(message)
+            if message["type"] == "http.response.body" and not message.get("more_body", False):
+                release()
+
+        try:
+            await self.app(scope, receive, send_releasing)
+        finally:
+            release()
+
+
+_controller: Optional[AdmissionController] = None
+_controller_lock = threading.Lock()
+
+
+def get_admission_controller() -> AdmissionController:
+    """Get the global admission controller, creating it from the settings if necessary."""
+    global _controller
+    with _controller_lock:
+        if _controller is None:
+            from ..config import get_settings
+            settings = get_settings()
+            _controller = AdmissionController(
+                max_concurrency=settings.admission_max_concurrency,
+                interactive_reserved=settings.admission_interactive_reserved,
+                lanes=default_lanes(
+                    max_queue=settings.admission_max_queue,
+                    target_ms=settings.admission_target_ms,
+                    interval_ms=settings.admission_interval_ms,
+                    bulk_target_ms=settings.admission_bulk_target_ms,
+                    bulk_interval_ms=settings.admission_bulk_interval_ms
+                ),
+                client_rate=settings.client_rate_limit,
+                client_burst=settings.client_burst
+            )
+        return _controller
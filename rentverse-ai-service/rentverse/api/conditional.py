@@ -0,0 +1,73 @@
+"""
+Conditional (ETag) responses for RentVerse AI Service.
+
+Responses that only change when a different model is loaded are rendered
+once per loaded model and served with a strong ETag, so clients polling them
+can revalidate with If-None-Match and get an empty 304 response.
+"""
+
+import hashlib
+import json
+import weakref
+from typing import Any, Callable, Optional, Tuple
+
+from fastapi import Request, Response
+from fastapi.encoders import jsonable_encoder
+
+DEFAULT_MAX_AGE = 30  # seconds a client may reuse a response without revalidating
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Check an If-None-Match header against an ETag (weak comparison, as RFC 9110 requires)."""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == '*':
+        return True
+    candidates = [tag.strip() for tag in if_none_match.split(',')]
+    return any(tag.removeprefix('W/') == etag for tag in candidates)
+
+
+class ModelBoundResponse:
+    """
+    JSON response rendered once per loaded model.
+
+    The body is rebuilt only when called with a different model instance,
+    e.g. after a reload. The model is held by weak reference so a replaced
+    model is not kept alive by the cache.
+
+    Parameters:
+    -----------
+    build : Callable
+        Function of the model returning the JSON-serializable payload
+    max_age : int, default=30
+        Cache-Control max-age in seconds
+    """
+
+    def __init__(self, build: Callable[[Any], Any], max_age: int = DEFAULT_MAX_AGE):
+        self.build = build
+        self.max_age = max_age
+        self._model_ref = None
+        self._body = b''
+        self._etag = ''
+
+    def render(self, model: Any) -> Tuple[bytes, str]:
+        """Body and strong ETag for a model, built on first use."""
+        cached = self._model_ref() if self._model_ref is not None else None
+        if cached is not model:
+            payload = jsonable_encoder(self.build(model))
+            body = json.dumps(payload, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+            self._body = body
+            self._etag = f'"{hashlib.sha256(body).hexdigest()[:32]}"'
+            self._model_ref = weakref.ref(model)
+        return self._body, self._etag
+
+    def respond(self, request: Request, model: Any) -> Response:
+        """Answer with 304 if the client's copy is current, else with the body."""
+        body, etag = self.render(model)
+        headers = {
+            'ETag': etag,
+            'Cache-Control': f'public, max-age={self.max_age}'
+        }
+        if etag_matches(request.headers.get('if-none-match'), etag):
+            return Response(status_code=304, headers=headers)
+        return Response(content=body, media_type='application/json', headers=headers)
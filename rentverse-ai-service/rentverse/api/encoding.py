@@ -0,0 +1,180 @@
+"""
+Binary content negotiation for RentVerse AI Service.
+
+Columnar requests and responses can be sent as JSON (the default), as an
+Apache Arrow IPC stream or as MessagePack. Arrow columns arrive as NumPy
+arrays without per-value decoding, which is what large internal batches
+benefit from most; MessagePack is a lighter binary alternative to JSON.
+Both are optional dependencies: a format whose library is not installed is
+answered with 415 (request body) or 406 (response) instead.
+"""
+
+import json
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+from fastapi import HTTPException, Request
+
+try:
+    import pyarrow as pa
+except ImportError:  # optional: pip install pyarrow
+    pa = None
+
+try:
+    import msgpack
+except ImportError:  # optional: pip install msgpack
+    msgpack = None
+
+JSON = "application/json"
+ARROW = "application/vnd.apache.arrow.stream"
+MSGPACK = "application/msgpack"
+
+# Other names clients use for the same formats
+ALIASES = {
+    "application/x-msgpack": MSGPACK,
+    "application/vnd.msgpack": MSGPACK,
+    "application/x-apache-arrow-stream": ARROW
+}
+
+
+def available_media_types() -> List[str]:
+    """Media types this process can decode and encode, JSON first."""
+    types = [JSON]
+    if pa is not None:
+        types.append(ARROW)
+    if msgpack is not None:
+        types.append(MSGPACK)
+    return types
+
+
+def _media_error(status_code: int, error: str, detail: str) -> HTTPException:
+    return HTTPException(
+        status_code=status_code,
+        detail={
+            "error": error,
+            "detail": detail,
+            "code": status_code,
+            "supported": available_media_types(),
+            "timestamp": datetime.now().isoformat()
+        }
+    )
+
+
+def _base_type(value: str) -> str:
+    media_type = value.split(";", 1)[0].strip().lower()
+    return ALIASES.get(media_type, media_type)
+
+
+def request_media_type(request: Request) -> str:
+    """Media type of the request body from Content-Type; JSON if absent, 415 if unsupported."""
+    content_type = request.headers.get("content-type")
+    media_type = _base_type(content_type) if content_type else JSON
+    if media_type not in available_media_types():
+        raise _media_error(415, "Unsupported media type", f"Cannot decode a {media_type} request body")
+    return media_type
+
+
+def response_media_type(request: Request) -> str:
+    """
+    Media type of the response from Accept, honouring q-values: JSON when
+    absent or for wildcards, the earlier entry on equal quality, 406 if
+    nothing acceptable is supported.
+    """
+    accept = request.headers.get("accept")
+    if not accept:
+        return JSON
+
+    supported = available_media_types()
+    best: Tuple[float, Optional[str]] = (0.0, None)
+    for item in accept.split(","):
+        media_range, *params = item.split(";")
+        media_range = _base_type(media_range)
+        quality = 1.0
+        for param in params:
+            name, _, value = param.partition("=")
+            if name.strip().lower() == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        if media_range in ("*/*", "application/*"):
+            candidate = JSON
+        elif media_range in supported:
+            candidate = media_range
+        else:
+            continue
+        if quality > best[0]:
+            best = (quality, candidate)
+
+    if best[1] is None:
+        raise _media_error(406, "Not acceptable", f"Cannot encode a response as any of: {accept}")
+    return best[1]
+
+
+def decode_columns(body: bytes, media_type: str) -> Dict[str, Any]:
+    """
+    Decode a columnar request body into a dictionary of columns.
+
+    Arrow columns become NumPy arrays (zero-copy for numeric columns without
+    nulls in a single chunk); MessagePack and JSON bodies become lists.
+    Raises ValueError for a malformed body.
+    """
+    if media_type == ARROW:
+        try:
+            table = pa.ipc.open_stream(body).read_all()
+        except (pa.ArrowInvalid, OSError) as e:
+            raise ValueError(f"Invalid Arrow IPC stream: {e}")
+        return {name: table.column(name).to_numpy() for name in table.column_names}
+
+    if media_type == MSGPACK:
+        try:
+            columns = msgpack.unpackb(body, raw=False)
+        except (msgpack.ExtraData, msgpack.FormatError, msgpack.StackError, ValueError) as e:
+            raise ValueError(f"Invalid MessagePack body: {str(e) or type(e).__name__}")
+    else:
+        try:
+            columns = json.loads(body)
+        except ValueError as e:
+            raise ValueError(f"Invalid JSON body: {e}")
+
+    if not isinstance(columns, dict):
+        raise ValueError("The body must be a map of column name to values")
+    return columns
+
+
+def _plain(value: Any) -> Any:
+    if isinstance(value, np.ndarray):
+        return value.tolist()
+    if isinstance(value, dict):
+        return {key: _plain(item) for key, item in value.items()}
+    return value
+
+
+def encode_columns(payload: Dict[str, Any], media_type: str) -> bytes:
+    """
+    Encode a columnar response: NumPy arrays, dictionaries of arrays and scalars.
+
+    JSON and MessagePack keep the payload's shape. Arrow gets a table of the
+    arrays, with those nested in a dictionary named '<name>_<key>', and the
+    scalars as JSON values in the schema metadata.
+    """
+    if media_type == ARROW:
+        columns, metadata = {}, {}
+        for name, value in payload.items():
+            if isinstance(value, np.ndarray):
+                columns[name] = value
+            elif isinstance(value, dict):
+                columns.update({f"{name}_{key}": values for key, values in value.items()})
+            else:
+                metadata[name] = json.dumps(value, default=str)
+        table = pa.table({name: pa.array(values) for name, values in columns.items()}, metadata=metadata)
+        sink = pa.BufferOutputStream()
+        with pa.ipc.new_stream(sink, table.schema) as writer:
+            writer.write_table(table)
+        return sink.getvalue().to_pybytes()
+
+    plain = _plain(payload)
+    if media_type == MSGPACK:
+        return msgpack.packb(plain, use_bin_type=True, default=str)
+    return json.dumps(plain, separators=(",", ":"), default=str).encode("utf-8")
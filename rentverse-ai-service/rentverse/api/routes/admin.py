@@ -0,0 +1,173 @@
+"""
+Admin endpoints for diagnosing the running service.
+
+Disabled unless ADMIN_TOKEN is set; requests must then carry the token in
+the X-Admin-Token header.
+"""
+
+import asyncio
+import hmac
+import threading
+from datetime import datetime
+from typing import Optional
+
+from fastapi import APIRouter, Depends, Header, HTTPException, Query
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import JSONResponse, PlainTextResponse
+
+from ..admission import get_admission_controller
+from ...config import get_settings
+from ...core.exceptions import ModelNotFoundError
+from ...models.ml_models import get_model
+from ...utils.audit import get_audit_log
+from ...utils.memory import get_allocation_tracker, process_memory
+from ...utils.profiler import SamplingProfiler
+from ...utils.singleflight import singleflight_stats
+
+router = APIRouter(prefix="/admin", tags=["Admin"])
+
+
+def _admin_error(status_code: int, error: str, detail: str) -> HTTPException:
+    return HTTPException(
+        status_code=status_code,
+        detail={
+            "error": error,
+            "detail": detail,
+            "code": status_code,
+            "timestamp": datetime.now().isoformat()
+        }
+    )
+
+
+def require_admin(x_admin_token: Optional[str] = Header(None)) -> None:
+    """Reject the request unless admin endpoints are enabled and the token matches."""
+    token = get_settings().admin_token
+    if not token:
+        raise _admin_error(404, "Not found", "Admin endpoints are disabled; set ADMIN_TOKEN to enable them")
+    if x_admin_token is None or not hmac.compare_digest(x_admin_token.encode(), token.encode()):
+        raise _admin_error(403, "Forbidden", "Missing or invalid X-Admin-Token")
+
+
+@router.get("/profile", dependencies=[Depends(require_admin)], response_class=PlainTextResponse)
+async def profile(
+    seconds: float = Query(10.0, gt=0, description="How long to sample"),
+    interval_ms: float = Query(10.0, ge=1, le=1000, description="Milliseconds between samples"),
+    idle: bool = Query(False, description="Keep stacks of threads waiting on a lock, queue or selector"),
+    format: str = Query("collapsed", pattern="^(collapsed|summary)$", description="collapsed or summary")
+):
+    """
+    Profile all threads of the service for a number of seconds.
+
+    Samples every thread's stack while real traffic is served. Each stack
+    starts with route:<path> and stage:<inference stage> frames, so a
+    flamegraph splits by endpoint and by preprocess, model, encode and so
+    on. Requests already in flight when the profile starts stay untagged.
+    Only one profile runs at a time.
+
+    Returns:
+        Collapsed stacks as text/plain (flamegraph.pl, speedscope), or with
+        format=summary sample counts by route and stage and the hottest frames
+    """
+    max_seconds = get_settings().profiler_max_seconds
+    if seconds > max_seconds:
+        raise _admin_error(400, "Invalid duration", f"seconds must be at most {max_seconds}")
+
+    profiler = SamplingProfiler(
+        interval=interval_ms / 1000,
+        include_idle=idle,
+        loop=asyncio.get_running_loop(),
+        loop_thread=threading.get_ident()
+    )
+    try:
+        await run_in_threadpool(profiler.run, seconds)
+    except RuntimeError as e:
+        raise _admin_error(409, "Profile in progress", str(e))
+
+    if format == "summary":
+        return JSONResponse(profiler.summary())
+    return PlainTextResponse(
+        profiler.collapsed(),
+        headers={"X-Profile-Samples": str(profiler.samples), "X-Profile-Duration": f"{profiler.duration:.3f}"}
+    )
+
+
+def _memory_report() -> dict:
+    """Process, model component and queue memory; runs in the thread pool."""
+    try:
+        model = get_model().memory_report()
+    except ModelNotFoundError as e:
+        model = {"error": str(e)}
+
+    audit_log = get_audit_log()
+    admission = get_admission_controller().get_stats()
+    queues = {
+        "audit_buffer": {
+            "entries": audit_log.get_stats()["buffered"],
+            "bytes": audit_log.buffered_bytes()
+        } if audit_log is not None else None,
+        "admission": {name: lane["queued"] for name, lane in admission["lanes"].items()},
+        "admission_clients": admission["tracked_clients"],
+        "coalescing_in_flight": {name: stats["in_flight"] for name, stats in singleflight_stats().items()}
+    }
+    return {
+        "process": process_memory(),
+        "model": model,
+        "queues": queues,
+        "tracemalloc": get_allocation_tracker().get_stats(),
+        "timestamp": datetime.now().isoformat()
+    }
+
+
+@router.get("/memory", dependencies=[Depends(require_admin)])
+async def memory():
+    """
+    Report memory by process, model component and queue.
+
+    Returns:
+        dict: RSS and garbage collector counts, approximate bytes held by the
+        model trees, scaler, encoders, location cache, monitors and the loaded
+        artifact, the sizes of the audit buffer and admission queues, and the
+        tracemalloc snapshots taken so far
+    """
+    return await run_in_threadpool(_memory_report)
+
+
+@router.post("/memory/snapshots", dependencies=[Depends(require_admin)])
+async def take_memory_snapshot(
+    label: Optional[str] = Query(None, max_length=64, description="Snapshot name, a timestamp by default"),
+    frames: int = Query(1, ge=1, le=64, description="Traceback depth if this starts tracing")
+):
+    """
+    Take a tracemalloc snapshot to compare later ones against.
+
+    The first snapshot starts tracing, which slows allocations until
+    DELETE /admin/memory/snapshots stops it. The newest 10 snapshots are kept.
+    """
+    return await run_in_threadpool(get_allocation_tracker().take, label, frames)
+
+
+@router.get("/memory/diff", dependencies=[Depends(require_admin)])
+async def memory_diff(
+    base: str = Query(..., description="Label of the earlier snapshot"),
+    target: Optional[str] = Query(None, description="Label of the later snapshot, a new snapshot if omitted"),
+    group_by: str = Query("lineno", pattern="^(lineno|filename|traceback)$"),
+    limit: int = Query(25, ge=1, le=500)
+):
+    """
+    Allocation sites that grew most between two snapshots.
+
+    Returns:
+        dict: Traced and RSS growth, and the top allocation sites by size
+        difference with their block counts
+    """
+    try:
+        return await run_in_threadpool(get_allocation_tracker().diff, base, target, group_by, limit)
+    except KeyError as e:
+        raise _admin_error(404, "Snapshot not found", f"No snapshot labelled {e.args[0]}")
+
+
+@router.delete("/memory/snapshots", dependencies=[Depends(require_admin)])
+async def stop_memory_tracing():
+    """Forget the snapshots and stop tracemalloc."""
+    get_allocation_tracker().stop()
+    return {"tracing": False, "timestamp": datetime.now().isoformat()}
@@ -3,21 +3,29 @@ Classification and additional prediction endpoints for RentVerse AI Service.
 """
 
 import logging
+import time
 from datetime import datetime
 
 from fastapi import APIRouter, HTTPException, Response
+from fastapi.concurrency import run_in_threadpool
 
 from ...core.exceptions import ModelNotFoundError, PredictionError, ValidationError
 from ...models.ml_models import get_model
+from ...models.pool import get_model_pool
+from ...utils.audit import audit_predictions
+from ...utils.singleflight import get_singleflight
 from ...models.schemas import (
     PricePredictionRequest,
     PricePredictionResponse,
     ListingApprovalRequest,
-    ListingApprovalResponse
+    ListingApprovalResponse,
+    BatchListingApprovalRequest,
+    BatchListingApprovalResponse
 )
 
 router = APIRouter(prefix="/classify", tags=["Classification"])
 logger = logging.getLogger(__name__)
+price_flight = get_singleflight("classify_price")
 
 
 @router.post("/price", response_model=PricePredictionResponse, summary="Simple price prediction")
@@ -42,11 +50,18 @@ async def predict_price(request: PricePredictionRequest, response: Response):
     logger.info(f"Received price prediction request for {request.property_type} property")
 
     try:
-        model = get_model()
+        model = await get_model_pool(get_model()).aselect(request.location)
 
         # Convert Pydantic model to dictionary for the ML model
         property_data = request.model_dump()
-        predicted_price = model.predict(property_data)
+
+        # Identical concurrent requests against the same loaded model share one prediction
+        feature_key = model.feature_key(property_data)
+        key = (model, feature_key) if feature_key is not None else None
+        started = time.perf_counter()
+        predicted_price = await price_flight.do(key, model.predict, property_data)
+        audit_predictions("/classify/price", model, [property_data], [predicted_price],
+                          (time.perf_counter() - started) * 1000)
 
         # Calculate price range (±10%)
         price_range = {
@@ -142,11 +157,14 @@ async def classify_listing_approval(request: ListingApprovalRequest, response: R
     logger.info(f"Received listing approval request for {request.property_type} property at RM {request.asking_price}")
 
     try:
-        model = get_model()
+        model = await get_model_pool(get_model()).aselect(request.location)
 
         # Convert Pydantic model to dictionary for the ML model
         property_data = request.model_dump()
-        result = model.classify_listing_approval(property_data)
+        started = time.perf_counter()
+        result = await run_in_threadpool(model.classify_listing_approval, property_data)
+        audit_predictions("/classify/approval", model, [property_data], [result],
+                          (time.perf_counter() - started) * 1000)
 
         response = ListingApprovalResponse(**result)
 
@@ -203,6 +221,108 @@ async def classify_listing_approval(request: ListingApprovalRequest, response: R
         )
 
 
+@router.post("/approval/batch", response_model=BatchListingApprovalResponse,
+             summary="Batch listing approval classification")
+async def classify_listing_approval_batch(request: BatchListingApprovalRequest, response: Response):
+    """
+    Classify many listings in a single request.
+
+    All asking prices are scored in one vectorized model call and the approval
+    rules are applied across the whole batch. Each result is identical to what
+    `/classify/approval` returns for the same listing, plus its `batch_index`.
+
+    Args:
+        request: Listings including asking prices for classification
+
+    Returns:
+        BatchListingApprovalResponse: Per-listing classifications with summary counts
+
+    Raises:
+        HTTPException: If classification fails or model is not available
+    """
+    # Set CORS headers
+    response.headers["Access-Control-Allow-Origin"] = "*"
+    response.headers["Access-Control-Allow-Methods"] = "GET, POST, PUT, DELETE, OPTIONS"
+    response.headers["Access-Control-Allow-Headers"] = "*"
+
+    logger.info(f"Received batch listing approval request for {len(request.listings)} listings")
+
+    try:
+        model = get_model()
+
+        # Convert Pydantic models to dictionaries for the ML model
+        listings_data = [listing.model_dump() for listing in request.listings]
+        started = time.perf_counter()
+        results, groups = await run_in_threadpool(
+            get_model_pool(model).map_batch, listings_data,
+            lambda routed, listings: routed.classify_listing_approval_batch(listings)
+        )
+        latency_ms = (time.perf_counter() - started) * 1000
+        for routed, positions in groups:
+            audit_predictions("/classify/approval/batch", routed, [listings_data[i] for i in positions],
+                              [results[i] for i in positions], latency_ms)
+
+        success_count = sum(1 for r in results if r.get("status") == "success")
+        error_count = len(results) - success_count
+
+        logger.info(f"Batch listing approval completed: {success_count} successful, {error_count} failed")
+        return BatchListingApprovalResponse(
+            results=results,
+            total_count=len(results),
+            success_count=success_count,
+            error_count=error_count,
+            timestamp=datetime.now()
+        )
+
+    except ModelNotFoundError as e:
+        logger.error(f"Model not found: {e}")
+        raise HTTPException(
+            status_code=503,
+            detail={
+                "error": "Model not available",
+                "detail": str(e),
+                "code": 503,
+                "timestamp": datetime.now().isoformat()
+            }
+        )
+
+    except ValidationError as e:
+        logger.error(f"Validation error: {e}")
+        raise HTTPException(
+            status_code=400,
+            detail={
+                "error": "Invalid batch request",
+                "detail": str(e),
+                "code": 400,
+                "timestamp": datetime.now().isoformat()
+            }
+        )
+
+    except PredictionError as e:
+        logger.error(f"Batch classification error: {e}")
+        raise HTTPException(
+            status_code=500,
+            detail={
+                "error": "Batch classification failed",
+                "detail": str(e),
+                "code": 500,
+                "timestamp": datetime.now().isoformat()
+            }
+        )
+
+    except Exception as e:
+        logger.error(f"Unexpected error in batch listing approval classification: {e}")
+        raise HTTPException(
+            status_code=500,
+            detail={
+                "error": "Internal server error",
+                "detail": "An unexpected error occurred during batch classification",
+                "code": 500,
+                "timestamp": datetime.now().isoformat()
+            }
+        )
+
+
 @router.options("/price")
 async def price_options(response: Response):
     """Handle OPTIONS request for price prediction endpoint."""
@@ -221,3 +341,13 @@ async def approval_options(response: Response):
     response.headers["Access-Control-Allow-Headers"] = "*"
     response.headers["Access-Control-Max-Age"] = "86400"
     return {"message": "OK"}
+
+
+@router.options("/approval/batch")
+async def approval_batch_options(response: Response):
+    """Handle OPTIONS request for batch approval classification endpoint."""
+    response.headers["Access-Control-Allow-Origin"] = "*"
+    response.headers["Access-Control-Allow-Methods"] = "GET, POST, PUT, DELETE, OPTIONS"
+    response.headers["Access-Control-Allow-Headers"] = "*"
+    response.headers["Access-Control-Max-Age"] = "86400"
+    return {"message": "OK"}
@@ -2,24 +2,61 @@
 Health check endpoints.
 """
 
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, Request, Response
+from fastapi.responses import JSONResponse
 from datetime import datetime
 
+from ..admission import get_admission_controller
+from ..conditional import ModelBoundResponse
+from ..shutdown import get_shutdown_coordinator
 from ...models.schemas import HealthResponse, ModelInfoResponse
 from ...models.ml_models import get_model
+from ...models.pool import model_pool_stats
 from ...core.exceptions import ModelNotFoundError
+from ...utils.audit import get_audit_log
+from ...utils.singleflight import singleflight_stats
 
 router = APIRouter(prefix="/health", tags=["Health"])
 
 
+def _model_info_summary(model) -> ModelInfoResponse:
+    """Summary model information served by /health/model."""
+    info = model.get_model_info()
+    return ModelInfoResponse(
+        model_version=info["model_version"],
+        created_at=info["created_at"],
+        feature_columns=info["feature_columns"],
+        supported_property_types=info["supported_property_types"],
+        supported_furnished_types=info["supported_furnished_types"],
+        is_loaded=info["is_loaded"],
+        max_batch_size=info["max_batch_size"]
+    )
+
+
+model_info_response = ModelBoundResponse(_model_info_summary)
+
+
 @router.get("/", response_model=HealthResponse)
 async def health_check():
     """
     Basic health check endpoint to verify service status.
 
+    Once shutdown has begun, answers 503 with status "draining" so load
+    balancers stop routing requests here.
+
     Returns:
         HealthResponse: Service health status with model information
     """
+    coordinator = get_shutdown_coordinator()
+    if coordinator.unready:
+        draining = HealthResponse(
+            status="draining",
+            message=f"Shutting down: {coordinator.in_flight} request(s) in flight",
+            timestamp=datetime.now(),
+            test_prediction=None
+        )
+        return JSONResponse(status_code=503, content=draining.model_dump(mode="json"))
+
     try:
         model = get_model()
         health_result = model.health_check()
@@ -28,7 +65,8 @@ async def health_check():
             status=health_result["status"],
             message=health_result["message"],
             timestamp=datetime.now(),
-            test_prediction=health_result.get("test_prediction")
+            test_prediction=health_result.get("test_prediction"),
+            drift_alerts=health_result.get("drift_alerts")
         )
     except Exception as e:
         return HealthResponse(
@@ -40,25 +78,18 @@ async def health_check():
 
 
 @router.get("/model", response_model=ModelInfoResponse)
-async def model_info():
+async def model_info(request: Request):
     """
     Get information about the current prediction model.
 
+    Served with a strong ETag; a matching If-None-Match gets 304 Not Modified.
+
     Returns:
         ModelInfoResponse: Model metadata including version and capabilities
     """
     try:
         model = get_model()
-        info = model.get_model_info()
-
-        return ModelInfoResponse(
-            model_version=info["model_version"],
-            created_at=info["created_at"],
-            feature_columns=info["feature_columns"],
-            supported_property_types=info["supported_property_types"],
-            is_loaded=info["is_loaded"],
-            max_batch_size=info["max_batch_size"]
-        )
+        return model_info_response.respond(request, model)
 
     except ModelNotFoundError as e:
         raise HTTPException(
@@ -80,3 +111,150 @@ async def model_info():
             }
         )
 
+
+@router.get("/coalescing")
+async def coalescing_stats():
+    """
+    Get in-flight request coalescing statistics.
+
+    Returns:
+        dict: Per endpoint calls, executions and calls that shared another
+        request's prediction
+    """
+    return {
+        "groups": singleflight_stats(),
+        "timestamp": datetime.now().isoformat()
+    }
+
+
+@router.get("/admission")
+async def admission_stats():
+    """
+    Get admission control and load shedding statistics.
+
+    Returns:
+        dict: Slot usage, admitted and shed request counts by reason, and
+        queueing delay percentiles
+    """
+    return {
+        **get_admission_controller().get_stats(),
+        "timestamp": datetime.now().isoformat()
+    }
+
+
+@router.get("/audit")
+async def audit_stats():
+    """
+    Get prediction audit log statistics.
+
+    Returns:
+        dict: Buffered, written, dropped and lost record counts and the
+        current segment, or enabled=false if auditing is disabled
+    """
+    audit_log = get_audit_log()
+    return {
+        "enabled": audit_log is not None,
+        **(audit_log.get_stats() if audit_log is not None else {}),
+        "timestamp": datetime.now().isoformat()
+    }
+
+
+@router.get("/pool")
+async def pool_stats():
+    """
+    Get region model pool statistics.
+
+    Returns:
+        dict: Resident region models and their sizes, hit rate, loads,
+        evictions, fallbacks to the global model and recent pool events, or
+        enabled=false before the first prediction created the pool
+    """
+    stats = model_pool_stats()
+    return {
+        "enabled": stats is not None,
+        **(stats or {}),
+        "timestamp": datetime.now().isoformat()
+    }
+
+
+def _model_or_503():
+    """Get the loaded model or fail with 503."""
+    try:
+        return get_model()
+    except Exception as e:
+        raise HTTPException(
+            status_code=503,
+            detail={
+                "error": f"Model not available: {str(e)}",
+                "status": "error",
+                "timestamp": datetime.now().isoformat()
+            }
+        )
+
+
+@router.get("/predictions")
+async def prediction_stats():
+    """
+    Get the distribution of predicted prices served by the loaded model.
+
+    Returns:
+        dict: Overall and per region/property type counts, price quantiles
+        (lifetime, current and previous window) and out-of-range counts
+    """
+    model = _model_or_503()
+    return {
+        "model_version": model.model_version,
+        **model.monitor.get_stats(),
+        "timestamp": datetime.now().isoformat()
+    }
+
+
+@router.get("/predictions/sketches")
+async def prediction_sketches():
+    """
+    Get the serialized prediction sketches of this worker.
+
+    Snapshots of several workers merge with PredictionMonitor.from_snapshot
+    and PredictionMonitor.merge into the statistics of their combined traffic.
+    """
+    model = _model_or_503()
+    return {
+        "model_version": model.model_version,
+        **model.monitor.snapshot()
+    }
+
+
+@router.get("/drift")
+async def drift_stats():
+    """
+    Get input drift scores of the loaded model.
+
+    Returns:
+        dict: Per-feature PSI against the training baseline, unknown-category
+        and out-of-range rates of recent inputs, and active alerts
+    """
+    model = _model_or_503()
+    if model.drift is None:
+        raise HTTPException(
+            status_code=503,
+            detail={
+                "error": "Drift detection not available for the loaded model",
+                "status": "error",
+                "timestamp": datetime.now().isoformat()
+            }
+        )
+    return {
+        "model_version": model.model_version,
+        **model.drift.get_stats(),
+        "timestamp": datetime.now().isoformat()
+    }
+
+
+@router.get("/metrics")
+async def metrics():
+    """Get prediction distribution and input drift metrics in the Prometheus text exposition format."""
+    model = _model_or_503()
+    content = model.monitor.prometheus(model.model_version)
+    if model.drift is not None:
+        content += model.drift.prometheus(model.model_version)
+    return Response(content=content, media_type="text/plain; version=0.0.4")
@@ -2,31 +2,78 @@
 Prediction endpoints for RentVerse AI Service.
 """
 
+import copy
 import logging
+import time
 from datetime import datetime
-
-from fastapi import APIRouter, HTTPException, BackgroundTasks
-
+from typing import List, Optional
+
+import numpy as np
+from fastapi import APIRouter, HTTPException, BackgroundTasks, Query, Request, Response
+from fastapi.concurrency import run_in_threadpool
+
+from ..conditional import ModelBoundResponse
+from ..encoding import (
+    ARROW,
+    JSON,
+    MSGPACK,
+    decode_columns,
+    encode_columns,
+    request_media_type,
+    response_media_type
+)
 from ...core.exceptions import ModelNotFoundError, PredictionError, ValidationError
+from ...models.comparables import DEFAULT_K, MAX_K
 from ...models.ml_models import get_model
+from ...models.pool import get_model_pool
 from ...models.schemas import (
     PropertyPredictionRequest,
     BatchPredictionRequest,
     PredictionResponse,
-    BatchPredictionResponse
+    BatchPredictionResponse,
+    ColumnarPredictionRequest,
+    ColumnarPredictionResponse,
+    ComparablesResponse,
+    ExplanationResponse,
+    BatchExplanationResponse
 )
+from ...utils.audit import ColumnRows, audit_predictions
+from ...utils.profiler import stage
+from ...utils.singleflight import get_singleflight
 
 router = APIRouter(prefix="/predict", tags=["Prediction"])
 logger = logging.getLogger(__name__)
+single_flight = get_singleflight("predict_single")
+model_info_response = ModelBoundResponse(lambda model: model.get_model_info())
+
+MAX_QUANTILES = 9
+
+
+def validate_quantiles(quantiles: Optional[List[float]]) -> Optional[List[float]]:
+    """Validate requested prediction quantiles."""
+    if not quantiles:
+        return None
+    if len(quantiles) > MAX_QUANTILES:
+        raise ValidationError(f"At most {MAX_QUANTILES} quantiles can be requested")
+    invalid = [q for q in quantiles if not 0 < q < 1]
+    if invalid:
+        raise ValidationError(f"Quantiles must be between 0 and 1 (exclusive): {invalid}")
+    return quantiles
 
 
 @router.post("/single", response_model=PredictionResponse, summary="Single property prediction")
-async def predict_single_property(request: PropertyPredictionRequest):
+async def predict_single_property(
+    request: PropertyPredictionRequest,
+    quantiles: Optional[List[float]] = Query(
+        None, description="Extra price quantiles to return, e.g. ?quantiles=0.05&quantiles=0.95"
+    )
+):
     """
     Predict rent price for a single property.
 
     Args:
         request: Property details for prediction
+        quantiles: Optional price quantiles (0-1) to include in the response
 
     Returns:
         PredictionResponse: Predicted rent price with confidence metrics
@@ -37,11 +84,20 @@ async def predict_single_property(request: PropertyPredictionRequest):
     logger.info(f"Received single prediction request for {request.property_type} property")
 
     try:
-        model = get_model()
+        model = await get_model_pool(get_model()).aselect(request.location)
 
         # Convert Pydantic model to dictionary for the ML model
         property_data = request.model_dump()
-        result = model.predict_single(property_data)
+        quantiles = validate_quantiles(quantiles)
+
+        # Identical concurrent requests against the same loaded model share one prediction
+        feature_key = model.feature_key(property_data)
+        key = (model, feature_key, tuple(quantiles or ())) if feature_key is not None else None
+        started = time.perf_counter()
+        # Coalesced callers get the same dict; copy it so one request's changes never reach another
+        result = copy.deepcopy(await single_flight.do(key, model.predict_single, property_data, quantiles=quantiles))
+        audit_predictions("/predict/single", model, [property_data], [result],
+                          (time.perf_counter() - started) * 1000)
 
         logger.info(f"Prediction successful: RM {result['predicted_price']:,.0f}")
         return result
@@ -95,10 +151,181 @@ async def predict_single_property(request: PropertyPredictionRequest):
         )
 
 
+@router.post("/comparables", response_model=ComparablesResponse, summary="Comparable listings")
+async def find_comparables(
+    request: PropertyPredictionRequest,
+    k: int = Query(DEFAULT_K, ge=1, le=MAX_K, description="Number of comparable listings to return")
+):
+    """
+    Find the training listings most similar to a property.
+
+    Comparables share the property's region, property type and furnishing,
+    giving up furnishing, then property type, then region when too few
+    listings match, and are ranked by distance over the model's scaled
+    numeric features. The listings are those stored in the artifact of the
+    model serving the property's region. The shipped artifacts have none, so
+    this route answers 503 until `rentverse index-comparables` has been run
+    on the artifact.
+
+    Args:
+        request: Property details to find comparables for
+        k: Number of comparables to return
+
+    Returns:
+        ComparablesResponse: Nearest listings with prices and distances, and their price distribution
+
+    Raises:
+        HTTPException: If the search fails or the loaded model has no comparables index
+    """
+    logger.info(f"Received comparables request for {request.property_type} property (k={k})")
+
+    try:
+        model = await get_model_pool(get_model()).aselect(request.location)
+        result = await run_in_threadpool(model.find_comparables, request.model_dump(), k)
+
+        logger.info(f"Comparables found: {len(result['comparables'])} in {result['query_ms']:.3f} ms")
+        return result
+
+    except ModelNotFoundError as e:
+        logger.error(f"Comparables index not available: {e}")
+        raise HTTPException(
+            status_code=503,
+            detail={
+                "error": "Comparables not available",
+                "detail": str(e),
+                "code": 503,
+                "timestamp": datetime.now().isoformat()
+            }
+        )
+
+    except PredictionError as e:
+        logger.error(f"Comparables error: {e}")
+        raise HTTPException(
+            status_code=500,
+            detail={
+                "error": "Comparables search failed",
+                "detail": str(e),
+                "code": 500,
+                "timestamp": datetime.now().isoformat()
+            }
+        )
+
+    except Exception as e:
+        logger.error(f"Unexpected error in comparables search: {e}")
+        raise HTTPException(
+            status_code=500,
+            detail={
+                "error": "Internal server error",
+                "detail": "An unexpected error occurred during the comparables search",
+                "code": 500,
+                "timestamp": datetime.now().isoformat()
+            }
+        )
+
+
+def _explanation_error(e: Exception) -> HTTPException:
+    """HTTPException for a failed explanation request."""
+    if isinstance(e, ModelNotFoundError):
+        logger.error(f"Explanations not available: {e}")
+        status_code, error, detail = 503, "Explanations not available", str(e)
+    elif isinstance(e, PredictionError):
+        logger.error(f"Explanation error: {e}")
+        status_code, error, detail = 500, "Explanation failed", str(e)
+    else:
+        logger.error(f"Unexpected error in explanation: {e}")
+        status_code, error, detail = 500, "Internal server error", "An unexpected error occurred during explanation"
+    return HTTPException(
+        status_code=status_code,
+        detail={
+            "error": error,
+            "detail": detail,
+            "code": status_code,
+            "timestamp": datetime.now().isoformat()
+        }
+    )
+
+
+@router.post("/explain", response_model=ExplanationResponse, summary="Explain a single prediction")
+async def explain_prediction(request: PropertyPredictionRequest):
+    """
+    Explain the predicted rent of a property feature by feature.
+
+    Each split along the property's path through every tree moves the
+    prediction from the parent node's training mean to the child's; the
+    change is credited to the feature split on (Saabas attribution). The
+    effects add up exactly to the predicted price minus the base price.
+    The attribution pass adds well under a millisecond per property; the
+    request as a whole costs about as much as /predict/single, most of it
+    preprocessing.
+
+    Args:
+        request: Property details to explain
+
+    Returns:
+        ExplanationResponse: Predicted and base price and per-feature effects, largest first
+
+    Raises:
+        HTTPException: If the explanation fails or the loaded model is not a tree ensemble
+    """
+    logger.info(f"Received explanation request for {request.property_type} property")
+
+    try:
+        model = await get_model_pool(get_model()).aselect(request.location)
+        result = await run_in_threadpool(model.explain, request.model_dump())
+
+        logger.info(f"Explanation completed: RM {result['predicted_price']:,.0f}")
+        return result
+
+    except Exception as e:
+        raise _explanation_error(e)
+
+
+@router.post("/explain/batch", response_model=BatchExplanationResponse, summary="Explain batch predictions")
+async def explain_batch(request: BatchPredictionRequest):
+    """
+    Explain the predicted rents of multiple properties in one vectorized pass.
+
+    Args:
+        request: Batch of property details (max 100 properties)
+
+    Returns:
+        BatchExplanationResponse: One explanation per property, in request order
+
+    Raises:
+        HTTPException: If the explanation fails or the loaded model is not a tree ensemble
+    """
+    logger.info(f"Received batch explanation request for {len(request.properties)} properties")
+
+    try:
+        model = get_model()
+        properties_data = [prop.model_dump() for prop in request.properties]
+        results, _ = await run_in_threadpool(
+            get_model_pool(model).map_batch, properties_data,
+            lambda routed, properties: routed.explain_batch(properties)
+        )
+
+        success_count = sum(1 for r in results if r.get("status") == "success")
+        logger.info(f"Batch explanation completed: {success_count} successful, "
+                    f"{len(results) - success_count} failed")
+        return BatchExplanationResponse(
+            explanations=results,
+            total_count=len(results),
+            success_count=success_count,
+            error_count=len(results) - success_count,
+            timestamp=datetime.now()
+        )
+
+    except Exception as e:
+        raise _explanation_error(e)
+
+
 @router.post("/batch", response_model=BatchPredictionResponse, summary="Batch property prediction")
 async def predict_batch_properties(
     request: BatchPredictionRequest,
-    background_tasks: BackgroundTasks
+    background_tasks: BackgroundTasks,
+    quantiles: Optional[List[float]] = Query(
+        None, description="Extra price quantiles to return for every property"
+    )
 ):
     """
     Predict rent prices for multiple properties in a single request.
@@ -106,6 +333,7 @@ async def predict_batch_properties(
     Args:
         request: List of properties for batch prediction
         background_tasks: FastAPI background tasks for logging
+        quantiles: Optional price quantiles (0-1) to include in each result
 
     Returns:
         BatchPredictionResponse: Batch prediction results with summary statistics
@@ -125,8 +353,17 @@ async def predict_batch_properties(
         # Convert Pydantic models to dictionaries for the ML model
         properties_data = [property_obj.model_dump() for property_obj in request.properties]
 
-        # Process batch predictions
-        results = model.predict_batch(properties_data)
+        # Process batch predictions, each property by the model of its region
+        quantiles = validate_quantiles(quantiles)
+        started = time.perf_counter()
+        results, groups = await run_in_threadpool(
+            get_model_pool(model).map_batch, properties_data,
+            lambda routed, properties: routed.predict_batch(properties, quantiles=quantiles)
+        )
+        latency_ms = (time.perf_counter() - started) * 1000
+        for routed, positions in groups:
+            audit_predictions("/predict/batch", routed, [properties_data[i] for i in positions],
+                              [results[i] for i in positions], latency_ms)
 
         # Calculate summary statistics
         successful_predictions = [r for r in results if r.get("status") == "success"]
@@ -195,20 +432,171 @@ async def predict_batch_properties(
         )
 
 
+def _predict_columnar_body(model, body: bytes, request_type: str, response_type: str,
+                           quantiles: Optional[List[float]]):
+    """Decode, check, predict per region and encode a columnar request; runs in the thread pool."""
+    try:
+        with stage('decode'):
+            columns = decode_columns(body, request_type)
+        with stage('validate'):
+            columns = ColumnarPredictionRequest.check_columns(columns)
+    except ValueError as e:
+        raise ValidationError(str(e))
+
+    result, groups = get_model_pool(model).predict_columns(columns, quantiles=quantiles)
+    payload = {
+        'predicted_price': result['predicted_price'],
+        'confidence_score': result['confidence_score'],
+        'price_min': result['price_min'],
+        'price_max': result['price_max'],
+        'quantiles': result['quantiles'],
+        'interval_method': result['interval_method'],
+        'model_version': result['model_version'],
+        'count': result['count'],
+        'currency': 'RM',
+        'status': 'success',
+        'timestamp': datetime.now().isoformat()
+    }
+    with stage('encode'):
+        content = encode_columns(payload, response_type)
+    return columns, result, groups, content
+
+
+@router.post(
+    "/columnar",
+    response_model=ColumnarPredictionResponse,
+    summary="Columnar batch prediction",
+    openapi_extra={
+        "requestBody": {
+            "required": True,
+            "content": {
+                media_type: {"schema": ColumnarPredictionRequest.model_json_schema()}
+                for media_type in (JSON, ARROW, MSGPACK)
+            }
+        }
+    }
+)
+async def predict_columnar(
+    request: Request,
+    quantiles: Optional[List[float]] = Query(
+        None, description="Extra price quantiles to return for every property"
+    )
+):
+    """
+    Predict rent prices for properties sent as columns, one array per field.
+
+    Meant for internal bulk callers: the columns are validated and predicted
+    as whole arrays, without an object per property, and the results come
+    back as arrays in request order. Up to 100,000 properties per request;
+    any invalid value rejects the whole request.
+
+    The body may be JSON, an Arrow IPC stream or MessagePack, as given by
+    Content-Type; the response format follows Accept and defaults to JSON.
+    Arrow responses hold quantile columns as `quantiles_<q>` and the scalar
+    fields as JSON values in the schema metadata.
+
+    Args:
+        request: Body with one array per property field, all of the same length
+        quantiles: Optional price quantiles (0-1) to include for every property
+
+    Returns:
+        ColumnarPredictionResponse: One array per result field
+
+    Raises:
+        HTTPException: If prediction fails or model is not available
+    """
+    request_type = request_media_type(request)
+    response_type = response_media_type(request)
+    body = await request.body()
+    logger.info(f"Received columnar prediction request ({len(body):,} bytes of {request_type})")
+
+    try:
+        model = get_model()
+
+        started = time.perf_counter()
+        columns, result, groups, content = await run_in_threadpool(
+            _predict_columnar_body, model, body, request_type, response_type, validate_quantiles(quantiles)
+        )
+        latency_ms = (time.perf_counter() - started) * 1000
+        outputs = {name: result[name] for name in ('predicted_price', 'price_min', 'price_max', 'confidence_score')}
+        if len(groups) == 1:
+            audit_predictions("/predict/columnar", groups[0][0], ColumnRows(columns), ColumnRows(outputs), latency_ms)
+        else:
+            for routed, positions in groups:
+                audit_predictions("/predict/columnar", routed,
+                                  ColumnRows({name: np.asarray(values)[positions] for name, values in columns.items()}),
+                                  ColumnRows({name: values[positions] for name, values in outputs.items()}),
+                                  latency_ms)
+
+        logger.info(f"Columnar prediction completed: {result['count']} properties as {response_type}")
+        return Response(content=content, media_type=response_type)
+
+    except ModelNotFoundError as e:
+        logger.error(f"Model not found for columnar prediction: {e}")
+        raise HTTPException(
+            status_code=503,
+            detail={
+                "error": "Model not available",
+                "detail": str(e),
+                "code": 503,
+                "timestamp": datetime.now().isoformat()
+            }
+        )
+
+    except ValidationError as e:
+        logger.error(f"Columnar validation error: {e}")
+        raise HTTPException(
+            status_code=400,
+            detail={
+                "error": "Invalid columnar request",
+                "detail": str(e),
+                "code": 400,
+                "timestamp": datetime.now().isoformat()
+            }
+        )
+
+    except PredictionError as e:
+        logger.error(f"Columnar prediction error: {e}")
+        raise HTTPException(
+            status_code=500,
+            detail={
+                "error": "Prediction failed",
+                "detail": str(e),
+                "code": 500,
+                "timestamp": datetime.now().isoformat()
+            }
+        )
+
+    except Exception as e:
+        logger.error(f"Unexpected error in columnar prediction: {e}")
+        raise HTTPException(
+            status_code=500,
+            detail={
+                "error": "Columnar prediction failed",
+                "detail": "An unexpected error occurred during columnar prediction",
+                "code": 500,
+                "timestamp": datetime.now().isoformat()
+            }
+        )
+
+
 @router.get("/model-info", summary="Get model information")
-async def get_model_info():
+async def get_model_info(request: Request):
     """
     Get information about the current prediction model.
 
+    The response is built once per loaded model and carries a strong ETag;
+    requests with a matching If-None-Match header get 304 Not Modified.
+
     Returns:
         dict: Model metadata including version, features, and capabilities
     """
     try:
         model = get_model()
-        info = model.get_model_info()
+        response = model_info_response.respond(request, model)
 
         logger.info("Model info requested")
-        return info
+        return response
 
     except ModelNotFoundError as e:
         logger.error(f"Model not found for info request: {e}")
@@ -0,0 +1,324 @@
+"""
+Graceful shutdown for RentVerse AI Service.
+
+A rolling deploy stops an instance with SIGTERM. Shutdown then goes through
+three phases:
+
+1. Grace: for SHUTDOWN_GRACE_SECONDS after the signal, requests are still
+   served, but the health check answers 503 `draining` so load balancers stop
+   routing new traffic here. Responses carry `Connection: close`, so clients
+   do not send their next request on a connection the server is about to
+   close.
+2. Drain: new requests get 503 with `Connection: close` and Retry-After, so
+   clients retry them on another instance. Requests already running or queued
+   for an admission slot finish, and so do their background tasks. The wait
+   ends when they are done or at the SHUTDOWN_DRAIN_SECONDS deadline; only
+   then is the signal passed on to the server, which closes its connections.
+3. Flush: the application's shutdown reports the counts, the audit log
+   writes its buffer and stops, and the log handlers are flushed.
+
+The drain runs in the signal path because the server waits for its open
+connections before it runs the application's shutdown; by then there is
+nothing left to wait for.
+
+Requests are counted by DrainMiddleware, which must be the outermost
+middleware. It then sees every request, including those still waiting for
+an admission slot, until their background tasks have run.
+"""
+
+import asyncio
+import logging
+import math
+import signal
+import threading
+import time
+from typing import Any, Callable, Dict, Optional, Sequence
+
+from fastapi.responses import JSONResponse
+
+logger = logging.getLogger(__name__)
+
+# Paths still served while draining, so probes can see the state
+DRAIN_EXEMPT_PREFIXES = ("/api/v1/health",)
+
+
+class ShutdownCoordinator:
+    """
+    Tracks in-flight requests and the shutdown phase.
+
+    Must be used from a single event loop, except begin_grace() and
+    begin_drain(), which may be called from a signal handler.
+
+    Parameters:
+    -----------
+    drain_seconds : float, default=30.0
+        Longest time to wait for in-flight requests once draining
+    grace_seconds : float, default=0.0
+        Time between the signal and draining, during which requests are still
+        served but the health check reports draining
+    """
+
+    def __init__(self, drain_seconds: float = 30.0, grace_seconds: float = 0.0):
+        self.drain_seconds = drain_seconds
+        self.grace_seconds = grace_seconds
+        self.in_flight = 0
+        self.completed = 0
+        self.rejected = 0
+        self.abandoned = 0
+        self.state = "serving"
+        self.signalled_at: Optional[float] = None
+        self.drain_started_at: Optional[float] = None
+        self.drain_ms: Optional[float] = None
+        self._idle: Optional[asyncio.Event] = None
+        self._shutdown_task: Optional[asyncio.Task] = None
+
+    @property
+    def draining(self) -> bool:
+        """Whether new requests are refused."""
+        return self.state in ("draining", "stopped")
+
+    @property
+    def unready(self) -> bool:
+        """Whether the health check should tell load balancers to stop routing here."""
+        return self.state != "serving"
+
+    def _idle_event(self) -> asyncio.Event:
+        if self._idle is None:
+            self._idle = asyncio.Event()
+            if self.in_flight == 0:
+                self._idle.set()
+        return self._idle
+
+    def request_started(self) -> None:
+        self.in_flight += 1
+        self._idle_event().clear()
+
+    def request_finished(self) -> None:
+        self.in_flight -= 1
+        self.completed += 1
+        if self.in_flight == 0:
+            self._idle_event().set()
+
+    def begin_grace(self) -> None:
+        """Report draining to health checks while still serving requests."""
+        if self.state == "serving":
+            self.state = "grace"
+            self.signalled_at = time.monotonic()
+            logger.info(f"Shutdown requested: serving for {self.grace_seconds:g}s more while reporting draining")
+
+    def begin_drain(self) -> None:
+        """Refuse new requests from now on."""
+        if not self.draining:
+            self.state = "draining"
+            self.drain_started_at = time.monotonic()
+            logger.info(f"Draining {self.in_flight} in-flight request(s)")
+
+    async def drain(self, timeout: Optional[float] = None) -> bool:
+        """
+        Refuse new requests and wait until in-flight requests have finished.
+
+        Args:
+            timeout: Seconds to wait; drain_seconds less the time already
+                spent draining if None
+
+        Returns:
+            True if every request finished, False if the deadline passed first
+        """
+        self.begin_drain()
+        if timeout is None:
+            timeout = max(0.0, self.drain_seconds - (time.monotonic() - self.drain_started_at))
+        started = time.monotonic()
+        try:
+            await asyncio.wait_for(self._idle_event().wait(), timeout)
+            finished = True
+        except asyncio.TimeoutError:
+            self.abandoned = self.in_flight
+            logger.warning(f"Drain deadline passed with {self.in_flight} request(s) still in flight")
+            finished = False
+        self.drain_ms = (time.monotonic() - started) * 1000
+        self.state = "stopped"
+        return finished
+
+    def remaining(self) -> float:
+        """Seconds left before the drain deadline."""
+        if self.drain_started_at is None:
+            return self.drain_seconds
+        return max(0.0, self.drain_seconds - (time.monotonic() - self.drain_started_at))
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get the shutdown phase and request counters."""
+        return {
+            'state': self.state,
+            'in_flight': self.in_flight,
+            'completed': self.completed,
+            'rejected_while_draining': self.rejected,
+            'abandoned': self.abandoned,
+            'grace_seconds': self.grace_seconds,
+            'drain_seconds': self.drain_seconds,
+            'drain_ms': round(self.drain_ms, 1) if self.drain_ms is not None else None
+        }
+
+
+class DrainMiddleware:
+    """
+    ASGI middleware counting in-flight requests and refusing new ones while draining.
+
+    Once shutdown has begun, responses close their connection. Must be the
+    outermost middleware, so a request is counted from its arrival to the end
+    of its background tasks.
+    """
+
+    def __init__(
+        self,
+        app,
+        get_coordinator: Callable[[], ShutdownCoordinator],
+        exempt_prefixes: Sequence[str] = DRAIN_EXEMPT_PREFIXES
+    ):
+        self.app = app
+        self.get_coordinator = get_coordinator
+        self.exempt_prefixes = tuple(exempt_prefixes)
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        coordinator = self.get_coordinator()
+        if coordinator.draining and not scope["path"].startswith(self.exempt_prefixes):
+            coordinator.rejected += 1
+            response = JSONResponse(
+                status_code=503,
+                content={
+                    "error": "Service shutting down",
+                    "detail": "draining",
+                    "code": 503,
+                    "status": "error",
+                    "timestamp": time.time()
+                },
+                headers={
+                    "Retry-After": str(max(1, math.ceil(coordinator.remaining()))),
+                    "Connection": "close"
+                }
+            )
+            await response(scope, receive, send)
+            return
+
+        async def send_closing(message):
+            if message["type"] == "http.response.start" and coordinator.unready:
+                headers = [(name, value) for name, value in message.get("headers", []) if name.lower() != b"connection"]
+                message = {**message, "headers": headers + [(b"connection", b"close")]}
+            await send(message)
+
+        coordinator.request_started()
+        try:
+            await self.app(scope, receive, send_closing)
+        finally:
+            coordinator.request_finished()
+
+
+async def _drain_then_forward(
+    coordinator: ShutdownCoordinator,
+    grace_seconds: float,
+    previous: Callable[[int, Any], Any],
+    signum: int,
+    frame: Any
+) -> None:
+    """Wait out the grace period, drain in-flight requests, then pass the signal on."""
+    try:
+        if grace_seconds > 0:
+            await asyncio.sleep(grace_seconds)
+        drained = await coordinator.drain()
+        logger.info(
+            f"Drained in {coordinator.drain_ms:.0f} ms: {coordinator.completed} request(s) completed, "
+            f"{coordinator.rejected} refused while draining"
+            + ("" if drained else f", {coordinator.abandoned} abandoned")
+        )
+    finally:
+        previous(signum, frame)
+
+
+def install_signal_handlers(
+    coordinator: ShutdownCoordinator,
+    loop: asyncio.AbstractEventLoop,
+    signals: Sequence[int] = (signal.SIGTERM, signal.SIGINT),
+    grace_signals: Sequence[int] = (signal.SIGTERM,)
+) -> bool:
+    """
+    Start the grace phase on a shutdown signal, then drain and pass the signal
+    on to the server's handler once in-flight requests have finished.
+
+    Must run after the server installed its own handlers, i.e. during
+    application startup. Only grace_signals start a grace period; the others
+    drain at once. A second signal is passed on at once. Does nothing outside
+    the main thread or when the server did not install a handler.
+
+    Returns:
+        Whether the handlers were installed
+    """
+    if threading.current_thread() is not threading.main_thread():
+        return False
+
+    def start(previous, signum, frame):
+        grace_seconds = coordinator.grace_seconds if signum in grace_signals else 0.0
+        coordinator._shutdown_task = loop.create_task(
+            _drain_then_forward(coordinator, grace_seconds, previous, signum, frame)
+        )
+
+    installed = False
+    for sig in signals:
+        previous = signal.getsignal(sig)
+        if not callable(previous) or previous is signal.default_int_handler:
+            continue
+
+        def handle(signum, frame, previous=previous):
+            if coordinator.state != "serving":
+                coordinator.begin_drain()
+                previous(signum, frame)
+                return
+            if signum in grace_signals:
+                coordinator.begin_grace()
+            else:
+                coordinator.begin_drain()
+            loop.call_soon_threadsafe(start, previous, signum, frame)
+
+        signal.signal(sig, handle)
+        installed = True
+    return installed
+
+
+def flush_log_handlers() -> None:
+    """Flush the handlers of every logger, e.g. before the process exits."""
+    loggers = [logging.getLogger()] + [
+        logger_ for logger_ in logging.Logger.manager.loggerDict.values() if isinstance(logger_, logging.Logger)
+    ]
+    for logger_ in loggers:
+        for handler in logger_.handlers:
+            try:
+                handler.flush()
+            except Exception:
+                pass
+
+
+_coordinator: Optional[ShutdownCoordinator] = None
+_coordinator_lock = threading.Lock()
+
+
+def get_shutdown_coordinator() -> ShutdownCoordinator:
+    """Get the global shutdown coordinator, creating it from the settings if necessary."""
+    global _coordinator
+    with _coordinator_lock:
+        if _coordinator is None:
+            from ..config import get_settings
+            settings = get_settings()
+            _coordinator = ShutdownCoordinator(
+                drain_seconds=settings.shutdown_drain_seconds,
+                grace_seconds=settings.shutdown_grace_seconds
+            )
+        return _coordinator
+
+
+def reset_shutdown_coordinator() -> None:
+    """Forget the global coordinator, so the next application start serves again."""
+    global _coordinator
+    with _coordinator_lock:
+        _coordinator = None
@@ -2,6 +2,8 @@
 Command-line interface for RentVerse AI Service.
 """
 
+import time
+
 import click
 import uvicorn
 from .config import get_settings
@@ -27,7 +29,10 @@ def start(host: str, port: int, reload: bool, log_level: str):
         host=host,
         port=port,
         reload=reload,
-        log_level=log_level
+        log_level=log_level,
+        # The shutdown signal handler has already drained in-flight requests;
+        # the ones it abandoned at the deadline are cancelled, not waited for again
+        timeout_graceful_shutdown=1
     )
 
 
@@ -47,6 +52,281 @@ def dev(host: str, port: int):
     )
 
 
+@cli.command()
+@click.option("--data", "data_path", required=True, type=click.Path(exists=True, dir_okay=False),
+              help="Raw listings CSV (e.g. notebooks/compiled.csv)")
+@click.option("--output-dir", default=None, help="Directory for the deployment pickles")
+@click.option("--reports-dir", default=None, help="Directory for the model comparison CSVs")
+@click.option("--jobs", default=None, type=int, help="Worker processes (default: all cores)")
+@click.option("--cv-folds", default=5, help="Cross-validation folds")
+@click.option("--test-size", default=0.2, help="Fraction of rows held out for testing")
+@click.option("--random-state", default=42, help="Random seed for splits and models")
+@click.option("--price-percentile", default=90, help="Price outlier percentile")
+@click.option("--area-percentile", default=95, help="Area outlier percentile")
+@click.option("--skip-normalization", is_flag=True, help="Skip the normalization method comparison")
+@click.option("--cache-dir", default=None, help="Stage cache directory (default: ~/.cache/rentverse/training)")
+@click.option("--cache-size-mb", default=None, type=int, help="Stage cache size cap in MB (default: 2048)")
+@click.option("--no-cache", is_flag=True, help="Recompute every stage without the stage cache")
+@click.option("--latency-slo-ms", default=None, type=float,
+              help="Deploy the most accurate model whose single-row p99 predict() latency is within this budget")
+@click.option("--region", default=None,
+              help="Train only on this region's listings, for the region model pool "
+                   "(default output: <models>/regions/<region>)")
+@click.option("--verbose", is_flag=True, help="Print preprocessing details")
+def train(data_path: str, output_dir: str, reports_dir: str, jobs: int, cv_folds: int, test_size: float,
+          random_state: int, price_percentile: int, area_percentile: int, skip_normalization: bool,
+          cache_dir: str, cache_size_mb: int, no_cache: bool, latency_slo_ms: float, region: str, verbose: bool):
+    """Train the candidate models and write the deployment artifacts."""
+    from .training import TrainingConfig, region_output_dir, run_training
+
+    config = TrainingConfig(
+        data_path=data_path,
+        cv_folds=cv_folds,
+        test_size=test_size,
+        random_state=random_state,
+        price_percentile=price_percentile,
+        area_percentile=area_percentile,
+        compare_normalization=not skip_normalization,
+        latency_slo_ms=latency_slo_ms,
+        region=region,
+        verbose=verbose
+    )
+    if output_dir:
+        config.output_dir = output_dir
+    elif region:
+        config.output_dir = region_output_dir(region)
+    if reports_dir:
+        config.reports_dir = reports_dir
+    if jobs:
+        config.n_jobs = jobs
+    if cache_dir:
+        config.cache_dir = cache_dir
+    if cache_size_mb:
+        config.cache_max_bytes = cache_size_mb * 1024 ** 2
+    if no_cache:
+        config.cache_dir = None
+
+    region_note = f" for region '{region}'" if region else ""
+    click.echo(f"Training RentVerse models{region_note} from {data_path} with {config.n_jobs} worker(s)...")
+    start_time = time.time()
+
+    try:
+        result = run_training(config)
+    except Exception as e:
+        click.echo(f"❌ Training failed: {e}")
+        raise SystemExit(1)
+
+    click.echo("\n📊 Enhanced model comparison:")
+    click.echo(result['enhanced_comparison'].round(4).to_string(index=False))
+    click.echo("\n📊 Standard model comparison:")
+    click.echo(result['standard_comparison'].round(4).to_string(index=False))
+    serving_df = result['serving_report']
+    click.echo("\n⏱️  Accuracy vs. serving cost (* = Pareto optimal):")
+    serving_df = serving_df.assign(Model=serving_df['Model'].where(~serving_df['Pareto Optimal'],
+                                                                   serving_df['Model'] + ' *'))
+    click.echo(serving_df.drop(columns=['Pareto Optimal']).round(4).to_string(index=False))
+    slo_note = f" (p99 SLO {latency_slo_ms} ms)" if latency_slo_ms is not None else ""
+    click.echo(f"\n🥇 Best enhanced model{slo_note}: {result['best_enhanced_model']}")
+    click.echo(f"🥇 Best standard model{slo_note}: {result['best_standard_model']}")
+    for name, path in result['paths'].items():
+        click.echo(f"✅ {name}: {path}")
+    if result['cache']:
+        cache_stats = result['cache']
+        click.echo(f"🗄️  Stage cache: {cache_stats['hits']} hit(s), {cache_stats['misses']} miss(es), "
+                   f"{cache_stats['bytes'] / 1024 ** 2:,.1f} MB in {cache_stats['cache_dir']}")
+    click.echo(f"Finished in {time.time() - start_time:.1f}s")
+
+
+@cli.command()
+@click.option("--data", "data_path", required=True, type=click.Path(exists=True, dir_okay=False),
+              help="Raw listings CSV (e.g. notebooks/compiled.csv)")
+@click.option("--models", default=None,
+              help="Comma-separated models to tune (default: Ridge Regression, Random Forest, "
+                   "Gradient Boosting, Extra Trees)")
+@click.option("--trials", default=20, help="Random configurations sampled per model")
+@click.option("--eta", default=3, help="Successive halving factor: keep 1/eta per rung, eta x rows next rung")
+@click.option("--min-rows", default=500, help="Training rows per fold in the first rung")
+@click.option("--log-target", is_flag=True, help="Tune the enhanced (log target, RobustScaler) pipeline")
+@click.option("--reports-dir", default=None, help="Directory for the tuning CSVs")
+@click.option("--jobs", default=None, type=int, help="Worker processes (default: all cores)")
+@click.option("--cv-folds", default=3, help="Cross-validation folds")
+@click.option("--test-size", default=0.2, help="Fraction of rows held out for testing")
+@click.option("--random-state", default=42, help="Random seed for sampling, splits and models")
+@click.option("--cache-dir", default=None, help="Stage cache directory (default: ~/.cache/rentverse/training)")
+@click.option("--no-cache", is_flag=True, help="Recompute preprocessing without the stage cache")
+def tune(data_path: str, models: str, trials: int, eta: int, min_rows: int, log_target: bool,
+         reports_dir: str, jobs: int, cv_folds: int, test_size: float, random_state: int,
+         cache_dir: str, no_cache: bool):
+    """Search regressor hyperparameters and report accuracy against inference latency."""
+    from .training.tuning import TuningConfig, run_tuning
+
+    config = TuningConfig(
+        data_path=data_path,
+        models=[name.strip() for name in models.split(",")] if models else None,
+        n_trials=trials,
+        eta=eta,
+        min_rows=min_rows,
+        log_target=log_target,
+        cv_folds=cv_folds,
+        test_size=test_size,
+        random_state=random_state
+    )
+    if reports_dir:
+        config.reports_dir = reports_dir
+    if jobs:
+        config.n_jobs = jobs
+    if cache_dir:
+        config.cache_dir = cache_dir
+    if no_cache:
+        config.cache_dir = None
+
+    click.echo(f"Tuning RentVerse models from {data_path} with {config.n_jobs} worker(s)...")
+    start_time = time.time()
+
+    try:
+        result = run_tuning(config)
+    except Exception as e:
+        click.echo(f"❌ Tuning failed: {e}")
+        raise SystemExit(1)
+
+    trial_df = result['trials']
+    stopped = int((trial_df['Status'] == 'stopped early').sum())
+    click.echo(f"\n🔎 {len(trial_df)} configurations tried, {stopped} stopped early")
+    click.echo("\n📊 Finalists (accuracy vs. inference latency):")
+    click.echo(result['summary'].round(4).to_string(index=False, max_colwidth=80))
+    for name, path in result['paths'].items():
+        click.echo(f"✅ {name}: {path}")
+    click.echo(f"Finished in {time.time() - start_time:.1f}s")
+
+
+@cli.command()
+@click.option("--artifact", "artifact_path", required=True, type=click.Path(exists=True, dir_okay=False),
+              help="Deployment pickle to compress (e.g. rentverse/models/standard_deployment_pipeline.pkl)")
+@click.option("--data", "data_path", required=True, type=click.Path(exists=True, dir_okay=False),
+              help="Raw listings CSV the artifact was trained on")
+@click.option("--output", "output_path", default=None,
+              help="Where to write the compressed pickle (default: <artifact>.compressed.pkl)")
+@click.option("--epsilon", default=0.005, help="Maximum allowed drop in test R²")
+@click.option("--reports-dir", default=None, help="Directory for the compression report CSV")
+@click.option("--test-size", default=0.2, help="Test fraction used when the artifact was trained")
+@click.option("--random-state", default=42, help="Random seed used when the artifact was trained")
+@click.option("--cache-dir", default=None, help="Stage cache directory (default: ~/.cache/rentverse/training)")
+@click.option("--no-cache", is_flag=True, help="Recompute preprocessing without the stage cache")
+def compress(artifact_path: str, data_path: str, output_path: str, epsilon: float, reports_dir: str,
+             test_size: float, random_state: int, cache_dir: str, no_cache: bool):
+    """Shrink a trained model's ensemble, depth and leaves within an accuracy budget."""
+    from .training import TrainingConfig
+    from .training.compression import run_compression
+
+    config = TrainingConfig(data_path=data_path, test_size=test_size, random_state=random_state)
+    if reports_dir:
+        config.reports_dir = reports_dir
+    if cache_dir:
+        config.cache_dir = cache_dir
+    if no_cache:
+        config.cache_dir = None
+
+    click.echo(f"Compressing {artifact_path} (max test R² drop {epsilon})...")
+    try:
+        result = run_compression(artifact_path, config, output_path, epsilon)
+    except Exception as e:
+        click.echo(f"❌ Compression failed: {e}")
+        raise SystemExit(1)
+
+    summary = result['summary']
+    if not summary['supported']:
+        click.echo("⚠️  Model is not a tree model; written unchanged")
+    else:
+        click.echo(f"   - Estimators removed: {summary['estimators_removed']}")
+        click.echo(f"   - Pruned depth: {summary['pruned_depth'] or 'unchanged'}")
+        click.echo(f"   - Leaf merge tolerance: {summary['leaf_merge_fraction']}")
+    click.echo("\n📊 Before / after:")
+    click.echo(result['report'].round(4).to_string(index=False))
+    for name, path in result['paths'].items():
+        click.echo(f"✅ {name}: {path}")
+
+
+@cli.command("index-comparables")
+@click.option("--artifact", "artifact_path", required=True, type=click.Path(exists=True, dir_okay=False),
+              help="Deployment pickle to add comparable listings to")
+@click.option("--data", "data_path", required=True, type=click.Path(exists=True, dir_okay=False),
+              help="Raw listings CSV the artifact was trained on")
+@click.option("--output", "output_path", default=None, help="Where to write the pickle (default: overwrite --artifact)")
+@click.option("--cache-dir", default=None, help="Stage cache directory (default: ~/.cache/rentverse/training)")
+@click.option("--no-cache", is_flag=True, help="Recompute preprocessing without the stage cache")
+def index_comparables(artifact_path: str, data_path: str, output_path: str, cache_dir: str, no_cache: bool):
+    """Store the training listings and drift baseline in an artifact."""
+    from .training import TrainingConfig, run_comparables_index
+
+    config = TrainingConfig(data_path=data_path)
+    if cache_dir:
+        config.cache_dir = cache_dir
+    if no_cache:
+        config.cache_dir = None
+
+    try:
+        result = run_comparables_index(artifact_path, config, output_path)
+    except Exception as e:
+        click.echo(f"❌ Indexing comparables failed: {e}")
+        raise SystemExit(1)
+
+    click.echo(f"✅ {result['listings']:,} comparable listings written to {result['paths']['artifact']}")
+
+
+def _parse_time(value):
+    """Unix timestamp of an ISO datetime or of a time ago such as 30m, 2h or 7d."""
+    from datetime import datetime
+
+    if value is None:
+        return None
+    units = {"s": 1, "m": 60, "h": 3600, "d": 86400}
+    if value[-1:] in units and value[:-1].replace(".", "", 1).isdigit():
+        return time.time() - float(value[:-1]) * units[value[-1]]
+    try:
+        return datetime.fromisoformat(value).timestamp()
+    except ValueError:
+        raise click.BadParameter(f"expected an ISO datetime or a time ago like 2h, got {value!r}")
+
+
+@cli.command()
+@click.option("--dir", "directory", default=None, help="Audit log directory (default: AUDIT_DIR)")
+@click.option("--since", default=None, help="Start of the time range: ISO datetime or time ago (30m, 2h, 7d)")
+@click.option("--until", default=None, help="End of the time range: ISO datetime or time ago")
+@click.option("--endpoint", default=None, help="Route, e.g. /predict/single")
+@click.option("--model", "model_version", default=None, help="Model version")
+@click.option("--property-type", default=None, help="Property type")
+@click.option("--region", default=None, help="Region the location was resolved to")
+@click.option("--furnished", default=None, help="Furnishing status")
+@click.option("--bedrooms", default=None, type=int, help="Number of bedrooms")
+@click.option("--min-price", default=None, type=float, help="Lowest predicted price")
+@click.option("--max-price", default=None, type=float, help="Highest predicted price")
+@click.option("--limit", default=100, help="Maximum number of records (0 for all)")
+def audit(directory: str, since: str, until: str, endpoint: str, model_version: str, property_type: str,
+          region: str, furnished: str, bedrooms: int, min_price: float, max_price: float, limit: int):
+    """Print audit log records, one JSON object per line."""
+    import json
+    from .utils.audit import query_audit
+
+    records = query_audit(
+        directory or get_settings().audit_dir,
+        since=_parse_time(since),
+        until=_parse_time(until),
+        filters={
+            "endpoint": endpoint,
+            "model_version": model_version,
+            "property_type": property_type,
+            "region": region,
+            "furnished": furnished,
+            "bedrooms": bedrooms
+        },
+        min_price=min_price,
+        max_price=max_price,
+        limit=limit or None
+    )
+    for record in records:
+        click.echo(json.dumps(record))
+
+
 @cli.command()
 def test_model():
     """Test if the ML model can be loaded and make a prediction."""
@@ -23,9 +23,44 @@ class Settings(BaseSettings):
     price_model_filename: str = "price_prediction_model.pkl"
     preprocessor_filename: str = "data_preprocessor.pkl"
 
+    # Region model pool (region models live in <model dir>/regions/<region> by default)
+    region_models_dir: Optional[str] = None
+    model_pool_memory_mb: float = 512.0
+    model_pool_retry_seconds: float = 300.0  # before reloading a region model that failed
+
     # API configuration
     api_prefix: str = "/api/v1"
     max_batch_size: int = 100
+
+    # Admission control for inference routes
+    admission_max_concurrency: int = 4
+    admission_max_queue: int = 64
+    admission_target_ms: float = 50.0
+    admission_interval_ms: float = 500.0
+    admission_interactive_reserved: int = 1  # slots only interactive requests may use
+    admission_bulk_target_ms: float = 500.0
+    admission_bulk_interval_ms: float = 2000.0
+    client_rate_limit: Optional[float] = None  # requests/second per client, None disables
+    client_burst: int = 20
+
+    # Graceful shutdown
+    shutdown_grace_seconds: float = 0.0  # keep serving after SIGTERM while health reports draining
+    shutdown_drain_seconds: float = 25.0  # deadline for in-flight requests once draining
+
+    # Prediction audit log
+    audit_enabled: bool = False
+    audit_dir: str = "audit"
+    audit_buffer_size: int = 65536  # requests held in memory before new ones are dropped
+    audit_batch_size: int = 1024
+    audit_flush_interval_ms: float = 1000.0
+    audit_durability: str = "flush"  # none, flush or fsync
+    audit_segment_max_mb: int = 64
+    audit_segment_max_seconds: float = 3600.0
+    audit_max_segments: int = 168
+
+    # Admin endpoints (disabled unless a token is set)
+    admin_token: Optional[str] = None
+    profiler_max_seconds: float = 60.0
     
     # Logging configuration
     log_level: str = "INFO"
@@ -2,16 +2,28 @@
 Main FastAPI application for RentVerse AI Service.
 """
 
+import asyncio
 import logging
 from contextlib import asynccontextmanager
 from fastapi import FastAPI, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import JSONResponse
 
-from .api.routes import health, prediction, classification
+from .api.routes import admin, health, prediction, classification
 from .api.middleware import RequestLoggingMiddleware, ErrorHandlingMiddleware
+from .api.admission import AdmissionMiddleware, get_admission_controller
+from .api.shutdown import (
+    DrainMiddleware,
+    flush_log_handlers,
+    get_shutdown_coordinator,
+    install_signal_handlers,
+    reset_shutdown_coordinator
+)
 from .models.ml_models import get_model
 from .core.exceptions import ModelNotFoundError
+from .utils.audit import get_audit_log, close_audit_log
+from .utils.singleflight import singleflight_stats
+from .utils.profiler import RouteTagMiddleware
 from .config import get_settings
 
 # Configure logging
@@ -29,6 +41,10 @@ async def lifespan(app: FastAPI):
     """Manage application lifespan events."""
     # Startup
     logger.info("Starting RentVerse AI Service...")
+    reset_shutdown_coordinator()
+    coordinator = get_shutdown_coordinator()
+    if install_signal_handlers(coordinator, asyncio.get_running_loop()) and coordinator.grace_seconds > 0:
+        logger.info(f"Shutdown signals start a {coordinator.grace_seconds:g}s grace period before draining")
 
     try:
         # Initialize the model on startup
@@ -42,12 +58,37 @@ async def lifespan(app: FastAPI):
     except Exception as e:
         logger.error(f"Unexpected error during startup: {e}")
 
+    audit_log = get_audit_log()
+    if audit_log is not None:
+        logger.info(f"Prediction audit log writing to {audit_log.directory} ({audit_log.durability})")
+
     logger.info("RentVerse AI Service started successfully")
 
     yield
-    
-    # Shutdown
+
+    # Shutdown: the signal handler has already drained in-flight requests
+    # (the server waits for its connections before this runs), so only report
+    # the counts and flush the sinks
     logger.info("Shutting down RentVerse AI Service...")
+    if coordinator.drain_ms is not None:
+        admission = get_admission_controller().get_stats()
+        logger.info(
+            f"Shutdown counts: {coordinator.completed} request(s) completed, "
+            f"{coordinator.rejected} refused while draining, {coordinator.abandoned} abandoned"
+            + (f", {admission['active']} still holding an admission slot" if admission['active'] else "")
+        )
+    coalescing = {name: stats['in_flight'] for name, stats in singleflight_stats().items() if stats['in_flight']}
+    if coalescing:
+        logger.warning(f"Coalesced computations still running at shutdown: {coalescing}")
+
+    audit_log = get_audit_log()
+    if audit_log is not None:
+        close_audit_log(timeout=max(coordinator.remaining(), 1.0))
+        stats = audit_log.get_stats()
+        logger.info(f"Audit log closed: {stats['written']} written, {stats['dropped']} dropped, "
+                    f"{stats['buffered']} unwritten")
+    logger.info("RentVerse AI Service stopped")
+    flush_log_handlers()
 
 
 # Create FastAPI application
@@ -61,6 +102,16 @@ app = FastAPI(
     lifespan=lifespan
 )
 
+# Profiler route tags go innermost, in the task that runs the endpoint
+app.add_middleware(RouteTagMiddleware)
+
+# Admission control goes inside CORS so shed responses still carry CORS headers
+app.add_middleware(
+    AdmissionMiddleware,
+    get_controller=get_admission_controller,
+    path_prefixes=(f"{settings.api_prefix}/predict", f"{settings.api_prefix}/classify")
+)
+
 # Add CORS middleware
 app.add_middleware(
     CORSMiddleware,
@@ -75,10 +126,18 @@ app.add_middleware(
 app.add_middleware(RequestLoggingMiddleware)
 app.add_middleware(ErrorHandlingMiddleware)
 
+# Drain tracking goes outermost, so it counts requests until their background tasks finish
+app.add_middleware(
+    DrainMiddleware,
+    get_coordinator=get_shutdown_coordinator,
+    exempt_prefixes=(f"{settings.api_prefix}/health",)
+)
+
 # Include routers
 app.include_router(health.router, prefix="/api/v1")
 app.include_router(prediction.router, prefix="/api/v1")
 app.include_router(classification.router, prefix="/api/v1")
+app.include_router(admin.router, prefix="/api/v1")
 
 
 @app.get("/", tags=["Root"])
@@ -95,6 +154,7 @@ async def root():
         "endpoints": {
             "price_prediction": "/api/v1/classify/price",
             "listing_approval": "/api/v1/classify/approval",
+            "listing_approval_batch": "/api/v1/classify/approval/batch",
             "single_prediction": "/api/v1/predict/single",
             "batch_prediction": "/api/v1/predict/batch"
         }
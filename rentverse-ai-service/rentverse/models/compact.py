@@ -0,0 +1,345 @@
+"""
+Compact tree ensemble representation for RentVerse AI Service.
+
+A fitted scikit-learn tree ensemble keeps, for every node, the training-only
+statistics (impurity, sample counts, weights) next to the split, and every
+tree lives in its own object. CompactTreeEnsemble flattens all trees of a
+loaded model into a handful of contiguous arrays holding only what inference
+needs, with split thresholds quantized against the discrete domain each
+feature takes in the model and node values stored as float32.
+"""
+
+import ctypes
+import ctypes.util
+import gc
+import warnings
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+# Bound on the (rows x trees) node matrix walked at once
+PREDICT_CHUNK_CELLS = 1 << 19
+
+# Agreement required with the original model's predictions
+DEFAULT_RTOL = 1e-5
+DEFAULT_ATOL = 1e-3
+
+
+def _supported_trees(model: Any) -> Optional[tuple]:
+    """
+    Trees, aggregation, per-tree scale and constant of a supported regressor.
+
+    Returns (trees, aggregate, scale, base) or None for unsupported models.
+    """
+    name = type(model).__name__
+    if getattr(model, 'n_outputs_', 1) != 1:
+        return None
+
+    if name == 'DecisionTreeRegressor':
+        return [model], 'sum', 1.0, 0.0
+
+    if name in ('RandomForestRegressor', 'ExtraTreesRegressor'):
+        trees = list(model.estimators_)
+        return trees, 'mean', 1.0, 0.0
+
+    if name == 'GradientBoostingRegressor':
+        init = model.init_
+        # Only a constant initial prediction can be folded into one number
+        if init != 'zero' and type(init).__name__ != 'DummyRegressor':
+            return None
+        trees = list(np.asarray(model.estimators_).ravel())
+        probe = np.zeros((1, model.n_features_in_))
+        stages = sum(tree.predict(probe)[0] for tree in trees)
+        with warnings.catch_warnings():
+            # Models fitted on a DataFrame warn about the unnamed probe
+            warnings.simplefilter('ignore', UserWarning)
+            base = float(model.predict(probe)[0] - model.learning_rate * stages)
+        return trees, 'sum', float(model.learning_rate), base
+
+    return None
+
+
+def release_memory() -> None:
+    """
+    Collect garbage and hand freed heap pages back to the operating system.
+
+    The scikit-learn trees are many small allocations; once they are freed
+    glibc keeps the pages unless asked to trim them. Elsewhere this only
+    collects garbage.
+    """
+    gc.collect()
+    libc_name = ctypes.util.find_library('c')
+    if not libc_name:
+        return
+    try:
+        libc = ctypes.CDLL(libc_name)
+        if hasattr(libc, 'malloc_trim'):
+            libc.malloc_trim(0)
+    except OSError:
+        pass
+
+
+def sklearn_tree_nbytes(model: Any) -> int:
+    """Bytes held by the node and value arrays of a scikit-learn tree ensemble."""
+    supported = _supported_trees(model)
+    if supported is None:
+        return 0
+    total = 0
+    for tree in supported[0]:
+        state = tree.tree_.__getstate__()
+        total += state['nodes'].nbytes + state['values'].nbytes
+    return total
+
+
+class CompactTreeEnsemble:
+    """
+    Flattened, quantized copy of a fitted tree regressor used for inference.
+
+    Supports DecisionTreeRegressor, RandomForestRegressor, ExtraTreesRegressor
+    and GradientBoostingRegressor with a constant initial estimator. Every
+    node of every tree is a row in the node arrays, trees are laid out one
+    after another and leaves point to themselves, so all trees are walked
+    together for max_depth steps with a few gathers per step.
+
+    Thresholds are replaced by their index in the sorted unique thresholds
+    of their feature. Inputs are binned against the same thresholds once per
+    row, so the split decisions are exactly those of scikit-learn, which
+    compares float32 inputs against the thresholds. Node values are float32
+    and are the only lossy part.
+
+    Every node keeps its value, the mean training target of the samples that
+    reached it, so the change of value along each edge is precomputed once
+    and contributions() attributes a prediction to the features split on
+    along its paths (Saabas).
+    """
+
+    def __init__(
+        self,
+        feature: np.ndarray,
+        threshold_bin: np.ndarray,
+        children: np.ndarray,
+        value: np.ndarray,
+        roots: np.ndarray,
+        thresholds: List[np.ndarray],
+        max_depth: int,
+        aggregate: str,
+        base: float,
+        n_features: int,
+        source: str,
+        feature_importances: Optional[np.ndarray] = None
+    ):
+        self.feature = feature
+        self.threshold_bin = threshold_bin
+        self.children = children
+        self.value = value
+        self.roots = roots
+        self.thresholds = thresholds
+        self.max_depth = max_depth
+        self.aggregate = aggregate
+        self.base = base
+        self.n_features_in_ = n_features
+        self.source = source
+        self.feature_importances_ = feature_importances
+        self.max_abs_error = None
+
+        # Change of the node value along each child edge, laid out like children
+        self.edge_delta = (value[children] - np.repeat(value, 2)).astype(np.float32)
+        root_values = value[roots].astype(np.float64)
+        self.expected_value = float(root_values.mean() if aggregate == 'mean' else root_values.sum()) + base
+
+    @classmethod
+    def from_model(cls, model: Any) -> Optional['CompactTreeEnsemble']:
+        """Build the compact representation of a fitted model, or None if unsupported."""
+        supported = _supported_trees(model)
+        if supported is None:
+            return None
+        trees, aggregate, scale, base = supported
+        n_features = int(model.n_features_in_)
+
+        structures = [tree.tree_ for tree in trees]
+        node_counts = np.array([t.node_count for t in structures])
+        roots = np.concatenate([[0], np.cumsum(node_counts)[:-1]]).astype(np.int32)
+        n_nodes = int(node_counts.sum())
+
+        feature = np.concatenate([t.feature for t in structures]).astype(np.int64)
+        threshold = np.concatenate([t.threshold for t in structures])
+        children_left = np.concatenate([t.children_left for t in structures]).astype(np.int64)
+        children_right = np.concatenate([t.children_right for t in structures]).astype(np.int64)
+        value = np.concatenate([t.value[:, 0, 0] for t in structures]) * scale
+
+        offsets = np.repeat(roots.astype(np.int64), node_counts)
+        nodes = np.arange(n_nodes, dtype=np.int64)
+        is_leaf = children_left < 0
+        # Left and right child of node i at 2i and 2i + 1
+        children = np.empty(2 * n_nodes, dtype=np.int32)
+        children[0::2] = np.where(is_leaf, nodes, children_left + offsets)
+        children[1::2] = np.where(is_leaf, nodes, children_right + offsets)
+
+        # Per feature domain of split points; a node keeps the index of its threshold
+        thresholds = []
+        threshold_bin = np.zeros(n_nodes, dtype=np.int64)
+        for f in range(n_features):
+            split = ~is_leaf & (feature == f)
+            domain = np.unique(threshold[split])
+            thresholds.append(domain)
+            threshold_bin[split] = np.searchsorted(domain, threshold[split])
+        widest = max((len(domain) for domain in thresholds), default=0)
+
+        # Leaves compare feature 0 against the largest bin and always go left, to themselves
+        feature = np.where(is_leaf, 0, feature)
+        threshold_bin = np.where(is_leaf, widest, threshold_bin)
+
+        index_dtype = np.uint16 if widest < np.iinfo(np.uint16).max else np.int32
+        feature_dtype = np.uint8 if n_features <= np.iinfo(np.uint8).max else np.int32
+        return cls(
+            feature=feature.astype(feature_dtype),
+            threshold_bin=threshold_bin.astype(index_dtype),
+            children=children,
+            value=value.astype(np.float32),
+            roots=roots.astype(np.intp),
+            thresholds=thresholds,
+            max_depth=max(t.max_depth for t in structures),
+            aggregate=aggregate,
+            base=base,
+            n_features=n_features,
+            source=type(model).__name__,
+            feature_importances=getattr(model, 'feature_importances_', None)
+        )
+
+    @property
+    def n_trees(self) -> int:
+        return len(self.roots)
+
+    @property
+    def n_nodes(self) -> int:
+        return len(self.value)
+
+    @property
+    def nbytes(self) -> int:
+        """Bytes held by the node arrays and threshold domains."""
+        arrays = [self.feature, self.threshold_bin, self.children, self.value, self.roots, self.edge_delta]
+        return sum(a.nbytes for a in arrays) + sum(d.nbytes for d in self.thresholds)
+
+    def _bin(self, X: np.ndarray) -> np.ndarray:
+        """Bin index of every input value against its feature's thresholds."""
+        # Trees compare float32 inputs, so bin the float32 value exactly as they see it
+        X = np.asarray(X, dtype=np.float32).astype(np.float64)
+        if X.ndim != 2 or X.shape[1] != self.n_features_in_:
+            raise ValueError(f"Expected {self.n_features_in_} features, got shape {X.shape}")
+        bins = np.empty(X.shape, dtype=np.int32)
+        for f, domain in enumerate(self.thresholds):
+            bins[:, f] = np.searchsorted(domain, X[:, f], side='left')
+        return bins
+
+    def _leaves(self, bins: np.ndarray) -> np.ndarray:
+        """Leaf index reached in every tree, shape (n_trees, n_rows)."""
+        n_rows, n_features = bins.shape
+        flat_bins = bins.ravel()
+        # Tree-major order keeps neighbouring lookups within the same tree's nodes
+        row_offsets = np.tile(np.arange(n_rows, dtype=np.intp) * n_features, self.n_trees)
+        node = np.repeat(self.roots, n_rows)
+        for _ in range(self.max_depth):
+            go_right = flat_bins[row_offsets + self.feature[node]] > self.threshold_bin[node]
+            node = self.children[2 * node + go_right]
+        return node.reshape(self.n_trees, n_rows)
+
+    def member_predictions(self, X: np.ndarray) -> np.ndarray:
+        """Per-tree predictions, shape (n_trees, n_rows)."""
+        bins = self._bin(X)
+        members = np.empty((self.n_trees, len(bins)), dtype=np.float64)
+        chunk = max(1, PREDICT_CHUNK_CELLS // max(self.n_trees, 1))
+        for start in range(0, len(bins), chunk):
+            members[:, start:start + chunk] = self.value[self._leaves(bins[start:start + chunk])]
+        return members
+
+    def predict(self, X: np.ndarray) -> np.ndarray:
+        """Predict the target for every row of X."""
+        members = self.member_predictions(X)
+        combined = members.mean(axis=0) if self.aggregate == 'mean' else members.sum(axis=0)
+        return combined + self.base
+
+    def _path_contributions(self, bins: np.ndarray) -> np.ndarray:
+        """Summed edge deltas per row and split feature over all trees, shape (n_rows, n_features)."""
+        n_rows, n_features = bins.shape
+        flat_bins = bins.ravel()
+        row_offsets = np.tile(np.arange(n_rows, dtype=np.intp) * n_features, self.n_trees)
+        node = np.repeat(self.roots, n_rows)
+        totals = np.zeros(n_rows * n_features)
+        for _ in range(self.max_depth):
+            # Leaves split on feature 0 and go left to themselves, adding nothing
+            cell = row_offsets + self.feature[node]
+            edge = 2 * node + (flat_bins[cell] > self.threshold_bin[node])
+            totals += np.bincount(cell, weights=self.edge_delta[edge], minlength=n_rows * n_features)
+            node = self.children[edge]
+        return totals.reshape(n_rows, n_features)
+
+    def contributions(self, X: np.ndarray) -> np.ndarray:
+        """
+        Per-feature contributions to the prediction of every row of X.
+
+        Walking a row down a tree, each split moves the value from the node's
+        to the child's; the change is credited to the feature split on. Summed
+        over the trees and aggregated like the predictions, expected_value plus
+        a row's contributions equals predict() for that row.
+
+        Returns:
+            Array of shape (n_rows, n_features)
+        """
+        bins = self._bin(X)
+        result = np.empty(bins.shape, dtype=np.float64)
+        chunk = max(1, PREDICT_CHUNK_CELLS // max(self.n_trees, 1))
+        for start in range(0, len(bins), chunk):
+            result[start:start + chunk] = self._path_contributions(bins[start:start + chunk])
+        if self.aggregate == 'mean':
+            result /= self.n_trees
+        return result
+
+    def probe_rows(self, n_rows: int = 512, random_state: int = 0) -> np.ndarray:
+        """
+        Rows that land on both sides of every split threshold, used to check
+        the compact model against the original.
+        """
+        rng = np.random.default_rng(random_state)
+        X = np.empty((n_rows, self.n_features_in_))
+        for f, domain in enumerate(self.thresholds):
+            if len(domain) == 0:
+                X[:, f] = rng.normal(size=n_rows)
+                continue
+            at = domain.astype(np.float32)
+            above = np.nextafter(at, np.float32(np.inf))
+            candidates = np.concatenate([at, above, [at[0] - 1.0, at[-1] + 1.0]])
+            X[:, f] = rng.choice(candidates, size=n_rows)
+        return X
+
+    def verify(
+        self,
+        model: Any,
+        X: Optional[np.ndarray] = None,
+        rtol: float = DEFAULT_RTOL,
+        atol: float = DEFAULT_ATOL
+    ) -> bool:
+        """
+        Check that predictions agree with the original model within tolerance.
+
+        Uses probe_rows() when no rows are given and records the largest
+        absolute difference in max_abs_error.
+        """
+        X = self.probe_rows() if X is None else np.asarray(X)
+        with warnings.catch_warnings():
+            # Models fitted on a DataFrame warn about unnamed probe columns
+            warnings.simplefilter('ignore', UserWarning)
+            expected = model.predict(X)
+        actual = self.predict(X)
+        self.max_abs_error = float(np.max(np.abs(actual - expected))) if len(X) else 0.0
+        return bool(np.allclose(actual, expected, rtol=rtol, atol=atol))
+
+    def describe(self) -> Dict[str, Any]:
+        """Summary of the representation for model info and health endpoints."""
+        return {
+            'source': self.source,
+            'trees': self.n_trees,
+            'nodes': self.n_nodes,
+            'max_depth': self.max_depth,
+            'bytes': self.nbytes,
+            'max_abs_error': self.max_abs_error
+        }
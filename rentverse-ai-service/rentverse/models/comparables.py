@@ -0,0 +1,278 @@
+"""
+Comparable listings index for RentVerse AI Service.
+
+The training pipeline stores the cleaned and encoded training listings with
+their prices in the deployment artifact. ComparablesIndex groups them by
+category when the model is loaded, so the nearest listings to a property of
+the same region, property type and furnishing, and the distribution of their
+prices, are available in memory at serving time.
+"""
+
+from typing import Any, Dict, List, Mapping, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+COMPARABLES_KEY = 'comparables'
+DEFAULT_K = 5
+MAX_K = 50
+DEFAULT_DISTRIBUTION_K = 20
+
+# Bound on the (rows x candidates) distance matrix computed at once
+QUERY_CHUNK_CELLS = 1 << 20
+
+# Categories a comparable must share, the last given up first when too few listings match
+CATEGORY_PRIORITY = ('region', 'property_type', 'furnished')
+
+
+def comparables_payload(df_processed: pd.DataFrame, feature_names: Sequence[str], target_column: str = 'price') -> Dict[str, Any]:
+    """
+    Arrays stored in a deployment artifact under 'comparables'.
+
+    Parameters:
+        df_processed: Preprocessor output with encoded features and the target
+        feature_names: Feature columns in model order
+        target_column: Price column
+
+    Returns:
+        Dictionary with the encoded (unscaled) features as float32, the prices
+        as float32 and the feature names
+    """
+    return {
+        'feature_names': list(feature_names),
+        'features': df_processed[list(feature_names)].to_numpy(dtype=np.float32),
+        'prices': df_processed[target_column].to_numpy(dtype=np.float32)
+    }
+
+
+class ComparablesIndex:
+    """
+    Training listings grouped by category, ranked by distance in the model's
+    scaled numeric features.
+
+    Encoded categories are arbitrary (alphabetical) codes, so they are never
+    part of the distance: comparables must have the same categories as the
+    property. Listings are sorted by their category codes in CATEGORY_PRIORITY
+    order, making every group of a leading subset of the categories one
+    contiguous slice, which is searched exhaustively. When a group has fewer
+    listings than requested, the lowest priority category is given up, and
+    categories unknown to the encoder are never matched on.
+
+    Parameters:
+    -----------
+    payload : dict
+        Arrays produced by comparables_payload
+    scaler : Any
+        Fitted scaler of the deployment pipeline
+    label_encoders : dict, optional
+        Fitted encoders of the categorical features; without them every
+        feature is treated as numeric
+    """
+
+    def __init__(
+        self,
+        payload: Dict[str, Any],
+        scaler: Any,
+        label_encoders: Optional[Dict[str, Any]] = None
+    ):
+        self.feature_names = list(payload['feature_names'])
+        self.features = np.asarray(payload['features'], dtype=np.float32)
+        self.prices = np.asarray(payload['prices'], dtype=np.float32)
+        if len(self.features) != len(self.prices) or len(self.prices) == 0:
+            raise ValueError("Comparables need one price per listing and at least one listing")
+
+        self.labels = {
+            col: np.asarray(encoder.classes_, dtype=object)
+            for col, encoder in (label_encoders or {}).items() if col in self.feature_names
+        }
+        self.categories = [col for col in CATEGORY_PRIORITY if col in self.labels] + \
+                          [col for col in self.feature_names if col in self.labels and col not in CATEGORY_PRIORITY]
+        self._category_columns = [self.feature_names.index(col) for col in self.categories]
+        self._numeric_columns = [j for j, col in enumerate(self.feature_names) if col not in self.labels]
+
+        # Mixed-radix key over the category codes, in priority order
+        codes = self.features[:, self._category_columns].astype(np.int64)
+        self._radix = np.array([
+            max(len(self.labels[col]), int(codes[:, i].max()) + 1) for i, col in enumerate(self.categories)
+        ], dtype=np.int64)
+        self._stride = np.array([np.prod(self._radix[i + 1:]) for i in range(len(self._radix))], dtype=np.int64)
+        keys = codes @ self._stride
+
+        self._order = np.argsort(keys, kind='stable')
+        self._keys = keys[self._order]
+        self._codes = codes[self._order]
+        scaled = scaler.transform(pd.DataFrame(self.features, columns=self.feature_names))
+        self._points = np.ascontiguousarray(np.asarray(scaled, dtype=np.float64)[self._order][:, self._numeric_columns])
+
+    def __len__(self) -> int:
+        return len(self.prices)
+
+    def _candidates(self, codes: np.ndarray, known: np.ndarray, k: int) -> Tuple[np.ndarray, Tuple[str, ...]]:
+        """
+        Sorted positions of the listings sharing the most categories with a
+        property while numbering at least k, and the categories matched.
+        """
+        matchable = [i for i in range(len(self.categories)) if known[i]]
+        for depth in range(len(matchable), -1, -1):
+            used = matchable[:depth]
+            if used == list(range(depth)):
+                # Leading categories: one slice of the sorted keys
+                low = int(codes[:depth] @ self._stride[:depth])
+                high = low + int(self._stride[depth - 1]) if depth else int(self._keys[-1]) + 1
+                start, stop = np.searchsorted(self._keys, [low, high])
+                positions = np.arange(start, stop)
+            else:
+                positions = np.flatnonzero((self._codes[:, used] == codes[used]).all(axis=1))
+            if len(positions) >= k:
+                return positions, tuple(self.categories[i] for i in used)
+        raise AssertionError("the unfiltered index always has k listings")
+
+    def query(
+        self,
+        scaled_features: np.ndarray,
+        features: np.ndarray,
+        k: int = DEFAULT_K,
+        unknown: Optional[Mapping[str, Sequence[bool]]] = None
+    ) -> Tuple[np.ndarray, np.ndarray, List[Tuple[str, ...]]]:
+        """
+        The k nearest listings of the same categories for every row.
+
+        Parameters:
+            scaled_features: Rows in the model's scaled feature space
+            features: The same rows encoded but unscaled
+            k: Listings per row
+            unknown: Per category, rows whose raw value the encoder does not
+                know (encoded as a fallback class); those are not matched on
+
+        Returns:
+            Distances and listing indices, each of shape (n_rows, k), and the
+            categories matched for every row
+        """
+        scaled_features = np.atleast_2d(np.asarray(scaled_features, dtype=np.float64))
+        features = np.atleast_2d(np.asarray(features))
+        n_rows = len(scaled_features)
+        k = max(1, min(int(k), len(self)))
+
+        codes = features[:, self._category_columns].astype(np.int64)
+        known = np.ones(codes.shape, dtype=bool)
+        for i, col in enumerate(self.categories):
+            if unknown is not None and col in unknown:
+                known[:, i] = ~np.asarray(unknown[col], dtype=bool)
+        points = scaled_features[:, self._numeric_columns]
+
+        distances = np.empty((n_rows, k))
+        indices = np.empty((n_rows, k), dtype=np.int64)
+        matched: List[Tuple[str, ...]] = [()] * n_rows
+        # Rows of the same categories share one candidate set
+        groups: Dict[Tuple, List[int]] = {}
+        for row, key in enumerate(zip(map(tuple, codes.tolist()), map(tuple, known.tolist()))):
+            groups.setdefault(key, []).append(row)
+
+        for rows in groups.values():
+            positions, categories = self._candidates(codes[rows[0]], known[rows[0]], k)
+            candidates = self._points[positions]
+            chunk = max(1, QUERY_CHUNK_CELLS // len(positions))
+            for start in range(0, len(rows), chunk):
+                chunk_rows = rows[start:start + chunk]
+                squared = np.zeros((len(chunk_rows), len(positions)))
+                for j in range(candidates.shape[1]):
+                    squared += (points[chunk_rows, j, None] - candidates[None, :, j]) ** 2
+                if k < len(positions):
+                    nearest = np.argpartition(squared, k - 1, axis=1)[:, :k]
+                else:
+                    nearest = np.broadcast_to(np.arange(len(positions)), (len(chunk_rows), k))
+                at = np.arange(len(chunk_rows))[:, None]
+                nearest = nearest[at, np.argsort(squared[at, nearest], axis=1, kind='stable')]
+                distances[chunk_rows] = np.sqrt(squared[at, nearest])
+                indices[chunk_rows] = self._order[positions[nearest]]
+            for row in rows:
+                matched[row] = categories
+        return distances, indices, matched
+
+    def _listing(self, index: int, distance: float) -> Dict[str, Any]:
+        listing: Dict[str, Any] = {'price': float(self.prices[index]), 'distance': float(distance)}
+        for j, col in enumerate(self.feature_names):
+            value = self.features[index, j]
+            if col in self.labels:
+                code = int(value)
+                listing[col] = str(self.labels[col][code]) if 0 <= code < len(self.labels[col]) else None
+            else:
+                listing[col] = float(value)
+        return listing
+
+    def _distributions(
+        self,
+        indices: np.ndarray,
+        matched: List[Tuple[str, ...]],
+        asking_prices: Optional[np.ndarray] = None
+    ) -> List[Dict[str, Any]]:
+        """Price quantiles of the listings of every row and the asking price's percentile among them."""
+        prices = self.prices[indices].astype(np.float64)
+        # Linear interpolation between the sorted prices, as np.quantile's default
+        ordered = np.sort(prices, axis=1)
+        position = np.array([0.1, 0.25, 0.5, 0.75, 0.9]) * (prices.shape[1] - 1)
+        lower = np.floor(position).astype(np.int64)
+        upper = np.minimum(lower + 1, prices.shape[1] - 1)
+        p10, p25, p50, p75, p90 = (ordered[:, lower] + (ordered[:, upper] - ordered[:, lower]) * (position - lower)).T
+        percentile = None
+        if asking_prices is not None:
+            asking = np.asarray(asking_prices, dtype=np.float64)[:, None]
+            percentile = ((prices < asking).sum(axis=1) + 0.5 * (prices == asking).sum(axis=1)) / prices.shape[1] * 100
+
+        return [
+            {
+                'count': int(prices.shape[1]),
+                'p10': round(float(p10[i]), 2),
+                'p25': round(float(p25[i]), 2),
+                'median': round(float(p50[i]), 2),
+                'p75': round(float(p75[i]), 2),
+                'p90': round(float(p90[i]), 2),
+                'matched_on': list(matched[i]),
+                'asking_percentile': round(float(percentile[i]), 1) if percentile is not None else None
+            }
+            for i in range(prices.shape[0])
+        ]
+
+    def search(
+        self,
+        scaled_features: np.ndarray,
+        features: np.ndarray,
+        k: int = DEFAULT_K,
+        distribution_k: int = DEFAULT_DISTRIBUTION_K,
+        unknown: Optional[Mapping[str, Sequence[bool]]] = None
+    ) -> Tuple[List[Dict[str, Any]], Dict[str, Any]]:
+        """
+        The k nearest listings to one row with their prices, distances and
+        decoded features, and the price distribution of the nearest
+        max(k, distribution_k), from a single query.
+        """
+        distances, indices, matched = self.query(scaled_features, features, max(k, distribution_k), unknown)
+        listings = [self._listing(i, d) for i, d in zip(indices[0, :k].tolist(), distances[0, :k].tolist())]
+        return listings, self._distributions(indices[:1], matched[:1])[0]
+
+    def price_distribution(
+        self,
+        scaled_features: np.ndarray,
+        features: np.ndarray,
+        k: int = DEFAULT_DISTRIBUTION_K,
+        asking_prices: Optional[np.ndarray] = None,
+        unknown: Optional[Mapping[str, Sequence[bool]]] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Price quantiles of the k nearest listings of every row, the categories
+        they share with it, and where each asking price falls among them
+        (share of comparables priced lower).
+        """
+        _, indices, matched = self.query(scaled_features, features, k, unknown)
+        return self._distributions(indices, matched, asking_prices)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Size of the index."""
+        return {
+            'listings': len(self),
+            'features': self.feature_names,
+            'categories': self.categories,
+            'groups': int(len(np.unique(self._keys))),
+            'bytes': int(self.features.nbytes + self.prices.nbytes + self._points.nbytes +
+                         self._keys.nbytes + self._codes.nbytes + self._order.nbytes)
+        }
@@ -0,0 +1,286 @@
+"""
+Input drift detection for RentVerse AI Service.
+
+Training stores a baseline of the encoded feature distribution in the
+deployment artifact: decile bins with their training proportions for numeric
+features and class proportions for categorical ones. DriftMonitor counts the
+encoded features of incoming rows into the same bins, with fixed-size count
+arrays so a row costs the same whatever the traffic, and scores the recent
+rows against the baseline with the population stability index (PSI). It also
+counts categorical values the fitted encoders do not know, which the
+preprocessor silently maps to 'unknown' or the first class.
+"""
+
+import threading
+import time
+from typing import Any, Dict, List, Mapping, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+DRIFT_BASELINE_KEY = 'drift_baseline'
+DEFAULT_BINS = 10
+DEFAULT_WINDOW_SECONDS = 3600.0
+PSI_WARNING = 0.1             # moderate shift
+PSI_ALERT = 0.25              # significant shift
+UNKNOWN_RATE_ALERT = 0.05     # share of rows with a category the encoder does not know
+MIN_SAMPLES = 200             # recent rows needed before PSI and unknown-category alerts are raised
+PSI_EPSILON = 1e-4            # floor for empty bins in the PSI
+
+
+def drift_baseline(
+    df_processed: pd.DataFrame,
+    feature_names: Sequence[str],
+    label_encoders: Mapping[str, Any],
+    bins: int = DEFAULT_BINS
+) -> Dict[str, Any]:
+    """
+    Training distribution of the encoded features stored under 'drift_baseline'.
+
+    Numeric features get interior edges at the training quantiles (so the
+    bins hold about equal shares); categorical features get the share of
+    every encoder class.
+
+    Parameters:
+        df_processed: Preprocessor output with encoded features
+        feature_names: Feature columns in model order
+        label_encoders: Fitted encoders of the categorical features
+        bins: Number of quantile bins for numeric features
+
+    Returns:
+        Dictionary with the number of rows and a per-feature baseline
+    """
+    features: Dict[str, Dict[str, Any]] = {}
+    for col in feature_names:
+        values = df_processed[col].to_numpy(dtype=float)
+        if col in label_encoders:
+            counts = np.bincount(values.astype(np.int64), minlength=len(label_encoders[col].classes_))
+            features[col] = {'kind': 'categorical', 'proportions': (counts / counts.sum()).tolist()}
+        else:
+            edges = np.unique(np.quantile(values, np.linspace(0, 1, bins + 1)[1:-1]))
+            counts = np.bincount(np.searchsorted(edges, values, side='right'), minlength=len(edges) + 1)
+            features[col] = {
+                'kind': 'numeric',
+                'edges': edges.tolist(),
+                'proportions': (counts / counts.sum()).tolist()
+            }
+    return {'rows': int(len(df_processed)), 'bins': bins, 'features': features}
+
+
+def psi(expected: np.ndarray, observed_counts: np.ndarray) -> float:
+    """Population stability index of observed counts against expected proportions."""
+    expected = np.maximum(np.asarray(expected, dtype=float), PSI_EPSILON)
+    total = observed_counts.sum()
+    if total == 0:
+        return 0.0
+    observed = np.maximum(observed_counts / total, PSI_EPSILON)
+    return float(np.sum((observed - expected) * np.log(observed / expected)))
+
+
+class _WindowedCounts:
+    """Fixed-size counts over the lifetime, the current and the previous window."""
+
+    def __init__(self, size: int = 1):
+        self.total = np.zeros(size, dtype=np.int64)
+        self.current = np.zeros(size, dtype=np.int64)
+        self.previous = np.zeros(size, dtype=np.int64)
+
+    def add(self, counts: Any) -> None:
+        self.total += counts
+        self.current += counts
+
+    def rotate(self, windows: int) -> None:
+        self.previous = self.current if windows == 1 else np.zeros_like(self.total)
+        self.current = np.zeros_like(self.total)
+
+    def recent(self) -> np.ndarray:
+        return self.current + self.previous
+
+
+class DriftMonitor:
+    """
+    Running histograms of incoming features scored against a training baseline.
+
+    Thread-safe; rows are recorded from the thread pool. Scores and alerts
+    use the recent rows: those of the current and the previous window.
+
+    Parameters:
+    -----------
+    feature_names : list
+        Encoded feature columns in model order
+    label_encoders : dict
+        Fitted encoders of the categorical features, to detect unknown categories
+    baseline : dict, optional
+        Output of drift_baseline; without it only unknown categories and,
+        for scalers that keep the training minimum and maximum, values
+        outside the training range are tracked
+    scaler : Any, optional
+        Fitted scaler whose data_min_/data_max_ give the training range
+    window_seconds : float, default=3600
+        Length of the current/previous windows
+    """
+
+    def __init__(
+        self,
+        feature_names: Sequence[str],
+        label_encoders: Mapping[str, Any],
+        baseline: Optional[Dict[str, Any]] = None,
+        scaler: Any = None,
+        window_seconds: float = DEFAULT_WINDOW_SECONDS
+    ):
+        self.feature_names = list(feature_names)
+        # A raw 'unknown' (e.g. no region found in the location) counts as unknown too
+        self.known_classes = {
+            col: frozenset(str(value) for value in encoder.classes_) - {'unknown'}
+            for col, encoder in label_encoders.items() if col in self.feature_names
+        }
+        self.baseline = baseline
+        self.window_seconds = float(window_seconds)
+        self.window_started_at = time.time()
+        self._lock = threading.Lock()
+
+        self.rows = _WindowedCounts()
+        self.unknown = {col: _WindowedCounts() for col in self.known_classes}
+        self.out_of_range = {}
+        self.histograms = {}
+        self._edges = {}
+
+        data_min = getattr(scaler, 'data_min_', None)
+        data_max = getattr(scaler, 'data_max_', None)
+        self._range = {}
+        if data_min is not None and data_max is not None:
+            for j, col in enumerate(self.feature_names):
+                if col not in self.known_classes:
+                    self._range[col] = (float(data_min[j]), float(data_max[j]))
+                    self.out_of_range[col] = _WindowedCounts()
+
+        for col, feature in ((baseline or {}).get('features') or {}).items():
+            if col not in self.feature_names:
+                continue
+            if feature['kind'] == 'numeric':
+                self._edges[col] = np.asarray(feature['edges'], dtype=float)
+            self.histograms[col] = _WindowedCounts(len(feature['proportions']))
+
+    def _rotate(self, now: float) -> None:
+        windows = int((now - self.window_started_at) // self.window_seconds)
+        if windows < 1:
+            return
+        for counts in [self.rows, *self.unknown.values(), *self.out_of_range.values(), *self.histograms.values()]:
+            counts.rotate(windows)
+        self.window_started_at += windows * self.window_seconds
+
+    def observe(self, raw_categories: Mapping[str, Sequence[Any]], features: pd.DataFrame) -> None:
+        """
+        Record a batch of incoming rows.
+
+        Parameters:
+            raw_categories: Categorical values per column before encoding
+                (region as resolved from the location)
+            features: Encoded, unscaled features of the same rows
+        """
+        n_rows = len(features)
+        if n_rows == 0:
+            return
+
+        unknown_counts = {
+            col: sum(1 for value in raw_categories[col] if str(value) not in known)
+            for col, known in self.known_classes.items() if col in raw_categories
+        }
+        matrix = features.to_numpy(dtype=float)
+        columns = {col: j for j, col in enumerate(features.columns)}
+        bin_counts = {}
+        for col, counts in self.histograms.items():
+            values = matrix[:, columns[col]]
+            n_bins = len(counts.total)
+            if col in self._edges:
+                indices = np.searchsorted(self._edges[col], values, side='right')
+            else:
+                indices = np.clip(values.astype(np.int64), 0, n_bins - 1)
+            bin_counts[col] = np.bincount(indices, minlength=n_bins)
+        range_counts = {}
+        for col, (low, high) in self._range.items():
+            values = matrix[:, columns[col]]
+            range_counts[col] = int(((values < low) | (values > high)).sum())
+
+        with self._lock:
+            self._rotate(time.time())
+            self.rows.add(n_rows)
+            for col, count in unknown_counts.items():
+                self.unknown[col].add(count)
+            for col, counts in bin_counts.items():
+                self.histograms[col].add(counts)
+            for col, count in range_counts.items():
+                self.out_of_range[col].add(count)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Per-feature PSI, unknown-category and out-of-range rates, and active alerts."""
+        with self._lock:
+            self._rotate(time.time())
+            recent_rows = int(self.rows.recent()[0])
+            features: Dict[str, Dict[str, Any]] = {}
+            alerts: List[str] = []
+
+            for col in self.feature_names:
+                entry: Dict[str, Any] = {}
+                if col in self.histograms:
+                    expected = self.baseline['features'][col]['proportions']
+                    entry['psi'] = round(psi(expected, self.histograms[col].recent()), 4)
+                    entry['psi_lifetime'] = round(psi(expected, self.histograms[col].total), 4)
+                    if recent_rows >= MIN_SAMPLES and entry['psi'] >= PSI_WARNING:
+                        level = 'alert' if entry['psi'] >= PSI_ALERT else 'warning'
+                        entry['level'] = level
+                        alerts.append(f"{col}: PSI {entry['psi']:.3f} ({level})")
+                if col in self.unknown:
+                    unknown = int(self.unknown[col].recent()[0])
+                    entry['unknown_rate'] = round(unknown / recent_rows, 4) if recent_rows else 0.0
+                    entry['unknown_total'] = int(self.unknown[col].total[0])
+                    if recent_rows >= MIN_SAMPLES and entry['unknown_rate'] >= UNKNOWN_RATE_ALERT:
+                        alerts.append(f"{col}: {entry['unknown_rate']:.1%} unknown categories")
+                if col in self.out_of_range:
+                    outside = int(self.out_of_range[col].recent()[0])
+                    entry['out_of_range_rate'] = round(outside / recent_rows, 4) if recent_rows else 0.0
+                    entry['training_range'] = list(self._range[col])
+                features[col] = entry
+
+            return {
+                'baseline': self.baseline is not None,
+                'baseline_rows': (self.baseline or {}).get('rows'),
+                'rows': int(self.rows.total[0]),
+                'recent_rows': recent_rows,
+                'window_seconds': self.window_seconds,
+                'thresholds': {
+                    'psi_warning': PSI_WARNING,
+                    'psi_alert': PSI_ALERT,
+                    'unknown_rate_alert': UNKNOWN_RATE_ALERT,
+                    'min_samples': MIN_SAMPLES
+                },
+                'status': 'drift' if alerts else 'ok',
+                'alerts': alerts,
+                'features': features
+            }
+
+    def prometheus(self, model_version: str = '') -> str:
+        """Render the drift scores in the Prometheus text exposition format."""
+        stats = self.get_stats()
+        model = str(model_version).replace('\\', '\\\\').replace('"', '\\"')
+        metrics = {
+            'psi': ('rentverse_input_drift_psi', 'PSI of recent inputs against the training baseline'),
+            'unknown_rate': ('rentverse_input_unknown_category_rate',
+                             'Share of recent inputs with a category unknown to the encoder'),
+            'out_of_range_rate': ('rentverse_input_out_of_range_rate',
+                                  'Share of recent inputs outside the training range')
+        }
+        lines = []
+        for key, (name, help_text) in metrics.items():
+            samples = [
+                f'{name}{{model="{model}",feature="{col}"}} {entry[key]}'
+                for col, entry in stats['features'].items() if key in entry
+            ]
+            if samples:
+                lines += [f'# HELP {name} {help_text}', f'# TYPE {name} gauge', *samples]
+        lines += [
+            '# HELP rentverse_input_drift_alerts Active input drift alerts',
+            '# TYPE rentverse_input_drift_alerts gauge',
+            f'rentverse_input_drift_alerts{{model="{model}"}} {len(stats["alerts"])}'
+        ]
+        return '\n'.join(lines) + '\n'
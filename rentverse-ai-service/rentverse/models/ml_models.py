@@ -5,19 +5,29 @@ ML model management for RentVerse AI Service.
 import logging
 import os
 import sys
+import time
 from datetime import datetime
 from pathlib import Path
-from typing import Dict, List, Any, Optional
+from statistics import NormalDist
+from typing import Dict, List, Any, Optional, Sequence, Tuple
 
 import joblib
 import numpy as np
 import pandas as pd
 
-from ..core.exceptions import ModelLoadError, PredictionError
-from ..utils.preprocessor import ImprovedDataPreprocessor, validate_property_data
+from ..core.exceptions import ModelLoadError, ModelNotFoundError, PredictionError, ValidationError
+from ..utils.location import LocationEngine
+from .comparables import COMPARABLES_KEY, DEFAULT_DISTRIBUTION_K, DEFAULT_K, MAX_K, ComparablesIndex
+from .compact import CompactTreeEnsemble, release_memory, sklearn_tree_nbytes
+from .drift import DRIFT_BASELINE_KEY, DriftMonitor, drift_baseline
+from .monitoring import PredictionMonitor
+from ..utils.preprocessor import ImprovedDataPreprocessor, validate_property_columns, validate_property_data
+from ..utils.memory import deep_sizeof
+from ..utils.profiler import stage
 
 # Add compatibility import for existing pickled models
-# This allows loading models that were pickled from the notebook's __main__ module
+# This allows loading models that were pickled from the notebook's __main__ module.
+# Artifacts written by `rentverse train` reference rentverse.utils.preprocessor directly.
 sys.modules['__main__'].ImprovedDataPreprocessor = ImprovedDataPreprocessor
 
 logger = logging.getLogger(__name__)
@@ -30,6 +40,30 @@ FALLBACK_MODEL_FILENAME = "standard_deployment_pipeline.pkl"
 LEGACY_ENHANCED_FILENAME = "enhanced_price_prediction_pipeline.pkl"
 LEGACY_IMPROVED_FILENAME = "improved_price_prediction_pipeline.pkl"
 MAX_BATCH_SIZE = 100
+MAX_APPROVAL_BATCH_SIZE = 1000
+MAX_COLUMNAR_BATCH_SIZE = 100000
+REASONABLE_PRICE_RANGE = (500, 50000)  # RM; predictions outside are counted by the monitor
+
+# Prediction intervals
+DEFAULT_INTERVAL = (0.1, 0.9)       # quantiles reported as price_range
+DEFAULT_RELATIVE_SPREAD = 0.15      # residual spread when no test RMSE is known
+INTERVAL_METHOD_KEY = 'interval_method'  # artifact entry forcing 'residual' intervals
+
+# Listing approval rules
+PRICE_DEVIATION_ACCEPTABLE = 15  # % either side of the predicted price
+PRICE_DEVIATION_REJECT = 30      # % above the predicted price
+PREMIUM_AREAS = ['klcc', 'mont kiara', 'bangsar', 'damansara', 'shah alam', 'petaling jaya']
+COMPARABLE_PERCENTILE_HIGH = 90  # asking price percentile among comparables flagged as high
+COMPARABLE_PERCENTILE_LOW = 10   # asking price percentile among comparables flagged as low
+
+
+def _scalar_metrics(metrics: Optional[Dict[str, Any]]) -> Dict[str, float]:
+    """Keep the numeric entries of stored performance metrics."""
+    return {
+        name: float(value)
+        for name, value in (metrics or {}).items()
+        if isinstance(value, (int, float, np.number)) and not isinstance(value, bool)
+    }
 
 
 class PropertyPricePredictionModel:
@@ -38,7 +72,7 @@ class PropertyPricePredictionModel:
     Uses the deployment-ready pipeline with our utility preprocessor.
     """
 
-    def __init__(self, model_dir: Optional[str] = None):
+    def __init__(self, model_dir: Optional[str] = None, compact: bool = True):
         self.pipeline_components = None
         self.preprocessor = None
         self.model = None
@@ -47,6 +81,18 @@ class PropertyPricePredictionModel:
         self.use_log_transform = False
         self.model_name = None
         self.performance_metrics = None
+        self.interval_method = None
+        self.location_engine = None
+        self.compact = compact
+        self.compact_info = None
+        self.explainer = None
+        self.comparables = None
+        self.monitor = PredictionMonitor(REASONABLE_PRICE_RANGE)
+        self.drift = None
+        self.region = None  # set when serving a single region from the model pool
+        self.model_path = None
+        self.created_at = None
+        self._model_info = None
         self.is_loaded = False
         self.model_dir = model_dir or DEFAULT_MODEL_DIR
 
@@ -54,8 +100,9 @@ class PropertyPricePredictionModel:
 
     @property
     def model_version(self) -> str:
-        """Get the model version."""
-        return self.model_name or "Unknown"
+        """Get the model version, with the region for a region model."""
+        name = self.model_name or "Unknown"
+        return f"{name} [{self.region}]" if self.region else name
 
     def _load_pipeline(self) -> None:
         """Load the pipeline from deployment pickle files."""
@@ -81,6 +128,8 @@ class PropertyPricePredictionModel:
 
             # Load the pipeline components
             self.pipeline_components = joblib.load(model_path)
+            self.model_path = model_path
+            self.created_at = datetime.fromtimestamp(os.path.getmtime(model_path))
             logger.info(f"Loaded pipeline from {model_path}")
 
             # Handle both dictionary format (deployment) and legacy format
@@ -97,7 +146,9 @@ class PropertyPricePredictionModel:
                 self.feature_names = self.pipeline_components['feature_names']
                 self.use_log_transform = self.pipeline_components.get('use_log_transform', False)
                 self.model_name = self.pipeline_components.get('model_name', 'Unknown')
-                self.performance_metrics = self.pipeline_components.get('performance_metrics', {})
+                self.performance_metrics = _scalar_metrics(self.pipeline_components.get('performance_metrics'))
+                # Notebook artifacts keep the fitted model and its test predictions in here too
+                self.pipeline_components['performance_metrics'] = self.performance_metrics
             else:
                 # Legacy class-based format - extract components
                 if hasattr(self.pipeline_components, 'preprocessor'):
@@ -107,10 +158,19 @@ class PropertyPricePredictionModel:
                     self.feature_names = self.pipeline_components.feature_names
                     self.use_log_transform = getattr(self.pipeline_components, 'use_log_transform', False)
                     self.model_name = getattr(self.pipeline_components, 'model_name', 'Unknown')
-                    self.performance_metrics = getattr(self.pipeline_components, 'performance_metrics', {})
+                    self.performance_metrics = _scalar_metrics(
+                        getattr(self.pipeline_components, 'performance_metrics', None)
+                    )
                 else:
                     raise ModelLoadError("Invalid pipeline format")
 
+            self.interval_method = self._artifact_entry(INTERVAL_METHOD_KEY)
+            self._build_location_engine()
+            self._compact_model()
+            self._build_explainer()
+            self._build_comparables()
+            self._build_drift_monitor()
+
             self.is_loaded = True
             logger.info(f"Pipeline loaded successfully:")
             logger.info(f"  - Model: {self.model_name}")
@@ -122,6 +182,339 @@ class PropertyPricePredictionModel:
             logger.error(f"Failed to load pipeline: {str(e)}")
             raise ModelLoadError(f"Failed to load pipeline: {str(e)}")
 
+    def _build_location_engine(self) -> None:
+        """Precompile the location engine against the fitted region encoder."""
+        encoders = getattr(self.preprocessor, 'label_encoders', {}) or {}
+        region_encoder = encoders.get('region')
+        known_regions = region_encoder.classes_ if region_encoder is not None else []
+
+        self.location_engine = LocationEngine(known_regions, keywords=PREMIUM_AREAS)
+        if hasattr(self.preprocessor, 'set_location_engine'):
+            self.preprocessor.set_location_engine(self.location_engine)
+        logger.info(f"Location engine compiled: {len(self.location_engine.gazetteer)} gazetteer entries "
+                    f"for {len(self.location_engine.known_regions)} regions")
+
+    def _compact_model(self) -> None:
+        """
+        Replace a supported tree ensemble by its compact representation.
+
+        The compact copy is checked against the loaded model on rows covering
+        both sides of every split threshold; the scikit-learn model is kept if
+        they disagree or the model type is not supported.
+        """
+        self.compact_info = None
+        if not self.compact:
+            return
+
+        try:
+            compact = CompactTreeEnsemble.from_model(self.model)
+        except Exception as e:
+            logger.warning(f"Could not build compact model: {str(e)}")
+            return
+        if compact is None:
+            logger.info(f"No compact representation for {type(self.model).__name__}, using it as loaded")
+            return
+        if not compact.verify(self.model):
+            logger.warning(f"Compact model disagrees with {compact.source} "
+                           f"(max abs error {compact.max_abs_error}), using it as loaded")
+            return
+
+        source_bytes = sklearn_tree_nbytes(self.model)
+        # Drop the last reference to the scikit-learn trees so their memory is released
+        self.model = compact
+        if isinstance(self.pipeline_components, dict):
+            self.pipeline_components['model'] = compact
+        else:
+            self.pipeline_components.model = compact
+        release_memory()
+
+        self.compact_info = {**compact.describe(), 'source_bytes': source_bytes}
+        logger.info(f"Compact model: {compact.n_trees} trees, {compact.n_nodes} nodes, "
+                    f"{compact.nbytes / 1024:.0f} KB (was {source_bytes / 1024:.0f} KB), "
+                    f"max abs error {compact.max_abs_error:.2e}")
+
+    def _build_explainer(self) -> None:
+        """
+        Use the compact ensemble for per-prediction explanations.
+
+        A tree model kept as loaded gets a compact copy for explanations only;
+        other models have none.
+        """
+        self.explainer = None
+        if isinstance(self.model, CompactTreeEnsemble):
+            self.explainer = self.model
+            return
+        try:
+            self.explainer = CompactTreeEnsemble.from_model(self.model)
+        except Exception as e:
+            logger.warning(f"Could not build explainer: {str(e)}")
+        if self.explainer is None:
+            logger.info(f"No per-prediction explanations for {type(self.model).__name__}")
+
+    def _build_comparables(self) -> None:
+        """Index the training listings stored in the artifact, if it has them."""
+        self.comparables = None
+        payload = self._artifact_entry(COMPARABLES_KEY)
+        if payload is None:
+            logger.info("Artifact has no comparable listings, /comparables is unavailable")
+            return
+
+        try:
+            self.comparables = ComparablesIndex(
+                payload, self.scaler, getattr(self.preprocessor, 'label_encoders', None)
+            )
+        except Exception as e:
+            logger.warning(f"Could not build comparables index: {str(e)}")
+            return
+        logger.info(f"Comparables index: {len(self.comparables):,} listings")
+
+    def _artifact_entry(self, key: str) -> Any:
+        """Optional entry of the loaded artifact, None if it does not have it."""
+        if isinstance(self.pipeline_components, dict):
+            return self.pipeline_components.get(key)
+        return getattr(self.pipeline_components, key, None)
+
+    def _build_drift_monitor(self) -> None:
+        """
+        Set up input drift detection against the artifact's training baseline.
+
+        Artifacts without a baseline but with comparable listings get one
+        computed from those listings; without either, only unknown categories
+        and out-of-training-range values are tracked.
+        """
+        encoders = getattr(self.preprocessor, 'label_encoders', {}) or {}
+        baseline = self._artifact_entry(DRIFT_BASELINE_KEY)
+        try:
+            if baseline is None and self.comparables is not None:
+                listings = pd.DataFrame(self.comparables.features, columns=self.comparables.feature_names)
+                baseline = drift_baseline(listings, self.feature_names, encoders)
+            self.drift = DriftMonitor(self.feature_names, encoders, baseline, self.scaler)
+        except Exception as e:
+            logger.warning(f"Could not set up drift detection: {str(e)}")
+            self.drift = None
+            return
+        logger.info(f"Drift detection: {'training baseline' if baseline else 'no baseline, unknown categories only'}")
+
+    def _raw_categories(self, df: pd.DataFrame) -> Dict[str, List[Any]]:
+        """Categorical values of validated rows before encoding, region as resolved from the location."""
+        raw_categories = {
+            col: [getattr(value, 'value', value) for value in df[col]]
+            for col in ('property_type', 'furnished') if col in df.columns
+        }
+        raw_categories['region'] = self.location_engine.regions(df['location']).tolist()
+        return raw_categories
+
+    def _unknown_categories(self, df: pd.DataFrame) -> Dict[str, np.ndarray]:
+        """Per categorical feature, the rows whose value the encoder does not know (or is 'unknown')."""
+        encoders = getattr(self.preprocessor, 'label_encoders', {}) or {}
+        unknown = {}
+        for col, values in self._raw_categories(df).items():
+            if col in encoders:
+                known = set(str(value) for value in encoders[col].classes_) - {'unknown'}
+                unknown[col] = np.array([str(value) not in known for value in values], dtype=bool)
+        return unknown
+
+    def _observe_inputs(self, df: pd.DataFrame, feature_df: pd.DataFrame) -> None:
+        """Record incoming rows in the drift monitor."""
+        try:
+            self.drift.observe(self._raw_categories(df), feature_df)
+        except Exception as e:
+            # Monitoring must never fail a prediction
+            logger.warning(f"Could not record inputs in the drift monitor: {str(e)}")
+
+    def _feature_frame(self, df: pd.DataFrame, observe: bool = True) -> pd.DataFrame:
+        """
+        Run preprocessing over a frame of validated rows.
+
+        All rows go through the preprocessor in a single vectorized call, and
+        are recorded in the drift monitor unless observe is False. Returns the
+        unscaled model features, one row per input row.
+        """
+        # Set verbose=False for API usage to reduce logging
+        original_verbose = getattr(self.preprocessor, 'verbose', True)
+        if hasattr(self.preprocessor, 'verbose'):
+            self.preprocessor.verbose = False
+
+        try:
+            with stage('preprocess'):
+                processed_df = self.preprocessor.transform(df)
+        finally:
+            # Restore original verbose setting
+            if hasattr(self.preprocessor, 'verbose'):
+                self.preprocessor.verbose = original_verbose
+
+        logger.debug(f"Processed data shape: {processed_df.shape}")
+        if len(processed_df) != len(df):
+            raise PredictionError(
+                f"Preprocessing dropped {len(df) - len(processed_df)} of {len(df)} rows"
+            )
+
+        # Extract features used for training (excluding price if present)
+        available_features = [col for col in self.feature_names if col in processed_df.columns]
+        if len(available_features) != len(self.feature_names):
+            missing_features = set(self.feature_names) - set(available_features)
+            logger.warning(f"Missing features: {missing_features}")
+
+        feature_df = processed_df[available_features]
+        logger.debug(f"Feature extraction: {len(available_features)} features selected")
+        if observe and self.drift is not None:
+            with stage('monitor'):
+                self._observe_inputs(df, feature_df)
+        return feature_df
+
+    def _scale_frame(self, df: pd.DataFrame, observe: bool = True) -> np.ndarray:
+        """
+        Run preprocessing and scaling over a frame of validated rows.
+
+        Returns the scaled feature matrix, one row per input row.
+        """
+        feature_df = self._feature_frame(df, observe)
+
+        # Scale features using the trained scaler
+        with stage('scale'):
+            scaled_features = self.scaler.transform(feature_df)
+        logger.debug(f"Features scaled: {scaled_features.shape}")
+
+        return scaled_features
+
+    def _predict_frame(self, df: pd.DataFrame, observe: bool = True) -> np.ndarray:
+        """
+        Predict prices for a frame of validated rows in one vectorized call.
+
+        Returns one predicted price (RM) per input row.
+        """
+        prediction = self._predict_scaled(self._scale_frame(df, observe))
+        if observe:
+            self._observe(df, prediction)
+        return prediction
+
+    def _observe(self, df: pd.DataFrame, prices: np.ndarray) -> None:
+        """Record served predictions in the monitor by region and property type."""
+        try:
+            with stage('monitor'):
+                regions = self.location_engine.regions(df['location'])
+                regions = regions.where(regions.isin(self.location_engine.known_regions), 'unknown')
+                property_types = [str(getattr(value, 'value', value)) for value in df['property_type']]
+                self.monitor.observe(regions.tolist(), property_types, prices)
+        except Exception as e:
+            # Monitoring must never fail a prediction
+            logger.warning(f"Could not record predictions in the monitor: {str(e)}")
+
+    def _predict_scaled(self, scaled_features: np.ndarray) -> np.ndarray:
+        """Predict prices (RM) from scaled features."""
+        # Make prediction with optional log transformation
+        with stage('model'):
+            prediction = self.model.predict(scaled_features)
+        if self.use_log_transform:
+            # Enhanced pipeline with log transformation
+            prediction = np.expm1(prediction)  # Transform back from log scale
+
+        return prediction
+
+    def _comparable_prices(
+        self,
+        df: pd.DataFrame,
+        feature_df: pd.DataFrame,
+        scaled_features: np.ndarray,
+        asking: np.ndarray
+    ) -> List[Optional[Dict[str, Any]]]:
+        """Comparable price distribution per row, or None for every row without an index."""
+        if self.comparables is None:
+            return [None] * len(asking)
+        with stage('comparables'):
+            return self.comparables.price_distribution(
+                scaled_features, feature_df.to_numpy(), DEFAULT_DISTRIBUTION_K, asking, self._unknown_categories(df)
+            )
+
+    @staticmethod
+    def _comparable_recommendation(distribution: Optional[Dict[str, Any]]) -> Optional[str]:
+        """Recommendation for an asking price outside the usual range of its comparables."""
+        if distribution is None:
+            return None
+        if distribution['asking_percentile'] > COMPARABLE_PERCENTILE_HIGH:
+            return (f"Asking price is above {COMPARABLE_PERCENTILE_HIGH}% of {distribution['count']} "
+                    f"comparable listings (median RM {distribution['median']:,.0f})")
+        if distribution['asking_percentile'] < COMPARABLE_PERCENTILE_LOW:
+            return (f"Asking price is below {100 - COMPARABLE_PERCENTILE_LOW}% of {distribution['count']} "
+                    f"comparable listings (median RM {distribution['median']:,.0f})")
+        return None
+
+    def _ensemble_member_predictions(self, scaled_features: np.ndarray) -> Optional[np.ndarray]:
+        """
+        Get per-estimator predictions for bagged ensembles.
+
+        Works for RandomForest, ExtraTrees and Bagging regressors, whose
+        estimators each predict the target independently. Boosted models are
+        excluded because their stages fit residuals and do not form a
+        distribution. Returns an array of shape (n_estimators, n_rows) or None.
+        """
+        if isinstance(self.model, CompactTreeEnsemble):
+            if self.model.aggregate != 'mean':
+                return None
+            return self.model.member_predictions(scaled_features)
+
+        estimators = getattr(self.model, 'estimators_', None)
+        if not isinstance(estimators, list) or not estimators:
+            return None
+        if not all(hasattr(estimator, 'predict') for estimator in estimators):
+            return None
+
+        # Trees in sklearn forests are evaluated on float32 input
+        X = np.ascontiguousarray(scaled_features, dtype=np.float32)
+        estimator_features = getattr(self.model, 'estimators_features_', None)
+
+        members = np.empty((len(estimators), X.shape[0]), dtype=np.float64)
+        for i, estimator in enumerate(estimators):
+            X_est = X[:, estimator_features[i]] if estimator_features is not None else X
+            members[i] = estimator.predict(X_est)
+        return members
+
+    def _predict_frame_with_intervals(
+        self,
+        df: pd.DataFrame,
+        quantiles: Sequence[float]
+    ) -> Tuple[np.ndarray, np.ndarray, str]:
+        """
+        Predict prices and quantiles for a frame of validated rows in one pass.
+
+        For bagged ensembles the quantiles are taken over the per-estimator
+        predictions and the point prediction is their mean, so both come from
+        the same pass over the trees. Other models, and artifacts whose
+        interval_method is 'residual' (e.g. compressed ensembles, whose few
+        remaining trees agree more than the data warrants), fall back to a
+        normal interval around the point prediction using the held-out test
+        RMSE.
+
+        Returns:
+            (point predictions of shape (n_rows,),
+             quantile predictions of shape (n_quantiles, n_rows),
+             interval method: 'ensemble' or 'residual')
+        """
+        scaled_features = self._scale_frame(df)
+        quantiles = np.asarray(quantiles, dtype=float)
+
+        members = None
+        if self.interval_method != 'residual':
+            with stage('model'):
+                members = self._ensemble_member_predictions(scaled_features)
+        if members is not None:
+            point = members.mean(axis=0)
+            bounds = np.quantile(members, quantiles, axis=0)
+            if self.use_log_transform:
+                point = np.expm1(point)
+                bounds = np.expm1(bounds)
+            self._observe(df, point)
+            return point, bounds, 'ensemble'
+
+        point = self._predict_scaled(scaled_features)
+
+        rmse = (self.performance_metrics or {}).get('test_rmse')
+        self._observe(df, point)
+        spread = np.full_like(point, float(rmse)) if rmse else point * DEFAULT_RELATIVE_SPREAD
+        z_scores = np.array([NormalDist().inv_cdf(q) for q in quantiles])
+        bounds = np.maximum(point[None, :] + z_scores[:, None] * spread[None, :], 0.0)
+        return point, bounds, 'residual'
+
     def predict(self, data: Dict[str, Any]) -> float:
         """
         Predict price for new data using the deployment pipeline.
@@ -163,50 +556,14 @@ class PropertyPricePredictionModel:
             else:
                 df = validated_data.copy()
 
-            # Apply preprocessing using the loaded preprocessor
-            # Set verbose=False for API usage to reduce logging
-            original_verbose = getattr(self.preprocessor, 'verbose', True)
-            if hasattr(self.preprocessor, 'verbose'):
-                self.preprocessor.verbose = False
-
-            try:
-                processed_df = self.preprocessor.transform(df)
-            finally:
-                # Restore original verbose setting
-                if hasattr(self.preprocessor, 'verbose'):
-                    self.preprocessor.verbose = original_verbose
-
-            logger.debug(f"Processed data shape: {processed_df.shape}")
-
-            # Extract features used for training (excluding price if present)
-            available_features = [col for col in self.feature_names if col in processed_df.columns]
-            if len(available_features) != len(self.feature_names):
-                missing_features = set(self.feature_names) - set(available_features)
-                logger.warning(f"Missing features: {missing_features}")
-
-            feature_df = processed_df[available_features]
-            logger.debug(f"Feature extraction: {len(available_features)} features selected")
-
-            # Scale features using the trained scaler
-            scaled_features = self.scaler.transform(feature_df)
-            logger.debug(f"Features scaled: {scaled_features.shape}")
-
-            # Make prediction with optional log transformation
-            if self.use_log_transform:
-                # Enhanced pipeline with log transformation
-                prediction_log = self.model.predict(scaled_features)
-                prediction = np.expm1(prediction_log)  # Transform back from log scale
-                logger.debug(f"Log prediction: {prediction_log[0]:.4f} -> Final: RM {prediction[0]:,.0f}")
-            else:
-                # Standard pipeline (no log transformation)
-                prediction = self.model.predict(scaled_features)
-                logger.debug(f"Direct prediction: RM {prediction[0]:,.0f}")
+            prediction = self._predict_frame(df)
+            logger.debug(f"Prediction: RM {prediction[0]:,.0f}")
 
             result = float(prediction[0])
             logger.info(f"Prediction completed: RM {result:,.0f}")
 
-            # Validate prediction is reasonable (RM 500 - RM 50,000)
-            if not (500 <= result <= 50000):
+            # Validate prediction is reasonable (RM 500 - RM 50,000); the monitor counts these per region
+            if not (REASONABLE_PRICE_RANGE[0] <= result <= REASONABLE_PRICE_RANGE[1]):
                 logger.warning(f"Prediction outside reasonable range: RM {result:,.0f}")
 
             return result
@@ -215,72 +572,188 @@ class PropertyPricePredictionModel:
             logger.error(f"Prediction failed: {str(e)}")
             raise PredictionError(f"Prediction failed: {str(e)}")
 
-    def predict_single(self, property_data: Dict[str, Any]) -> Dict[str, Any]:
+    def feature_key(self, data: Dict[str, Any]) -> Optional[Tuple]:
         """
-        Predict price for a single property and return detailed results.
+        Hashable key of the features a property is predicted from.
+
+        Properties with equal keys get equal predictions from this model: the
+        location only enters the model through its region, so it is reduced
+        to the region when the preprocessor resolves regions with the
+        location engine. Returns None for data that fails validation.
+        """
+        try:
+            validated = validate_property_data(data)
+        except ValueError:
+            return None
+
+        location = validated['location']
+        if self.location_engine is not None and \
+                getattr(self.preprocessor, 'location_engine', None) is self.location_engine:
+            location = self.location_engine.region(location)
+
+        return (
+            validated['property_type'],
+            validated['bedrooms'],
+            validated['bathrooms'],
+            validated['area'],
+            validated['furnished'],
+            location
+        )
+
+    def audit_features(self, data: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """Normalized features of a property as recorded in the audit log, None if invalid."""
+        key = self.feature_key(data)
+        if key is None:
+            return None
+        resolved = self.location_engine is not None and \
+            getattr(self.preprocessor, 'location_engine', None) is self.location_engine
+        names = ('property_type', 'bedrooms', 'bathrooms', 'area', 'furnished',
+                 'region' if resolved else 'location')
+        return dict(zip(names, key))
+
+    def find_comparables(self, data: Dict[str, Any], k: int = DEFAULT_K) -> Dict[str, Any]:
+        """
+        Find the training listings of the same categories nearest to a property.
 
         Args:
-            property_data: Dictionary containing property features
+            data: Dictionary containing property features
+            k: Number of comparables to return (1 to MAX_K)
 
         Returns:
-            Dictionary with prediction results including confidence metrics
+            Dictionary with the comparables (nearest first, with price and
+            distance), the price distribution of the nearest listings and
+            the time spent searching the index
         """
         if not self.is_loaded or not self.pipeline_components:
             raise PredictionError(MODEL_NOT_LOADED_MSG)
+        if self.comparables is None:
+            raise ModelNotFoundError("Loaded model artifact has no comparable listings")
+        if not 1 <= k <= MAX_K:
+            raise PredictionError(f"k must be between 1 and {MAX_K}, got {k}")
 
         try:
-            # Get the core prediction
-            predicted_price = self.predict(property_data)
-
-            # Calculate confidence score based on actual model performance
-            if self.performance_metrics:
-                base_confidence = self.performance_metrics.get('cv_mean', 0.7)
-                test_r2 = self.performance_metrics.get('test_r2', 0.7)
-
-                # Adjust confidence based on model quality
-                if test_r2 >= 0.8:
-                    confidence_adjustment = np.random.normal(0.05, 0.02)
-                elif test_r2 >= 0.6:
-                    confidence_adjustment = np.random.normal(0.02, 0.03)
-                else:
-                    confidence_adjustment = np.random.normal(-0.05, 0.05)
-
-                confidence_score = min(0.95, max(0.6, base_confidence + confidence_adjustment))
-            else:
-                confidence_score = np.random.uniform(0.75, 0.90)
-
-            # Calculate price range based on model performance
-            if self.performance_metrics:
-                test_r2 = self.performance_metrics.get('test_r2', 0.7)
-                uncertainty_factor = 1 - test_r2
-                range_factor = 0.10 + (uncertainty_factor * 0.15) # 10-25% range
-            else:
-                range_factor = 0.15  # Default 15% range
+            validated_data = validate_property_data(data)
+            frame = pd.DataFrame([validated_data])
+            feature_df = self._feature_frame(frame)
+            with stage('scale'):
+                scaled_features = self.scaler.transform(feature_df)
+            unknown = self._unknown_categories(frame)
+
+            started = time.perf_counter()
+            with stage('comparables'):
+                comparables, distribution = self.comparables.search(
+                    scaled_features, feature_df.to_numpy(), k, DEFAULT_DISTRIBUTION_K, unknown
+                )
+            query_ms = (time.perf_counter() - started) * 1000
+            del distribution['asking_percentile']
 
             return {
-                'predicted_price': float(predicted_price),
-                'confidence_score': float(confidence_score),
-                'price_range': {
-                    'min': float(predicted_price * (1 - range_factor)),
-                    'max': float(predicted_price * (1 + range_factor))
-                },
+                'comparables': comparables,
+                'price_distribution': distribution,
+                'query_ms': round(query_ms, 3),
                 'currency': 'RM',
                 'status': 'success',
-                'model_version': self.model_name,
-                'features_used': self.feature_names,
+                'model_version': self.model_version,
                 'timestamp': datetime.now().isoformat()
             }
 
+        except Exception as e:
+            logger.error(f"Comparables search failed: {str(e)}")
+            raise PredictionError(f"Comparables search failed: {str(e)}")
+
+    def _format_prediction(
+        self,
+        predicted_price: float,
+        bounds: np.ndarray,
+        quantiles: Sequence[float],
+        method: str
+    ) -> Dict[str, Any]:
+        """Build a prediction result from a point prediction and its quantiles."""
+        quantile_values = dict(zip(quantiles, (float(value) for value in bounds)))
+        lower, upper = DEFAULT_INTERVAL
+        price_min, price_max = quantile_values[lower], quantile_values[upper]
+
+        # Confidence shrinks as the default interval widens relative to the price
+        relative_width = (price_max - price_min) / (2 * predicted_price) if predicted_price > 0 else 1.0
+        confidence_score = min(1.0, max(0.0, 1.0 - relative_width))
+
+        return {
+            'predicted_price': float(predicted_price),
+            'confidence_score': float(confidence_score),
+            'price_range': {
+                'min': price_min,
+                'max': price_max
+            },
+            'quantiles': {f"{q:g}": value for q, value in quantile_values.items()},
+            'interval_method': method,
+            'currency': 'RM',
+            'status': 'success',
+            'model_version': self.model_version,
+            'features_used': self.feature_names,
+            'timestamp': datetime.now().isoformat()
+        }
+
+    @staticmethod
+    def _interval_quantiles(quantiles: Optional[Sequence[float]]) -> List[float]:
+        """Merge requested quantiles with the default interval, sorted and deduplicated."""
+        requested = [float(q) for q in (quantiles or [])]
+        invalid = [q for q in requested if not 0 < q < 1]
+        if invalid:
+            raise ValueError(f"Quantiles must be between 0 and 1 (exclusive): {invalid}")
+        return sorted(set(requested) | set(DEFAULT_INTERVAL))
+
+    def predict_single(
+        self,
+        property_data: Dict[str, Any],
+        quantiles: Optional[Sequence[float]] = None
+    ) -> Dict[str, Any]:
+        """
+        Predict price for a single property and return detailed results.
+
+        The price range and confidence score come from a deterministic
+        prediction interval computed in the same pass as the point prediction.
+
+        Args:
+            property_data: Dictionary containing property features
+            quantiles: Optional extra quantiles (0-1) to return alongside the
+                default 10th-90th percentile price range
+
+        Returns:
+            Dictionary with prediction results including confidence metrics
+        """
+        if not self.is_loaded or not self.pipeline_components:
+            raise PredictionError(MODEL_NOT_LOADED_MSG)
+
+        try:
+            all_quantiles = self._interval_quantiles(quantiles)
+            validated_data = validate_property_data(property_data)
+
+            point, bounds, method = self._predict_frame_with_intervals(
+                pd.DataFrame([validated_data]), all_quantiles
+            )
+            predicted_price = float(point[0])
+            logger.info(f"Prediction completed: RM {predicted_price:,.0f}")
+
+            return self._format_prediction(predicted_price, bounds[:, 0], all_quantiles, method)
+
         except Exception as e:
             logger.error(f"Single prediction failed: {str(e)}")
             raise PredictionError(f"Single prediction failed: {str(e)}")
 
-    def predict_batch(self, properties_data: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    def predict_batch(
+        self,
+        properties_data: List[Dict[str, Any]],
+        quantiles: Optional[Sequence[float]] = None
+    ) -> List[Dict[str, Any]]:
         """
         Predict prices for multiple properties using the complete pipeline.
 
+        Valid properties are preprocessed and predicted, intervals included,
+        in a single vectorized pass.
+
         Args:
             properties_data: List of property feature dictionaries
+            quantiles: Optional extra quantiles (0-1) to return for every property
 
         Returns:
             List of prediction result dictionaries
@@ -291,45 +764,325 @@ class PropertyPricePredictionModel:
         if len(properties_data) > MAX_BATCH_SIZE:
             raise PredictionError(f"Batch size {len(properties_data)} exceeds maximum {MAX_BATCH_SIZE}")
 
-        results = []
+        try:
+            all_quantiles = self._interval_quantiles(quantiles)
+        except ValueError as e:
+            raise PredictionError(f"Batch prediction failed: {str(e)}")
+
+        results: List[Optional[Dict[str, Any]]] = [None] * len(properties_data)
+        valid_indices = []
+        valid_rows = []
 
         for i, prop_data in enumerate(properties_data):
             try:
-                result = self.predict_single(prop_data)
-                result['batch_index'] = i
-                results.append(result)
+                valid_rows.append(validate_property_data(prop_data))
+                valid_indices.append(i)
             except Exception as e:
                 logger.error(f"Failed to predict for property {i}: {str(e)}")
-                results.append({
+                results[i] = {
+                    'batch_index': i,
+                    'error': f"Single prediction failed: {str(e)}",
+                    'status': 'error',
+                    'timestamp': datetime.now().isoformat()
+                }
+
+        if valid_rows:
+            try:
+                point, bounds, method = self._predict_frame_with_intervals(
+                    pd.DataFrame(valid_rows), all_quantiles
+                )
+            except Exception as e:
+                logger.error(f"Batch prediction failed: {str(e)}")
+                raise PredictionError(f"Batch prediction failed: {str(e)}")
+
+            for j, i in enumerate(valid_indices):
+                result = self._format_prediction(float(point[j]), bounds[:, j], all_quantiles, method)
+                result['batch_index'] = i
+                results[i] = result
+
+        return results
+
+    def _explain_frame(self, df: pd.DataFrame) -> List[Dict[str, Any]]:
+        """
+        Explain the predictions for a frame of validated rows in one vectorized pass.
+
+        Explanations are not recorded in the prediction or drift monitors.
+        """
+        feature_df = self._feature_frame(df, observe=False)
+        with stage('scale'):
+            scaled_features = self.scaler.transform(feature_df)
+        with stage('explain'):
+            contributions = self.explainer.contributions(scaled_features)
+
+        expected = self.explainer.expected_value
+        raw = expected + contributions.sum(axis=1)
+        if self.use_log_transform:
+            base_price = float(np.expm1(expected))
+            prices = np.expm1(raw)
+            # Split each price's distance from the base price in proportion to the
+            # log-scale contributions; without any, the effect of each on its own
+            totals = contributions.sum(axis=1, keepdims=True)
+            shares = np.divide(contributions, totals, out=np.zeros_like(contributions),
+                               where=np.abs(totals) > 1e-12)
+            effects = np.where(np.abs(totals) > 1e-12, shares * (prices - base_price)[:, None],
+                               (base_price + 1) * np.expm1(contributions))
+        else:
+            base_price = expected
+            prices = raw
+            effects = contributions
+
+        # Show label-encoded features by their category
+        encoders = getattr(self.preprocessor, 'label_encoders', {}) or {}
+        values = {}
+        for name in self.feature_names:
+            column = feature_df[name].to_numpy()
+            if name in encoders:
+                classes = encoders[name].classes_
+                values[name] = classes[np.clip(column.astype(np.int64), 0, len(classes) - 1)].tolist()
+            else:
+                values[name] = column.tolist()
+
+        results = []
+        timestamp = datetime.now().isoformat()
+        for i in range(len(df)):
+            order = np.argsort(-np.abs(effects[i]), kind='stable')
+            results.append({
+                'predicted_price': float(prices[i]),
+                'base_price': float(base_price),
+                'contributions': [
+                    {
+                        'feature': self.feature_names[j],
+                        'value': values[self.feature_names[j]][i],
+                        'effect': float(effects[i, j]),
+                        'contribution': float(contributions[i, j])
+                    }
+                    for j in order
+                ],
+                'output_scale': 'log_price' if self.use_log_transform else 'price',
+                'method': 'saabas',
+                'currency': 'RM',
+                'status': 'success',
+                'model_version': self.model_version,
+                'timestamp': timestamp
+            })
+        return results
+
+    def explain(self, property_data: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Explain the predicted price of a property feature by feature.
+
+        Each feature's effect is the change in price (RM) its splits make
+        along the property's paths through the trees; the effects add up to
+        the difference between the predicted price and the base price, the
+        model's average over its training data.
+
+        Args:
+            property_data: Dictionary containing property features
+
+        Returns:
+            Dictionary with the predicted and base price and the per-feature
+            contributions, largest effect first
+
+        Raises:
+            ModelNotFoundError: If the loaded model is not a tree ensemble
+        """
+        if not self.is_loaded or not self.pipeline_components:
+            raise PredictionError(MODEL_NOT_LOADED_MSG)
+        if self.explainer is None:
+            raise ModelNotFoundError(f"Explanations are not available for {self.model_name}")
+
+        try:
+            validated_data = validate_property_data(property_data)
+            return self._explain_frame(pd.DataFrame([validated_data]))[0]
+        except Exception as e:
+            logger.error(f"Explanation failed: {str(e)}")
+            raise PredictionError(f"Explanation failed: {str(e)}")
+
+    def explain_batch(self, properties_data: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Explain the predicted prices of multiple properties in one vectorized pass.
+
+        Args:
+            properties_data: List of property feature dictionaries
+
+        Returns:
+            List of explanation dictionaries with batch_index; invalid
+            properties get an error entry instead
+        """
+        if not self.is_loaded or not self.pipeline_components:
+            raise PredictionError(MODEL_NOT_LOADED_MSG)
+        if self.explainer is None:
+            raise ModelNotFoundError(f"Explanations are not available for {self.model_name}")
+
+        if len(properties_data) > MAX_BATCH_SIZE:
+            raise PredictionError(f"Batch size {len(properties_data)} exceeds maximum {MAX_BATCH_SIZE}")
+
+        results: List[Optional[Dict[str, Any]]] = [None] * len(properties_data)
+        valid_indices = []
+        valid_rows = []
+        for i, prop_data in enumerate(properties_data):
+            try:
+                valid_rows.append(validate_property_data(prop_data))
+                valid_indices.append(i)
+            except Exception as e:
+                results[i] = {
                     'batch_index': i,
-                    'error': str(e),
+                    'error': f"Explanation failed: {str(e)}",
                     'status': 'error',
                     'timestamp': datetime.now().isoformat()
-                })
+                }
+
+        if valid_rows:
+            try:
+                explanations = self._explain_frame(pd.DataFrame(valid_rows))
+            except Exception as e:
+                logger.error(f"Batch explanation failed: {str(e)}")
+                raise PredictionError(f"Batch explanation failed: {str(e)}")
+            for i, explanation in zip(valid_indices, explanations):
+                explanation['batch_index'] = i
+                results[i] = explanation
 
         return results
 
+    def predict_columns(
+        self,
+        columns: Dict[str, Sequence[Any]],
+        quantiles: Optional[Sequence[float]] = None
+    ) -> Dict[str, Any]:
+        """
+        Predict prices for properties given as columns, one array per field.
+
+        The columnar counterpart of predict_batch: columns are validated and
+        predicted as whole arrays, without a dictionary per property, and
+        results come back as arrays in input order. Unlike predict_batch, an
+        invalid value fails the whole batch with a ValidationError.
+
+        Args:
+            columns: Values per field (property_type, bedrooms, bathrooms,
+                area, furnished, location), all of the same length
+            quantiles: Optional extra quantiles (0-1) to return for every property
+
+        Returns:
+            Dictionary of NumPy arrays (predicted_price, confidence_score,
+            price_min, price_max and one per quantile under 'quantiles') plus
+            the interval method, model version and row count
+        """
+        if not self.is_loaded or not self.pipeline_components:
+            raise PredictionError(MODEL_NOT_LOADED_MSG)
+
+        batch_size = max((len(values) for values in columns.values()), default=0)
+        if batch_size > MAX_COLUMNAR_BATCH_SIZE:
+            raise ValidationError(f"Batch size {batch_size} exceeds maximum {MAX_COLUMNAR_BATCH_SIZE}")
+
+        try:
+            all_quantiles = self._interval_quantiles(quantiles)
+            with stage('validate'):
+                df = validate_property_columns(columns)
+        except ValueError as e:
+            raise ValidationError(str(e))
+
+        try:
+            point, bounds, method = self._predict_frame_with_intervals(df, all_quantiles)
+        except Exception as e:
+            logger.error(f"Columnar prediction failed: {str(e)}")
+            raise PredictionError(f"Columnar prediction failed: {str(e)}")
+
+        # Same confidence as _format_prediction, over whole columns
+        lower, upper = DEFAULT_INTERVAL
+        price_min = bounds[all_quantiles.index(lower)]
+        price_max = bounds[all_quantiles.index(upper)]
+        with np.errstate(divide='ignore', invalid='ignore'):
+            relative_width = np.where(point > 0, (price_max - price_min) / (2 * point), 1.0)
+        confidence_score = np.clip(1.0 - relative_width, 0.0, 1.0)
+
+        return {
+            'predicted_price': point,
+            'confidence_score': confidence_score,
+            'price_min': price_min,
+            'price_max': price_max,
+            'quantiles': {f"{q:g}": bounds[i] for i, q in enumerate(all_quantiles)},
+            'interval_method': method,
+            'model_version': self.model_version,
+            'count': len(df)
+        }
+
     def get_model_info(self) -> Dict[str, Any]:
-        """Get detailed model information from the pipeline components."""
+        """
+        Get detailed model information from the pipeline components.
+
+        The information only depends on the loaded artifact, so it is built on
+        the first call and the same dictionary is returned afterwards.
+        """
         if not self.is_loaded or not self.pipeline_components:
             raise PredictionError(MODEL_NOT_LOADED_MSG)
 
-        # Extract feature importance if available
+        if self._model_info is None:
+            self._model_info = self._build_model_info()
+        return self._model_info
+
+    def memory_report(self) -> Dict[str, Any]:
+        """
+        Approximate memory held by each component of the loaded model.
+
+        Components are sized in order, each counting only what no earlier
+        component reached, so pipeline_components shows what stays referenced
+        by the loaded artifact alone after extraction (e.g. the comparable
+        listings payload once the index is built).
+
+        Returns:
+            Bytes per component, their total and the location cache size
+        """
+        encoders = getattr(self.preprocessor, 'label_encoders', None)
+        components = [
+            ('model', self.model),
+            ('explainer', self.explainer),
+            ('scaler', self.scaler),
+            ('encoders', encoders),
+            ('location_engine', self.location_engine),
+            ('preprocessor', self.preprocessor),
+            ('comparables', self.comparables),
+            ('drift', self.drift),
+            ('monitor', self.monitor),
+            ('model_info', self._model_info),
+            ('pipeline_components', self.pipeline_components)
+        ]
+
+        seen: set = set()
+        sizes = {name: deep_sizeof(component, seen) if component is not None else 0
+                 for name, component in components}
+        return {
+            'model_version': self.model_version,
+            'components': sizes,
+            'total_bytes': sum(sizes.values()),
+            'location_cache_entries': len(getattr(self.location_engine, '_cache', None) or {}),
+            'location_cache_size': getattr(self.location_engine, 'cache_size', None)
+        }
+
+    def _build_model_info(self) -> Dict[str, Any]:
+        """Assemble the model information returned by get_model_info."""
+        # Extract feature importance if available; sklearn ensembles average it over all trees per access
         feature_importance = None
-        if hasattr(self.model, 'feature_importances_'):
-            feature_importance = dict(zip(self.feature_names, self.model.feature_importances_.tolist()))
+        importances = getattr(self.model, 'feature_importances_', None)
+        if importances is not None:
+            feature_importance = dict(zip(self.feature_names, np.asarray(importances).tolist()))
 
         return {
-            'model_version': self.model_name,
-            'created_at': datetime.now().isoformat(),
+            'model_version': self.model_version,
+            'created_at': self.created_at.isoformat() if self.created_at else None,
             'feature_columns': self.feature_names,
             'supported_property_types': ['Apartment', 'Condominium', 'Service Residence', 'Townhouse'],
             'supported_furnished_types': ['Yes', 'No', 'Partial', 'Fully Furnished', 'Partially Furnished', 'Unfurnished'],
             'is_loaded': self.is_loaded,
             'max_batch_size': MAX_BATCH_SIZE,
+            'max_columnar_batch_size': MAX_COLUMNAR_BATCH_SIZE,
             'use_log_transform': self.use_log_transform,
             'performance_metrics': self.performance_metrics,
+            'interval_method': self.interval_method or 'auto',
             'feature_importance': feature_importance,
+            'compact_model': self.compact_info,
+            'explanations': self.explainer is not None,
+            'comparables': self.comparables.get_stats() if self.comparables is not None else None,
+            'drift_baseline': self.drift is not None and self.drift.baseline is not None,
             'pipeline_components_keys': list(self.pipeline_components.keys()),
             'expected_input_format': {
                 'property_type': 'str (e.g., "Condominium")',
@@ -361,7 +1114,9 @@ class PropertyPricePredictionModel:
                 'location': 'KLCC, Kuala Lumpur'
             }
 
-            predicted_price = self.predict(test_data)
+            # Not recorded in the monitors, probes would skew the distributions
+            predicted_price = float(self._predict_frame(pd.DataFrame([validate_property_data(test_data)]),
+                                                        observe=False)[0])
 
             # Validate prediction is reasonable for Malaysian market (RM 500 - RM 15,000)
             if 500 <= predicted_price <= 15000:
@@ -377,15 +1132,23 @@ class PropertyPricePredictionModel:
                 status = 'warning'
                 message = 'Model prediction seems very high but functional'
 
+            drift_alerts = self.drift.get_stats()['alerts'] if self.drift is not None else []
+            if drift_alerts and status == 'healthy':
+                status = 'warning'
+                message = f"{message}; input drift detected"
+
             return {
                 'status': status,
                 'message': message,
+                'drift_alerts': drift_alerts,
                 'test_prediction': float(predicted_price),
                 'test_data': test_data,
                 'model_info': {
                     'model_name': self.model_name,
                     'use_log_transform': self.use_log_transform,
-                    'feature_count': len(self.feature_names)
+                    'feature_count': len(self.feature_names),
+                    'compact': self.compact_info is not None,
+                    'comparables': len(self.comparables) if self.comparables is not None else 0
                 },
                 'timestamp': datetime.now().isoformat()
             }
@@ -413,11 +1176,21 @@ class PropertyPricePredictionModel:
 
         try:
             # Get predicted price first
-            predicted_price = self.predict(data)
+            validated_data = validate_property_data(data)
             asking_price = data.get('asking_price', 0)
             
             if asking_price <= 0:
                 raise ValueError("Asking price must be provided and positive")
+
+            frame = pd.DataFrame([validated_data])
+            feature_df = self._feature_frame(frame)
+            with stage('scale'):
+                scaled_features = self.scaler.transform(feature_df)
+            predicted_price = float(self._predict_scaled(scaled_features)[0])
+            self._observe(frame, np.array([predicted_price]))
+            comparable_prices = self._comparable_prices(
+                frame, feature_df, scaled_features, np.array([asking_price], dtype=float)
+            )[0]
             
             # Calculate price deviation
             price_deviation = ((asking_price - predicted_price) / predicted_price) * 100
@@ -427,12 +1200,14 @@ class PropertyPricePredictionModel:
             recommendations = []
             
             # Price-based classification
-            if abs(price_deviation) <= 15:  # Within 15% of predicted price
+            if abs(price_deviation) <= PRICE_DEVIATION_ACCEPTABLE:  # Within 15% of predicted price
                 price_status = "acceptable"
                 approval_reasons.append("Price within acceptable range")
-            elif price_deviation > 15:
+            elif price_deviation > PRICE_DEVIATION_ACCEPTABLE:
                 price_status = "overpriced"
-                recommendations.append(f"Consider reducing price by {price_deviation - 15:.1f}% for better market fit")
+                recommendations.append(
+                    f"Consider reducing price by {price_deviation - PRICE_DEVIATION_ACCEPTABLE:.1f}% for better market fit"
+                )
             else:  # price_deviation < -15
                 price_status = "underpriced"
                 approval_reasons.append("Competitively priced")
@@ -450,9 +1225,7 @@ class PropertyPricePredictionModel:
                 recommendations.append("Verify property specifications meet minimum standards")
             
             # Location assessment (basic)
-            location = data.get('location', '').lower()
-            premium_areas = ['klcc', 'mont kiara', 'bangsar', 'damansara', 'shah alam', 'petaling jaya']
-            if any(area in location for area in premium_areas):
+            if self.location_engine.has_keyword(data.get('location', '')):
                 approval_reasons.append("Good location")
             
             # Facilities assessment
@@ -462,11 +1235,16 @@ class PropertyPricePredictionModel:
             elif not facilities:
                 recommendations.append("Consider highlighting available facilities")
             
+            # Comparable listings
+            comparable_recommendation = self._comparable_recommendation(comparable_prices)
+            if comparable_recommendation:
+                recommendations.append(comparable_recommendation)
+            
             # Final approval decision
             if price_status == "acceptable" and len(approval_reasons) >= 2:
                 approval_status = "approved"
                 confidence_score = min(0.9, 0.6 + (len(approval_reasons) * 0.1))
-            elif price_status == "overpriced" and price_deviation > 30:
+            elif price_status == "overpriced" and price_deviation > PRICE_DEVIATION_REJECT:
                 approval_status = "rejected"
                 confidence_score = min(0.85, 0.5 + (abs(price_deviation) / 100))
                 approval_reasons = ["Price significantly above market rate"]
@@ -486,6 +1264,7 @@ class PropertyPricePredictionModel:
                 "price_deviation": round(price_deviation, 1),
                 "approval_reasons": approval_reasons,
                 "recommendations": recommendations if recommendations else None,
+                "comparable_prices": comparable_prices,
                 "status": "success"
             }
             
@@ -493,6 +1272,151 @@ class PropertyPricePredictionModel:
             logger.error(f"Error in listing approval classification: {str(e)}")
             raise PredictionError(f"Failed to classify listing approval: {str(e)}")
 
+    def classify_listing_approval_batch(self, listings: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Classify many listings at once with the same rules as classify_listing_approval.
+
+        Valid listings are priced in a single vectorized model call and the
+        deviation thresholds, specification checks, premium-area match and
+        facilities rules are evaluated as array operations across the batch.
+        Listings that fail validation get a per-item error entry, as in
+        predict_batch.
+
+        Args:
+            listings: List of dictionaries containing property details and asking price
+
+        Returns:
+            List of approval classification dictionaries, one per listing, with batch_index
+        """
+        if not self.is_loaded or not self.pipeline_components:
+            raise PredictionError(MODEL_NOT_LOADED_MSG)
+
+        if len(listings) > MAX_APPROVAL_BATCH_SIZE:
+            raise PredictionError(f"Batch size {len(listings)} exceeds maximum {MAX_APPROVAL_BATCH_SIZE}")
+
+        results: List[Optional[Dict[str, Any]]] = [None] * len(listings)
+        valid_indices = []
+        valid_rows = []
+
+        for i, data in enumerate(listings):
+            try:
+                validated = validate_property_data(data)
+                if data.get('asking_price', 0) <= 0:
+                    raise ValueError("Asking price must be provided and positive")
+                valid_indices.append(i)
+                valid_rows.append(validated)
+            except Exception as e:
+                logger.error(f"Failed to validate listing {i}: {str(e)}")
+                results[i] = {
+                    'batch_index': i,
+                    'error': f"Failed to classify listing approval: {str(e)}",
+                    'status': 'error'
+                }
+
+        if not valid_rows:
+            return results
+
+        valid = [listings[i] for i in valid_indices]
+        asking = np.array([data.get('asking_price', 0) for data in valid], dtype=float)
+
+        try:
+            frame = pd.DataFrame(valid_rows)
+            feature_df = self._feature_frame(frame)
+            with stage('scale'):
+                scaled_features = self.scaler.transform(feature_df)
+            predicted = self._predict_scaled(scaled_features)
+            self._observe(frame, predicted)
+            comparable_prices = self._comparable_prices(frame, feature_df, scaled_features, asking)
+        except Exception as e:
+            logger.error(f"Batch listing approval classification failed: {str(e)}")
+            raise PredictionError(f"Failed to classify listing approval: {str(e)}")
+
+        bedrooms = np.array([data.get('bedrooms', 0) for data in valid], dtype=float)
+        bathrooms = np.array([data.get('bathrooms', 0) for data in valid], dtype=float)
+        area = np.array([data.get('area', 0) for data in valid], dtype=float)
+        facility_counts = np.array([len(data.get('facilities') or []) for data in valid])
+
+        deviation = ((asking - predicted) / predicted) * 100
+
+        # Price-based classification
+        acceptable = np.abs(deviation) <= PRICE_DEVIATION_ACCEPTABLE
+        overpriced = ~acceptable & (deviation > PRICE_DEVIATION_ACCEPTABLE)
+        underpriced = ~acceptable & ~overpriced
+
+        # Property, location and facilities factors
+        specs_ok = (bedrooms >= 1) & (bathrooms >= 1) & (area >= 300)
+        premium = np.fromiter(
+            (self.location_engine.has_keyword(data.get('location', '')) for data in valid),
+            dtype=bool, count=len(valid)
+        )
+        facilities_ok = facility_counts >= 2
+        facilities_missing = facility_counts == 0
+
+        reason_counts = (
+            acceptable.astype(int) + underpriced + specs_ok + premium + facilities_ok
+        )
+
+        # Final approval decision
+        approved = acceptable & (reason_counts >= 2)
+        rejected = ~approved & overpriced & (deviation > PRICE_DEVIATION_REJECT)
+        review = ~approved & ~rejected
+
+        confidence = np.full(len(valid), 0.7)
+        confidence[approved] = np.minimum(0.9, 0.6 + (reason_counts[approved] * 0.1))
+        confidence[rejected] = np.minimum(0.85, 0.5 + (np.abs(deviation[rejected]) / 100))
+
+        status = np.where(approved, "approved", np.where(rejected, "rejected", "needs_review"))
+
+        reasons: List[List[str]] = [[] for _ in valid]
+        recommendations: List[List[str]] = [[] for _ in valid]
+
+        for j in np.flatnonzero(acceptable):
+            reasons[j].append("Price within acceptable range")
+        for j in np.flatnonzero(overpriced):
+            recommendations[j].append(
+                f"Consider reducing price by {deviation[j] - PRICE_DEVIATION_ACCEPTABLE:.1f}% for better market fit"
+            )
+        for j in np.flatnonzero(underpriced):
+            reasons[j].append("Competitively priced")
+            recommendations[j].append("Price is very competitive, consider slight increase if demand is high")
+        for j in np.flatnonzero(specs_ok):
+            reasons[j].append("Adequate property specifications")
+        for j in np.flatnonzero(~specs_ok):
+            recommendations[j].append("Verify property specifications meet minimum standards")
+        for j in np.flatnonzero(premium):
+            reasons[j].append("Good location")
+        for j in np.flatnonzero(facilities_ok):
+            reasons[j].append("Adequate facilities")
+        for j in np.flatnonzero(facilities_missing):
+            recommendations[j].append("Consider highlighting available facilities")
+        for j, distribution in enumerate(comparable_prices):
+            comparable_recommendation = self._comparable_recommendation(distribution)
+            if comparable_recommendation:
+                recommendations[j].append(comparable_recommendation)
+        for j in np.flatnonzero(rejected):
+            reasons[j] = ["Price significantly above market rate"]
+            recommendations[j].append("Adjust pricing to market standards")
+        for j in np.flatnonzero(review):
+            if not reasons[j]:
+                reasons[j].append("Requires manual review")
+            recommendations[j].append("Manual review recommended for final approval")
+
+        for j, i in enumerate(valid_indices):
+            results[i] = {
+                "batch_index": i,
+                "approval_status": str(status[j]),
+                "confidence_score": round(float(confidence[j]), 2),
+                "predicted_price": round(float(predicted[j]), 2),
+                "asking_price": valid[j].get('asking_price', 0),
+                "price_deviation": round(float(deviation[j]), 1),
+                "approval_reasons": reasons[j],
+                "recommendations": recommendations[j] if recommendations[j] else None,
+                "comparable_prices": comparable_prices[j],
+                "status": "success"
+            }
+
+        return results
+
 
 # Global model instance - will be initialized on first use
 ml_model: Optional[PropertyPricePredictionModel] = None
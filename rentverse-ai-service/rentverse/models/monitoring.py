@@ -0,0 +1,268 @@
+"""
+Prediction distribution monitoring for RentVerse AI Service.
+
+PredictionMonitor keeps, per (region, property_type), a count, the
+out-of-range counts and QuantileSketches of the predicted prices: one over
+the model's lifetime and one per fixed time window, of which the current and
+the previous are kept. Memory is fixed whatever the traffic: the sketches
+grow only with the logarithm of the price range and the number of groups is
+capped. Snapshots serialize the sketches, so the monitors of several workers
+can be merged into the monitor of their combined traffic.
+"""
+
+import threading
+import time
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+from ..utils.sketches import QuantileSketch
+
+DEFAULT_WINDOW_SECONDS = 3600.0
+DEFAULT_MAX_GROUPS = 512
+DEFAULT_RELATIVE_ACCURACY = 0.01
+REPORTED_QUANTILES = (0.1, 0.5, 0.9, 0.99)
+OTHER_GROUP = ('other', 'other')
+
+
+class _GroupStats:
+    """Counters and sketches of one (region, property_type) group."""
+
+    def __init__(self, relative_accuracy: float):
+        self.relative_accuracy = relative_accuracy
+        self.total = QuantileSketch(relative_accuracy)
+        self.current = QuantileSketch(relative_accuracy)
+        self.previous = QuantileSketch(relative_accuracy)
+        self.sum = 0.0
+        self.below_range = 0
+        self.above_range = 0
+        self.non_finite = 0
+
+    def add(self, prices: np.ndarray, price_range: Tuple[float, float]) -> None:
+        finite = prices[np.isfinite(prices)]
+        self.non_finite += int(prices.size - finite.size)
+        self.total.add(finite)
+        self.current.add(finite)
+        self.sum += float(finite.sum())
+        self.below_range += int((finite < price_range[0]).sum())
+        self.above_range += int((finite > price_range[1]).sum())
+
+    def rotate(self, windows: int) -> None:
+        """Move on by a number of elapsed windows."""
+        self.previous = self.current if windows == 1 else QuantileSketch(self.relative_accuracy)
+        self.current = QuantileSketch(self.relative_accuracy)
+
+    def merge(self, other: '_GroupStats') -> None:
+        self.total.merge(other.total)
+        self.current.merge(other.current)
+        self.previous.merge(other.previous)
+        self.sum += other.sum
+        self.below_range += other.below_range
+        self.above_range += other.above_range
+        self.non_finite += other.non_finite
+
+    def summary(self) -> Dict[str, Any]:
+        count = self.total.count + self.non_finite
+        out_of_range = self.below_range + self.above_range + self.non_finite
+        return {
+            'count': count,
+            'mean': self.sum / self.total.count if self.total.count else None,
+            'quantiles': _quantiles(self.total),
+            'current_window': {'count': self.current.count, 'quantiles': _quantiles(self.current)},
+            'previous_window': {'count': self.previous.count, 'quantiles': _quantiles(self.previous)},
+            'below_range': self.below_range,
+            'above_range': self.above_range,
+            'non_finite': self.non_finite,
+            'out_of_range_rate': out_of_range / count if count else 0.0
+        }
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'total': self.total.to_dict(),
+            'current': self.current.to_dict(),
+            'previous': self.previous.to_dict(),
+            'sum': self.sum,
+            'below_range': self.below_range,
+            'above_range': self.above_range,
+            'non_finite': self.non_finite
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> '_GroupStats':
+        stats = cls(data['total']['relative_accuracy'])
+        stats.total = QuantileSketch.from_dict(data['total'])
+        stats.current = QuantileSketch.from_dict(data['current'])
+        stats.previous = QuantileSketch.from_dict(data['previous'])
+        stats.sum = float(data['sum'])
+        stats.below_range = int(data['below_range'])
+        stats.above_range = int(data['above_range'])
+        stats.non_finite = int(data['non_finite'])
+        return stats
+
+
+def _quantiles(sketch: QuantileSketch) -> Optional[Dict[str, float]]:
+    if sketch.count == 0:
+        return None
+    return {f"p{q * 100:g}": round(sketch.quantile(q), 2) for q in REPORTED_QUANTILES}
+
+
+class PredictionMonitor:
+    """
+    Streaming statistics of predicted prices per region and property type.
+
+    Thread-safe; predictions are recorded from the thread pool.
+
+    Parameters:
+    -----------
+    price_range : tuple
+        (min, max) reasonable price in RM; predictions outside are counted
+    window_seconds : float, default=3600
+        Length of the current/previous comparison windows
+    max_groups : int, default=512
+        Groups tracked separately; further groups share the ('other', 'other') group
+    relative_accuracy : float, default=0.01
+        Relative accuracy of the quantile sketches
+    """
+
+    def __init__(
+        self,
+        price_range: Tuple[float, float],
+        window_seconds: float = DEFAULT_WINDOW_SECONDS,
+        max_groups: int = DEFAULT_MAX_GROUPS,
+        relative_accuracy: float = DEFAULT_RELATIVE_ACCURACY
+    ):
+        self.price_range = (float(price_range[0]), float(price_range[1]))
+        self.window_seconds = float(window_seconds)
+        self.max_groups = max_groups
+        self.relative_accuracy = relative_accuracy
+        self.groups: Dict[Tuple[str, str], _GroupStats] = {}
+        self.started_at = time.time()
+        self.window_started_at = self.started_at
+        self._lock = threading.Lock()
+
+    def _group(self, key: Tuple[str, str]) -> _GroupStats:
+        stats = self.groups.get(key)
+        if stats is None:
+            if len(self.groups) >= self.max_groups - 1 and key != OTHER_GROUP:
+                return self._group(OTHER_GROUP)
+            stats = self.groups[key] = _GroupStats(self.relative_accuracy)
+        return stats
+
+    def _rotate(self, now: float) -> None:
+        windows = int((now - self.window_started_at) // self.window_seconds)
+        if windows < 1:
+            return
+        for stats in self.groups.values():
+            stats.rotate(windows)
+        self.window_started_at += windows * self.window_seconds
+
+    def observe(self, regions: Iterable[str], property_types: Iterable[str], prices: np.ndarray) -> None:
+        """Record predicted prices with the region and property type of each row."""
+        prices = np.asarray(prices, dtype=float).ravel()
+        if prices.size == 0:
+            return
+        rows: Dict[Tuple[str, str], List[int]] = {}
+        for i, key in enumerate(zip(regions, property_types)):
+            rows.setdefault(key, []).append(i)
+
+        with self._lock:
+            self._rotate(time.time())
+            for key, indices in rows.items():
+                self._group(key).add(prices[indices], self.price_range)
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Serialize the monitor so that another worker's monitor can merge it."""
+        with self._lock:
+            self._rotate(time.time())
+            return {
+                'price_range': list(self.price_range),
+                'window_seconds': self.window_seconds,
+                'relative_accuracy': self.relative_accuracy,
+                'started_at': self.started_at,
+                'window_started_at': self.window_started_at,
+                'groups': [
+                    {'region': region, 'property_type': property_type, **stats.to_dict()}
+                    for (region, property_type), stats in self.groups.items()
+                ]
+            }
+
+    def merge(self, snapshot: Dict[str, Any]) -> 'PredictionMonitor':
+        """
+        Merge a snapshot of another monitor into this one.
+
+        Both must use the same price range, window length and sketch
+        accuracy. Windows are matched by position (current with current), so
+        monitors merged together should have been started together.
+        """
+        if (tuple(snapshot['price_range']) != self.price_range
+                or snapshot['window_seconds'] != self.window_seconds
+                or snapshot['relative_accuracy'] != self.relative_accuracy):
+            raise ValueError("Cannot merge monitors with different price range, window or accuracy")
+
+        with self._lock:
+            self.started_at = min(self.started_at, snapshot['started_at'])
+            for group in snapshot['groups']:
+                self._group((group['region'], group['property_type'])).merge(_GroupStats.from_dict(group))
+        return self
+
+    @classmethod
+    def from_snapshot(cls, snapshot: Dict[str, Any], max_groups: int = DEFAULT_MAX_GROUPS) -> 'PredictionMonitor':
+        """Rebuild a monitor from a snapshot, e.g. to merge several workers' snapshots."""
+        monitor = cls(tuple(snapshot['price_range']), snapshot['window_seconds'], max_groups,
+                      snapshot['relative_accuracy'])
+        monitor.started_at = snapshot['started_at']
+        monitor.window_started_at = snapshot['window_started_at']
+        return monitor.merge(snapshot)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Overall and per-group counts, price quantiles and out-of-range counts."""
+        with self._lock:
+            self._rotate(time.time())
+            overall = _GroupStats(self.relative_accuracy)
+            for stats in self.groups.values():
+                overall.merge(stats)
+            groups: List[Dict[str, Any]] = [
+                {'region': region, 'property_type': property_type, **stats.summary()}
+                for (region, property_type), stats in sorted(
+                    self.groups.items(), key=lambda item: -item[1].total.count
+                )
+            ]
+            return {
+                'price_range': {'min': self.price_range[0], 'max': self.price_range[1]},
+                'window_seconds': self.window_seconds,
+                'window_started_at': self.window_started_at,
+                'started_at': self.started_at,
+                'overall': overall.summary(),
+                'groups': groups
+            }
+
+    def prometheus(self, model_version: str = '') -> str:
+        """Render the statistics in the Prometheus text exposition format."""
+        stats = self.get_stats()
+        lines = [
+            '# HELP rentverse_predicted_price_rm Predicted rent price quantiles per region and property type',
+            '# TYPE rentverse_predicted_price_rm summary'
+        ]
+        counters = []
+        for group in stats['groups']:
+            labels = (f'model="{_escape(model_version)}",region="{_escape(group["region"])}",'
+                      f'property_type="{_escape(group["property_type"])}"')
+            for name, value in (group['quantiles'] or {}).items():
+                quantile = float(name[1:]) / 100
+                lines.append(f'rentverse_predicted_price_rm{{{labels},quantile="{quantile:g}"}} {value}')
+            finite = group['count'] - group['non_finite']
+            lines.append(f'rentverse_predicted_price_rm_sum{{{labels}}} {(group["mean"] or 0.0) * finite}')
+            lines.append(f'rentverse_predicted_price_rm_count{{{labels}}} {finite}')
+            for reason in ('below_range', 'above_range', 'non_finite'):
+                counters.append(
+                    f'rentverse_predictions_out_of_range_total{{{labels},reason="{reason}"}} {group[reason]}'
+                )
+
+        lines.append('# HELP rentverse_predictions_out_of_range_total Predictions outside the reasonable price range')
+        lines.append('# TYPE rentverse_predictions_out_of_range_total counter')
+        lines.extend(counters)
+        return '\n'.join(lines) + '\n'
+
+
+def _escape(value: str) -> str:
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
@@ -0,0 +1,415 @@
+"""
+Region-partitioned model pool for RentVerse AI Service.
+
+Specialized pipelines trained on one region's listings (see `rentverse train
+--region`) live next to the global model, one directory per region:
+
+    <model_dir>/regions/kuala_lumpur/enhanced_deployment_pipeline.pkl
+    <model_dir>/regions/selangor/enhanced_deployment_pipeline.pkl
+
+Requests are routed by the region the global preprocessor resolves from the
+location (`_parse_location`, corrected by the location engine). A region
+model is loaded on its first request and kept while the resident models fit
+the memory budget, the least recently used being evicted first. Regions
+without a model, with a model that failed to load or that alone exceeds the
+budget are served by the global pipeline.
+"""
+
+import asyncio
+import logging
+import os
+import re
+import threading
+import time
+from collections import OrderedDict, deque
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+from ..config import get_settings
+from .compact import release_memory
+from .ml_models import (
+    DEFAULT_MODEL_FILENAME,
+    FALLBACK_MODEL_FILENAME,
+    LEGACY_ENHANCED_FILENAME,
+    LEGACY_IMPROVED_FILENAME,
+    PropertyPricePredictionModel
+)
+
+logger = logging.getLogger(__name__)
+
+REGIONS_DIRNAME = "regions"
+MODEL_FILENAMES = (DEFAULT_MODEL_FILENAME, FALLBACK_MODEL_FILENAME, LEGACY_ENHANCED_FILENAME, LEGACY_IMPROVED_FILENAME)
+MAX_EVENTS = 100
+
+
+def region_dirname(region: str) -> str:
+    """Directory name of a region's model: lowercase words joined by underscores."""
+    return re.sub(r"[^\w]+", "_", str(region).strip().lower()).strip("_")
+
+
+class _Resident:
+    """A loaded region model and its bookkeeping."""
+
+    def __init__(self, model: PropertyPricePredictionModel, nbytes: int, load_ms: float):
+        self.model = model
+        self.nbytes = nbytes
+        self.load_ms = load_ms
+        self.loaded_at = time.time()
+        self.last_used = self.loaded_at
+        self.requests = 0
+
+
+class ModelPool:
+    """
+    Region models loaded on demand in front of a global model.
+
+    Thread-safe: loads run outside the pool lock, one at a time per region,
+    so requests for resident regions are never held up by a load.
+
+    Parameters:
+    -----------
+    global_model : PropertyPricePredictionModel
+        Model serving every region without a model of its own; its location
+        engine decides the region of a request
+    regions_dir : str
+        Directory holding one model directory per region
+    memory_budget : int
+        Bytes the resident region models may use together
+    retry_seconds : float
+        How long a region whose model failed to load is served by the global model
+    loader : callable, optional
+        Builds a model from a directory, PropertyPricePredictionModel by default
+    """
+
+    def __init__(
+        self,
+        global_model: PropertyPricePredictionModel,
+        regions_dir: str,
+        memory_budget: int = 512 * 1024 ** 2,
+        retry_seconds: float = 300.0,
+        loader: Optional[Callable[[str], PropertyPricePredictionModel]] = None
+    ):
+        self.global_model = global_model
+        self.regions_dir = str(regions_dir)
+        self.memory_budget = int(memory_budget)
+        self.retry_seconds = float(retry_seconds)
+        self.loader = loader or PropertyPricePredictionModel
+
+        self._lock = threading.Lock()
+        self._resident: "OrderedDict[str, _Resident]" = OrderedDict()
+        self._load_locks: Dict[str, threading.Lock] = {}
+        self._failed: Dict[str, float] = {}
+        self.events: deque = deque(maxlen=MAX_EVENTS)
+
+        self.hits = 0
+        self.misses = 0
+        self.loads = 0
+        self.load_failures = 0
+        self.evictions = 0
+        self.fallbacks = 0
+
+        self.available = self.discover()
+        if self.available:
+            logger.info(f"Model pool: {len(self.available)} region model(s) in {self.regions_dir}, "
+                        f"budget {self.memory_budget / 1024 ** 2:,.0f} MB")
+
+    def discover(self) -> Dict[str, str]:
+        """Map region directory names to the directories holding a model."""
+        if not os.path.isdir(self.regions_dir):
+            return {}
+        available = {}
+        for name in sorted(os.listdir(self.regions_dir)):
+            path = os.path.join(self.regions_dir, name)
+            if os.path.isdir(path) and any(os.path.exists(os.path.join(path, f)) for f in MODEL_FILENAMES):
+                available[name] = path
+        return available
+
+    def _event(self, kind: str, region: str, **details: Any) -> None:
+        self.events.append({"event": kind, "region": region, "time": datetime.now().isoformat(), **details})
+
+    @property
+    def routing(self) -> bool:
+        """Whether any request can be served by a region model."""
+        return bool(self.available) and self.global_model.location_engine is not None
+
+    def region_of(self, location: Any) -> str:
+        """Region directory name a location is routed by."""
+        return region_dirname(self.global_model.location_engine.region(location))
+
+    def resident_bytes(self) -> int:
+        """Bytes used by the resident region models."""
+        with self._lock:
+            return sum(entry.nbytes for entry in self._resident.values())
+
+    def _resident_model(self, region: str) -> Optional[PropertyPricePredictionModel]:
+        """The region's model if it is loaded, counting the hit. Caller holds the lock."""
+        entry = self._resident.get(region)
+        if entry is None:
+            return None
+        self._resident.move_to_end(region)
+        entry.last_used = time.time()
+        entry.requests += 1
+        self.hits += 1
+        return entry.model
+
+    def _needs_load(self, region: str) -> bool:
+        """Whether the region has a model that is neither loaded nor recently failed. Caller holds the lock."""
+        if region not in self.available or region in self._resident:
+            return False
+        failed_at = self._failed.get(region)
+        return failed_at is None or time.time() - failed_at >= self.retry_seconds
+
+    def get(self, region: str) -> PropertyPricePredictionModel:
+        """The model serving a region, loading the region's model if needed; may block on a load."""
+        with self._lock:
+            model = self._resident_model(region)
+            if model is not None:
+                return model
+            if not self._needs_load(region):
+                self.fallbacks += 1
+                return self.global_model
+            load_lock = self._load_locks.setdefault(region, threading.Lock())
+
+        with load_lock:
+            with self._lock:
+                # Loaded (or failed) by another request while this one waited
+                model = self._resident_model(region)
+                if model is not None:
+                    return model
+                if not self._needs_load(region):
+                    self.fallbacks += 1
+                    return self.global_model
+                self.misses += 1
+            return self._load(region)
+
+    def _load(self, region: str) -> PropertyPricePredictionModel:
+        """Load a region's model and make room for it; the global model if that fails."""
+        started = time.perf_counter()
+        try:
+            model = self.loader(self.available[region])
+            if not model.is_loaded:
+                raise RuntimeError("model did not load")
+            model.region = region
+            nbytes = model.memory_report()["total_bytes"]
+        except Exception as e:
+            logger.error(f"Could not load the {region} model, serving it with the global model: {e}")
+            with self._lock:
+                self.load_failures += 1
+                self.fallbacks += 1
+                self._failed[region] = time.time()
+                self._event("load_failed", region, error=str(e))
+            return self.global_model
+
+        load_ms = (time.perf_counter() - started) * 1000
+        if nbytes > self.memory_budget:
+            logger.warning(f"The {region} model needs {nbytes / 1024 ** 2:,.1f} MB, more than the pool budget "
+                           f"of {self.memory_budget / 1024 ** 2:,.1f} MB; serving it with the global model")
+            with self._lock:
+                self.load_failures += 1
+                self.fallbacks += 1
+                self._failed[region] = time.time()
+                self._event("over_budget", region, bytes=nbytes)
+            release_memory()
+            return self.global_model
+
+        evicted = []
+        with self._lock:
+            self.loads += 1
+            entry = _Resident(model, nbytes, load_ms)
+            entry.requests = 1
+            self._resident[region] = entry
+            self._failed.pop(region, None)
+            self._event("load", region, bytes=nbytes, load_ms=round(load_ms, 1))
+
+            used = sum(resident.nbytes for resident in self._resident.values())
+            while used > self.memory_budget:
+                victim, victim_entry = next(iter(self._resident.items()))
+                if victim == region:
+                    break
+                del self._resident[victim]
+                used -= victim_entry.nbytes
+                self.evictions += 1
+                evicted.append(victim)
+                self._event("evict", victim, bytes=victim_entry.nbytes, requests=victim_entry.requests)
+
+        logger.info(f"Loaded the {region} model in {load_ms:,.0f} ms ({nbytes / 1024 ** 2:,.1f} MB)"
+                    + (f", evicted {', '.join(evicted)}" if evicted else ""))
+        if evicted:
+            release_memory()
+        return model
+
+    def select(self, location: Any) -> PropertyPricePredictionModel:
+        """The model serving a location; may block on a load."""
+        if not self.routing:
+            return self.global_model
+        return self.get(self.region_of(location))
+
+    async def aselect(self, location: Any) -> PropertyPricePredictionModel:
+        """select() for the event loop: loads run in the default executor, resident models are returned directly."""
+        if not self.routing:
+            return self.global_model
+        region = self.region_of(location)
+        with self._lock:
+            model = self._resident_model(region)
+            if model is not None:
+                return model
+            if not self._needs_load(region):
+                self.fallbacks += 1
+                return self.global_model
+        return await asyncio.get_running_loop().run_in_executor(None, self.get, region)
+
+    def partition(self, locations: Sequence[Any]) -> List[Tuple[PropertyPricePredictionModel, np.ndarray]]:
+        """Group row positions by the model serving them; may block on loads."""
+        if not self.routing:
+            return [(self.global_model, np.arange(len(locations)))]
+
+        regions = self.global_model.location_engine.regions(pd.Series(np.asarray(locations, dtype=object)))
+        codes, uniques = pd.factorize(regions.map(region_dirname))
+
+        groups: Dict[int, Tuple[PropertyPricePredictionModel, List[np.ndarray]]] = {}
+        for code, region in enumerate(uniques):
+            model = self.get(region)
+            positions = np.flatnonzero(codes == code)
+            if id(model) in groups:
+                groups[id(model)][1].append(positions)
+            else:
+                groups[id(model)] = (model, [positions])
+        return [(model, np.sort(np.concatenate(parts))) for model, parts in groups.values()]
+
+    def map_batch(
+        self,
+        items: List[Dict[str, Any]],
+        fn: Callable[[PropertyPricePredictionModel, List[Dict[str, Any]]], List[Dict[str, Any]]]
+    ) -> Tuple[List[Dict[str, Any]], List[Tuple[PropertyPricePredictionModel, np.ndarray]]]:
+        """
+        Run a batch method per model on its share of the items.
+
+        fn(model, items) must return one result per item; results are put
+        back in input order with batch_index rewritten to the input position.
+
+        Returns:
+            (results in input order, the (model, positions) groups served)
+        """
+        groups = self.partition([item.get("location") for item in items])
+        if len(groups) == 1:
+            return fn(groups[0][0], items), groups
+
+        results: List[Optional[Dict[str, Any]]] = [None] * len(items)
+        for model, positions in groups:
+            for position, result in zip(positions, fn(model, [items[i] for i in positions])):
+                if isinstance(result, dict) and "batch_index" in result:
+                    result["batch_index"] = int(position)
+                results[position] = result
+        return results, groups
+
+    def predict_columns(
+        self,
+        columns: Dict[str, Any],
+        quantiles: Optional[Sequence[float]] = None
+    ) -> Tuple[Dict[str, Any], List[Tuple[PropertyPricePredictionModel, np.ndarray]]]:
+        """
+        predict_columns routed per region, with the arrays put back in input order.
+
+        The scalar fields (interval method, model version) come from the
+        largest group; the returned groups tell which model served which rows.
+        """
+        groups = self.partition(columns["location"])
+        if len(groups) == 1:
+            return groups[0][0].predict_columns(columns, quantiles=quantiles), groups
+
+        count = len(columns["location"])
+        merged: Dict[str, Any] = {}
+        largest = max(len(positions) for _, positions in groups)
+        for model, positions in groups:
+            part = model.predict_columns({name: np.asarray(values)[positions] for name, values in columns.items()},
+                                         quantiles=quantiles)
+            for name, value in part.items():
+                if isinstance(value, np.ndarray):
+                    merged.setdefault(name, np.empty(count, dtype=value.dtype))[positions] = value
+                elif isinstance(value, dict):
+                    target = merged.setdefault(name, {})
+                    for key, values in value.items():
+                        target.setdefault(key, np.empty(count, dtype=values.dtype))[positions] = values
+                elif len(positions) == largest and name not in merged:
+                    merged[name] = value
+        merged["count"] = count
+        return merged, groups
+
+    def clear(self) -> None:
+        """Unload every region model."""
+        with self._lock:
+            for region, entry in self._resident.items():
+                self._event("evict", region, bytes=entry.nbytes, requests=entry.requests)
+            self.evictions += len(self._resident)
+            self._resident.clear()
+            self._failed.clear()
+        release_memory()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get hit rate, load and eviction counters, resident models and recent events."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            now = time.time()
+            return {
+                "regions_dir": self.regions_dir,
+                "available": sorted(self.available),
+                "memory_budget_bytes": self.memory_budget,
+                "resident_bytes": sum(entry.nbytes for entry in self._resident.values()),
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "loads": self.loads,
+                "load_failures": self.load_failures,
+                "evictions": self.evictions,
+                "fallbacks": self.fallbacks,
+                "resident": {
+                    region: {
+                        "model_version": entry.model.model_version,
+                        "bytes": entry.nbytes,
+                        "load_ms": round(entry.load_ms, 1),
+                        "requests": entry.requests,
+                        "idle_seconds": round(now - entry.last_used, 1)
+                    }
+                    for region, entry in reversed(self._resident.items())
+                },
+                "failed": {
+                    region: datetime.fromtimestamp(failed_at).isoformat()
+                    for region, failed_at in self._failed.items()
+                },
+                "events": list(self.events)
+            }
+
+
+_pool: Optional[ModelPool] = None
+_pool_lock = threading.Lock()
+
+
+def get_model_pool(global_model: PropertyPricePredictionModel) -> ModelPool:
+    """
+    Get the pool in front of the global model, creating it if necessary.
+
+    A reloaded global model gets a new pool, so region models are
+    rediscovered and loaded afresh after a reload.
+    """
+    global _pool
+    with _pool_lock:
+        if _pool is None or _pool.global_model is not global_model:
+            settings = get_settings()
+            regions_dir = settings.region_models_dir or os.path.join(str(global_model.model_dir), REGIONS_DIRNAME)
+            _pool = ModelPool(
+                global_model,
+                regions_dir,
+                memory_budget=int(settings.model_pool_memory_mb * 1024 ** 2),
+                retry_seconds=settings.model_pool_retry_seconds
+            )
+        return _pool
+
+
+def model_pool_stats() -> Optional[Dict[str, Any]]:
+    """Statistics of the current pool, None before the first request created one."""
+    with _pool_lock:
+        pool = _pool
+    return pool.get_stats() if pool is not None else None
@@ -7,6 +7,9 @@ from pydantic import BaseModel, Field, field_validator
 from datetime import datetime
 from enum import Enum
 
+import numpy as np
+import pandas as pd
+
 
 class PropertyType(str, Enum):
     """Supported property types."""
@@ -94,6 +97,102 @@ class BatchPredictionRequest(BaseModel):
         }
 
 
+class ColumnarPredictionRequest(BaseModel):
+    """
+    Schema for columnar batch prediction request: one array per field.
+
+    Values are checked as whole columns by check_columns, with the same
+    rules as PropertyPredictionRequest, without building an object per
+    property. check_columns also takes columns decoded from binary bodies.
+    """
+
+    property_type: List[str] = Field(..., min_length=1, max_length=100000, description="Type of each property")
+    bedrooms: List[int] = Field(..., min_length=1, max_length=100000, description="Bedrooms of each property")
+    bathrooms: List[int] = Field(..., min_length=1, max_length=100000, description="Bathrooms of each property")
+    area: List[float] = Field(..., min_length=1, max_length=100000, description="Area of each property in square feet")
+    furnished: List[str] = Field(..., min_length=1, max_length=100000, description="Furnished status of each property")
+    location: List[str] = Field(..., min_length=1, max_length=100000, description="Location of each property")
+
+    def columns(self) -> Dict[str, List[Any]]:
+        """Columns as a dictionary of lists."""
+        return {field: getattr(self, field) for field in type(self).model_fields}
+
+    @classmethod
+    def check_columns(cls, columns: Dict[str, Any]) -> Dict[str, np.ndarray]:
+        """
+        Check column types, lengths, ranges, categories and locations.
+
+        Parameters:
+            columns: Lists or arrays per field, e.g. from columns() or a decoded binary body
+
+        Returns:
+            The columns as NumPy arrays, locations stripped
+
+        Raises:
+            ValueError naming the field and first offending index; unlike
+            field errors, the message does not echo the (possibly very
+            large) input
+        """
+        missing = [field for field in cls.model_fields if field not in columns]
+        if missing:
+            raise ValueError(f"Missing columns: {missing}")
+        arrays = {field: np.asarray(columns[field]) for field in cls.model_fields}
+
+        lengths = {field: len(values) for field, values in arrays.items()}
+        if len(set(lengths.values())) != 1:
+            raise ValueError(f"All columns must have the same length, got {lengths}")
+        if not 1 <= lengths['location'] <= 100000:
+            raise ValueError(f"Columns must hold 1 to 100000 values, got {lengths['location']}")
+
+        for field in ('bedrooms', 'bathrooms', 'area'):
+            values = arrays[field]
+            if values.dtype.kind not in 'iuf':
+                raise ValueError(f"{field} must be numeric")
+            if values.dtype.kind == 'f':
+                invalid = ~np.isfinite(values)
+                if field != 'area':
+                    invalid |= np.mod(values, 1) != 0
+                if invalid.any():
+                    raise ValueError(f"Invalid {field} value at index {int(np.argmax(invalid))}")
+            arrays[field] = values.astype(np.float64 if field == 'area' else np.int64)
+
+        ranges = {'bedrooms': (0, 10), 'bathrooms': (1, 10), 'area': (0, 10000)}
+        for field, (low, high) in ranges.items():
+            values = arrays[field]
+            invalid = ((values <= low) if field == 'area' else (values < low)) | (values > high)
+            if invalid.any():
+                raise ValueError(f"{field} out of range at index {int(np.argmax(invalid))}")
+
+        for field in ('property_type', 'furnished', 'location'):
+            arrays[field] = arrays[field].astype(object)
+            if pd.api.types.infer_dtype(arrays[field], skipna=False) != 'string':
+                raise ValueError(f"{field} must hold strings")
+
+        for field, enum in (('property_type', PropertyType), ('furnished', FurnishedType)):
+            unknown = set(arrays[field]) - {member.value for member in enum}
+            if unknown:
+                raise ValueError(f"Invalid {field} values: {sorted(unknown)[:5]}")
+
+        location = pd.Series(arrays['location'], dtype=object).str.strip()
+        invalid = ((location.str.len() == 0) | (location.str.len() > 200)).to_numpy()
+        if invalid.any():
+            raise ValueError(f"Location must be 1 to 200 characters at index {int(np.argmax(invalid))}")
+        arrays['location'] = location.to_numpy(dtype=object)
+        return arrays
+
+    class Config:
+        json_schema_extra = {
+            "example": {
+                "property_type": ["Condominium", "Apartment"],
+                "bedrooms": [3, 2],
+                "bathrooms": [2, 1],
+                "area": [1200, 800],
+                "furnished": ["Yes", "No"],
+                "location": ["KLCC, Kuala Lumpur", "Petaling Jaya, Selangor"]
+            }
+        }
+
+
 class PredictionResponse(BaseModel):
     """Schema for prediction response."""
 
@@ -102,6 +201,8 @@ class PredictionResponse(BaseModel):
     price_range: dict = Field(..., description="Price range (min, max)")
     model_version: str = Field(..., description="Version of the model used")
     features_used: List[str] = Field(..., description="List of features used in prediction")
+    quantiles: Optional[Dict[str, float]] = Field(None, description="Predicted price per requested quantile")
+    interval_method: Optional[str] = Field(None, description="How intervals were computed: ensemble or residual")
     currency: str = Field(default="RM", description="Currency")
     status: str = Field(default="success", description="Prediction status")
 
@@ -113,12 +214,106 @@ class PredictionResponse(BaseModel):
                 "price_range": {"min": 400000.0, "max": 500000.0},
                 "model_version": "1.0.0",
                 "features_used": ["property_type", "bedrooms", "bathrooms", "square_feet"],
+                "quantiles": {"0.1": 400000.0, "0.5": 450000.0, "0.9": 500000.0},
+                "interval_method": "ensemble",
                 "currency": "RM",
                 "status": "success"
             }
         }
 
 
+class ComparablesResponse(BaseModel):
+    """Schema for comparable listings response."""
+
+    comparables: List[Dict[str, Any]] = Field(..., description="Nearest training listings, nearest first")
+    price_distribution: Dict[str, Any] = Field(
+        ..., description="Price quantiles of the nearest listings and the categories they share with the property"
+    )
+    currency: str = Field(default="RM", description="Currency")
+    status: str = Field(default="success", description="Search status")
+    model_version: str = Field(..., description="Version of the model whose listings were searched")
+    query_ms: float = Field(..., description="Time spent finding the comparables in milliseconds")
+
+    class Config:
+        json_schema_extra = {
+            "example": {
+                "comparables": [
+                    {
+                        "price": 4300.0,
+                        "distance": 0.021,
+                        "property_type": "Condominium",
+                        "bedrooms": 3.0,
+                        "bathrooms": 2.0,
+                        "area": 1180.0,
+                        "furnished": "Yes",
+                        "region": "Kuala Lumpur"
+                    }
+                ],
+                "price_distribution": {
+                    "count": 20, "p10": 3300.0, "p25": 3800.0, "median": 4300.0, "p75": 4700.0, "p90": 5200.0,
+                    "matched_on": ["region", "property_type", "furnished"]
+                },
+                "currency": "RM",
+                "status": "success",
+                "model_version": "Gradient Boosting",
+                "query_ms": 0.4
+            }
+        }
+
+
+class FeatureContribution(BaseModel):
+    """Schema for one feature's share of a prediction."""
+
+    feature: str = Field(..., description="Model feature")
+    value: Any = Field(..., description="Feature value the model saw, categories by name")
+    effect: float = Field(..., description="Change in predicted price (RM) due to this feature")
+    contribution: float = Field(..., description="Contribution on the model's output scale")
+
+
+class ExplanationResponse(BaseModel):
+    """Schema for per-prediction explanation response."""
+
+    predicted_price: float = Field(..., description="Predicted price in RM")
+    base_price: float = Field(..., description="Price predicted before any feature is taken into account")
+    contributions: List[FeatureContribution] = Field(..., description="Per-feature contributions, largest effect first")
+    output_scale: str = Field(..., description="Scale of the contributions: price or log_price")
+    method: str = Field(default="saabas", description="Attribution method")
+    model_version: str = Field(..., description="Version of the model used")
+    currency: str = Field(default="RM", description="Currency")
+    status: str = Field(default="success", description="Explanation status")
+
+    class Config:
+        json_schema_extra = {
+            "example": {
+                "predicted_price": 2740.1,
+                "base_price": 1908.4,
+                "contributions": [
+                    {"feature": "area", "value": 1200.0, "effect": 412.7, "contribution": 412.7},
+                    {"feature": "region", "value": "kuala lumpur", "effect": 301.2, "contribution": 301.2},
+                    {"feature": "furnished", "value": "Yes", "effect": 88.5, "contribution": 88.5},
+                    {"feature": "bedrooms", "value": 3.0, "effect": 41.0, "contribution": 41.0},
+                    {"feature": "property_type", "value": "Condominium", "effect": -15.3, "contribution": -15.3},
+                    {"feature": "bathrooms", "value": 2.0, "effect": 3.6, "contribution": 3.6}
+                ],
+                "output_scale": "price",
+                "method": "saabas",
+                "model_version": "Gradient Boosting",
+                "currency": "RM",
+                "status": "success"
+            }
+        }
+
+
+class BatchExplanationResponse(BaseModel):
+    """Schema for batch explanation response."""
+
+    explanations: List[Dict[str, Any]] = Field(..., description="List of explanations")
+    total_count: int = Field(..., description="Total number of properties")
+    success_count: int = Field(..., description="Number of successful explanations")
+    error_count: int = Field(..., description="Number of failed explanations")
+    timestamp: datetime = Field(..., description="Batch processing timestamp")
+
+
 class BatchPredictionResponse(BaseModel):
     """Schema for batch prediction response."""
 
@@ -149,6 +344,39 @@ class BatchPredictionResponse(BaseModel):
         }
 
 
+class ColumnarPredictionResponse(BaseModel):
+    """Schema for columnar batch prediction response: one array per field, in request order."""
+
+    predicted_price: List[float] = Field(..., description="Predicted price in RM of each property")
+    confidence_score: List[float] = Field(..., description="Confidence score of each prediction")
+    price_min: List[float] = Field(..., description="Lower end of each price range")
+    price_max: List[float] = Field(..., description="Upper end of each price range")
+    quantiles: Dict[str, List[float]] = Field(..., description="Predicted prices per quantile")
+    interval_method: str = Field(..., description="How intervals were computed: ensemble or residual")
+    model_version: str = Field(..., description="Version of the model used")
+    count: int = Field(..., description="Number of predictions")
+    currency: str = Field(default="RM", description="Currency")
+    status: str = Field(default="success", description="Prediction status")
+    timestamp: datetime = Field(..., description="Batch processing timestamp")
+
+    class Config:
+        json_schema_extra = {
+            "example": {
+                "predicted_price": [4300.0, 1900.0],
+                "confidence_score": [0.87, 0.81],
+                "price_min": [3750.0, 1540.0],
+                "price_max": [4850.0, 2260.0],
+                "quantiles": {"0.1": [3750.0, 1540.0], "0.9": [4850.0, 2260.0]},
+                "interval_method": "residual",
+                "model_version": "Gradient Boosting",
+                "count": 2,
+                "currency": "RM",
+                "status": "success",
+                "timestamp": "2025-09-13T10:30:00"
+            }
+        }
+
+
 class ModelInfoResponse(BaseModel):
     """Schema for model information response."""
 
@@ -181,6 +409,7 @@ class HealthResponse(BaseModel):
     message: str = Field(..., description="Health message")
     timestamp: datetime = Field(..., description="Health check timestamp")
     test_prediction: Optional[float] = Field(None, description="Test prediction result")
+    drift_alerts: Optional[List[str]] = Field(None, description="Active input drift alerts")
 
     class Config:
         json_schema_extra = {
@@ -257,6 +486,9 @@ class ListingApprovalResponse(BaseModel):
     price_deviation: float = Field(..., description="Percentage deviation from predicted price")
     approval_reasons: List[str] = Field(..., description="Reasons for approval/rejection")
     recommendations: Optional[List[str]] = Field(None, description="Recommendations for improvement")
+    comparable_prices: Optional[Dict[str, Any]] = Field(
+        None, description="Price distribution of the nearest training listings and the asking price's percentile"
+    )
     status: str = Field(default="success", description="Classification status")
 
     class Config:
@@ -269,11 +501,83 @@ class ListingApprovalResponse(BaseModel):
                 "price_deviation": 7.1,
                 "approval_reasons": ["Price within acceptable range", "Good location", "Adequate facilities"],
                 "recommendations": ["Consider slightly reducing price for faster rental"],
+                "comparable_prices": {
+                    "count": 20, "p10": 3300.0, "p25": 3800.0, "median": 4300.0,
+                    "p75": 4700.0, "p90": 5200.0, "matched_on": ["region", "property_type", "furnished"],
+                    "asking_percentile": 65.0
+                },
                 "status": "success"
             }
         }
 
 
+class BatchListingApprovalRequest(BaseModel):
+    """Schema for batch listing approval classification request."""
+
+    listings: List[ListingApprovalRequest] = Field(..., min_length=1, max_length=1000,
+                                                   description="List of listings to classify")
+
+    class Config:
+        json_schema_extra = {
+            "example": {
+                "listings": [
+                    {
+                        "property_type": "Condominium",
+                        "bedrooms": 3,
+                        "bathrooms": 2,
+                        "area": 1200,
+                        "furnished": "Yes",
+                        "location": "KLCC, Kuala Lumpur",
+                        "asking_price": 4500.0,
+                        "facilities": ["Swimming Pool", "Gym", "Security"]
+                    },
+                    {
+                        "property_type": "Apartment",
+                        "bedrooms": 2,
+                        "bathrooms": 1,
+                        "area": 800,
+                        "furnished": "No",
+                        "location": "Petaling Jaya, Selangor",
+                        "asking_price": 1800.0
+                    }
+                ]
+            }
+        }
+
+
+class BatchListingApprovalResponse(BaseModel):
+    """Schema for batch listing approval classification response."""
+
+    results: List[Dict[str, Any]] = Field(..., description="List of approval classification results")
+    total_count: int = Field(..., description="Total number of listings")
+    success_count: int = Field(..., description="Number of successful classifications")
+    error_count: int = Field(..., description="Number of failed classifications")
+    timestamp: datetime = Field(..., description="Batch processing timestamp")
+
+    class Config:
+        json_schema_extra = {
+            "example": {
+                "results": [
+                    {
+                        "batch_index": 0,
+                        "approval_status": "approved",
+                        "confidence_score": 0.9,
+                        "predicted_price": 4200.0,
+                        "asking_price": 4500.0,
+                        "price_deviation": 7.1,
+                        "approval_reasons": ["Price within acceptable range", "Good location"],
+                        "recommendations": None,
+                        "status": "success"
+                    }
+                ],
+                "total_count": 1,
+                "success_count": 1,
+                "error_count": 0,
+                "timestamp": "2025-09-13T10:30:00"
+            }
+        }
+
+
 class PricePredictionRequest(BaseModel):
     """Schema for simplified price prediction request."""
 
@@ -0,0 +1,66 @@
+"""
+Training pipeline for RentVerse AI Service.
+"""
+
+from .trainer import (
+    TrainingConfig,
+    run_training,
+    standard_candidates,
+    enhanced_candidates,
+    evaluate_candidates,
+    comparison_frame,
+    build_deployment_artifact,
+    run_comparables_index,
+    region_output_dir
+)
+
+from .tuning import (
+    TuningConfig,
+    run_tuning,
+    SEARCH_SPACES
+)
+
+from .latency import measure_latency
+
+from .evaluation import (
+    serving_report,
+    pareto_front,
+    select_model
+)
+
+from .compression import (
+    compress_model,
+    compress_artifact,
+    run_compression
+)
+
+from .cache import (
+    StageCache,
+    hash_file,
+    hash_frame
+)
+
+__all__ = [
+    'TrainingConfig',
+    'run_training',
+    'standard_candidates',
+    'enhanced_candidates',
+    'evaluate_candidates',
+    'comparison_frame',
+    'build_deployment_artifact',
+    'run_comparables_index',
+    'region_output_dir',
+    'TuningConfig',
+    'run_tuning',
+    'SEARCH_SPACES',
+    'measure_latency',
+    'serving_report',
+    'pareto_front',
+    'select_model',
+    'compress_model',
+    'compress_artifact',
+    'run_compression',
+    'StageCache',
+    'hash_file',
+    'hash_frame'
+]
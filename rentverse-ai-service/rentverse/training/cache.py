@@ -0,0 +1,236 @@
+"""
+Content-Addressed Stage Cache for Rentverse Training
+====================================================
+
+This module contains StageCache, an on-disk cache for the outputs of the
+training pipeline stages (preprocessing, train/test split, scaling). Each
+entry is addressed by a hash of its inputs and parameters, stores arrays as
+``.npy`` files that are memory-mapped on load, and the cache is kept under a
+size cap by evicting the least recently used entries.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import shutil
+import time
+import uuid
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import joblib
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+# Bump when the layout of cached entries or the stage semantics change
+CACHE_VERSION = 1
+DEFAULT_CACHE_DIR = Path.home() / ".cache" / "rentverse" / "training"
+DEFAULT_CACHE_MAX_BYTES = 2 * 1024 ** 3
+META_FILENAME = "meta.json"
+
+
+def hash_file(path: str, block_size: int = 1024 ** 2) -> str:
+    """SHA-256 of a file's contents."""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(block_size), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def hash_frame(df: pd.DataFrame) -> str:
+    """SHA-256 of a dataframe's values, index and column names."""
+    digest = hashlib.sha256()
+    digest.update(json.dumps([str(col) for col in df.columns]).encode())
+    digest.update(pd.util.hash_pandas_object(df, index=True).to_numpy().tobytes())
+    return digest.hexdigest()
+
+
+def frame_to_arrays(df: pd.DataFrame, prefix: str) -> Tuple[Dict[str, np.ndarray], Dict[str, Any]]:
+    """Split a dataframe into one array per column plus the metadata to rebuild it."""
+    arrays = {f"{prefix}.index": df.index.to_numpy()}
+    for i, col in enumerate(df.columns):
+        arrays[f"{prefix}.{i}"] = df[col].to_numpy()
+    return arrays, {'columns': [str(col) for col in df.columns]}
+
+
+def arrays_to_frame(arrays: Dict[str, np.ndarray], meta: Dict[str, Any], prefix: str) -> pd.DataFrame:
+    """Rebuild a dataframe stored with frame_to_arrays."""
+    columns = meta['columns']
+    return pd.DataFrame(
+        {col: arrays[f"{prefix}.{i}"] for i, col in enumerate(columns)},
+        index=arrays[f"{prefix}.index"],
+        columns=columns
+    )
+
+
+class StageCache:
+    """
+    On-disk, content-addressed cache for training stage outputs.
+
+    Every entry is a directory named by its key, holding ``.npy`` arrays
+    (memory-mapped read-only on load), joblib-pickled objects such as fitted
+    preprocessors and scalers, and a ``meta.json`` file. Reads touch the
+    metadata file, whose modification time is the LRU clock used to evict
+    entries once the cache grows beyond ``max_bytes``.
+
+    Parameters:
+    -----------
+    cache_dir : str
+        Directory holding the cache entries
+    max_bytes : int, default=2 GiB
+        Size cap of all entries together
+    """
+
+    def __init__(self, cache_dir: str = str(DEFAULT_CACHE_DIR), max_bytes: int = DEFAULT_CACHE_MAX_BYTES):
+        self.cache_dir = Path(cache_dir)
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+
+    @staticmethod
+    def key(stage: str, inputs: Iterable[str], params: Optional[Dict[str, Any]] = None) -> str:
+        """
+        Key of a stage output: a hash of the stage name, the keys or content
+        hashes of its inputs and its parameters.
+        """
+        payload = json.dumps({
+            'version': CACHE_VERSION,
+            'stage': stage,
+            'inputs': list(inputs),
+            'params': params or {}
+        }, sort_keys=True, default=str)
+        return f"{stage}-{hashlib.sha256(payload.encode()).hexdigest()[:32]}"
+
+    def _entry_dir(self, key: str) -> Path:
+        return self.cache_dir / key
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """
+        Load an entry, or None on a miss.
+
+        Returns a dictionary with the stored arrays and objects by name, plus
+        the stored metadata under ``'meta'``.
+        """
+        entry_dir = self._entry_dir(key)
+        meta_path = entry_dir / META_FILENAME
+        try:
+            with open(meta_path) as f:
+                meta = json.load(f)
+            values: Dict[str, Any] = {'meta': meta['meta']}
+            for name in meta['arrays']:
+                values[name] = np.load(entry_dir / f"{name}.npy", mmap_mode='r', allow_pickle=False)
+            for name in meta['objects']:
+                values[name] = joblib.load(entry_dir / f"{name}.joblib")
+            os.utime(meta_path)
+        except FileNotFoundError:
+            self.misses += 1
+            return None
+        except Exception as e:
+            logger.warning(f"Discarding unreadable cache entry {key}: {str(e)}")
+            shutil.rmtree(entry_dir, ignore_errors=True)
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        return values
+
+    def put(
+        self,
+        key: str,
+        arrays: Optional[Dict[str, np.ndarray]] = None,
+        objects: Optional[Dict[str, Any]] = None,
+        meta: Optional[Dict[str, Any]] = None
+    ) -> bool:
+        """
+        Store an entry atomically and evict old entries beyond the size cap.
+
+        Returns False (and stores nothing) if an array cannot be saved without
+        pickling, e.g. an object-dtype column.
+        """
+        arrays = arrays or {}
+        objects = objects or {}
+        entry_dir = self._entry_dir(key)
+        tmp_dir = self.cache_dir / f".tmp-{key}-{uuid.uuid4().hex}"
+        tmp_dir.mkdir(parents=True)
+
+        try:
+            for name, array in arrays.items():
+                np.save(tmp_dir / f"{name}.npy", np.ascontiguousarray(array), allow_pickle=False)
+            for name, obj in objects.items():
+                joblib.dump(obj, tmp_dir / f"{name}.joblib")
+            with open(tmp_dir / META_FILENAME, 'w') as f:
+                json.dump({
+                    'key': key,
+                    'created': time.time(),
+                    'arrays': list(arrays),
+                    'objects': list(objects),
+                    'meta': meta or {}
+                }, f, default=str)
+
+            shutil.rmtree(entry_dir, ignore_errors=True)
+            os.replace(tmp_dir, entry_dir)
+        except ValueError as e:
+            logger.warning(f"Not caching {key}: {str(e)}")
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+            return False
+        except Exception:
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+            raise
+
+        self.evict()
+        return True
+
+    def entries(self) -> List[Dict[str, Any]]:
+        """List entries with their size and last access time, least recently used first."""
+        entries = []
+        for entry_dir in self.cache_dir.iterdir():
+            meta_path = entry_dir / META_FILENAME
+            if entry_dir.name.startswith('.') or not meta_path.exists():
+                continue
+            try:
+                size = sum(path.stat().st_size for path in entry_dir.iterdir())
+                last_used = meta_path.stat().st_mtime
+            except FileNotFoundError:
+                # Removed concurrently by another process
+                continue
+            entries.append({'key': entry_dir.name, 'bytes': size, 'last_used': last_used})
+        return sorted(entries, key=lambda entry: entry['last_used'])
+
+    def evict(self) -> List[str]:
+        """Remove least recently used entries until the cache fits in max_bytes."""
+        entries = self.entries()
+        total = sum(entry['bytes'] for entry in entries)
+        evicted = []
+        # Keep the most recent entry even if it alone exceeds the cap
+        for entry in entries[:-1]:
+            if total <= self.max_bytes:
+                break
+            shutil.rmtree(self._entry_dir(entry['key']), ignore_errors=True)
+            total -= entry['bytes']
+            evicted.append(entry['key'])
+
+        if evicted:
+            logger.info(f"Evicted {len(evicted)} training cache entries")
+        return evicted
+
+    def clear(self) -> None:
+        """Remove every entry."""
+        for entry in self.entries():
+            shutil.rmtree(self._entry_dir(entry['key']), ignore_errors=True)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get cache size and hit statistics."""
+        entries = self.entries()
+        return {
+            'cache_dir': str(self.cache_dir),
+            'entries': len(entries),
+            'bytes': sum(entry['bytes'] for entry in entries),
+            'max_bytes': self.max_bytes,
+            'hits': self.hits,
+            'misses': self.misses
+        }
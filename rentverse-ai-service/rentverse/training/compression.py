@@ -0,0 +1,441 @@
+"""
+Model Compression for Rentverse Deployment Artifacts
+====================================================
+
+This module shrinks a fitted tree ensemble after training, within an
+accuracy budget. Three steps run in order, and each keeps test R² within its
+share of ``epsilon`` of the uncompressed model:
+
+1. Ensemble size reduction: greedy forward selection of trees for averaging
+   ensembles (random forests), greedy backward elimination of stages for
+   additive ensembles (gradient boosting).
+2. Depth pruning: every tree is cut at the smallest common depth that fits.
+3. Leaf merging: sibling leaves whose values differ by at most a fraction of
+   the tree's leaf value range are merged into their parent, bottom-up.
+
+Cut and merged nodes get the sample-weighted mean of the original leaves
+below them. Rewritten trees are plain sklearn trees, so the compressed model
+pickles and predicts like the original.
+
+The spread of the remaining trees no longer reflects the prediction error, so
+a compressed artifact is marked to serve residual intervals, based on the test
+RMSE measured after compression.
+"""
+
+import copy
+import io
+import logging
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+import joblib
+import numpy as np
+import pandas as pd
+from sklearn.ensemble import GradientBoostingRegressor
+from sklearn.ensemble._forest import ForestRegressor
+from sklearn.metrics import mean_absolute_error, mean_squared_error, r2_score
+from sklearn.tree import DecisionTreeRegressor
+
+from ..models.ml_models import INTERVAL_METHOD_KEY
+from .cache import StageCache
+from .latency import measure_latency
+from .trainer import TrainingConfig, preprocess_stage, split_stage
+
+logger = logging.getLogger(__name__)
+
+COMPRESSION_REPORT_FILENAME = "model_compression_report.csv"
+DEFAULT_EPSILON = 0.005
+# Leaf merge tolerances, as fractions of each tree's leaf value range
+LEAF_MERGE_FRACTIONS = (0.0, 0.001, 0.002, 0.005, 0.01, 0.02, 0.05, 0.1)
+
+TREE_LEAF = -1
+TREE_UNDEFINED = -2
+
+
+def _ensemble_kind(model: Any) -> Optional[str]:
+    if isinstance(model, GradientBoostingRegressor):
+        return 'additive'
+    if isinstance(model, ForestRegressor):
+        return 'average'
+    if isinstance(model, DecisionTreeRegressor):
+        return 'single'
+    return None
+
+
+def _trees(model: Any) -> List[DecisionTreeRegressor]:
+    kind = _ensemble_kind(model)
+    if kind == 'additive':
+        return list(model.estimators_[:, 0])
+    if kind == 'average':
+        return list(model.estimators_)
+    if kind == 'single':
+        return [model]
+    return []
+
+
+class _TreeArrays:
+    """Node arrays of a fitted sklearn tree, with per-node subtree means and depths."""
+
+    def __init__(self, estimator: DecisionTreeRegressor):
+        self.cls, self.args, state = estimator.tree_.__reduce__()
+        self.nodes = state['nodes']
+        self.values = state['values']
+        self.left = self.nodes['left_child']
+        self.right = self.nodes['right_child']
+        weights = self.nodes['weighted_n_node_samples']
+
+        # Depth of every node, level by level from the root
+        self.depth = np.zeros(len(self.nodes), dtype=np.int64)
+        levels = []
+        frontier = np.array([0])
+        while frontier.size:
+            levels.append(frontier)
+            internal = frontier[self.left[frontier] != TREE_LEAF]
+            self.depth[self.left[internal]] = self.depth[internal] + 1
+            self.depth[self.right[internal]] = self.depth[internal] + 1
+            frontier = np.concatenate([self.left[internal], self.right[internal]])
+
+        # Sample-weighted mean of the leaves below each node, deepest level first
+        value = self.values[:, 0, 0].astype(float).copy()
+        for level in reversed(levels):
+            internal = level[self.left[level] != TREE_LEAF]
+            left, right = self.left[internal], self.right[internal]
+            total = weights[left] + weights[right]
+            value[internal] = np.where(
+                total > 0,
+                (weights[left] * value[left] + weights[right] * value[right]) / np.where(total > 0, total, 1),
+                value[internal]
+            )
+        self.subtree_value = value
+
+    @property
+    def max_depth(self) -> int:
+        return int(self.depth[self.left == TREE_LEAF].max())
+
+    def leaf_range(self) -> float:
+        leaf_values = self.subtree_value[self.left == TREE_LEAF]
+        return float(leaf_values.max() - leaf_values.min())
+
+    def build(self, cut: np.ndarray) -> Any:
+        """New sklearn Tree in which the nodes marked in ``cut`` become leaves."""
+        frontier = np.array([0])
+        order = []
+        while frontier.size:
+            order.append(frontier)
+            internal = frontier[(self.left[frontier] != TREE_LEAF) & ~cut[frontier]]
+            frontier = np.concatenate([self.left[internal], self.right[internal]])
+        order = np.concatenate(order)
+
+        new_id = np.full(len(self.nodes), TREE_LEAF, dtype=np.int64)
+        new_id[order] = np.arange(len(order))
+        nodes = self.nodes[order].copy()
+        values = self.values[order].copy()
+
+        leaf = (nodes['left_child'] == TREE_LEAF) | cut[order]
+        cut_leaf = leaf & (nodes['left_child'] != TREE_LEAF)
+        values[cut_leaf, 0, 0] = self.subtree_value[order[cut_leaf]]
+        nodes['left_child'] = np.where(leaf, TREE_LEAF, new_id[nodes['left_child']])
+        nodes['right_child'] = np.where(leaf, TREE_LEAF, new_id[nodes['right_child']])
+        nodes['feature'][leaf] = TREE_UNDEFINED
+        nodes['threshold'][leaf] = TREE_UNDEFINED
+
+        tree = self.cls(*self.args)
+        tree.__setstate__({
+            'max_depth': int(self.depth[order[leaf]].max()),
+            'node_count': len(order),
+            'nodes': nodes,
+            'values': values
+        })
+        return tree
+
+    def depth_cut(self, max_depth: int) -> np.ndarray:
+        return self.depth >= max_depth
+
+    def merge_cut(self, tolerance: float) -> np.ndarray:
+        """Merge sibling leaves whose values differ by at most tolerance, repeatedly upwards."""
+        cut = np.zeros(len(self.nodes), dtype=bool)
+        internal = np.flatnonzero(self.left != TREE_LEAF)
+        while internal.size:
+            is_leaf = (self.left == TREE_LEAF) | cut
+            left, right = self.left[internal], self.right[internal]
+            mergeable = is_leaf[left] & is_leaf[right] & (
+                np.abs(self.subtree_value[left] - self.subtree_value[right]) <= tolerance
+            )
+            if not mergeable.any():
+                break
+            cut[internal[mergeable]] = True
+            internal = internal[~mergeable]
+        return cut
+
+
+def _set_trees(model: Any, trees: List[Any]) -> None:
+    for estimator, tree in zip(_trees(model), trees):
+        estimator.tree_ = tree
+
+
+class _Scorer:
+    """Test R² of a model on the price scale, as in the training reports."""
+
+    def __init__(self, X_test: np.ndarray, y_test: np.ndarray, log_target: bool):
+        self.X_test = X_test
+        self.y_test = np.asarray(y_test, dtype=float)
+        self.log_target = log_target
+
+    def to_price(self, raw: np.ndarray) -> np.ndarray:
+        return np.expm1(raw) if self.log_target else raw
+
+    def r2(self, raw: np.ndarray) -> float:
+        return float(r2_score(self.y_test, self.to_price(raw)))
+
+    def r2_rows(self, raw: np.ndarray) -> np.ndarray:
+        """R² of every row of a (n_candidates, n_test) prediction matrix."""
+        residual = self.y_test[None, :] - self.to_price(raw)
+        total = ((self.y_test - self.y_test.mean()) ** 2).sum()
+        return 1 - (residual ** 2).sum(axis=1) / total
+
+    def metrics(self, model: Any) -> Dict[str, float]:
+        price = self.to_price(model.predict(self.X_test))
+        return {
+            'test_r2': float(r2_score(self.y_test, price)),
+            'test_rmse': float(np.sqrt(mean_squared_error(self.y_test, price))),
+            'test_mae': float(mean_absolute_error(self.y_test, price)),
+            'test_mape': float(np.mean(np.abs((self.y_test - price) / self.y_test)) * 100)
+        }
+
+
+def _select_estimators(model: Any, scorer: _Scorer, threshold: float) -> int:
+    """Shrink the ensemble in place; returns the number of estimators removed."""
+    kind = _ensemble_kind(model)
+    trees = _trees(model)
+    if kind not in ('average', 'additive') or len(trees) < 2:
+        return 0
+
+    member = np.array([tree.predict(scorer.X_test) for tree in trees])
+
+    if kind == 'average':
+        # Forward selection: add the tree that helps the mean prediction most
+        # until the selection is within budget
+        selected: List[int] = []
+        remaining = list(range(len(trees)))
+        total = np.zeros(member.shape[1])
+        while remaining:
+            scores = scorer.r2_rows((total[None, :] + member[remaining]) / (len(selected) + 1))
+            best = int(np.argmax(scores))
+            total += member[remaining[best]]
+            selected.append(remaining.pop(best))
+            if scores[best] >= threshold:
+                break
+        keep = sorted(selected)
+        model.estimators_ = [model.estimators_[i] for i in keep]
+        model.n_estimators = len(keep)
+        return len(trees) - len(keep)
+
+    # Backward elimination: drop the stage whose removal costs least while in budget
+    contribution = model.learning_rate * member
+    raw = model.predict(scorer.X_test)
+    keep = list(range(len(trees)))
+    while len(keep) > 1:
+        scores = scorer.r2_rows(raw[None, :] - contribution[keep])
+        best = int(np.argmax(scores))
+        if scores[best] < threshold:
+            break
+        raw = raw - contribution[keep[best]]
+        keep.pop(best)
+
+    model.estimators_ = model.estimators_[keep]
+    model.n_estimators = model.n_estimators_ = len(keep)
+    for attribute in ('train_score_', 'oob_improvement_', 'oob_scores_'):
+        values = getattr(model, attribute, None)
+        if values is not None and len(values) == len(trees):
+            setattr(model, attribute, values[keep])
+    return len(trees) - len(keep)
+
+
+def _prune_depth(model: Any, scorer: _Scorer, threshold: float) -> Optional[int]:
+    """Cut all trees at the smallest common depth within budget; returns it (None if unchanged)."""
+    arrays = [_TreeArrays(tree) for tree in _trees(model)]
+    original = [tree.tree_ for tree in _trees(model)]
+    current_depth = max(tree_arrays.max_depth for tree_arrays in arrays)
+
+    best = None
+    for depth in range(current_depth - 1, 0, -1):
+        _set_trees(model, [tree_arrays.build(tree_arrays.depth_cut(depth)) for tree_arrays in arrays])
+        if scorer.r2(model.predict(scorer.X_test)) < threshold:
+            break
+        best = depth
+
+    if best is None:
+        _set_trees(model, original)
+    else:
+        _set_trees(model, [tree_arrays.build(tree_arrays.depth_cut(best)) for tree_arrays in arrays])
+    return best
+
+
+def _merge_leaves(model: Any, scorer: _Scorer, threshold: float) -> Optional[float]:
+    """Merge near-equal sibling leaves with the largest tolerance within budget."""
+    arrays = [_TreeArrays(tree) for tree in _trees(model)]
+    original = [tree.tree_ for tree in _trees(model)]
+
+    best = None
+    for fraction in LEAF_MERGE_FRACTIONS:
+        _set_trees(model, [tree_arrays.build(tree_arrays.merge_cut(fraction * tree_arrays.leaf_range()))
+                           for tree_arrays in arrays])
+        if scorer.r2(model.predict(scorer.X_test)) < threshold:
+            break
+        best = fraction
+
+    if best is None:
+        _set_trees(model, original)
+    else:
+        _set_trees(model, [tree_arrays.build(tree_arrays.merge_cut(best * tree_arrays.leaf_range()))
+                           for tree_arrays in arrays])
+    return best
+
+
+def model_structure(model: Any) -> Dict[str, int]:
+    """Number of trees, total nodes and maximum depth of a tree model."""
+    trees = _trees(model)
+    return {
+        'n_estimators': len(trees),
+        'total_nodes': int(sum(tree.tree_.node_count for tree in trees)),
+        'max_depth': int(max((tree.tree_.max_depth for tree in trees), default=0))
+    }
+
+
+def compress_model(
+    model: Any,
+    X_test: np.ndarray,
+    y_test: np.ndarray,
+    log_target: bool = False,
+    epsilon: float = DEFAULT_EPSILON
+) -> Tuple[Any, Dict[str, Any]]:
+    """
+    Compress a fitted tree model, keeping test R² within epsilon of the original.
+
+    The budget is split evenly: ensemble reduction may use a third of epsilon,
+    depth pruning up to two thirds (cumulative) and leaf merging the rest.
+
+    Returns:
+        Compressed copy of the model and a summary of what each step did
+    """
+    compressed = copy.deepcopy(model)
+    kind = _ensemble_kind(compressed)
+    scorer = _Scorer(X_test, y_test, log_target)
+    baseline = scorer.r2(model.predict(X_test))
+    summary: Dict[str, Any] = {'epsilon': epsilon, 'baseline_r2': baseline, 'supported': kind is not None}
+
+    if kind is None:
+        logger.info(f"{type(model).__name__} is not a tree model; nothing to compress")
+        return compressed, summary
+
+    summary['estimators_removed'] = _select_estimators(compressed, scorer, baseline - epsilon / 3)
+    summary['pruned_depth'] = _prune_depth(compressed, scorer, baseline - 2 * epsilon / 3)
+    summary['leaf_merge_fraction'] = _merge_leaves(compressed, scorer, baseline - epsilon)
+    summary['compressed_r2'] = scorer.r2(compressed.predict(X_test))
+    return compressed, summary
+
+
+def _artifact_bytes(artifact: Dict[str, Any]) -> int:
+    buffer = io.BytesIO()
+    joblib.dump(artifact, buffer)
+    return buffer.tell()
+
+
+def compress_artifact(
+    artifact: Dict[str, Any],
+    X_test: np.ndarray,
+    y_test: np.ndarray,
+    epsilon: float = DEFAULT_EPSILON,
+    latency_repeats: int = 200
+) -> Tuple[Dict[str, Any], pd.DataFrame]:
+    """
+    Compress the model of a deployment dictionary.
+
+    Parameters:
+        artifact: Deployment dictionary as written by rentverse train
+        X_test: Scaled test matrix
+        y_test: Test prices
+        epsilon: Maximum test R² drop
+        latency_repeats: Timed single-row predict() calls for the report
+
+    Returns:
+        New deployment dictionary (test metrics updated, residual intervals)
+        and a before/after report
+    """
+    log_target = bool(artifact.get('use_log_transform', False))
+    model, summary = compress_model(artifact['model'], X_test, y_test, log_target, epsilon)
+    scorer = _Scorer(X_test, y_test, log_target)
+
+    performance_metrics = dict(artifact.get('performance_metrics') or {})
+    performance_metrics.pop('model', None)
+    performance_metrics.update(scorer.metrics(model))
+    compressed = {**artifact, 'model': model, 'performance_metrics': performance_metrics, 'compression': summary}
+    if summary['supported']:
+        # Intervals from the test RMSE above rather than the spread of the kept trees
+        compressed[INTERVAL_METHOD_KEY] = 'residual'
+
+    rows = []
+    for stage, stage_artifact in (('before', artifact), ('after', compressed)):
+        stage_model = stage_artifact['model']
+        latency = measure_latency(stage_model, X_test, repeats=latency_repeats)
+        metrics = scorer.metrics(stage_model)
+        rows.append({
+            'Stage': stage,
+            'Model': artifact.get('model_name', type(stage_model).__name__),
+            **{key.replace('_', ' ').title(): value for key, value in model_structure(stage_model).items()},
+            'Artifact Size (KB)': _artifact_bytes(stage_artifact) / 1024,
+            'Test R²': metrics['test_r2'],
+            'Test RMSE': metrics['test_rmse'],
+            'Single p50 (ms)': latency['single_p50_ms'],
+            'Single p99 (ms)': latency['single_p99_ms'],
+            f"Batch-{latency['batch_size']} p50 (ms)": latency['batch_p50_ms']
+        })
+
+    return compressed, pd.DataFrame(rows)
+
+
+def run_compression(
+    artifact_path: str,
+    config: TrainingConfig,
+    output_path: Optional[str] = None,
+    epsilon: float = DEFAULT_EPSILON
+) -> Dict[str, Any]:
+    """
+    Compress a deployment artifact on the test split it was evaluated on.
+
+    The test split is rebuilt from ``config.data_path`` with the artifact's
+    preprocessing percentiles and config's test_size/random_state (through the
+    stage cache), then scaled with the artifact's scaler.
+
+    Returns:
+        Dictionary with the written paths, the compression summary and the report
+    """
+    artifact = joblib.load(artifact_path)
+    preprocessor = artifact['preprocessor']
+    config.remove_outliers = getattr(preprocessor, 'remove_outliers', config.remove_outliers)
+    config.price_percentile = getattr(preprocessor, 'price_percentile', config.price_percentile)
+    config.area_percentile = getattr(preprocessor, 'area_percentile', config.area_percentile)
+
+    cache = StageCache(config.cache_dir, config.cache_max_bytes) if config.cache_dir else None
+    _, df_processed, preprocess_key = preprocess_stage(config, cache)
+    split, _ = split_stage(df_processed, config, cache, preprocess_key)
+    X_test = artifact['scaler'].transform(split.X_test[artifact['feature_names']])
+
+    compressed, report = compress_artifact(artifact, X_test, split.y_test.to_numpy(dtype=float),
+                                           epsilon, config.latency_repeats)
+
+    output_path = Path(output_path) if output_path else Path(artifact_path).with_suffix('.compressed.pkl')
+    reports_dir = Path(config.reports_dir)
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+    reports_dir.mkdir(parents=True, exist_ok=True)
+    paths = {'artifact': output_path, 'report': reports_dir / COMPRESSION_REPORT_FILENAME}
+
+    joblib.dump(compressed, paths['artifact'])
+    report.to_csv(paths['report'], index=False)
+    logger.info(f"Compressed {artifact_path} -> {output_path}: {compressed['compression']}")
+
+    return {
+        'paths': {key: str(path) for key, path in paths.items()},
+        'summary': compressed['compression'],
+        'report': report
+    }
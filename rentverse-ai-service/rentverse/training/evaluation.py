@@ -0,0 +1,201 @@
+"""
+Serving Cost Evaluation for Rentverse Models
+============================================
+
+This module measures what each trained candidate costs to serve (predict()
+latency of the predictor the service runs for single rows and batches,
+pickled artifact size and the memory it occupies once loaded), puts it next
+to the accuracy metrics, marks the Pareto front of accuracy against latency
+and selects the most accurate model that meets a latency SLO.
+"""
+
+import logging
+import os
+import subprocess
+import sys
+import tempfile
+import tracemalloc
+from typing import Any, Dict, Optional
+
+import joblib
+import numpy as np
+import pandas as pd
+
+from ..models.compact import CompactTreeEnsemble
+from .latency import DEFAULT_BATCH_SIZE, measure_latency
+
+logger = logging.getLogger(__name__)
+
+SERVING_REPORT_FILENAME = "model_serving_report.csv"
+ACCURACY_COLUMN = 'Test R²'
+LATENCY_COLUMN = 'Single p99 (ms)'
+
+
+# Run in a fresh interpreter: resident memory before and after loading the artifact
+_RSS_PROBE = """
+import sys, joblib, sklearn.ensemble, sklearn.linear_model, sklearn.preprocessing
+
+def rss():
+    with open('/proc/self/statm') as f:
+        return int(f.read().split()[1]) * __import__('os').sysconf('SC_PAGE_SIZE')
+
+before = rss()
+artifact = joblib.load(sys.argv[1])
+print(rss() - before)
+"""
+
+
+def _loaded_memory_bytes(path: str) -> Optional[int]:
+    """Resident memory added by loading an artifact in a fresh process (Linux only)."""
+    if not os.path.exists('/proc/self/statm'):
+        return None
+    try:
+        output = subprocess.run(
+            [sys.executable, '-c', _RSS_PROBE, path],
+            env={**os.environ, 'PYTHONPATH': os.pathsep.join(p for p in sys.path if p)},
+            check=True, capture_output=True, text=True, timeout=120
+        ).stdout
+        return max(int(output.strip().splitlines()[-1]), 0)
+    except Exception as e:
+        logger.warning(f"Could not measure loaded artifact memory: {str(e)}")
+        return None
+
+
+def _traced_memory_bytes(path: str) -> int:
+    """Python-level allocations made by loading an artifact (misses C-allocated tree nodes)."""
+    was_tracing = tracemalloc.is_tracing()
+    if not was_tracing:
+        tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    loaded = joblib.load(path)
+    memory = tracemalloc.get_traced_memory()[0] - before
+    del loaded
+    if not was_tracing:
+        tracemalloc.stop()
+    return max(memory, 0)
+
+
+def artifact_footprint(artifact: Dict[str, Any]) -> Dict[str, int]:
+    """
+    Size of a deployment dictionary as written by joblib, and the resident
+    memory it adds once loaded.
+    """
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'artifact.pkl')
+        joblib.dump(artifact, path)
+        size = os.path.getsize(path)
+        memory = _loaded_memory_bytes(path)
+        if memory is None:
+            memory = _traced_memory_bytes(path)
+
+    return {'artifact_bytes': size, 'memory_bytes': memory}
+
+
+def serving_predictor(model: Any) -> Any:
+    """
+    The predictor the service runs for a trained model.
+
+    As when PropertyPricePredictionModel loads an artifact, a supported tree
+    ensemble is served as its compact copy when that copy agrees with the
+    model; anything else as trained.
+    """
+    try:
+        compact = CompactTreeEnsemble.from_model(model)
+    except Exception as e:
+        logger.warning(f"Could not build compact model: {str(e)}")
+        return model
+    if compact is None or not compact.verify(model):
+        return model
+    return compact
+
+
+def pareto_front(report: pd.DataFrame, accuracy: str = ACCURACY_COLUMN, cost: str = LATENCY_COLUMN) -> pd.Series:
+    """
+    Mark rows not dominated by another row, i.e. no other model is at least as
+    accurate and at least as fast while being strictly better in one of them.
+    """
+    acc = report[accuracy].to_numpy(dtype=float)
+    lat = report[cost].to_numpy(dtype=float)
+    dominated = (
+        (acc[None, :] >= acc[:, None]) & (lat[None, :] <= lat[:, None]) &
+        ((acc[None, :] > acc[:, None]) | (lat[None, :] < lat[:, None]))
+    ).any(axis=1)
+    return pd.Series(~dominated, index=report.index)
+
+
+def serving_report(
+    pipeline: str,
+    results: Dict[str, Optional[Dict[str, Any]]],
+    artifacts: Dict[str, Dict[str, Any]],
+    X_test: np.ndarray,
+    latency_slo_ms: Optional[float] = None,
+    repeats: int = 200,
+    random_state: int = 42
+) -> pd.DataFrame:
+    """
+    Build the accuracy and serving cost table of one pipeline's candidates.
+
+    Parameters:
+        pipeline: Pipeline label ('standard' or 'enhanced')
+        results: Metrics per model from evaluate_candidates (None if training failed)
+        artifacts: Deployment dictionary per model
+        X_test: Scaled test matrix used for the latency measurement
+        latency_slo_ms: Single-row p99 budget for the 'Meets SLO' column
+        repeats: Timed single-row predict() calls per model, made on the
+            predictor the service would run (see serving_predictor)
+        random_state: Seed for the rows drawn
+
+    Returns:
+        One row per trained model, most accurate first
+    """
+    rows = []
+    for name, metrics in results.items():
+        if metrics is None:
+            continue
+        predictor = serving_predictor(metrics['model'])
+        latency = measure_latency(predictor, X_test, repeats=repeats, random_state=random_state)
+        footprint = artifact_footprint(artifacts[name])
+        rows.append({
+            'Pipeline': pipeline,
+            'Model': name,
+            'Served As': 'compact' if isinstance(predictor, CompactTreeEnsemble) else 'as trained',
+            'Test R²': metrics['test_r2'],
+            'Test RMSE': metrics['test_rmse'],
+            'Test MAE': metrics['test_mae'],
+            'Single p50 (ms)': latency['single_p50_ms'],
+            'Single p99 (ms)': latency['single_p99_ms'],
+            f'Batch-{DEFAULT_BATCH_SIZE} p50 (ms)': latency['batch_p50_ms'],
+            f'Batch-{DEFAULT_BATCH_SIZE} p99 (ms)': latency['batch_p99_ms'],
+            'Artifact Size (MB)': footprint['artifact_bytes'] / 1024 ** 2,
+            'Memory (MB)': footprint['memory_bytes'] / 1024 ** 2
+        })
+
+    report = pd.DataFrame(rows)
+    if report.empty:
+        return report
+
+    report = report.sort_values(ACCURACY_COLUMN, ascending=False).reset_index(drop=True)
+    report['Pareto Optimal'] = pareto_front(report)
+    if latency_slo_ms is not None:
+        report['Meets SLO'] = report[LATENCY_COLUMN] <= latency_slo_ms
+    return report
+
+
+def select_model(report: pd.DataFrame, latency_slo_ms: Optional[float] = None) -> str:
+    """
+    Pick the most accurate model whose single-row p99 latency meets the SLO.
+
+    Without an SLO the most accurate model is returned. If no model meets the
+    SLO, the fastest one is returned and a warning is logged.
+    """
+    if latency_slo_ms is None:
+        return report.sort_values(ACCURACY_COLUMN, ascending=False).iloc[0]['Model']
+
+    eligible = report[report[LATENCY_COLUMN] <= latency_slo_ms]
+    if eligible.empty:
+        fastest = report.sort_values(LATENCY_COLUMN).iloc[0]
+        logger.warning(f"No model meets the {latency_slo_ms} ms p99 SLO; using the fastest, "
+                       f"{fastest['Model']} ({fastest[LATENCY_COLUMN]:.2f} ms)")
+        return fastest['Model']
+
+    return eligible.sort_values(ACCURACY_COLUMN, ascending=False).iloc[0]['Model']
@@ -0,0 +1,74 @@
+"""
+Inference Latency Measurement for Rentverse Models
+==================================================
+
+Helpers that time a fitted regressor's predict() on single rows and on
+batches, the two request shapes the API serves.
+"""
+
+import time
+from typing import Any, Dict
+
+import numpy as np
+
+DEFAULT_BATCH_SIZE = 100
+
+
+def _percentiles_ms(timings_ns: np.ndarray) -> Dict[str, float]:
+    p50, p99 = np.percentile(timings_ns, [50, 99]) / 1e6
+    return {'p50_ms': float(p50), 'p99_ms': float(p99)}
+
+
+def measure_latency(
+    model: Any,
+    X: np.ndarray,
+    repeats: int = 200,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    warmup: int = 5,
+    random_state: int = 42
+) -> Dict[str, float]:
+    """
+    Measure predict() latency on single rows and on batches of rows from X.
+
+    Parameters:
+        model: Fitted regressor
+        X: Feature matrix to draw rows from (already scaled)
+        repeats: Timed single-row calls; a quarter as many batch calls are made
+        batch_size: Rows per batch call
+        warmup: Untimed calls before measuring
+        random_state: Seed for the rows drawn
+
+    Returns:
+        p50/p99 milliseconds for single rows and for batches
+    """
+    X = np.asarray(X)
+    rng = np.random.default_rng(random_state)
+    batch_size = min(batch_size, len(X))
+
+    for _ in range(warmup):
+        model.predict(X[:1])
+        model.predict(X[:batch_size])
+
+    single = np.empty(repeats, dtype=np.int64)
+    for i, row in enumerate(rng.integers(0, len(X), repeats)):
+        start = time.perf_counter_ns()
+        model.predict(X[row:row + 1])
+        single[i] = time.perf_counter_ns() - start
+
+    batch_repeats = max(1, repeats // 4)
+    batch = np.empty(batch_repeats, dtype=np.int64)
+    for i in range(batch_repeats):
+        rows = rng.integers(0, len(X), batch_size)
+        start = time.perf_counter_ns()
+        model.predict(X[rows])
+        batch[i] = time.perf_counter_ns() - start
+
+    single_stats = _percentiles_ms(single)
+    batch_stats = _percentiles_ms(batch)
+    return {
+        'single_p50_ms': single_stats['p50_ms'],
+        'single_p99_ms': single_stats['p99_ms'],
+        'batch_p50_ms': batch_stats['p50_ms'],
+        'batch_p99_ms': batch_stats['p99_ms'],
+        'batch_size': batch_size
+    }
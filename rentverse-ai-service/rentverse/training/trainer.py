@@ -0,0 +1,624 @@
+"""
+Model Training Pipeline for Rentverse
+=====================================
+
+This module reproduces the training flow from
+notebooks/Rentverse_rentprice_prediction.ipynb as a script: it fits the
+ImprovedDataPreprocessor, trains the candidate regressors in parallel,
+cross-validates them in a process pool, writes the model comparison CSVs and
+dumps the deployment dictionaries loaded by PropertyPricePredictionModel.
+Preprocessing, splitting and scaling outputs are kept in a StageCache so runs
+that only change the regressors skip those stages.
+"""
+
+import logging
+import os
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import joblib
+import numpy as np
+import pandas as pd
+from sklearn.base import BaseEstimator, clone
+from sklearn.ensemble import GradientBoostingRegressor, RandomForestRegressor
+from sklearn.linear_model import LinearRegression, Ridge
+from sklearn.metrics import mean_absolute_error, mean_squared_error, r2_score
+from sklearn.model_selection import KFold, train_test_split
+from sklearn.preprocessing import MinMaxScaler, RobustScaler, StandardScaler
+
+from ..models.comparables import COMPARABLES_KEY, comparables_payload
+from ..models.drift import DRIFT_BASELINE_KEY, drift_baseline
+from ..models.pool import REGIONS_DIRNAME, region_dirname
+from ..utils.preprocessor import ImprovedDataPreprocessor
+from .cache import (
+    DEFAULT_CACHE_DIR,
+    DEFAULT_CACHE_MAX_BYTES,
+    StageCache,
+    arrays_to_frame,
+    frame_to_arrays,
+    hash_file
+)
+from .evaluation import SERVING_REPORT_FILENAME, select_model, serving_report
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_OUTPUT_DIR = Path(__file__).resolve().parent.parent / "models"
+DEFAULT_REPORTS_DIR = Path(__file__).resolve().parent.parent.parent / "notebooks"
+STANDARD_ARTIFACT_FILENAME = "standard_deployment_pipeline.pkl"
+ENHANCED_ARTIFACT_FILENAME = "enhanced_deployment_pipeline.pkl"
+STANDARD_COMPARISON_FILENAME = "improved_model_comparison.csv"
+ENHANCED_COMPARISON_FILENAME = "enhanced_model_comparison.csv"
+NORMALIZATION_COMPARISON_FILENAME = "normalization_method_comparison.csv"
+
+
+def standard_candidates(random_state: int = 42) -> Dict[str, BaseEstimator]:
+    """Candidate regressors for the standard (untransformed target) pipeline."""
+    return {
+        'Linear Regression': LinearRegression(),
+        'Ridge Regression': Ridge(alpha=1.0),
+        'Random Forest': RandomForestRegressor(
+            n_estimators=100,
+            random_state=random_state,
+            max_depth=10,
+            min_samples_split=5
+        ),
+        'Gradient Boosting': GradientBoostingRegressor(
+            n_estimators=100,
+            random_state=random_state,
+            max_depth=6,
+            learning_rate=0.1
+        )
+    }
+
+
+def enhanced_candidates(random_state: int = 42) -> Dict[str, BaseEstimator]:
+    """Candidate regressors for the enhanced (log target) pipeline."""
+    return {
+        'Linear Regression': LinearRegression(),
+        'Ridge Regression': Ridge(alpha=10.0),
+        'Random Forest': RandomForestRegressor(
+            n_estimators=200,
+            random_state=random_state,
+            max_depth=15,
+            min_samples_split=10,
+            min_samples_leaf=5,
+            max_features='sqrt'
+        ),
+        'Gradient Boosting': GradientBoostingRegressor(
+            n_estimators=200,
+            random_state=random_state,
+            max_depth=8,
+            learning_rate=0.05,
+            subsample=0.8,
+            max_features='sqrt'
+        ),
+        # Same configuration as the notebook: a non-bootstrapped random forest
+        'Extra Trees': RandomForestRegressor(
+            n_estimators=200,
+            random_state=random_state,
+            max_depth=20,
+            min_samples_split=5,
+            min_samples_leaf=2,
+            bootstrap=False,
+            max_features='sqrt'
+        )
+    }
+
+
+@dataclass
+class TrainingConfig:
+    """Settings for a training run."""
+
+    data_path: str
+    output_dir: str = str(DEFAULT_OUTPUT_DIR)
+    reports_dir: str = str(DEFAULT_REPORTS_DIR)
+    n_jobs: int = field(default_factory=lambda: os.cpu_count() or 1)
+    cv_folds: int = 5
+    test_size: float = 0.2
+    random_state: int = 42
+    remove_outliers: bool = True
+    price_percentile: int = 90
+    area_percentile: int = 95
+    compare_normalization: bool = True
+    verbose: bool = False
+    # Stage cache location (None disables caching) and size cap
+    cache_dir: Optional[str] = str(DEFAULT_CACHE_DIR)
+    cache_max_bytes: int = DEFAULT_CACHE_MAX_BYTES
+    # Single-row p99 predict() budget for picking the deployed models (None: most accurate)
+    latency_slo_ms: Optional[float] = None
+    latency_repeats: int = 200
+    # Train only on the listings of one region, for the region model pool (None: all regions)
+    region: Optional[str] = None
+
+
+@dataclass
+class DatasetSplit:
+    """Preprocessed train/test split shared by all candidates."""
+
+    feature_names: List[str]
+    X_train: pd.DataFrame
+    X_test: pd.DataFrame
+    y_train: pd.Series
+    y_test: pd.Series
+
+
+def region_output_dir(region: str, output_dir: str = str(DEFAULT_OUTPUT_DIR)) -> str:
+    """Directory the region model pool loads a region's pipeline from."""
+    return str(Path(output_dir) / REGIONS_DIRNAME / region_dirname(region))
+
+
+def load_training_data(data_path: str, region: Optional[str] = None) -> pd.DataFrame:
+    """
+    Load the raw listings CSV used for training, optionally only the listings
+    whose location parses to the given region.
+    """
+    if not os.path.exists(data_path):
+        raise FileNotFoundError(f"Training data not found: {data_path}")
+    df_raw = pd.read_csv(data_path)
+    if region is None:
+        return df_raw
+
+    regions = ImprovedDataPreprocessor(verbose=False)._parse_location_series(df_raw['location'])
+    df_region = df_raw[regions.map(region_dirname) == region_dirname(region)].reset_index(drop=True)
+    if df_region.empty:
+        raise ValueError(f"No listings in {data_path} are in region '{region}'")
+    logger.info(f"Training on {len(df_region):,} of {len(df_raw):,} listings in region '{region}'")
+    return df_region
+
+
+def fit_preprocessor(df_raw: pd.DataFrame, config: TrainingConfig) -> Tuple[ImprovedDataPreprocessor, pd.DataFrame]:
+    """Fit ImprovedDataPreprocessor on the raw data and return it with the processed frame."""
+    preprocessor = ImprovedDataPreprocessor(
+        remove_outliers=config.remove_outliers,
+        price_percentile=config.price_percentile,
+        area_percentile=config.area_percentile,
+        verbose=config.verbose
+    )
+    df_processed = preprocessor.fit_transform(df_raw)
+    return preprocessor, df_processed
+
+
+def split_dataset(df_processed: pd.DataFrame, config: TrainingConfig, target_column: str = 'price') -> DatasetSplit:
+    """Split the processed frame into train and test sets."""
+    feature_names = [col for col in df_processed.columns if col != target_column]
+    X_train, X_test, y_train, y_test = train_test_split(
+        df_processed[feature_names], df_processed[target_column],
+        test_size=config.test_size, random_state=config.random_state
+    )
+    return DatasetSplit(feature_names, X_train, X_test, y_train, y_test)
+
+
+def preprocess_stage(
+    config: TrainingConfig,
+    cache: Optional[StageCache] = None
+) -> Tuple[ImprovedDataPreprocessor, pd.DataFrame, str]:
+    """
+    Load and preprocess the raw data, reusing the cached result when the data
+    file and the preprocessing parameters are unchanged.
+
+    Returns:
+        Fitted preprocessor, processed frame and the cache key ('' without cache)
+    """
+    if cache is None:
+        preprocessor, df_processed = fit_preprocessor(load_training_data(config.data_path, config.region), config)
+        return preprocessor, df_processed, ''
+
+    if not os.path.exists(config.data_path):
+        raise FileNotFoundError(f"Training data not found: {config.data_path}")
+
+    params = {
+        'remove_outliers': config.remove_outliers,
+        'price_percentile': config.price_percentile,
+        'area_percentile': config.area_percentile
+    }
+    if config.region is not None:
+        # Only keyed when set, so the keys of whole-dataset runs are unchanged
+        params['region'] = region_dirname(config.region)
+    key = cache.key('preprocess', [hash_file(config.data_path)], params)
+    cached = cache.get(key)
+    if cached is not None:
+        logger.info(f"Reusing cached preprocessing ({key})")
+        return cached['preprocessor'], arrays_to_frame(cached, cached['meta'], 'processed'), key
+
+    preprocessor, df_processed = fit_preprocessor(load_training_data(config.data_path, config.region), config)
+    arrays, meta = frame_to_arrays(df_processed, 'processed')
+    cache.put(key, arrays, {'preprocessor': preprocessor}, meta)
+    return preprocessor, df_processed, key
+
+
+def split_stage(
+    df_processed: pd.DataFrame,
+    config: TrainingConfig,
+    cache: Optional[StageCache] = None,
+    parent_key: str = ''
+) -> Tuple[DatasetSplit, str]:
+    """Split the processed frame, reusing the cached split of the same preprocessing output."""
+    if cache is None or not parent_key:
+        return split_dataset(df_processed, config), ''
+
+    key = cache.key('split', [parent_key], {
+        'test_size': config.test_size,
+        'random_state': config.random_state
+    })
+    cached = cache.get(key)
+    if cached is not None:
+        meta = cached['meta']
+        X_train = arrays_to_frame(cached, meta['X_train'], 'X_train')
+        X_test = arrays_to_frame(cached, meta['X_test'], 'X_test')
+        y_train = pd.Series(cached['y_train'], index=X_train.index, name=meta['target'])
+        y_test = pd.Series(cached['y_test'], index=X_test.index, name=meta['target'])
+        return DatasetSplit(list(X_train.columns), X_train, X_test, y_train, y_test), key
+
+    split = split_dataset(df_processed, config)
+    train_arrays, train_meta = frame_to_arrays(split.X_train, 'X_train')
+    test_arrays, test_meta = frame_to_arrays(split.X_test, 'X_test')
+    cache.put(
+        key,
+        {**train_arrays, **test_arrays,
+         'y_train': split.y_train.to_numpy(), 'y_test': split.y_test.to_numpy()},
+        meta={'X_train': train_meta, 'X_test': test_meta, 'target': split.y_train.name}
+    )
+    return split, key
+
+
+def _fit_and_score(
+    estimator: BaseEstimator,
+    X_train: np.ndarray,
+    y_train: np.ndarray,
+    X_test: np.ndarray,
+    y_test: np.ndarray,
+    log_target: bool
+) -> Dict[str, Any]:
+    """Fit a clone of the estimator and score it on the original price scale."""
+    model = clone(estimator)
+    model.fit(X_train, np.log1p(y_train) if log_target else y_train)
+
+    pred_train = model.predict(X_train)
+    pred_test = model.predict(X_test)
+    if log_target:
+        pred_train = np.expm1(pred_train)
+        pred_test = np.expm1(pred_test)
+
+    return {
+        'model': model,
+        'train_r2': float(r2_score(y_train, pred_train)),
+        'test_r2': float(r2_score(y_test, pred_test)),
+        'train_rmse': float(np.sqrt(mean_squared_error(y_train, pred_train))),
+        'test_rmse': float(np.sqrt(mean_squared_error(y_test, pred_test))),
+        'test_mae': float(mean_absolute_error(y_test, pred_test)),
+        'test_mape': float(np.mean(np.abs((y_test - pred_test) / y_test)) * 100)
+    }
+
+
+def _cv_fold_score(
+    estimator: BaseEstimator,
+    X: np.ndarray,
+    y: np.ndarray,
+    train_idx: np.ndarray,
+    val_idx: np.ndarray,
+    log_target: bool
+) -> float:
+    """R² of one cross-validation fold, on the scale the model is trained on."""
+    target = np.log1p(y) if log_target else y
+    model = clone(estimator)
+    model.fit(X[train_idx], target[train_idx])
+    return float(r2_score(target[val_idx], model.predict(X[val_idx])))
+
+
+class _ImmediateResult:
+    """Stand-in for a Future when running without a process pool."""
+
+    def __init__(self, value: Any = None, error: Optional[BaseException] = None):
+        self._value = value
+        self._error = error
+
+    def result(self) -> Any:
+        if self._error is not None:
+            raise self._error
+        return self._value
+
+
+def _run_inline(fn: Callable, *args: Any) -> _ImmediateResult:
+    try:
+        return _ImmediateResult(fn(*args))
+    except Exception as e:
+        return _ImmediateResult(error=e)
+
+
+def evaluate_candidates(
+    candidates: Dict[str, BaseEstimator],
+    X_train: np.ndarray,
+    X_test: np.ndarray,
+    y_train: np.ndarray,
+    y_test: np.ndarray,
+    log_target: bool,
+    config: TrainingConfig,
+    executor: Optional[ProcessPoolExecutor] = None
+) -> Dict[str, Optional[Dict[str, Any]]]:
+    """
+    Train and cross-validate every candidate in parallel.
+
+    Each candidate's final fit and each of its cross-validation folds is a
+    separate task in the process pool, so all cores stay busy regardless of
+    how many candidates there are.
+    """
+    folds = list(KFold(n_splits=config.cv_folds).split(X_train))
+    submit: Callable = executor.submit if executor is not None else _run_inline
+
+    fit_futures = {
+        name: submit(_fit_and_score, estimator, X_train, y_train, X_test, y_test, log_target)
+        for name, estimator in candidates.items()
+    }
+    cv_futures = {
+        name: [
+            submit(_cv_fold_score, estimator, X_train, y_train, train_idx, val_idx, log_target)
+            for train_idx, val_idx in folds
+        ]
+        for name, estimator in candidates.items()
+    }
+
+    results: Dict[str, Optional[Dict[str, Any]]] = {}
+    for name in candidates:
+        try:
+            metrics = fit_futures[name].result()
+            cv_scores = np.array([future.result() for future in cv_futures[name]])
+            metrics['cv_mean'] = float(cv_scores.mean())
+            metrics['cv_std'] = float(cv_scores.std())
+            results[name] = metrics
+            logger.info(f"{name}: test R²={metrics['test_r2']:.4f}, "
+                        f"RMSE=RM {metrics['test_rmse']:,.0f}, CV R²={metrics['cv_mean']:.4f}")
+        except Exception as e:
+            logger.error(f"Training {name} failed: {str(e)}")
+            results[name] = None
+
+    return results
+
+
+def comparison_frame(results: Dict[str, Optional[Dict[str, Any]]], enhanced: bool) -> pd.DataFrame:
+    """Build the model comparison table in the notebook's CSV layout, best model first."""
+    rows = []
+    for name, metrics in results.items():
+        if metrics is None:
+            continue
+        row = {
+            'Model': name,
+            'Test R²': metrics['test_r2'],
+            'Test RMSE': metrics['test_rmse'],
+            'Test MAE': metrics['test_mae']
+        }
+        if enhanced:
+            row['Test MAPE'] = metrics['test_mape']
+        row['CV R² Mean'] = metrics['cv_mean']
+        row['CV R² Std'] = metrics['cv_std']
+        overfitting_column = 'Overfitting' if enhanced else 'Overfitting (Train R² - Test R²)'
+        row[overfitting_column] = metrics['train_r2'] - metrics['test_r2']
+        rows.append(row)
+
+    return pd.DataFrame(rows).sort_values('Test R²', ascending=False).reset_index(drop=True)
+
+
+def normalization_frame(results_by_method: Dict[str, Dict[str, Optional[Dict[str, Any]]]]) -> pd.DataFrame:
+    """Build the normalization method comparison table in the notebook's CSV layout."""
+    rows = []
+    for method, results in results_by_method.items():
+        for name, metrics in results.items():
+            if metrics is None:
+                continue
+            rows.append({
+                'Normalization_Method': method,
+                'Model': name,
+                'Test_R2': metrics['test_r2'],
+                'Test_RMSE': metrics['test_rmse'],
+                'Test_MAE': metrics['test_mae'],
+                'CV_R2_Mean': metrics['cv_mean'],
+                'CV_R2_Std': metrics['cv_std']
+            })
+    return pd.DataFrame(rows)
+
+
+def build_deployment_artifact(
+    preprocessor: ImprovedDataPreprocessor,
+    model_name: str,
+    metrics: Dict[str, Any],
+    scaler: Any,
+    use_log_transform: bool
+) -> Dict[str, Any]:
+    """Build the deployment dictionary loaded by PropertyPricePredictionModel."""
+    performance_metrics = {key: value for key, value in metrics.items() if key != 'model'}
+    return {
+        'preprocessor': preprocessor,
+        'model': metrics['model'],
+        'scaler': scaler,
+        'feature_names': preprocessor.feature_names,
+        'model_name': model_name,
+        'use_log_transform': use_log_transform,
+        'performance_metrics': performance_metrics
+    }
+
+
+def _scale(
+    scaler: Any,
+    split: DatasetSplit,
+    cache: Optional[StageCache] = None,
+    split_key: str = ''
+) -> Tuple[Any, np.ndarray, np.ndarray]:
+    if cache is not None and split_key:
+        key = cache.key('scale', [split_key], {
+            'scaler': type(scaler).__name__,
+            'params': scaler.get_params()
+        })
+        cached = cache.get(key)
+        if cached is not None:
+            return cached['scaler'], cached['X_train'], cached['X_test']
+
+    X_train = scaler.fit_transform(split.X_train)
+    X_test = scaler.transform(split.X_test)
+
+    if cache is not None and split_key:
+        cache.put(key, {'X_train': X_train, 'X_test': X_test}, {'scaler': scaler})
+    return scaler, X_train, X_test
+
+
+def run_training(config: TrainingConfig) -> Dict[str, Any]:
+    """
+    Run the full training flow and write artifacts and comparison reports.
+
+    Returns:
+        Dictionary with the written paths and the comparison tables
+    """
+    cache = StageCache(config.cache_dir, config.cache_max_bytes) if config.cache_dir else None
+
+    logger.info(f"Loading training data from {config.data_path}")
+    preprocessor, df_processed, preprocess_key = preprocess_stage(config, cache)
+    split, split_key = split_stage(df_processed, config, cache, preprocess_key)
+    logger.info(f"Training on {len(split.X_train):,} rows, testing on {len(split.X_test):,} rows "
+                f"with features {split.feature_names}")
+
+    y_train = split.y_train.to_numpy(dtype=float)
+    y_test = split.y_test.to_numpy(dtype=float)
+
+    minmax_scaler, X_train_minmax, X_test_minmax = _scale(MinMaxScaler(), split, cache, split_key)
+    robust_scaler, X_train_robust, X_test_robust = _scale(RobustScaler(), split, cache, split_key)
+
+    n_jobs = max(1, config.n_jobs)
+    executor = ProcessPoolExecutor(max_workers=n_jobs) if n_jobs > 1 else None
+    try:
+        standard_results = evaluate_candidates(
+            standard_candidates(config.random_state),
+            X_train_minmax, X_test_minmax, y_train, y_test,
+            log_target=False, config=config, executor=executor
+        )
+        enhanced_results = evaluate_candidates(
+            enhanced_candidates(config.random_state),
+            X_train_robust, X_test_robust, y_train, y_test,
+            log_target=True, config=config, executor=executor
+        )
+
+        normalization_results = None
+        if config.compare_normalization:
+            _, X_train_std, X_test_std = _scale(StandardScaler(), split, cache, split_key)
+            normalization_results = {
+                'MinMaxScaler (0-1)': standard_results,
+                'StandardScaler (z-score)': evaluate_candidates(
+                    standard_candidates(config.random_state),
+                    X_train_std, X_test_std, y_train, y_test,
+                    log_target=False, config=config, executor=executor
+                )
+            }
+    finally:
+        if executor is not None:
+            executor.shutdown()
+
+    standard_df = comparison_frame(standard_results, enhanced=False)
+    enhanced_df = comparison_frame(enhanced_results, enhanced=True)
+    if standard_df.empty or enhanced_df.empty:
+        raise RuntimeError("No candidate model trained successfully")
+
+    standard_artifacts = {
+        name: build_deployment_artifact(preprocessor, name, metrics, minmax_scaler, use_log_transform=False)
+        for name, metrics in standard_results.items() if metrics is not None
+    }
+    enhanced_artifacts = {
+        name: build_deployment_artifact(preprocessor, name, metrics, robust_scaler, use_log_transform=True)
+        for name, metrics in enhanced_results.items() if metrics is not None
+    }
+
+    # Serving cost is measured after the pool is gone, so models do not compete for cores
+    standard_report = serving_report('standard', standard_results, standard_artifacts, X_test_minmax,
+                                     config.latency_slo_ms, config.latency_repeats, config.random_state)
+    enhanced_report = serving_report('enhanced', enhanced_results, enhanced_artifacts, X_test_robust,
+                                     config.latency_slo_ms, config.latency_repeats, config.random_state)
+    serving_df = pd.concat([enhanced_report, standard_report], ignore_index=True)
+
+    best_standard = select_model(standard_report, config.latency_slo_ms)
+    best_enhanced = select_model(enhanced_report, config.latency_slo_ms)
+
+    output_dir = Path(config.output_dir)
+    reports_dir = Path(config.reports_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+    reports_dir.mkdir(parents=True, exist_ok=True)
+
+    paths = {
+        'standard_artifact': output_dir / STANDARD_ARTIFACT_FILENAME,
+        'enhanced_artifact': output_dir / ENHANCED_ARTIFACT_FILENAME,
+        'standard_comparison': reports_dir / STANDARD_COMPARISON_FILENAME,
+        'enhanced_comparison': reports_dir / ENHANCED_COMPARISON_FILENAME,
+        'serving_report': reports_dir / SERVING_REPORT_FILENAME
+    }
+
+    # Both deployed pipelines carry the training listings for their comparables index
+    # and the training feature distribution for drift detection
+    training_data = {
+        COMPARABLES_KEY: comparables_payload(df_processed, preprocessor.feature_names),
+        DRIFT_BASELINE_KEY: drift_baseline(df_processed, preprocessor.feature_names, preprocessor.label_encoders)
+    }
+    joblib.dump({**standard_artifacts[best_standard], **training_data}, paths['standard_artifact'])
+    joblib.dump({**enhanced_artifacts[best_enhanced], **training_data}, paths['enhanced_artifact'])
+    standard_df.to_csv(paths['standard_comparison'], index=False)
+    enhanced_df.to_csv(paths['enhanced_comparison'], index=False)
+    serving_df.to_csv(paths['serving_report'], index=False)
+
+    normalization_df = None
+    if normalization_results is not None:
+        paths['normalization_comparison'] = reports_dir / NORMALIZATION_COMPARISON_FILENAME
+        normalization_df = normalization_frame(normalization_results)
+        normalization_df.to_csv(paths['normalization_comparison'], index=False)
+
+    logger.info(f"Best standard model: {best_standard}, best enhanced model: {best_enhanced}")
+
+    return {
+        'paths': {key: str(path) for key, path in paths.items()},
+        'best_standard_model': best_standard,
+        'best_enhanced_model': best_enhanced,
+        'standard_comparison': standard_df,
+        'enhanced_comparison': enhanced_df,
+        'normalization_comparison': normalization_df,
+        'serving_report': serving_df,
+        'cache': cache.get_stats() if cache is not None else None
+    }
+
+
+def run_comparables_index(
+    artifact_path: str,
+    config: TrainingConfig,
+    output_path: Optional[str] = None
+) -> Dict[str, Any]:
+    """
+    Add the comparable listings and the drift baseline to an existing deployment artifact.
+
+    The training data is preprocessed again from ``config.data_path`` with the
+    artifact's outlier percentiles (through the stage cache); the refitted
+    label encoders must match the artifact's, otherwise the encoded listings
+    would not line up with the model's categories.
+
+    Returns:
+        Dictionary with the written path and the number of listings
+    """
+    artifact = joblib.load(artifact_path)
+    preprocessor = artifact['preprocessor']
+    config.remove_outliers = getattr(preprocessor, 'remove_outliers', config.remove_outliers)
+    config.price_percentile = getattr(preprocessor, 'price_percentile', config.price_percentile)
+    config.area_percentile = getattr(preprocessor, 'area_percentile', config.area_percentile)
+
+    cache = StageCache(config.cache_dir, config.cache_max_bytes) if config.cache_dir else None
+    refitted, df_processed, _ = preprocess_stage(config, cache)
+    for col, encoder in getattr(preprocessor, 'label_encoders', {}).items():
+        refitted_encoder = refitted.label_encoders.get(col)
+        if refitted_encoder is None or list(refitted_encoder.classes_) != list(encoder.classes_):
+            raise ValueError(f"Categories of '{col}' in {config.data_path} differ from the artifact's; "
+                             f"use the data the artifact was trained on")
+
+    artifact[COMPARABLES_KEY] = comparables_payload(df_processed, artifact['feature_names'])
+    artifact[DRIFT_BASELINE_KEY] = drift_baseline(df_processed, artifact['feature_names'],
+                                                  getattr(preprocessor, 'label_encoders', {}))
+    output_path = Path(output_path) if output_path else Path(artifact_path)
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+    joblib.dump(artifact, output_path)
+    logger.info(f"Added {len(df_processed):,} comparable listings to {output_path}")
+
+    return {
+        'paths': {'artifact': str(output_path)},
+        'listings': len(df_processed)
+    }
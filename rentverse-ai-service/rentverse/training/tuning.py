@@ -0,0 +1,354 @@
+"""
+Hyperparameter Search for Rentverse Models
+==========================================
+
+This module runs a successive-halving random search over the candidate
+regressors of the training pipeline. The data is preprocessed and scaled once
+(through the stage cache), written to ``.npy`` files together with the
+cross-validation fold indices, and memory-mapped by the worker processes, so
+trials only ship an estimator and a fold number. Each rung trains the surviving
+configurations on more rows and drops all but the best 1/eta of them. The
+finalists are refit on the full training set and reported with their test
+accuracy and measured inference latency.
+"""
+
+import json
+import logging
+import math
+import shutil
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+from sklearn.base import BaseEstimator, clone
+from sklearn.metrics import r2_score
+from sklearn.model_selection import KFold
+from sklearn.preprocessing import MinMaxScaler, RobustScaler
+
+from .cache import StageCache
+from .latency import measure_latency
+from .trainer import (
+    TrainingConfig,
+    _fit_and_score,
+    _run_inline,
+    _scale,
+    enhanced_candidates,
+    preprocess_stage,
+    split_stage,
+    standard_candidates
+)
+
+logger = logging.getLogger(__name__)
+
+TRIALS_FILENAME = "hyperparameter_trials.csv"
+SUMMARY_FILENAME = "hyperparameter_tuning_summary.csv"
+
+# Discrete search spaces sampled uniformly per parameter
+SEARCH_SPACES: Dict[str, Dict[str, List[Any]]] = {
+    'Ridge Regression': {
+        'alpha': [0.01, 0.1, 1.0, 10.0, 100.0]
+    },
+    'Random Forest': {
+        'n_estimators': [50, 100, 200, 300],
+        'max_depth': [None, 8, 10, 15, 20],
+        'min_samples_split': [2, 5, 10],
+        'min_samples_leaf': [1, 2, 5],
+        'max_features': [None, 'sqrt', 0.5]
+    },
+    'Gradient Boosting': {
+        'n_estimators': [50, 100, 200, 300, 500],
+        'max_depth': [3, 4, 5, 6, 8],
+        'learning_rate': [0.02, 0.05, 0.1, 0.2],
+        'subsample': [0.6, 0.8, 1.0],
+        'min_samples_leaf': [1, 2, 5, 10],
+        'max_features': [None, 'sqrt']
+    },
+    'Extra Trees': {
+        'n_estimators': [50, 100, 200, 300],
+        'max_depth': [None, 10, 15, 20, 25],
+        'min_samples_split': [2, 5, 10],
+        'min_samples_leaf': [1, 2, 5],
+        'max_features': [None, 'sqrt', 0.5]
+    }
+}
+
+
+@dataclass
+class TuningConfig(TrainingConfig):
+    """Settings for a hyperparameter search run."""
+
+    models: Optional[List[str]] = None
+    n_trials: int = 20
+    eta: int = 3
+    min_rows: int = 500
+    log_target: bool = False
+
+
+# Memory-mapped arrays opened by this process, keyed by path
+_SHARED_ARRAYS: Dict[str, np.ndarray] = {}
+
+
+def _shared_array(path: str) -> np.ndarray:
+    array = _SHARED_ARRAYS.get(path)
+    if array is None:
+        array = _SHARED_ARRAYS[path] = np.load(path, mmap_mode='r')
+    return array
+
+
+class SharedFolds:
+    """
+    Training matrix, target and cross-validation folds stored as ``.npy``
+    files that worker processes memory-map instead of receiving pickled
+    copies. Fold training indices are shuffled once, so a prefix of them is a
+    random subsample for the smaller rungs.
+    """
+
+    def __init__(self, X: np.ndarray, y: np.ndarray, cv_folds: int, random_state: int, work_dir: str):
+        self.work_dir = Path(work_dir)
+        self.work_dir.mkdir(parents=True, exist_ok=True)
+        self.n_folds = cv_folds
+
+        np.save(self.work_dir / "X.npy", np.ascontiguousarray(X, dtype=float))
+        np.save(self.work_dir / "y.npy", np.ascontiguousarray(y, dtype=float))
+
+        rng = np.random.default_rng(random_state)
+        self.train_sizes = []
+        for fold, (train_idx, val_idx) in enumerate(KFold(n_splits=cv_folds).split(X)):
+            np.save(self.work_dir / f"fold{fold}_train.npy", rng.permutation(train_idx))
+            np.save(self.work_dir / f"fold{fold}_val.npy", val_idx)
+            self.train_sizes.append(len(train_idx))
+
+    @property
+    def max_rows(self) -> int:
+        return min(self.train_sizes)
+
+    def paths(self, fold: int) -> Tuple[str, str, str, str]:
+        return (
+            str(self.work_dir / "X.npy"),
+            str(self.work_dir / "y.npy"),
+            str(self.work_dir / f"fold{fold}_train.npy"),
+            str(self.work_dir / f"fold{fold}_val.npy")
+        )
+
+    def cleanup(self) -> None:
+        shutil.rmtree(self.work_dir, ignore_errors=True)
+
+
+def _trial_fold_score(estimator: BaseEstimator, paths: Tuple[str, str, str, str], n_rows: int,
+                      log_target: bool) -> float:
+    """R² of one configuration on one fold, trained on the first n_rows fold rows."""
+    X_path, y_path, train_path, val_path = paths
+    X, y = _shared_array(X_path), _shared_array(y_path)
+    train_idx = _shared_array(train_path)[:n_rows]
+    val_idx = _shared_array(val_path)
+
+    target = np.log1p(y) if log_target else y
+    model = clone(estimator)
+    model.fit(X[train_idx], target[train_idx])
+    return float(r2_score(target[val_idx], model.predict(X[val_idx])))
+
+
+def sample_configurations(space: Dict[str, List[Any]], n_trials: int, rng: np.random.Generator) -> List[Dict[str, Any]]:
+    """Draw up to n_trials distinct parameter combinations from a discrete space."""
+    n_combinations = math.prod(len(values) for values in space.values())
+    configs: List[Dict[str, Any]] = []
+    seen = set()
+    while len(configs) < min(n_trials, n_combinations):
+        params = {name: values[rng.integers(len(values))] for name, values in space.items()}
+        signature = json.dumps(params, sort_keys=True, default=str)
+        if signature not in seen:
+            seen.add(signature)
+            configs.append(params)
+    return configs
+
+
+def halving_schedule(n_configs: int, max_rows: int, min_rows: int, eta: int) -> List[int]:
+    """Rows per rung: each rung multiplies the budget by eta and ends at max_rows."""
+    min_rows = max(1, min(min_rows, max_rows))
+    n_rungs = 1 + min(
+        int(math.log(max(n_configs, 1), eta)) if n_configs > 1 else 0,
+        int(math.log(max_rows / min_rows, eta))
+    )
+    return [max(min_rows, int(max_rows / eta ** (n_rungs - 1 - rung))) for rung in range(n_rungs)]
+
+
+def successive_halving(
+    bases: Dict[str, BaseEstimator],
+    configs: Dict[str, List[Dict[str, Any]]],
+    folds: SharedFolds,
+    config: TuningConfig,
+    executor: Optional[ProcessPoolExecutor] = None
+) -> List[Dict[str, Any]]:
+    """
+    Run successive halving for every model, rung by rung.
+
+    All trials of a rung (across models, configurations and folds) run in
+    parallel. After each rung only the best ceil(n/eta) configurations of each
+    model continue; the others are recorded as stopped at that rung.
+
+    Returns:
+        One record per configuration with its last rung and CV scores
+    """
+    submit: Callable = executor.submit if executor is not None else _run_inline
+    trials = {
+        name: [{'Model': name, 'params': params, 'rung': -1, 'rows': 0, 'cv_mean': np.nan, 'cv_std': np.nan}
+               for params in model_configs]
+        for name, model_configs in configs.items()
+    }
+    schedules = {
+        name: halving_schedule(len(model_trials), folds.max_rows, config.min_rows, config.eta)
+        for name, model_trials in trials.items()
+    }
+    alive = {name: list(range(len(model_trials))) for name, model_trials in trials.items()}
+
+    for rung in range(max(len(schedule) for schedule in schedules.values())):
+        futures = {}
+        for name, indices in alive.items():
+            if rung >= len(schedules[name]):
+                continue
+            n_rows = schedules[name][rung]
+            for index in indices:
+                estimator = clone(bases[name]).set_params(**trials[name][index]['params'])
+                futures[(name, index)] = (n_rows, [
+                    submit(_trial_fold_score, estimator, folds.paths(fold), n_rows, config.log_target)
+                    for fold in range(folds.n_folds)
+                ])
+
+        for (name, index), (n_rows, fold_futures) in futures.items():
+            record = trials[name][index]
+            try:
+                scores = np.array([future.result() for future in fold_futures])
+                record.update(rung=rung, rows=n_rows, cv_mean=float(scores.mean()), cv_std=float(scores.std()))
+            except Exception as e:
+                logger.error(f"{name} trial {record['params']} failed: {str(e)}")
+                record.update(rung=rung, rows=n_rows, cv_mean=-np.inf)
+
+        for name in list(alive):
+            if rung >= len(schedules[name]) - 1:
+                continue
+            ranked = sorted(alive[name], key=lambda index: trials[name][index]['cv_mean'], reverse=True)
+            alive[name] = ranked[:max(1, math.ceil(len(ranked) / config.eta))]
+            logger.info(f"{name}: rung {rung} ({schedules[name][rung]:,} rows) kept {len(alive[name])} "
+                        f"of {len(ranked)} configurations")
+
+    # At most eta finalists per model go on to the full refit
+    for name, indices in alive.items():
+        ranked = sorted(indices, key=lambda index: trials[name][index]['cv_mean'], reverse=True)
+        for index in ranked[:config.eta]:
+            trials[name][index]['finalist'] = True
+
+    return [record for model_trials in trials.values() for record in model_trials]
+
+
+def trials_frame(trials: List[Dict[str, Any]]) -> pd.DataFrame:
+    """Table of every configuration tried, best first within each model."""
+    rows = [{
+        'Model': trial['Model'],
+        'Params': json.dumps(trial['params'], sort_keys=True, default=str),
+        'Rung Reached': trial['rung'],
+        'Training Rows': trial['rows'],
+        'CV R² Mean': trial['cv_mean'],
+        'CV R² Std': trial['cv_std'],
+        'Status': 'finalist' if trial.get('finalist') else 'stopped early'
+    } for trial in trials]
+    return pd.DataFrame(rows).sort_values(
+        ['Model', 'Rung Reached', 'CV R² Mean'], ascending=[True, False, False]
+    ).reset_index(drop=True)
+
+
+def run_tuning(config: TuningConfig) -> Dict[str, Any]:
+    """
+    Run the hyperparameter search and write the trial and summary reports.
+
+    Returns:
+        Dictionary with the written paths and the trial and summary tables
+    """
+    cache = StageCache(config.cache_dir, config.cache_max_bytes) if config.cache_dir else None
+    _, df_processed, preprocess_key = preprocess_stage(config, cache)
+    split, split_key = split_stage(df_processed, config, cache, preprocess_key)
+
+    scaler = RobustScaler() if config.log_target else MinMaxScaler()
+    _, X_train, X_test = _scale(scaler, split, cache, split_key)
+    y_train = split.y_train.to_numpy(dtype=float)
+    y_test = split.y_test.to_numpy(dtype=float)
+
+    # Base estimators carry the fixed settings (e.g. Extra Trees' bootstrap=False);
+    # models missing from one pipeline's candidates come from the other's
+    standard = standard_candidates(config.random_state)
+    enhanced = enhanced_candidates(config.random_state)
+    candidates = {**standard, **enhanced} if config.log_target else {**enhanced, **standard}
+    bases = {name: estimator for name, estimator in candidates.items()
+             if name in SEARCH_SPACES and (not config.models or name in config.models)}
+    if not bases:
+        raise ValueError(f"No tunable models selected; choose from {sorted(SEARCH_SPACES)}")
+
+    rng = np.random.default_rng(config.random_state)
+    configs = {name: sample_configurations(SEARCH_SPACES[name], config.n_trials, rng) for name in bases}
+
+    folds = SharedFolds(X_train, y_train, config.cv_folds, config.random_state,
+                        tempfile.mkdtemp(prefix="rentverse-tune-"))
+    n_jobs = max(1, config.n_jobs)
+    executor = ProcessPoolExecutor(max_workers=n_jobs) if n_jobs > 1 else None
+    submit: Callable = executor.submit if executor is not None else _run_inline
+    try:
+        logger.info(f"Tuning {list(bases)} with {config.n_trials} trials each on {len(X_train):,} rows")
+        trials = successive_halving(bases, configs, folds, config, executor)
+
+        finalists = [trial for trial in trials if trial.get('finalist') and np.isfinite(trial['cv_mean'])]
+        fit_futures = [
+            submit(_fit_and_score, clone(bases[trial['Model']]).set_params(**trial['params']),
+                   X_train, y_train, X_test, y_test, config.log_target)
+            for trial in finalists
+        ]
+        fitted = []
+        for trial, future in zip(finalists, fit_futures):
+            try:
+                fitted.append((trial, future.result()))
+            except Exception as e:
+                logger.error(f"Refitting {trial['Model']} {trial['params']} failed: {str(e)}")
+    finally:
+        if executor is not None:
+            executor.shutdown()
+        folds.cleanup()
+
+    # Latency is measured serially after the pool is gone, so trials do not compete for cores
+    summary_rows = []
+    for trial, metrics in fitted:
+        latency = measure_latency(metrics['model'], X_test, repeats=config.latency_repeats,
+                                  random_state=config.random_state)
+        summary_rows.append({
+            'Model': trial['Model'],
+            'Params': json.dumps(trial['params'], sort_keys=True, default=str),
+            'CV R² Mean': trial['cv_mean'],
+            'Test R²': metrics['test_r2'],
+            'Test RMSE': metrics['test_rmse'],
+            'Test MAE': metrics['test_mae'],
+            'Single p50 (ms)': latency['single_p50_ms'],
+            'Single p99 (ms)': latency['single_p99_ms'],
+            f"Batch-{latency['batch_size']} p50 (ms)": latency['batch_p50_ms']
+        })
+    if not summary_rows:
+        raise RuntimeError("No configuration trained successfully")
+
+    summary_df = pd.DataFrame(summary_rows).sort_values('Test R²', ascending=False).reset_index(drop=True)
+    trial_df = trials_frame(trials)
+
+    reports_dir = Path(config.reports_dir)
+    reports_dir.mkdir(parents=True, exist_ok=True)
+    paths = {
+        'trials': reports_dir / TRIALS_FILENAME,
+        'summary': reports_dir / SUMMARY_FILENAME
+    }
+    trial_df.to_csv(paths['trials'], index=False)
+    summary_df.to_csv(paths['summary'], index=False)
+
+    return {
+        'paths': {key: str(path) for key, path in paths.items()},
+        'trials': trial_df,
+        'summary': summary_df,
+        'cache': cache.get_stats() if cache is not None else None
+    }
@@ -15,7 +15,44 @@ from .preprocessor import (
     ImprovedDataPreprocessor,
     create_preprocessor,
     preprocess_property_data,
-    validate_property_data
+    validate_property_data,
+    validate_property_columns
+)
+
+from .sketches import QuantileSketch
+
+from .singleflight import (
+    SingleFlight,
+    get_singleflight,
+    singleflight_stats
+)
+
+from .audit import (
+    AuditLog,
+    ColumnRows,
+    get_audit_log,
+    close_audit_log,
+    audit_predictions,
+    query_audit
+)
+
+from .profiler import (
+    SamplingProfiler,
+    RouteTagMiddleware,
+    stage,
+    profiling_active
+)
+
+from .memory import (
+    AllocationTracker,
+    deep_sizeof,
+    get_allocation_tracker,
+    process_memory
+)
+
+from .location import (
+    LocationEngine,
+    GAZETTEER
 )
 
 __all__ = [
@@ -31,5 +68,38 @@ __all__ = [
     'ImprovedDataPreprocessor',
     'create_preprocessor',
     'preprocess_property_data',
-    'validate_property_data'
+    'validate_property_data',
+    'validate_property_columns',
+
+    # Streaming sketches
+    'QuantileSketch',
+
+    # Request coalescing
+    'SingleFlight',
+    'get_singleflight',
+    'singleflight_stats',
+
+    # Prediction audit log
+    'AuditLog',
+    'ColumnRows',
+    'get_audit_log',
+    'close_audit_log',
+    'audit_predictions',
+    'query_audit',
+
+    # Sampling profiler
+    'SamplingProfiler',
+    'RouteTagMiddleware',
+    'stage',
+    'profiling_active',
+
+    # Memory accounting
+    'AllocationTracker',
+    'deep_sizeof',
+    'get_allocation_tracker',
+    'process_memory',
+
+    # Location normalization
+    'LocationEngine',
+    'GAZETTEER'
 ]
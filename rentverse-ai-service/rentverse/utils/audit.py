@@ -0,0 +1,483 @@
+"""
+Prediction audit log for RentVerse AI Service.
+
+Requests hand their inputs, outputs, model version and latency to an
+AuditLog, which only appends them to an in-memory buffer: a deque, whose
+append and popleft are atomic in CPython, so producers never take a lock. A
+background thread drains the buffer in batches, normalizes the inputs, and
+appends one JSON line per prediction to segment files that are rotated by
+size and age. When the buffer is full, records are dropped and counted
+instead of slowing requests down.
+
+Segments are named audit-<start time>-<pid>-<n>.jsonl, so several workers can
+share one directory; query_audit reads them back filtered by time range and
+listing attributes.
+"""
+
+import atexit
+import itertools
+import json
+import logging
+import os
+import threading
+import time
+import uuid
+from collections import deque
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence
+
+from .memory import deep_sizeof
+
+logger = logging.getLogger(__name__)
+
+DURABILITY_MODES = ('none', 'flush', 'fsync')
+SEGMENT_PREFIX = 'audit-'
+SEGMENT_SUFFIX = '.jsonl'
+SEGMENT_TIME_FORMAT = '%Y%m%dT%H%M%S'
+
+
+class AuditLog:
+    """
+    Append-only prediction audit log with a background batch writer.
+
+    Parameters:
+    -----------
+    directory : str
+        Directory for the segment files
+    buffer_size : int, default=65536
+        Requests held in memory before new ones are dropped
+    batch_size : int, default=1024
+        Requests written per batch; a full batch wakes the writer early
+    flush_interval : float, default=1.0
+        Seconds between writer runs
+    durability : str, default='flush'
+        'none' leaves batches in the file buffer until rotation or close,
+        'flush' hands every batch to the OS (survives a process crash),
+        'fsync' also syncs every batch to disk (survives a power loss)
+    segment_max_bytes : int, default=64 MB
+        Size at which a segment is closed and a new one started
+    segment_max_seconds : float, default=3600
+        Age at which a segment is closed and a new one started
+    max_segments : int, default=168
+        Segments kept in the directory; the oldest are deleted
+    """
+
+    def __init__(
+        self,
+        directory: str,
+        buffer_size: int = 65536,
+        batch_size: int = 1024,
+        flush_interval: float = 1.0,
+        durability: str = 'flush',
+        segment_max_bytes: int = 64 * 1024 * 1024,
+        segment_max_seconds: float = 3600.0,
+        max_segments: int = 168
+    ):
+        if durability not in DURABILITY_MODES:
+            raise ValueError(f"durability must be one of {DURABILITY_MODES}, got {durability!r}")
+        self.directory = Path(directory)
+        self.buffer_size = buffer_size
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.durability = durability
+        self.segment_max_bytes = segment_max_bytes
+        self.segment_max_seconds = segment_max_seconds
+        self.max_segments = max_segments
+
+        self._buffer: deque = deque()
+        # next() on itertools.count is atomic in CPython, so producers need no lock
+        self._accepted = itertools.count()
+        self._dropped = itertools.count()
+        self._wake = threading.Event()
+        self._stopping = threading.Event()
+        self._idle = threading.Condition()
+        self._thread: Optional[threading.Thread] = None
+
+        self._file = None
+        self._segment_path: Optional[Path] = None
+        self._segment_started = 0.0
+        self._segment_bytes = 0
+        self._segment_number = 0
+        self.written = 0
+        self.batches = 0
+        self.bytes_written = 0
+        self.write_errors = 0
+        self.lost = 0
+        self.last_flush: Optional[float] = None
+
+    # Producer side
+
+    def record(
+        self,
+        endpoint: str,
+        model_version: str,
+        inputs: Sequence[Dict[str, Any]],
+        outputs: Sequence[Any],
+        latency_ms: float,
+        normalize: Optional[Callable[[Dict[str, Any]], Optional[Dict[str, Any]]]] = None
+    ) -> bool:
+        """
+        Queue the predictions of one request; never blocks.
+
+        Parameters:
+            endpoint: Route that served the request
+            model_version: Version of the model that predicted
+            inputs: Input of every prediction in the request
+            outputs: Output of every prediction, in the same order
+            latency_ms: Time the request spent predicting
+            normalize: Function giving the normalized features of an input,
+                called on the writer thread
+
+        Returns:
+            False if the buffer was full and the request was dropped
+        """
+        if len(self._buffer) >= self.buffer_size:
+            next(self._dropped)
+            return False
+        self._buffer.append((time.time(), endpoint, model_version, inputs, outputs, latency_ms, normalize))
+        next(self._accepted)
+        if len(self._buffer) >= self.batch_size:
+            self._wake.set()
+        return True
+
+    # Writer side
+
+    def start(self) -> 'AuditLog':
+        """Start the background writer."""
+        if self._thread is None or not self._thread.is_alive():
+            self.directory.mkdir(parents=True, exist_ok=True)
+            self._stopping.clear()
+            self._thread = threading.Thread(target=self._run, name='audit-writer', daemon=True)
+            self._thread.start()
+        return self
+
+    def _run(self) -> None:
+        while not self._stopping.is_set():
+            self._wake.wait(self.flush_interval)
+            self._wake.clear()
+            self._drain()
+        self._drain()
+        self._close_segment()
+
+    def _drain(self) -> None:
+        while self._buffer:
+            batch = []
+            while self._buffer and len(batch) < self.batch_size:
+                batch.append(self._buffer.popleft())
+            self._write_batch(batch)
+        with self._idle:
+            self._idle.notify_all()
+
+    @staticmethod
+    def _lines(entry: tuple) -> List[str]:
+        timestamp, endpoint, model_version, inputs, outputs, latency_ms, normalize = entry
+        request_id = uuid.uuid4().hex
+        base = {
+            'ts': round(timestamp, 6),
+            'time': datetime.fromtimestamp(timestamp).isoformat(),
+            'request_id': request_id,
+            'endpoint': endpoint,
+            'model_version': model_version,
+            'latency_ms': round(latency_ms, 3)
+        }
+        lines = []
+        for i, (data, output) in enumerate(zip(inputs, outputs)):
+            features = None
+            if normalize is not None:
+                try:
+                    features = normalize(data)
+                except Exception:
+                    features = None
+            line = {**base, 'input': data, 'features': features, 'output': output}
+            if len(inputs) > 1:
+                line['batch_index'] = i
+            lines.append(json.dumps(line, default=str, separators=(',', ':')))
+        return lines
+
+    def _write_batch(self, batch: List[tuple]) -> None:
+        lines = []
+        for entry in batch:
+            try:
+                lines.extend(self._lines(entry))
+            except Exception as e:
+                self.lost += len(entry[3])
+                logger.warning(f"Could not serialize audit record: {str(e)}")
+        if not lines:
+            return
+
+        payload = ('\n'.join(lines) + '\n').encode('utf-8')
+        try:
+            handle = self._segment(len(payload))
+            handle.write(payload)
+            if self.durability in ('flush', 'fsync'):
+                handle.flush()
+            if self.durability == 'fsync':
+                os.fsync(handle.fileno())
+        except OSError as e:
+            self.write_errors += 1
+            self.lost += len(lines)
+            logger.error(f"Audit log write failed, {len(lines)} records lost: {str(e)}")
+            self._close_segment()
+            return
+
+        self._segment_bytes += len(payload)
+        self.bytes_written += len(payload)
+        self.written += len(lines)
+        self.batches += 1
+        self.last_flush = time.time()
+
+    def _segment(self, incoming: int):
+        """Current segment file, rotated when it is too large or too old."""
+        now = time.time()
+        if self._file is not None and (
+            self._segment_bytes + incoming > self.segment_max_bytes
+            or now - self._segment_started >= self.segment_max_seconds
+        ):
+            self._close_segment()
+        if self._file is None:
+            self._segment_number += 1
+            started = datetime.fromtimestamp(now).strftime(SEGMENT_TIME_FORMAT)
+            name = f"{SEGMENT_PREFIX}{started}-{os.getpid()}-{self._segment_number:04d}{SEGMENT_SUFFIX}"
+            self._segment_path = self.directory / name
+            self._file = open(self._segment_path, 'ab')
+            self._segment_started = now
+            self._segment_bytes = 0
+            self._enforce_retention()
+        return self._file
+
+    def _close_segment(self) -> None:
+        if self._file is None:
+            return
+        try:
+            self._file.flush()
+            if self.durability == 'fsync':
+                os.fsync(self._file.fileno())
+            self._file.close()
+        except OSError as e:
+            logger.error(f"Closing audit segment failed: {str(e)}")
+        self._file = None
+
+    def _enforce_retention(self) -> None:
+        segments = list_segments(self.directory)
+        for path in segments[:max(0, len(segments) - self.max_segments)]:
+            try:
+                path.unlink()
+            except OSError:
+                pass
+
+    def flush(self, timeout: float = 5.0) -> bool:
+        """Wake the writer and wait until the buffer is empty; False on timeout."""
+        if self._thread is None or not self._thread.is_alive():
+            return not self._buffer
+        deadline = time.monotonic() + timeout
+        with self._idle:
+            while self._buffer:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return False
+                self._wake.set()
+                self._idle.wait(min(remaining, 0.1))
+        return True
+
+    def close(self, timeout: float = 5.0) -> None:
+        """Write what is buffered, close the segment and stop the writer."""
+        if self._thread is None:
+            return
+        self._stopping.set()
+        self._wake.set()
+        self._thread.join(timeout)
+        if self._thread.is_alive():
+            logger.warning(f"Audit writer did not stop within {timeout}s, {len(self._buffer)} requests unwritten")
+
+    def buffered_bytes(self) -> int:
+        """Approximate memory held by the requests waiting to be written."""
+        return deep_sizeof(list(self._buffer))
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get buffer, throughput, rotation and loss counters."""
+        accepted = _count_value(self._accepted)
+        dropped = _count_value(self._dropped)
+        offered = accepted + dropped
+        return {
+            'directory': str(self.directory),
+            'durability': self.durability,
+            'running': self._thread is not None and self._thread.is_alive(),
+            'buffered': len(self._buffer),
+            'buffer_size': self.buffer_size,
+            'accepted': accepted,
+            'dropped': dropped,
+            'drop_rate': dropped / offered if offered else 0.0,
+            'written': self.written,
+            'lost': self.lost,
+            'write_errors': self.write_errors,
+            'batches': self.batches,
+            'bytes_written': self.bytes_written,
+            'segment': str(self._segment_path) if self._segment_path else None,
+            'segments': len(list_segments(self.directory)),
+            'last_flush': datetime.fromtimestamp(self.last_flush).isoformat() if self.last_flush else None
+        }
+
+
+def _count_value(counter: 'itertools.count') -> int:
+    # A count can only be read without advancing it through its repr, 'count(n)'
+    return int(repr(counter)[6:-1])
+
+
+def list_segments(directory: Any) -> List[Path]:
+    """Segment files in a directory, oldest first."""
+    directory = Path(directory)
+    if not directory.is_dir():
+        return []
+    return sorted(directory.glob(f"{SEGMENT_PREFIX}*{SEGMENT_SUFFIX}"))
+
+
+def _segment_start(path: Path) -> Optional[float]:
+    try:
+        stamp = path.name[len(SEGMENT_PREFIX):].split('-', 1)[0]
+        return datetime.strptime(stamp, SEGMENT_TIME_FORMAT).timestamp()
+    except ValueError:
+        return None
+
+
+def _matches(record: Dict[str, Any], filters: Dict[str, Any]) -> bool:
+    features = record.get('features') or {}
+    data = record.get('input') or {}
+    for key, expected in filters.items():
+        value = features.get(key, data.get(key, record.get(key)))
+        if value is None or str(value).lower() != str(expected).lower():
+            return False
+    return True
+
+
+def _price(record: Dict[str, Any]) -> Optional[float]:
+    output = record.get('output')
+    if isinstance(output, dict):
+        output = output.get('predicted_price')
+    return float(output) if isinstance(output, (int, float)) else None
+
+
+def query_audit(
+    directory: Any,
+    since: Optional[float] = None,
+    until: Optional[float] = None,
+    filters: Optional[Dict[str, Any]] = None,
+    min_price: Optional[float] = None,
+    max_price: Optional[float] = None,
+    limit: Optional[int] = None
+) -> Iterator[Dict[str, Any]]:
+    """
+    Read audit records back, oldest segment first.
+
+    Parameters:
+        directory: Audit log directory
+        since, until: Time range as Unix timestamps (inclusive)
+        filters: Exact, case-insensitive matches on normalized features,
+            inputs or record fields (e.g. region, property_type, endpoint)
+        min_price, max_price: Range of the predicted price
+        limit: Maximum number of records
+
+    Yields:
+        Matching records as dictionaries
+    """
+    filters = {key: value for key, value in (filters or {}).items() if value is not None}
+    found = 0
+    for path in list_segments(directory):
+        start = _segment_start(path)
+        if until is not None and start is not None and start > until:
+            continue
+        if since is not None and path.stat().st_mtime < since:
+            continue
+        with open(path, 'r', encoding='utf-8') as handle:
+            for line in handle:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    continue  # a line cut short by a crash
+                ts = record.get('ts', 0)
+                if (since is not None and ts < since) or (until is not None and ts > until):
+                    continue
+                if filters and not _matches(record, filters):
+                    continue
+                price = _price(record)
+                if (min_price is not None and (price is None or price < min_price)) or \
+                        (max_price is not None and (price is None or price > max_price)):
+                    continue
+                yield record
+                found += 1
+                if limit is not None and found >= limit:
+                    return
+
+
+_audit_log: Optional[AuditLog] = None
+_audit_configured = False
+_audit_lock = threading.Lock()
+
+
+def get_audit_log() -> Optional[AuditLog]:
+    """Get the global audit log, started from the settings; None if auditing is disabled."""
+    global _audit_log, _audit_configured
+    if _audit_configured:
+        return _audit_log
+    with _audit_lock:
+        if not _audit_configured:
+            from ..config import get_settings
+            settings = get_settings()
+            if settings.audit_enabled:
+                _audit_log = AuditLog(
+                    directory=settings.audit_dir,
+                    buffer_size=settings.audit_buffer_size,
+                    batch_size=settings.audit_batch_size,
+                    flush_interval=settings.audit_flush_interval_ms / 1000,
+                    durability=settings.audit_durability,
+                    segment_max_bytes=settings.audit_segment_max_mb * 1024 * 1024,
+                    segment_max_seconds=settings.audit_segment_max_seconds,
+                    max_segments=settings.audit_max_segments
+                ).start()
+                atexit.register(_audit_log.close)
+            _audit_configured = True
+        return _audit_log
+
+
+def close_audit_log(timeout: float = 5.0) -> None:
+    """Write out and stop the global audit log; the next get_audit_log starts a new one."""
+    global _audit_log, _audit_configured
+    with _audit_lock:
+        if _audit_log is not None:
+            _audit_log.close(timeout)
+        _audit_log = None
+        _audit_configured = False
+
+
+class ColumnRows:
+    """
+    Rows of a dictionary of equal-length columns, for recording columnar
+    requests; the row dictionaries are only built when iterated, on the
+    writer thread.
+    """
+
+    def __init__(self, columns: Dict[str, Sequence[Any]]):
+        self.columns = columns
+
+    def __len__(self) -> int:
+        return len(next(iter(self.columns.values()), ()))
+
+    def __iter__(self) -> Iterator[Dict[str, Any]]:
+        names = list(self.columns)
+        # NumPy columns become Python scalars, which json can encode
+        values = [column.tolist() if hasattr(column, 'tolist') else list(column) for column in self.columns.values()]
+        return (dict(zip(names, row)) for row in zip(*values))
+
+
+def audit_predictions(
+    endpoint: str,
+    model: Any,
+    inputs: Sequence[Dict[str, Any]],
+    outputs: Sequence[Any],
+    latency_ms: float
+) -> None:
+    """Queue predictions served by a model in the global audit log, if enabled."""
+    audit_log = get_audit_log()
+    if audit_log is not None:
+        audit_log.record(endpoint, model.model_version, inputs, outputs, latency_ms,
+                         normalize=getattr(model, 'audit_features', None))
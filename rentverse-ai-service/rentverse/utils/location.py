@@ -0,0 +1,325 @@
+"""
+Location Normalization Engine for Rentverse
+===========================================
+
+This module contains the LocationEngine class, a precompiled matcher that maps
+raw listing locations to the region classes known by the fitted preprocessor
+and flags premium-area keywords in a single pass over the string.
+"""
+
+import re
+import threading
+from collections import deque
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+import numpy as np
+import pandas as pd
+
+# Known neighbourhoods, cities and aliases mapped to the preprocessor's region
+# classes (the lowercased state names found at the end of training locations).
+# Entries whose region is not a class of the fitted encoder are ignored.
+GAZETTEER: Dict[str, str] = {
+    # Kuala Lumpur
+    'kl': 'kuala lumpur',
+    'kuala lumpur': 'kuala lumpur',
+    'wilayah persekutuan': 'kuala lumpur',
+    'wp kuala lumpur': 'kuala lumpur',
+    'klcc': 'kuala lumpur',
+    'bukit bintang': 'kuala lumpur',
+    'mont kiara': 'kuala lumpur',
+    'sri hartamas': 'kuala lumpur',
+    'bangsar': 'kuala lumpur',
+    'damansara heights': 'kuala lumpur',
+    'bukit jalil': 'kuala lumpur',
+    'cheras': 'kuala lumpur',
+    'kepong': 'kuala lumpur',
+    'setapak': 'kuala lumpur',
+    'sentul': 'kuala lumpur',
+    'wangsa maju': 'kuala lumpur',
+    'titiwangsa': 'kuala lumpur',
+    'brickfields': 'kuala lumpur',
+    'kl sentral': 'kuala lumpur',
+    'old klang road': 'kuala lumpur',
+    'desa parkcity': 'kuala lumpur',
+    # Selangor
+    'selangor': 'selangor',
+    'petaling jaya': 'selangor',
+    'pj': 'selangor',
+    'damansara': 'selangor',
+    'shah alam': 'selangor',
+    'subang jaya': 'selangor',
+    'subang': 'selangor',
+    'puchong': 'selangor',
+    'klang': 'selangor',
+    'cyberjaya': 'selangor',
+    'kajang': 'selangor',
+    'seri kembangan': 'selangor',
+    'bangi': 'selangor',
+    'rawang': 'selangor',
+    'sepang': 'selangor',
+    'ampang': 'selangor',
+    'setia alam': 'selangor',
+    'kota damansara': 'selangor',
+    # Putrajaya
+    'putrajaya': 'putrajaya',
+    # Penang
+    'penang': 'penang',
+    'pulau pinang': 'penang',
+    'george town': 'penang',
+    'georgetown': 'penang',
+    'bayan lepas': 'penang',
+    'butterworth': 'penang',
+    'tanjung bungah': 'penang',
+    'gelugor': 'penang',
+    'bukit mertajam': 'penang',
+    # Johor
+    'johor': 'johor',
+    'johore': 'johor',
+    'johor bahru': 'johor',
+    'jb': 'johor',
+    'iskandar puteri': 'johor',
+    'nusajaya': 'johor',
+    'skudai': 'johor',
+    'batu pahat': 'johor',
+    # Melaka
+    'melaka': 'melaka',
+    'malacca': 'melaka',
+    # Negeri Sembilan
+    'negeri sembilan': 'negeri sembilan',
+    'n sembilan': 'negeri sembilan',
+    'seremban': 'negeri sembilan',
+    'nilai': 'negeri sembilan',
+    'port dickson': 'negeri sembilan',
+    # Perak
+    'perak': 'perak',
+    'ipoh': 'perak',
+    'taiping': 'perak',
+    # Pahang
+    'pahang': 'pahang',
+    'kuantan': 'pahang',
+    'genting highlands': 'pahang',
+    'cameron highlands': 'pahang',
+    # Kedah
+    'kedah': 'kedah',
+    'alor setar': 'kedah',
+    'langkawi': 'kedah',
+    'sungai petani': 'kedah',
+    # Kelantan
+    'kelantan': 'kelantan',
+    'kota bharu': 'kelantan',
+    # Sabah
+    'sabah': 'sabah',
+    'kota kinabalu': 'sabah',
+    'sandakan': 'sabah',
+    # Sarawak
+    'sarawak': 'sarawak',
+    'kuching': 'sarawak',
+    'miri': 'sarawak',
+    'sibu': 'sarawak',
+}
+
+GAZETTEER_KIND = 0
+KEYWORD_KIND = 1
+
+
+class _PatternAutomaton:
+    """
+    Aho-Corasick automaton over a fixed set of lowercase patterns.
+
+    Finds every occurrence of every pattern in one left-to-right scan of the
+    text, independent of the number of patterns.
+    """
+
+    def __init__(self, patterns: Iterable[Tuple[str, int, Any]]):
+        # Node 0 is the root; each node has goto edges, a fail link and outputs
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._out: List[List[Tuple[int, int, Any]]] = [[]]
+
+        for pattern, kind, value in patterns:
+            if not pattern:
+                continue
+            node = 0
+            for char in pattern:
+                nxt = self._goto[node].get(char)
+                if nxt is None:
+                    nxt = len(self._goto)
+                    self._goto[node][char] = nxt
+                    self._goto.append({})
+                    self._fail.append(0)
+                    self._out.append([])
+                node = nxt
+            self._out[node].append((len(pattern), kind, value))
+
+        # Breadth-first construction of failure links
+        queue = deque(self._goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for char, nxt in self._goto[node].items():
+                queue.append(nxt)
+                fail = self._fail[node]
+                while fail and char not in self._goto[fail]:
+                    fail = self._fail[fail]
+                target = self._goto[fail].get(char, 0)
+                self._fail[nxt] = target if target != nxt else 0
+                self._out[nxt].extend(self._out[self._fail[nxt]])
+
+    def scan(self, text: str) -> List[Tuple[int, int, int, Any]]:
+        """Return (start, end, kind, value) for every pattern occurrence in text."""
+        goto, fail, out = self._goto, self._fail, self._out
+        matches = []
+        node = 0
+        for end, char in enumerate(text, start=1):
+            while node and char not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(char, 0)
+            for length, kind, value in out[node]:
+                matches.append((end - length, end, kind, value))
+        return matches
+
+
+class LocationEngine:
+    """
+    Precompiled location normalizer built once per loaded model.
+
+    Region lookup is exactly compatible with ImprovedDataPreprocessor._parse_location
+    whenever that parse already yields a region known to the fitted encoder.
+    Otherwise the whole string is scanned for gazetteer neighbourhoods and
+    aliases, and the rightmost (then longest) word-bounded hit that maps to a
+    known region wins. If nothing matches, the legacy parse is returned so the
+    preprocessor's unknown-category fallback still applies.
+
+    Parameters:
+    -----------
+    known_regions : Iterable[str]
+        Region classes of the fitted LabelEncoder
+    keywords : Iterable[str], optional
+        Lowercase keywords (e.g. premium areas) matched as plain substrings
+    gazetteer : Dict[str, str], optional
+        Alias to region mapping, defaults to GAZETTEER
+    cache_size : int, default=4096
+        Maximum number of raw location strings memoized
+    """
+
+    def __init__(
+        self,
+        known_regions: Iterable[str],
+        keywords: Optional[Iterable[str]] = None,
+        gazetteer: Optional[Dict[str, str]] = None,
+        cache_size: int = 4096
+    ):
+        self.known_regions = frozenset(str(region) for region in known_regions)
+        self.keywords = tuple(keywords or ())
+        self.gazetteer = {
+            alias.lower(): region
+            for alias, region in (GAZETTEER if gazetteer is None else gazetteer).items()
+            if region in self.known_regions
+        }
+        self.cache_size = cache_size
+
+        patterns = [(alias, GAZETTEER_KIND, region) for alias, region in self.gazetteer.items()]
+        patterns += [(keyword.lower(), KEYWORD_KIND, keyword) for keyword in self.keywords]
+        self._automaton = _PatternAutomaton(patterns)
+        self._cache: Dict[str, Tuple[str, frozenset]] = {}
+        self.cache_hits = 0
+        self.cache_misses = 0
+        self._lock = threading.Lock()
+
+    def __getstate__(self) -> Dict[str, Any]:
+        state = self.__dict__.copy()
+        state['_cache'] = {}
+        del state['_lock']
+        return state
+
+    def __setstate__(self, state: Dict[str, Any]) -> None:
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _legacy_region(location: str) -> str:
+        """Same parse as ImprovedDataPreprocessor._parse_location for a string."""
+        region = location.split(', ')[-1].strip().lower()
+        region = re.sub(r'[^\w\s]', '', region)
+        return region if region else "unknown"
+
+    @staticmethod
+    def _is_bounded(text: str, start: int, end: int) -> bool:
+        """Check that text[start:end] is not part of a longer word."""
+        return (start == 0 or not text[start - 1].isalnum()) and \
+               (end == len(text) or not text[end].isalnum())
+
+    def _resolve(self, location: str) -> Tuple[str, frozenset]:
+        """Compute (region, matched keywords) for a raw location string."""
+        text = location.lower()
+        best = None
+        keywords = set()
+
+        for start, end, kind, value in self._automaton.scan(text):
+            if kind == KEYWORD_KIND:
+                keywords.add(value)
+            elif self._is_bounded(text, start, end):
+                if best is None or (end, end - start) > (best[0], best[1]):
+                    best = (end, end - start, value)
+
+        region = self._legacy_region(location)
+        if region not in self.known_regions and best is not None:
+            region = best[2]
+
+        return region, frozenset(keywords)
+
+    def lookup(self, location: Any) -> Tuple[str, frozenset]:
+        """Return (region, matched keywords) for a location, memoized per raw string."""
+        if pd.isna(location):
+            return "unknown", frozenset()
+
+        location = str(location)
+        with self._lock:
+            cached = self._cache.get(location)
+            if cached is not None:
+                self.cache_hits += 1
+                return cached
+            self.cache_misses += 1
+
+        # Resolved outside the lock; a concurrent miss on the same string
+        # computes the same result
+        result = self._resolve(location)
+        with self._lock:
+            if location not in self._cache:
+                while len(self._cache) >= self.cache_size:
+                    # Evict the oldest entry (dicts preserve insertion order)
+                    del self._cache[next(iter(self._cache))]
+                self._cache[location] = result
+        return result
+
+    def region(self, location: Any) -> str:
+        """Map a raw location string to a region."""
+        return self.lookup(location)[0]
+
+    def regions(self, locations: pd.Series) -> pd.Series:
+        """Map a series of raw location strings to regions, looking up each distinct string once."""
+        codes, uniques = pd.factorize(locations)
+        resolved = np.array([self.region(location) for location in uniques] + ["unknown"], dtype=object)
+        return pd.Series(resolved[codes], index=locations.index, dtype=object)
+
+    def matched_keywords(self, location: Any) -> Set[str]:
+        """Return the configured keywords found in the location."""
+        return set(self.lookup(location)[1])
+
+    def has_keyword(self, location: Any) -> bool:
+        """Check whether any configured keyword occurs in the location."""
+        return bool(self.lookup(location)[1])
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get memo cache statistics."""
+        with self._lock:
+            hits, misses, size = self.cache_hits, self.cache_misses, len(self._cache)
+        total = hits + misses
+        return {
+            'known_regions': len(self.known_regions),
+            'gazetteer_entries': len(self.gazetteer),
+            'keywords': len(self.keywords),
+            'cache_size': size,
+            'cache_hits': hits,
+            'cache_misses': misses,
+            'hit_rate': (hits / total) if total else 0.0
+        }
@@ -0,0 +1,252 @@
+"""
+Memory accounting for RentVerse AI Service.
+
+Process memory comes from /proc (getrusage elsewhere), object sizes
+from a deep walk of the object graph, and allocation growth between two
+points in time from tracemalloc snapshots. Tracing is off until the first
+snapshot is taken, because tracemalloc slows every allocation while it runs.
+"""
+
+import gc
+import os
+import resource
+import sys
+import threading
+import time
+import tracemalloc
+from collections import OrderedDict, deque
+from datetime import datetime
+from types import BuiltinFunctionType, FunctionType, MethodType, ModuleType
+from typing import Any, Dict, List, Optional, Set
+
+import numpy as np
+import pandas as pd
+
+MAX_SNAPSHOTS = 10
+SNAPSHOT_FILTERS = (
+    tracemalloc.Filter(False, tracemalloc.__file__),
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap_external>"),
+    tracemalloc.Filter(False, "<unknown>"),
+)
+
+# Shared by everything and not owned by any component
+_SKIPPED_TYPES = (type, ModuleType, FunctionType, BuiltinFunctionType, MethodType)
+
+
+def process_memory() -> Dict[str, Any]:
+    """Resident and peak memory of this process in bytes, plus garbage collector counts."""
+    rss = peak = None
+    try:
+        with open("/proc/self/status") as status:
+            for line in status:
+                if line.startswith("VmRSS:"):
+                    rss = int(line.split()[1]) * 1024
+                elif line.startswith("VmHWM:"):
+                    peak = int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    if peak is None:
+        # ru_maxrss is in KB on Linux, bytes on macOS
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * (1 if sys.platform == "darwin" else 1024)
+
+    return {
+        "pid": os.getpid(),
+        "rss_bytes": rss,
+        "peak_rss_bytes": peak,
+        "threads": threading.active_count(),
+        "gc_counts": list(gc.get_count()),
+        "gc_objects": len(gc.get_objects()),
+        "gc_garbage": len(gc.garbage)
+    }
+
+
+def deep_sizeof(obj: Any, seen: Optional[Set[int]] = None) -> int:
+    """
+    Approximate bytes reachable from an object.
+
+    Follows containers, instance attributes and scikit-learn extension types,
+    counts NumPy buffers once per owner and pandas objects by their deep
+    memory usage. Objects already in seen are not counted again, so sizing
+    several components with one set attributes shared objects to the first.
+    """
+    seen = set() if seen is None else seen
+    total = 0
+    stack = [obj]
+    while stack:
+        item = stack.pop()
+        if id(item) in seen or isinstance(item, _SKIPPED_TYPES):
+            continue
+        seen.add(id(item))
+
+        if isinstance(item, np.ndarray):
+            # Includes the buffer if the array owns it; views count their base instead
+            total += sys.getsizeof(item)
+            if item.base is not None:
+                stack.append(item.base)
+            if item.dtype == object:
+                stack.extend(item.ravel())
+            continue
+        if isinstance(item, (pd.DataFrame, pd.Series)):
+            usage = item.memory_usage(deep=True)
+            total += int(usage.sum() if isinstance(usage, pd.Series) else usage)
+            continue
+        if isinstance(item, pd.Index):
+            total += int(item.memory_usage(deep=True))
+            continue
+
+        total += sys.getsizeof(item)
+        if isinstance(item, dict):
+            stack.extend(item.keys())
+            stack.extend(item.values())
+        elif isinstance(item, (list, tuple, set, frozenset, deque)):
+            stack.extend(item)
+        elif isinstance(item, (str, bytes, bytearray, int, float, complex, bool)) or item is None:
+            continue
+        else:
+            if hasattr(item, "__dict__"):
+                stack.append(item.__dict__)
+            for slot in getattr(type(item), "__slots__", ()):
+                if isinstance(slot, str) and hasattr(item, slot):
+                    stack.append(getattr(item, slot))
+            if not hasattr(item, "__dict__") and type(item).__module__.startswith("sklearn"):
+                # Cython trees and KD-trees keep their arrays out of __dict__
+                try:
+                    stack.append(item.__getstate__())
+                except Exception:
+                    pass
+    return total
+
+
+class AllocationTracker:
+    """
+    Named tracemalloc snapshots and the differences between them.
+
+    Taking the first snapshot starts tracing; stop() ends it and forgets the
+    snapshots. Only the newest MAX_SNAPSHOTS are kept.
+    """
+
+    def __init__(self, max_snapshots: int = MAX_SNAPSHOTS):
+        self.max_snapshots = max_snapshots
+        self._snapshots: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._started_tracing = False
+
+    @staticmethod
+    def _describe(label: str, entry: Dict[str, Any]) -> Dict[str, Any]:
+        return {
+            "label": label,
+            "taken_at": entry["taken_at"],
+            "traced_bytes": entry["traced_bytes"],
+            "rss_bytes": entry["rss_bytes"]
+        }
+
+    def take(self, label: Optional[str] = None, frames: int = 1) -> Dict[str, Any]:
+        """Take a snapshot under a label (a timestamp by default), starting tracing if needed."""
+        with self._lock:
+            if not tracemalloc.is_tracing():
+                tracemalloc.start(frames)
+                self._started_tracing = True
+            label = label or datetime.now().strftime("%Y%m%dT%H%M%S.%f")
+            snapshot = tracemalloc.take_snapshot().filter_traces(SNAPSHOT_FILTERS)
+            entry = {
+                "snapshot": snapshot,
+                "taken_at": datetime.now().isoformat(),
+                "traced_bytes": tracemalloc.get_traced_memory()[0],
+                "rss_bytes": process_memory()["rss_bytes"]
+            }
+            self._snapshots.pop(label, None)
+            self._snapshots[label] = entry
+            while len(self._snapshots) > self.max_snapshots:
+                self._snapshots.popitem(last=False)
+            return self._describe(label, entry)
+
+    def snapshots(self) -> List[Dict[str, Any]]:
+        """Kept snapshots, oldest first."""
+        with self._lock:
+            return [self._describe(label, entry) for label, entry in self._snapshots.items()]
+
+    def diff(
+        self,
+        base: str,
+        target: Optional[str] = None,
+        group_by: str = "lineno",
+        limit: int = 25
+    ) -> Dict[str, Any]:
+        """
+        Allocation growth from one snapshot to another, largest first.
+
+        Args:
+            base: Label of the earlier snapshot
+            target: Label of the later snapshot; a new one is taken if None
+            group_by: 'lineno', 'filename' or 'traceback'
+            limit: Number of allocation sites to return
+
+        Raises KeyError for an unknown label.
+        """
+        with self._lock:
+            if base not in self._snapshots:
+                raise KeyError(base)
+        if target is None:
+            target = self.take()["label"]
+        with self._lock:
+            if base not in self._snapshots:
+                raise KeyError(base)
+            if target not in self._snapshots:
+                raise KeyError(target)
+            before, after = self._snapshots[base], self._snapshots[target]
+
+        started = time.perf_counter()
+        stats = after["snapshot"].compare_to(before["snapshot"], group_by)
+        return {
+            "base": self._describe(base, before),
+            "target": self._describe(target, after),
+            "traced_growth_bytes": after["traced_bytes"] - before["traced_bytes"],
+            "rss_growth_bytes": (after["rss_bytes"] - before["rss_bytes"])
+            if after["rss_bytes"] is not None and before["rss_bytes"] is not None else None,
+            "compare_ms": round((time.perf_counter() - started) * 1000, 1),
+            "top": [
+                {
+                    "location": [f"{frame.filename}:{frame.lineno}" for frame in stat.traceback],
+                    "size_diff_bytes": stat.size_diff,
+                    "count_diff": stat.count_diff,
+                    "size_bytes": stat.size,
+                    "count": stat.count
+                }
+                for stat in stats[:limit]
+            ]
+        }
+
+    def stop(self) -> None:
+        """Forget every snapshot and stop tracing if this tracker started it."""
+        with self._lock:
+            self._snapshots.clear()
+            if self._started_tracing and tracemalloc.is_tracing():
+                tracemalloc.stop()
+            self._started_tracing = False
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Whether tracing is on, its overhead and the kept snapshots."""
+        tracing = tracemalloc.is_tracing()
+        traced, peak = tracemalloc.get_traced_memory() if tracing else (0, 0)
+        return {
+            "tracing": tracing,
+            "traceback_frames": tracemalloc.get_traceback_limit() if tracing else None,
+            "traced_bytes": traced,
+            "traced_peak_bytes": peak,
+            "tracemalloc_overhead_bytes": tracemalloc.get_tracemalloc_memory() if tracing else 0,
+            "snapshots": self.snapshots()
+        }
+
+
+_tracker: Optional[AllocationTracker] = None
+_tracker_lock = threading.Lock()
+
+
+def get_allocation_tracker() -> AllocationTracker:
+    """Get the process-wide allocation tracker."""
+    global _tracker
+    with _tracker_lock:
+        if _tracker is None:
+            _tracker = AllocationTracker()
+        return _tracker
@@ -11,11 +11,15 @@ import numpy as np
 import re
 from sklearn.base import BaseEstimator, TransformerMixin
 from sklearn.preprocessing import LabelEncoder
-from typing import Optional, List, Dict, Any
+from typing import Optional, List, Dict, Any, Callable, Iterable
 import logging
 
+from .sketches import QuantileSketch
+
 logger = logging.getLogger(__name__)
 
+CATEGORICAL_COLUMNS = ['property_type', 'furnished', 'region']
+
 
 class ImprovedDataPreprocessor(BaseEstimator, TransformerMixin):
     """
@@ -139,6 +143,144 @@ class ImprovedDataPreprocessor(BaseEstimator, TransformerMixin):
                 logger.warning(f"Error parsing location '{location_str}': {e}")
             return "unknown"
 
+    def _clean_numeric_series(self, values: pd.Series) -> pd.Series:
+        """
+        Vectorized _clean_price/_clean_area for a whole column.
+
+        Numeric columns only need abs(); string columns are cleaned with pandas
+        string operations once per distinct value and broadcast back.
+
+        Parameters:
+        -----------
+        values : pd.Series
+            Raw price or area column
+
+        Returns:
+        --------
+        pd.Series : Cleaned float values (NaN where cleaning fails)
+        """
+        if pd.api.types.is_numeric_dtype(values) and not pd.api.types.is_bool_dtype(values):
+            magnitude = values.astype(float).abs()
+            if pd.api.types.is_integer_dtype(values):
+                return magnitude
+            # str() switches to scientific notation outside this range, which
+            # the digit filter would turn into a different number
+            plain = magnitude.isna() | (magnitude == 0) | ((magnitude >= 1e-4) & (magnitude < 1e16))
+            if not plain.all():
+                magnitude[~plain] = values[~plain].map(self._clean_price)
+            return magnitude
+
+        codes, uniques = pd.factorize(values)
+        digits = pd.Series(uniques, dtype=object).astype(str).str.replace(r'[^\d.]', '', regex=True)
+        cleaned = pd.to_numeric(digits, errors='coerce')
+        # Non-ASCII digits pass the filter but not to_numeric; float() accepts them
+        retry = cleaned.isna() & (digits != '')
+        if retry.any():
+            cleaned[retry] = digits[retry].map(self._clean_price)
+
+        result = np.full(len(values), np.nan)
+        present = codes >= 0
+        result[present] = cleaned.to_numpy(dtype=float)[codes[present]]
+        return pd.Series(result, index=values.index, name=values.name)
+
+    def _parse_location_series(self, locations: pd.Series) -> pd.Series:
+        """
+        Vectorized _parse_location for a whole column.
+
+        Parameters:
+        -----------
+        locations : pd.Series
+            Raw location strings
+
+        Returns:
+        --------
+        pd.Series : Extracted regions ('unknown' where missing)
+        """
+        codes, uniques = pd.factorize(locations)
+        regions = (
+            pd.Series(uniques, dtype=object).astype(str)
+            .str.rsplit(', ', n=1).str[-1]
+            .str.strip().str.lower()
+            .str.replace(r'[^\w\s]', '', regex=True)
+        )
+        regions = regions.mask(regions == '', 'unknown').to_numpy(dtype=object)
+
+        result = np.full(len(locations), 'unknown', dtype=object)
+        present = codes >= 0
+        result[present] = regions[codes[present]]
+        return pd.Series(result, index=locations.index, name='region')
+
+    def _prepare_frame(self, X: pd.DataFrame, location_engine: Optional[Any] = None) -> pd.DataFrame:
+        """
+        Build the cleaned working frame from only the columns the preprocessor uses.
+
+        Parameters:
+        -----------
+        X : pd.DataFrame
+            Raw input data
+        location_engine : LocationEngine, optional
+            Engine used for region lookup instead of the plain location parse
+
+        Returns:
+        --------
+        pd.DataFrame : Frame with cleaned price/area and a region column
+        """
+        columns = {}
+        if self.target_column in X.columns:
+            columns[self.target_column] = self._clean_numeric_series(X[self.target_column])
+        if 'area' in X.columns:
+            columns['area'] = self._clean_numeric_series(X['area'])
+        for col in ('property_type', 'bedrooms', 'bathrooms', 'furnished'):
+            if col in X.columns:
+                columns[col] = X[col]
+
+        if 'location' in X.columns:
+            if location_engine is not None:
+                columns['region'] = location_engine.regions(X['location'])
+            else:
+                columns['region'] = self._parse_location_series(X['location'])
+        elif 'region' in X.columns:
+            columns['region'] = X['region']
+
+        return pd.DataFrame(columns, index=X.index)
+
+    def _outlier_masks(self, df: pd.DataFrame) -> Dict[str, np.ndarray]:
+        """
+        Compute the boolean keep-masks used for outlier removal.
+
+        Parameters:
+        -----------
+        df : pd.DataFrame
+            Cleaned dataframe
+
+        Returns:
+        --------
+        Dict[str, np.ndarray] : Keep-mask per check ('price', 'area', 'rooms')
+        """
+        masks = {}
+
+        # More stringent price bounds: RM 500 to RM 8,000
+        if self.target_column in df.columns and self.price_upper_bound is not None:
+            price = df[self.target_column].to_numpy()
+            masks['price'] = (price <= self.price_upper_bound) & (price >= 500) & (price <= 8000)
+
+        # More stringent area bounds: 200 to 5,000 sqft
+        if 'area' in df.columns and self.area_upper_bound is not None:
+            area = df['area'].to_numpy()
+            masks['area'] = (area <= self.area_upper_bound) & (area >= 200) & (area <= 5000)
+
+        # Realistic bedroom (0-6, studio allowed) and bathroom (1-5) counts
+        rooms = np.ones(len(df), dtype=bool)
+        if 'bedrooms' in df.columns:
+            bedrooms = df['bedrooms'].to_numpy()
+            rooms &= (bedrooms <= 6) & (bedrooms >= 0)
+        if 'bathrooms' in df.columns:
+            bathrooms = df['bathrooms'].to_numpy()
+            rooms &= (bathrooms <= 5) & (bathrooms >= 1)
+        masks['rooms'] = rooms
+
+        return masks
+
     def _remove_outliers(self, df: pd.DataFrame) -> pd.DataFrame:
         """
         Remove outliers based on percentiles - aggressive approach.
@@ -159,36 +301,18 @@ class ImprovedDataPreprocessor(BaseEstimator, TransformerMixin):
             print("🧹 Removing outliers with aggressive filtering...")
         original_size = len(df)
 
-        # Remove price outliers - more stringent bounds
-        if self.target_column in df.columns and self.price_upper_bound is not None:
-            if self.verbose:
-                print(f"   - Before price outlier removal: {len(df):,} samples")
-            # More stringent price bounds
-            df = df[df[self.target_column] <= self.price_upper_bound]
-            df = df[df[self.target_column] >= 500]  # Minimum reasonable price RM 500
-            df = df[df[self.target_column] <= 8000] # Maximum reasonable price RM 8,000
-            if self.verbose:
-                print(f"   - After price outlier removal: {len(df):,} samples")
+        masks = self._outlier_masks(df)
+        keep = np.ones(original_size, dtype=bool)
+        for name in ('price', 'area', 'rooms'):
+            if name not in masks:
+                continue
+            if self.verbose and name != 'rooms':
+                print(f"   - Before {name} outlier removal: {int(keep.sum()):,} samples")
+            keep &= masks[name]
+            if self.verbose and name != 'rooms':
+                print(f"   - After {name} outlier removal: {int(keep.sum()):,} samples")
 
-        # Remove area outliers - more stringent bounds
-        if 'area' in df.columns and self.area_upper_bound is not None:
-            if self.verbose:
-                print(f"   - Before area outlier removal: {len(df):,} samples")
-            # More stringent area bounds
-            df = df[df['area'] <= self.area_upper_bound]
-            df = df[df['area'] >= 200]  # Minimum reasonable area 200 sqft
-            df = df[df['area'] <= 5000] # Maximum reasonable area 5,000 sqft
-            if self.verbose:
-                print(f"   - After area outlier removal: {len(df):,} samples")
-
-        # Remove unrealistic bedroom/bathroom counts
-        if 'bedrooms' in df.columns:
-            df = df[df['bedrooms'] <= 6]   # Max 6 bedrooms (more realistic)
-            df = df[df['bedrooms'] >= 0]   # Min 0 bedrooms (studio)
-
-        if 'bathrooms' in df.columns:
-            df = df[df['bathrooms'] <= 5]   # Max 5 bathrooms (more realistic)
-            df = df[df['bathrooms'] >= 1]   # Min 1 bathroom
+        df = df[keep]
 
         removed_count = original_size - len(df)
         removal_pct = (removed_count / original_size) * 100
@@ -199,6 +323,25 @@ class ImprovedDataPreprocessor(BaseEstimator, TransformerMixin):
 
         return df
 
+    def _set_feature_names(self, columns: Iterable[str]) -> None:
+        """Store feature names (excluding target and original location)."""
+        columns = set(columns)
+        self.feature_names = [col for col in ['property_type', 'bedrooms', 'bathrooms',
+                                            'area', 'furnished', 'region']
+                             if col in columns]
+
+        if self.verbose:
+            print(f"   - Features selected: {self.feature_names}")
+
+    def _fit_encoder(self, col: str, categories: Iterable[str]) -> None:
+        """Fit the label encoder of a categorical column."""
+        self.label_encoders[col] = LabelEncoder()
+        self.label_encoders[col].fit(np.array(sorted(categories), dtype=object))
+
+        if self.verbose:
+            n_categories = len(self.label_encoders[col].classes_)
+            print(f"   - {col}: {n_categories} categories")
+
     def fit(self, X: pd.DataFrame, y: Optional[pd.Series] = None) -> 'ImprovedDataPreprocessor':
         """
         Fit the preprocessor on training data.
@@ -218,29 +361,19 @@ class ImprovedDataPreprocessor(BaseEstimator, TransformerMixin):
         if self.verbose:
             print("📊 Fitting preprocessor with aggressive outlier removal...")
 
-        # Make a copy of the data
-        df = X.copy()
+        # 1-3. Clean price and area and extract region, without copying unused columns
+        df = self._prepare_frame(X)
 
-        # 1. Clean target variable (price)
-        if self.target_column in df.columns:
-            df[self.target_column] = df[self.target_column].apply(self._clean_price)
-            if self.verbose:
+        if self.verbose:
+            if self.target_column in df.columns:
                 price_min = df[self.target_column].min()
                 price_max = df[self.target_column].max()
                 print(f"   - Price range before cleaning: RM {price_min:,.0f} to RM {price_max:,.0f}")
-
-        # 2. Clean area column
-        if 'area' in df.columns:
-            df['area'] = df['area'].apply(self._clean_area)
-            if self.verbose:
+            if 'area' in df.columns:
                 area_min = df['area'].min()
                 area_max = df['area'].max()
                 print(f"   - Area range before cleaning: {area_min:.0f} to {area_max:,.0f} sqft")
 
-        # 3. Extract region from location - simplified approach
-        if 'location' in df.columns:
-            df['region'] = df['location'].apply(self._parse_location)
-
         # 4. Calculate outlier bounds before removal
         if self.remove_outliers:
             if self.target_column in df.columns:
@@ -267,32 +400,133 @@ class ImprovedDataPreprocessor(BaseEstimator, TransformerMixin):
                 area_max = df['area'].max()
                 print(f"   - Final area range: {area_min:.0f} to {area_max:,.0f} sqft")
 
-        # 6. Ensure proper data types for categorical columns
-        categorical_columns = ['property_type', 'furnished', 'region']
-
-        for col in categorical_columns:
+        # 6. Fit label encoders on the distinct categories (missing -> 'unknown')
+        for col in CATEGORICAL_COLUMNS:
             if col in df.columns:
-                # Fill missing values with 'unknown'
-                df[col] = df[col].fillna('unknown').astype(str)
+                self._fit_encoder(col, df[col].fillna('unknown').astype(str).unique())
 
-                # Fit label encoder
-                self.label_encoders[col] = LabelEncoder()
-                self.label_encoders[col].fit(df[col])
+        # 7. Store feature names
+        self._set_feature_names(df.columns)
 
-                if self.verbose:
-                    n_categories = len(self.label_encoders[col].classes_)
-                    print(f"   - {col}: {n_categories} categories")
+        return self
 
-        # 7. Store feature names (excluding target and original location)
-        self.feature_names = [col for col in ['property_type', 'bedrooms', 'bathrooms',
-                                            'area', 'furnished', 'region']
-                             if col in df.columns]
+    def fit_chunks(
+        self,
+        chunks: Callable[[], Iterable[pd.DataFrame]],
+        relative_accuracy: float = 0.001
+    ) -> 'ImprovedDataPreprocessor':
+        """
+        Fit the preprocessor on data read in pieces, e.g. a CSV too large for memory.
 
+        Makes two passes over the chunks. The first sketches the price and area
+        distributions with mergeable QuantileSketches to get the outlier bounds;
+        the second collects the categories of the rows that survive outlier
+        removal. Bounds are within ``relative_accuracy`` of a value at the exact
+        percentile rank, so encoders match fit() unless a row lies that close
+        to a bound.
+
+        Parameters:
+        -----------
+        chunks : Callable[[], Iterable[pd.DataFrame]]
+            Function returning a fresh iterable of raw chunks; called once per pass
+        relative_accuracy : float, default=0.001
+            Relative accuracy of the percentile sketches
+
+        Returns:
+        --------
+        self : ImprovedDataPreprocessor
+            Fitted preprocessor
+        """
         if self.verbose:
-            print(f"   - Features selected: {self.feature_names}")
+            print("📊 Fitting preprocessor in chunks with aggressive outlier removal...")
+
+        # Pass 1: percentile sketches for the outlier bounds
+        if self.remove_outliers:
+            price_sketch = QuantileSketch(relative_accuracy)
+            area_sketch = QuantileSketch(relative_accuracy)
+            has_price = has_area = False
+            for chunk in chunks():
+                df = self._prepare_frame(chunk)
+                if self.target_column in df.columns:
+                    has_price = True
+                    price_sketch.add(df[self.target_column].to_numpy())
+                if 'area' in df.columns:
+                    has_area = True
+                    area_sketch.add(df['area'].to_numpy())
+
+            if has_price:
+                self.price_upper_bound = price_sketch.quantile(self.price_percentile / 100)
+                if self.verbose:
+                    print(f"   - Price upper bound (P{self.price_percentile}): RM {self.price_upper_bound:,.0f}")
+            if has_area:
+                self.area_upper_bound = area_sketch.quantile(self.area_percentile / 100)
+                if self.verbose:
+                    print(f"   - Area upper bound (P{self.area_percentile}): {self.area_upper_bound:,.0f} sqft")
+
+        # Pass 2: categories and features of the rows kept after outlier removal
+        categories: Dict[str, set] = {}
+        columns: set = set()
+        rows = kept = 0
+        for chunk in chunks():
+            df = self._prepare_frame(chunk)
+            rows += len(df)
+            if self.remove_outliers:
+                keep = np.logical_and.reduce(list(self._outlier_masks(df).values()))
+                df = df[keep]
+            kept += len(df)
+            columns.update(df.columns)
+            for col in CATEGORICAL_COLUMNS:
+                if col in df.columns:
+                    categories.setdefault(col, set()).update(df[col].fillna('unknown').astype(str).unique())
+
+        if self.verbose and rows:
+            removed_count = rows - kept
+            print(f"   - Removed {removed_count:,} outliers ({removed_count / rows * 100:.1f}% of data)")
+            print(f"   - Remaining samples: {kept:,}")
+
+        for col in CATEGORICAL_COLUMNS:
+            if col in categories:
+                self._fit_encoder(col, categories[col])
+
+        self._set_feature_names(columns)
 
         return self
 
+    def fit_csv(
+        self,
+        path: str,
+        chunksize: int = 200_000,
+        relative_accuracy: float = 0.001,
+        **read_csv_kwargs: Any
+    ) -> 'ImprovedDataPreprocessor':
+        """
+        Fit the preprocessor on a CSV file with fit_chunks, reading only the used columns.
+
+        Parameters:
+        -----------
+        path : str
+            Path to the raw listings CSV
+        chunksize : int, default=200_000
+            Rows per chunk
+        relative_accuracy : float, default=0.001
+            Relative accuracy of the percentile sketches
+        **read_csv_kwargs
+            Extra arguments for pd.read_csv
+
+        Returns:
+        --------
+        self : ImprovedDataPreprocessor
+            Fitted preprocessor
+        """
+        used_columns = {self.target_column, 'area', 'location', 'region', *CATEGORICAL_COLUMNS,
+                        'bedrooms', 'bathrooms'}
+        read_csv_kwargs.setdefault('usecols', lambda col: col in used_columns)
+
+        def chunks() -> Iterable[pd.DataFrame]:
+            return pd.read_csv(path, chunksize=chunksize, **read_csv_kwargs)
+
+        return self.fit_chunks(chunks, relative_accuracy=relative_accuracy)
+
     def transform(self, X: pd.DataFrame, y: Optional[pd.Series] = None) -> pd.DataFrame:
         """
         Transform the data using fitted preprocessor.
@@ -314,37 +548,22 @@ class ImprovedDataPreprocessor(BaseEstimator, TransformerMixin):
         if verbose:
             print("🔄 Transforming data...")
 
-        # Make a copy
-        df = X.copy()
-
-        # 1. Clean price if present
-        if self.target_column in df.columns:
-            df[self.target_column] = df[self.target_column].apply(self._clean_price)
-
-        # 2. Clean area
-        if 'area' in df.columns:
-            df['area'] = df['area'].apply(self._clean_area)
-
-        # 3. Extract region from location - simplified
-        if 'location' in df.columns:
-            df['region'] = df['location'].apply(self._parse_location)
+        # 1-3. Clean price and area and extract region, without copying unused columns
+        df = self._prepare_frame(X, getattr(self, 'location_engine', None))
 
         # 4. Remove outliers (only during training when target is present)
         if self.target_column in df.columns:  # This indicates training data
             df = self._remove_outliers(df)
 
-        # 5. Encode categorical variables
+        # 5. Encode categorical variables (unknown categories fall back to
+        # 'unknown' if the encoder knows it, else to the first class)
         for col, encoder in self.label_encoders.items():
             if col in df.columns:
-                # Fill missing values and ensure string type
-                df[col] = df[col].fillna('unknown').astype(str)
-
-                # Handle unknown categories
-                mask = df[col].isin(encoder.classes_)
-                df.loc[~mask, col] = 'unknown' if 'unknown' in encoder.classes_ else encoder.classes_[0]
-
-                # Transform
-                df[col] = encoder.transform(df[col])
+                values = df[col].fillna('unknown').astype(str)
+                codes = pd.Categorical(values, categories=encoder.classes_).codes.astype(np.int64)
+                classes = list(encoder.classes_)
+                codes[codes < 0] = classes.index('unknown') if 'unknown' in classes else 0
+                df[col] = codes
 
         # 6. Select only the features we want
         columns_to_select = self.feature_names.copy()
@@ -377,6 +596,20 @@ class ImprovedDataPreprocessor(BaseEstimator, TransformerMixin):
 
         return result
 
+    def set_location_engine(self, location_engine: Optional[Any]) -> None:
+        """
+        Attach a precompiled LocationEngine used for region extraction in transform.
+
+        The engine is a serving-time aid and is not pickled with the preprocessor;
+        fit always uses _parse_location so training labels are unaffected.
+        """
+        self.location_engine = location_engine
+
+    def __getstate__(self) -> Dict[str, Any]:
+        state = self.__dict__.copy()
+        state.pop('location_engine', None)
+        return state
+
     def get_feature_names(self) -> List[str]:
         """Get the list of feature names."""
         return self.feature_names.copy()
@@ -503,10 +736,80 @@ def validate_property_data(data: Dict[str, Any]) -> Dict[str, Any]:
     except (ValueError, TypeError) as e:
         raise ValueError(f"Invalid numeric values in property data: {e}")
 
-    # Ensure string fields are strings
+    # Ensure string fields are strings (enum members by their value)
     for field in ['property_type', 'furnished', 'location']:
-        validated_data[field] = str(data[field]).strip()
+        validated_data[field] = str(getattr(data[field], 'value', data[field])).strip()
         if not validated_data[field]:
             raise ValueError(f"Empty {field} field")
 
     return validated_data
+
+
+def _invalid_rows(mask: np.ndarray, limit: int = 5) -> str:
+    """Describe the first rows flagged in a mask, e.g. 'rows 3, 7 (2 total)'."""
+    rows = np.flatnonzero(mask)
+    shown = ', '.join(str(i) for i in rows[:limit])
+    return f"rows {shown}{', ...' if len(rows) > limit else ''} ({len(rows)} total)"
+
+
+def validate_property_columns(columns: Dict[str, Any]) -> pd.DataFrame:
+    """
+    Validate and clean columnar property data before preprocessing.
+
+    The columnar counterpart of validate_property_data: every field holds one
+    value per property, and the same checks run over whole columns at once.
+
+    Parameters:
+    -----------
+    columns : Dict[str, Any]
+        Sequence or array of values per field
+
+    Returns:
+    --------
+    pd.DataFrame : Validated property data, one row per property
+
+    Raises:
+    -------
+    ValueError : If fields are missing, of unequal length or invalid
+    """
+    required_fields = ['property_type', 'bedrooms', 'bathrooms', 'area', 'furnished', 'location']
+    missing_fields = [field for field in required_fields if field not in columns]
+    if missing_fields:
+        raise ValueError(f"Missing required fields: {missing_fields}")
+
+    lengths = {field: len(columns[field]) for field in required_fields}
+    if len(set(lengths.values())) != 1:
+        raise ValueError(f"All columns must have the same length, got {lengths}")
+
+    validated = {}
+    try:
+        numeric = {field: np.asarray(columns[field], dtype=np.float64) for field in ('bedrooms', 'bathrooms', 'area')}
+    except (ValueError, TypeError) as e:
+        raise ValueError(f"Invalid numeric values in property data: {e}")
+
+    for field, values in numeric.items():
+        if not np.isfinite(values).all():
+            raise ValueError(f"Invalid numeric values in property data: {field} {_invalid_rows(~np.isfinite(values))}")
+
+    # Same truncation as int(float(value)) in validate_property_data
+    for field in ('bedrooms', 'bathrooms'):
+        validated[field] = np.trunc(numeric[field]).astype(np.int64)
+        invalid = (validated[field] < 0) | (validated[field] > 10)
+        if invalid.any():
+            raise ValueError(f"Invalid {field} count in {_invalid_rows(invalid)}")
+
+    validated['area'] = numeric['area']
+    invalid = (validated['area'] <= 0) | (validated['area'] > 10000)
+    if invalid.any():
+        raise ValueError(f"Invalid area in {_invalid_rows(invalid)}")
+
+    # Strings repeat a lot (categories, popular locations), so each distinct one is stripped once
+    for field in ('property_type', 'furnished', 'location'):
+        codes, uniques = pd.factorize(pd.Series(columns[field], dtype=object))
+        stripped = np.array([str(value).strip() for value in uniques] + [''], dtype=object)
+        validated[field] = stripped[codes]
+        empty = validated[field] == ''
+        if empty.any():
+            raise ValueError(f"Empty {field} field in {_invalid_rows(empty)}")
+
+    return pd.DataFrame({field: validated[field] for field in required_fields})
@@ -0,0 +1,218 @@
+"""
+On-demand sampling profiler for RentVerse AI Service.
+
+While a profile runs, a background thread takes the Python stack of every
+thread at a fixed interval and counts identical stacks, producing collapsed
+stacks ('frame;frame;frame count' per line) that flamegraph.pl, speedscope
+and similar tools read directly. Each stack is prefixed with the route and
+the inference stage it was sampled in:
+
+    route:/api/v1/predict/batch;stage:preprocess;run (threading.py:975);...;transform (preprocessor.py:412) 37
+
+Routes are tagged by RouteTagMiddleware and stages by `with stage(name):`
+blocks around the expensive steps. Both check a single flag and do nothing
+else while no profile is running, so the profiler costs nothing when idle.
+"""
+
+import asyncio
+import os
+import sys
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Dict, Iterator, Optional, Tuple
+
+UNTAGGED = "-"
+MAX_STACK_DEPTH = 256
+
+# Innermost frames of threads that are waiting rather than working; samples
+# ending in them are dropped unless idle stacks are requested.
+IDLE_LEAVES = {
+    ("threading.py", "wait"),
+    ("threading.py", "_wait_for_tstate_lock"),
+    ("selectors.py", "select"),
+    ("queue.py", "get"),
+    ("thread.py", "_worker"),
+}
+
+_active = False
+_route: ContextVar[str] = ContextVar("profile_route", default=UNTAGGED)
+_thread_tags: Dict[int, Tuple[str, str]] = {}
+_task_routes: Dict[Any, str] = {}
+
+_profile_lock = threading.Lock()
+
+
+def profiling_active() -> bool:
+    """Whether a profile is being taken right now."""
+    return _active
+
+
+@contextmanager
+def stage(name: str) -> Iterator[None]:
+    """
+    Attribute the samples taken on this thread inside the block to an inference stage.
+
+    The block must not await: on the event loop thread another request could
+    run in the meantime and be attributed to this stage.
+    """
+    if not _active:
+        yield
+        return
+
+    ident = threading.get_ident()
+    previous = _thread_tags.get(ident)
+    _thread_tags[ident] = (_route.get(), name)
+    try:
+        yield
+    finally:
+        if previous is None:
+            _thread_tags.pop(ident, None)
+        else:
+            _thread_tags[ident] = previous
+
+
+class RouteTagMiddleware:
+    """
+    ASGI middleware tagging requests with their path for the profiler.
+
+    Must be the innermost middleware: BaseHTTPMiddleware runs the rest of the
+    application in a new task, and the route is looked up by the task that is
+    running on the event loop when a sample is taken.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if not _active or scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        task = asyncio.current_task()
+        _task_routes[task] = scope["path"]
+        token = _route.set(scope["path"])
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            _route.reset(token)
+            _task_routes.pop(task, None)
+
+
+def _frame_label(code) -> str:
+    return f"{code.co_qualname} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+
+
+class SamplingProfiler:
+    """
+    Samples the stacks of all threads for a fixed duration.
+
+    Only one profile runs at a time; run() raises RuntimeError while another
+    is in progress. The event loop and its thread are needed to attribute
+    samples on the event loop thread to the request running there.
+    """
+
+    def __init__(
+        self,
+        interval: float = 0.01,
+        include_idle: bool = False,
+        loop: Optional[asyncio.AbstractEventLoop] = None,
+        loop_thread: Optional[int] = None
+    ):
+        """
+        Args:
+            interval: Seconds between samples
+            include_idle: Keep stacks of threads waiting on a lock, queue or selector
+            loop: Event loop serving requests
+            loop_thread: Ident of the thread running the loop
+        """
+        self.interval = interval
+        self.include_idle = include_idle
+        self.loop = loop
+        self.loop_thread = loop_thread
+        self.stacks: Counter = Counter()
+        self.samples = 0
+        self.duration = 0.0
+
+    def _tags(self, ident: int) -> Tuple[str, str]:
+        tags = _thread_tags.get(ident)
+        if tags is not None:
+            return tags
+        if ident == self.loop_thread and self.loop is not None:
+            try:
+                task = asyncio.current_task(self.loop)
+            except RuntimeError:
+                task = None
+            return _task_routes.get(task, UNTAGGED), UNTAGGED
+        return UNTAGGED, UNTAGGED
+
+    def _sample(self, own_ident: int, names: Dict[int, str]) -> None:
+        for ident, frame in sys._current_frames().items():
+            if ident == own_ident:
+                continue
+            code = frame.f_code
+            if not self.include_idle and (os.path.basename(code.co_filename), code.co_name) in IDLE_LEAVES:
+                continue
+
+            frames = []
+            while frame is not None and len(frames) < MAX_STACK_DEPTH:
+                frames.append(_frame_label(frame.f_code))
+                frame = frame.f_back
+            frames.reverse()
+
+            route, stage_name = self._tags(ident)
+            thread = names.get(ident, str(ident))
+            self.stacks[";".join([f"route:{route}", f"stage:{stage_name}", f"thread:{thread}"] + frames)] += 1
+        self.samples += 1
+
+    def run(self, seconds: float) -> "SamplingProfiler":
+        """Sample every thread but the calling one for the given number of seconds."""
+        global _active
+        if not _profile_lock.acquire(blocking=False):
+            raise RuntimeError("A profile is already running")
+
+        own_ident = threading.get_ident()
+        start = time.perf_counter()
+        _active = True
+        try:
+            deadline = start + seconds
+            next_sample = start
+            while True:
+                names = {thread.ident: thread.name for thread in threading.enumerate()}
+                self._sample(own_ident, names)
+                next_sample += self.interval
+                now = time.perf_counter()
+                if next_sample >= deadline:
+                    break
+                if next_sample > now:
+                    time.sleep(next_sample - now)
+        finally:
+            _active = False
+            _thread_tags.clear()
+            _task_routes.clear()
+            self.duration = time.perf_counter() - start
+            _profile_lock.release()
+        return self
+
+    def collapsed(self) -> str:
+        """Collapsed stacks, most frequent first, one 'stack count' per line."""
+        return "".join(f"{stack} {count}\n" for stack, count in self.stacks.most_common())
+
+    def summary(self, top: int = 20) -> Dict[str, Any]:
+        """Sample counts by route and stage, and the hottest leaf frames."""
+        by_tag: Counter = Counter()
+        leaves: Counter = Counter()
+        for stack, count in self.stacks.items():
+            parts = stack.split(";")
+            by_tag[f"{parts[0][6:]} {parts[1][6:]}"] += count
+            leaves[parts[-1]] += count
+        return {
+            "samples": self.samples,
+            "duration_seconds": round(self.duration, 3),
+            "interval_ms": round(self.interval * 1000, 3),
+            "stacks": sum(self.stacks.values()),
+            "by_route_stage": dict(by_tag.most_common()),
+            "top_frames": dict(leaves.most_common(top))
+        }
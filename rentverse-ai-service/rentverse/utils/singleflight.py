@@ -0,0 +1,94 @@
+"""
+In-flight request coalescing for RentVerse AI Service.
+
+A SingleFlight group runs a blocking computation in the thread pool once per
+key: callers asking for a key that is already being computed wait for that
+computation and get the same result (or exception) instead of starting their
+own. Keys are forgotten as soon as the computation finishes, so this shares
+work between concurrent requests only and never serves stale results.
+"""
+
+import asyncio
+import functools
+import threading
+from typing import Any, Callable, Dict, Hashable, Optional
+
+
+class SingleFlight:
+    """
+    Coalesce concurrent calls with equal keys into one execution.
+
+    Must be used from a single event loop; the bookkeeping is only touched
+    from that loop, the computations themselves run in its default executor.
+
+    Parameters:
+    -----------
+    name : str
+        Label reported in the statistics
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self._in_flight: Dict[Hashable, asyncio.Future] = {}
+        self.calls = 0
+        self.executions = 0
+        self.coalesced = 0
+
+    def _forget(self, key: Hashable, future: asyncio.Future) -> None:
+        if self._in_flight.get(key) is future:
+            del self._in_flight[key]
+        # Mark a failure as retrieved even if every waiter was cancelled
+        if not future.cancelled():
+            future.exception()
+
+    async def do(self, key: Optional[Hashable], fn: Callable[..., Any], *args, **kwargs) -> Any:
+        """
+        Return fn(*args, **kwargs), sharing the execution with concurrent
+        callers of the same key. A key of None always executes.
+
+        Coalesced callers receive the same result object; callers that modify
+        a mutable result must copy it first.
+        """
+        self.calls += 1
+        future = self._in_flight.get(key) if key is not None else None
+        if future is not None:
+            self.coalesced += 1
+        else:
+            loop = asyncio.get_running_loop()
+            future = loop.run_in_executor(None, functools.partial(fn, *args, **kwargs))
+            self.executions += 1
+            if key is not None:
+                self._in_flight[key] = future
+                future.add_done_callback(functools.partial(self._forget, key))
+
+        # A cancelled waiter must not cancel the computation the others wait for
+        return await asyncio.shield(future)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get call, execution and saved-work counters."""
+        return {
+            'name': self.name,
+            'calls': self.calls,
+            'executions': self.executions,
+            'coalesced': self.coalesced,
+            'in_flight': len(self._in_flight),
+            'saved_ratio': self.coalesced / self.calls if self.calls else 0.0
+        }
+
+
+_groups: Dict[str, SingleFlight] = {}
+_groups_lock = threading.Lock()
+
+
+def get_singleflight(name: str) -> SingleFlight:
+    """Get the coalescing group registered under a name, creating it if necessary."""
+    with _groups_lock:
+        if name not in _groups:
+            _groups[name] = SingleFlight(name)
+        return _groups[name]
+
+
+def singleflight_stats() -> Dict[str, Dict[str, Any]]:
+    """Statistics of every registered coalescing group."""
+    with _groups_lock:
+        return {name: group.get_stats() for name, group in _groups.items()}
@@ -0,0 +1,139 @@
+"""
+Streaming Sketches for Rentverse
+================================
+
+This module contains QuantileSketch, a mergeable approximate-quantile sketch
+with a relative-accuracy guarantee (DDSketch-style logarithmic buckets). It is
+used where data does not fit in memory at once, e.g. for computing outlier
+percentiles during chunked preprocessor fits. Sketches built on separate
+chunks or workers can be merged into exactly the sketch of the combined data.
+"""
+
+import math
+from typing import Any, Dict, Iterable, Union
+
+import numpy as np
+
+
+class QuantileSketch:
+    """
+    Approximate quantiles with bounded relative error and fixed memory.
+
+    Values are counted in logarithmically sized buckets, so every quantile
+    estimate is within ``relative_accuracy`` of a true value at that rank, and
+    memory grows only with the logarithm of the value range, not with the
+    number of values added. Two sketches with the same accuracy merge by
+    adding bucket counts.
+
+    Parameters:
+    -----------
+    relative_accuracy : float, default=0.001
+        Maximum relative error of quantile estimates
+    """
+
+    def __init__(self, relative_accuracy: float = 0.001):
+        if not 0 < relative_accuracy < 1:
+            raise ValueError("relative_accuracy must be between 0 and 1")
+        self.relative_accuracy = relative_accuracy
+        self.gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self._log_gamma = math.log(self.gamma)
+        # Values with magnitude below this are counted as zero
+        self.min_value = 1e-9
+        self.positive: Dict[int, int] = {}
+        self.negative: Dict[int, int] = {}
+        self.zero_count = 0
+        self.count = 0
+        self.min = math.inf
+        self.max = -math.inf
+
+    def _add_to_store(self, store: Dict[int, int], magnitudes: np.ndarray) -> None:
+        keys = np.ceil(np.log(magnitudes) / self._log_gamma).astype(np.int64)
+        unique_keys, counts = np.unique(keys, return_counts=True)
+        for key, count in zip(unique_keys.tolist(), counts.tolist()):
+            store[key] = store.get(key, 0) + count
+
+    def add(self, values: Union[float, Iterable[float], np.ndarray]) -> None:
+        """Add one value or an array of values; NaNs are ignored."""
+        values = np.asarray(values, dtype=float).ravel()
+        values = values[~np.isnan(values)]
+        if values.size == 0:
+            return
+
+        positive = values[values > self.min_value]
+        negative = -values[values < -self.min_value]
+        if positive.size:
+            self._add_to_store(self.positive, positive)
+        if negative.size:
+            self._add_to_store(self.negative, negative)
+
+        self.zero_count += int(values.size - positive.size - negative.size)
+        self.count += int(values.size)
+        self.min = min(self.min, float(values.min()))
+        self.max = max(self.max, float(values.max()))
+
+    def merge(self, other: 'QuantileSketch') -> 'QuantileSketch':
+        """Merge another sketch with the same accuracy into this one."""
+        if other.relative_accuracy != self.relative_accuracy:
+            raise ValueError("Cannot merge sketches with different relative accuracy")
+        for store, other_store in ((self.positive, other.positive), (self.negative, other.negative)):
+            for key, count in other_store.items():
+                store[key] = store.get(key, 0) + count
+        self.zero_count += other.zero_count
+        self.count += other.count
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+        return self
+
+    def _bucket_value(self, key: int) -> float:
+        return 2 * self.gamma ** key / (self.gamma + 1)
+
+    def quantile(self, q: float) -> float:
+        """Estimate the q-th quantile (0 <= q <= 1); NaN if the sketch is empty."""
+        if not 0 <= q <= 1:
+            raise ValueError("q must be between 0 and 1")
+        if self.count == 0:
+            return math.nan
+        if q == 0:
+            return self.min
+        if q == 1:
+            return self.max
+
+        rank = q * (self.count - 1)
+        seen = 0
+        for key in sorted(self.negative, reverse=True):
+            seen += self.negative[key]
+            if seen > rank:
+                return max(self.min, -self._bucket_value(key))
+        seen += self.zero_count
+        if seen > rank:
+            return 0.0
+        for key in sorted(self.positive):
+            seen += self.positive[key]
+            if seen > rank:
+                return min(self.max, self._bucket_value(key))
+        return self.max
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Serialize the sketch, e.g. to merge it in another worker."""
+        return {
+            'relative_accuracy': self.relative_accuracy,
+            'positive': {str(key): count for key, count in self.positive.items()},
+            'negative': {str(key): count for key, count in self.negative.items()},
+            'zero_count': self.zero_count,
+            'count': self.count,
+            'min': self.min if self.count else None,
+            'max': self.max if self.count else None
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'QuantileSketch':
+        """Rebuild a sketch serialized with to_dict."""
+        sketch = cls(data['relative_accuracy'])
+        sketch.positive = {int(key): int(count) for key, count in data['positive'].items()}
+        sketch.negative = {int(key): int(count) for key, count in data['negative'].items()}
+        sketch.zero_count = int(data['zero_count'])
+        sketch.count = int(data['count'])
+        if sketch.count:
+            sketch.min = float(data['min'])
+            sketch.max = float(data['max'])
+        return sketch
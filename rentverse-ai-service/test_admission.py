@@ -0,0 +1,268 @@
+"""
+Test script for admission control, load shedding and priority lanes.
+
+Runs the AdmissionController in-process, no server needed.
+"""
+
+import asyncio
+
+from fastapi import FastAPI
+from fastapi.responses import StreamingResponse
+from fastapi.testclient import TestClient
+
+from rentverse.api.admission import (
+    BULK,
+    INTERACTIVE,
+    AdmissionController,
+    AdmissionMiddleware,
+    AdmissionRejected,
+    Lane
+)
+
+
+def make_controller(max_concurrency=1, interactive_reserved=0, max_queue=4, target_ms=20.0, interval_ms=100.0,
+                    client_rate=None, client_burst=20):
+    """Controller with small queues and short intervals."""
+    lanes = (
+        Lane(INTERACTIVE, 0, target_ms, interval_ms, max_queue),
+        Lane(BULK, 1, target_ms, interval_ms, max_queue)
+    )
+    return AdmissionController(max_concurrency, interactive_reserved, lanes, client_rate, client_burst)
+
+
+def test_queue_full():
+    """A full lane queue sheds new requests with 503."""
+    async def scenario():
+        controller = make_controller(max_queue=1)
+        await controller.acquire("a")
+        waiter = asyncio.ensure_future(controller.acquire("b"))
+        await asyncio.sleep(0)
+
+        try:
+            await controller.acquire("c")
+            raise AssertionError("third request was admitted")
+        except AdmissionRejected as e:
+            assert (e.status_code, e.reason) == (503, 'queue_full')
+            assert e.retry_after > 0
+
+        controller.release()
+        await waiter
+        controller.release()
+        assert controller.active == 0
+        assert controller.lanes[INTERACTIVE].rejected['queue_full'] == 1
+
+    asyncio.run(scenario())
+    print("Queue full: 503 queue_full")
+
+
+def test_rate_limited():
+    """A client over its token bucket gets 429 with Retry-After."""
+    app = FastAPI()
+    controller = make_controller(client_rate=0.5, client_burst=1)
+    app.add_middleware(AdmissionMiddleware, get_controller=lambda: controller)
+
+    @app.post("/api/v1/predict/single")
+    async def predict():
+        return {"status": "success"}
+
+    with TestClient(app) as client:
+        headers = {"X-Client-Id": "crawler"}
+        first = client.post("/api/v1/predict/single", headers=headers)
+        second = client.post("/api/v1/predict/single", headers=headers)
+        other = client.post("/api/v1/predict/single", headers={"X-Client-Id": "someone-else"})
+        health = client.get("/api/v1/predict/single")
+
+    assert first.status_code == 200
+    assert first.headers["X-Priority"] == INTERACTIVE
+    assert second.status_code == 429
+    assert second.json()["detail"] == 'rate_limited'
+    assert int(second.headers["Retry-After"]) >= 1
+    assert other.status_code == 200
+    # Only the configured methods are admission controlled
+    assert health.status_code == 405
+    assert controller.active == 0
+    print(f"Rate limited: {second.status_code} {second.json()['detail']}, Retry-After {second.headers['Retry-After']}")
+
+
+def test_queue_timeout():
+    """A request waiting longer than its lane allows is shed with 503."""
+    async def scenario():
+        controller = make_controller(interval_ms=50.0)
+        await controller.acquire("a")
+        loop = asyncio.get_running_loop()
+        started = loop.time()
+        try:
+            await controller.acquire("b")
+            raise AssertionError("request was admitted while the slot was held")
+        except AdmissionRejected as e:
+            assert (e.status_code, e.reason) == (503, 'queue_timeout')
+        waited = loop.time() - started
+
+        lane = controller.lanes[INTERACTIVE]
+        assert 0.04 <= waited < 1.0, waited
+        assert not lane.waiters
+        assert lane.rejected['queue_timeout'] == 1
+        controller.release()
+        assert controller.active == 0
+
+    asyncio.run(scenario())
+    print("Queue timeout: 503 queue_timeout")
+
+
+def test_interactive_priority():
+    """A freed slot goes to an interactive waiter before an older bulk one, and reserved slots stay interactive."""
+    async def scenario():
+        controller = make_controller(max_concurrency=2, interactive_reserved=1, interval_ms=1000.0)
+        await controller.acquire("a", BULK)
+        # The only shared slot is taken; bulk must queue although a slot is free
+        bulk = asyncio.ensure_future(controller.acquire("b", BULK))
+        await asyncio.sleep(0)
+        assert not bulk.done()
+        await controller.acquire("c", INTERACTIVE)
+
+        # Both slots busy: queue interactive work behind the bulk waiter
+        interactive = asyncio.ensure_future(controller.acquire("d", INTERACTIVE))
+        await asyncio.sleep(0)
+        controller.release(INTERACTIVE)
+        await asyncio.wait_for(interactive, 1)
+        assert not bulk.done()
+
+        controller.release(BULK)
+        await asyncio.wait_for(bulk, 1)
+        controller.release(INTERACTIVE)
+        controller.release(BULK)
+        assert controller.active == 0
+
+    asyncio.run(scenario())
+    print("Priority: interactive waiter served before older bulk waiter")
+
+
+def test_disconnect_releases_slot():
+    """A client going away while queued, or just as it is granted a slot, leaves no slot taken."""
+    async def scenario():
+        controller = make_controller(interval_ms=1000.0)
+        lane = controller.lanes[INTERACTIVE]
+        await controller.acquire("a")
+
+        # Cancelled while waiting: removed from the queue
+        waiting = asyncio.ensure_future(controller.acquire("b"))
+        await asyncio.sleep(0)
+        waiting.cancel()
+        await asyncio.gather(waiting, return_exceptions=True)
+        assert not lane.waiters and controller.active == 1
+
+        # Cancelled after the slot was handed over but before it resumed
+        granted = asyncio.ensure_future(controller.acquire("c"))
+        await asyncio.sleep(0)
+        controller.release()
+        assert controller.active == 1
+        granted.cancel()
+        await asyncio.gather(granted, return_exceptions=True)
+        assert controller.active == 0
+
+        await controller.acquire("d")
+        controller.release()
+        assert controller.active == 0 and not lane.waiters
+
+    asyncio.run(scenario())
+    print("Disconnect: slots released")
+
+
+def test_streaming_holds_slot():
+    """A streamed response keeps its slot until the last body chunk, and a failing one releases it."""
+    controller = make_controller(interval_ms=1000.0)
+    finish = asyncio.Event()
+    app = FastAPI()
+    app.add_middleware(AdmissionMiddleware, get_controller=lambda: controller)
+
+    @app.post("/api/v1/predict/stream")
+    async def stream():
+        async def chunks():
+            yield b"first,"
+            await finish.wait()
+            yield b"last"
+        return StreamingResponse(chunks(), media_type="text/csv")
+
+    @app.post("/api/v1/predict/fail")
+    async def fail():
+        raise RuntimeError("model exploded")
+
+    def scope(path):
+        return {"type": "http", "method": "POST", "path": path, "raw_path": path.encode(), "query_string": b"",
+                "headers": [], "client": ("127.0.0.1", 1234), "server": ("test", 80), "scheme": "http",
+                "http_version": "1.1", "root_path": "", "app": app}
+
+    def receiver():
+        """The request body once, then nothing until the client would disconnect."""
+        messages = [{"type": "http.request", "body": b"", "more_body": False}]
+
+        async def receive():
+            if messages:
+                return messages.pop()
+            await asyncio.Future()
+        return receive
+
+    async def scenario():
+        sent = []
+        first_chunk = asyncio.Event()
+
+        async def send(message):
+            sent.append(message)
+            if message["type"] == "http.response.body" and message.get("body"):
+                first_chunk.set()
+
+        request = asyncio.ensure_future(app(scope("/api/v1/predict/stream"), receiver(), send))
+        await asyncio.wait_for(first_chunk.wait(), 1)
+        # Headers and the first chunk are out, the body is not finished
+        assert sent[0]["status"] == 200
+        assert (b"x-priority", INTERACTIVE.encode()) in sent[0]["headers"]
+        assert controller.active == 1
+
+        finish.set()
+        await asyncio.wait_for(request, 1)
+        assert b"".join(m.get("body", b"") for m in sent if m["type"] == "http.response.body") == b"first,last"
+        assert controller.active == 0
+
+        try:
+            await app(scope("/api/v1/predict/fail"), receiver(), send)
+        except RuntimeError:
+            pass
+        assert controller.active == 0
+
+    asyncio.run(scenario())
+    print("Streaming: slot held until the last chunk")
+
+
+if __name__ == "__main__":
+    print("Testing RentVerse AI Service Admission Control")
+    print("=" * 50)
+
+    tests = [
+        ("Queue Full", test_queue_full),
+        ("Rate Limited", test_rate_limited),
+        ("Queue Timeout", test_queue_timeout),
+        ("Interactive Priority", test_interactive_priority),
+        ("Disconnect Releases Slot", test_disconnect_releases_slot),
+        ("Streaming Holds Slot", test_streaming_holds_slot)
+    ]
+
+    results = []
+    for test_name, test_func in tests:
+        print(f"\n{test_name}:")
+        try:
+            test_func()
+            success = True
+        except AssertionError as e:
+            print(f"Assertion failed: {e}")
+            success = False
+        results.append((test_name, success))
+
+    print("\n" + "=" * 50)
+    print("Test Results Summary:")
+    for test_name, success in results:
+        status = "✅ PASSED" if success else "❌ FAILED"
+        print(f"{test_name}: {status}")
+
+    passed = sum(1 for _, success in results if success)
+    total = len(results)
+    print(f"\nOverall: {passed}/{total} tests passed")
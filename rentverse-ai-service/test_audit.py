@@ -0,0 +1,158 @@
+"""
+Test script for the prediction audit log.
+
+Runs AuditLog and query_audit in-process on a temporary directory, no server
+needed.
+"""
+
+import json
+import tempfile
+import time
+
+from rentverse.utils.audit import AuditLog, ColumnRows, list_segments, query_audit
+
+PROPERTY = {
+    "property_type": "Condominium",
+    "bedrooms": 3,
+    "bathrooms": 2,
+    "area": 1200,
+    "furnished": "Yes",
+    "location": "KLCC, Kuala Lumpur"
+}
+
+
+def read_lines(directory):
+    """Every record written to the directory's segments."""
+    return [json.loads(line) for path in list_segments(directory) for line in path.read_text().splitlines()]
+
+
+def test_drops_when_buffer_full():
+    """Records offered to a full buffer are dropped and counted, never blocking."""
+    with tempfile.TemporaryDirectory() as directory:
+        audit_log = AuditLog(directory, buffer_size=3)
+        accepted = [audit_log.record("/predict/single", "v1", [PROPERTY], [2500.0], 1.0) for _ in range(5)]
+
+        assert accepted == [True, True, True, False, False]
+        stats = audit_log.get_stats()
+        assert (stats['accepted'], stats['dropped'], stats['buffered']) == (3, 2, 3)
+        assert stats['drop_rate'] == 0.4
+
+        # Writing frees the buffer for new records
+        audit_log.start()
+        assert audit_log.flush()
+        assert audit_log.record("/predict/single", "v1", [PROPERTY], [2500.0], 1.0)
+        audit_log.close()
+        assert audit_log.get_stats()['written'] == 4
+    print(f"Drops: {stats['dropped']} of {stats['accepted'] + stats['dropped']} records")
+
+
+def test_segment_rotation():
+    """Segments rotate by size and age, and only max_segments are kept."""
+    with tempfile.TemporaryDirectory() as directory:
+        audit_log = AuditLog(directory, flush_interval=0.01, segment_max_bytes=1500, max_segments=3).start()
+        for i in range(8):
+            audit_log.record("/predict/batch", "v1", [PROPERTY] * 2, [1000.0 + i, 2000.0 + i], 1.0)
+            assert audit_log.flush()
+        audit_log.close()
+
+        segments = list_segments(directory)
+        stats = audit_log.get_stats()
+        assert stats['written'] == 16
+        assert len(segments) == 3
+        assert all(path.stat().st_size <= 1500 for path in segments)
+        # The newest records are kept
+        assert read_lines(directory)[-1]['output'] == 2007.0
+
+    with tempfile.TemporaryDirectory() as directory:
+        aged = AuditLog(directory, flush_interval=0.01, segment_max_seconds=0).start()
+        for _ in range(3):
+            aged.record("/predict/single", "v1", [PROPERTY], [2500.0], 1.0)
+            assert aged.flush()
+        aged.close()
+        assert len(list_segments(directory)) == 3
+    print(f"Rotation: {len(segments)} segments kept of {stats['batches']} batches")
+
+
+def test_close_writes_buffer():
+    """close(timeout) writes what is buffered before the writer's next run."""
+    with tempfile.TemporaryDirectory() as directory:
+        audit_log = AuditLog(directory, flush_interval=60.0).start()
+        for i in range(10):
+            audit_log.record("/predict/single", "v1", [PROPERTY], [{"predicted_price": 2000.0 + i}], 1.0)
+        assert audit_log.get_stats()['written'] == 0
+
+        started = time.monotonic()
+        audit_log.close(timeout=5.0)
+        assert time.monotonic() - started < 5.0
+
+        stats = audit_log.get_stats()
+        assert not stats['running'] and stats['buffered'] == 0
+        assert stats['written'] == 10 and stats['lost'] == 0
+        records = read_lines(directory)
+        assert [r['output']['predicted_price'] for r in records] == [2000.0 + i for i in range(10)]
+    print(f"Close: {stats['written']} buffered records written")
+
+
+def test_query_filters():
+    """query_audit filters by time range, listing attributes, predicted price and limit."""
+    with tempfile.TemporaryDirectory() as directory:
+        audit_log = AuditLog(directory, flush_interval=0.01).start()
+        audit_log.record("/predict/single", "v1", [PROPERTY], [{"predicted_price": 2500.0}], 1.0)
+        audit_log.record("/classify/price", "v1", [{**PROPERTY, "property_type": "House"}], [4000.0], 1.0)
+        assert audit_log.flush()
+        time.sleep(0.05)
+        middle = time.time()
+        time.sleep(0.05)
+        columns = ColumnRows({"property_type": ["Condominium", "Apartment"], "area": [900, 700]})
+        audit_log.record("/predict/columnar", "v2", columns, [1800.0, 3200.0], 2.0)
+        audit_log.close()
+
+        records = list(query_audit(directory))
+        assert len(records) == 4
+        assert [r['batch_index'] for r in records[2:]] == [0, 1]
+
+        assert {r['endpoint'] for r in query_audit(directory, until=middle)} == {"/predict/single", "/classify/price"}
+        assert [r['output'] for r in query_audit(directory, since=middle)] == [1800.0, 3200.0]
+
+        condos = list(query_audit(directory, filters={"property_type": "condominium"}))
+        assert [r['endpoint'] for r in condos] == ["/predict/single", "/predict/columnar"]
+        assert [r['model_version'] for r in query_audit(directory, filters={"endpoint": "/classify/price"})] == ["v1"]
+
+        priced = list(query_audit(directory, min_price=2000.0, max_price=3500.0))
+        assert [r['endpoint'] for r in priced] == ["/predict/single", "/predict/columnar"]
+        assert priced[1]['output'] == 3200.0
+        assert len(list(query_audit(directory, min_price=1000.0, limit=3))) == 3
+    print("Query: time range, attribute, price and limit filters")
+
+
+if __name__ == "__main__":
+    print("Testing RentVerse AI Service Audit Log")
+    print("=" * 50)
+
+    tests = [
+        ("Drops When Buffer Full", test_drops_when_buffer_full),
+        ("Segment Rotation", test_segment_rotation),
+        ("Close Writes Buffer", test_close_writes_buffer),
+        ("Query Filters", test_query_filters)
+    ]
+
+    results = []
+    for test_name, test_func in tests:
+        print(f"\n{test_name}:")
+        try:
+            test_func()
+            success = True
+        except AssertionError as e:
+            print(f"Assertion failed: {e}")
+            success = False
+        results.append((test_name, success))
+
+    print("\n" + "=" * 50)
+    print("Test Results Summary:")
+    for test_name, success in results:
+        status = "✅ PASSED" if success else "❌ FAILED"
+        print(f"{test_name}: {status}")
+
+    passed = sum(1 for _, success in results if success)
+    total = len(results)
+    print(f"\nOverall: {passed}/{total} tests passed")
@@ -0,0 +1,137 @@
+"""
+Test script for the compact tree ensemble representation.
+
+Fits small scikit-learn regressors in-process and compares the compact copy
+against them; no server needed.
+"""
+
+import warnings
+
+import numpy as np
+import pandas as pd
+from sklearn.ensemble import ExtraTreesRegressor, GradientBoostingRegressor, RandomForestRegressor
+from sklearn.linear_model import LinearRegression, Ridge
+from sklearn.tree import DecisionTreeRegressor
+
+from rentverse.models.compact import CompactTreeEnsemble
+
+# Largest difference to scikit-learn accepted, in RM
+MAX_ABS_ERROR = 1e-3
+
+
+def rent_data(n, seed=0):
+    """Scaled features and prices in RM, with repeated values like the encoded categories."""
+    rng = np.random.default_rng(seed)
+    X = np.column_stack([
+        rng.integers(0, 5, n) / 4,        # property type code
+        rng.integers(0, 7, n) / 6,        # bedrooms
+        rng.integers(1, 5, n) / 4,        # bathrooms
+        rng.uniform(0, 1, n),             # area
+        rng.integers(0, 4, n) / 3,        # furnished code
+        rng.integers(0, 14, n) / 13       # region code
+    ])
+    y = 800 + 3000 * X[:, 3] + 400 * X[:, 1] + 600 * (X[:, 5] > 0.5) + rng.normal(0, 100, n)
+    return X, y
+
+
+def test_matches_sklearn():
+    """Compact predictions agree with every supported regressor to well within a sen."""
+    X, y = rent_data(800)
+    X_new, _ = rent_data(500, seed=1)
+    models = [
+        RandomForestRegressor(n_estimators=30, max_depth=10, random_state=0),
+        ExtraTreesRegressor(n_estimators=30, max_depth=10, random_state=0),
+        GradientBoostingRegressor(n_estimators=60, max_depth=4, random_state=0),
+        DecisionTreeRegressor(max_depth=12, random_state=0)
+    ]
+
+    for model in models:
+        model.fit(X, y)
+        compact = CompactTreeEnsemble.from_model(model)
+        assert compact is not None, type(model).__name__
+        assert compact.verify(model), (type(model).__name__, compact.max_abs_error)
+
+        for rows in (X_new, compact.probe_rows()):
+            error = np.max(np.abs(compact.predict(rows) - model.predict(rows)))
+            assert error < MAX_ABS_ERROR, (type(model).__name__, error)
+        print(f"{type(model).__name__}: max abs error {compact.max_abs_error:.1e} RM, "
+              f"{compact.n_trees} trees, {compact.nbytes / 1024:.0f} KB")
+
+
+def test_member_predictions():
+    """Per-tree predictions of a forest match its estimators, for the ensemble intervals."""
+    X, y = rent_data(500)
+    forest = RandomForestRegressor(n_estimators=10, max_depth=8, random_state=0).fit(X, y)
+    compact = CompactTreeEnsemble.from_model(forest)
+
+    expected = np.stack([tree.predict(X.astype(np.float32)) for tree in forest.estimators_])
+    assert np.max(np.abs(compact.member_predictions(X) - expected)) < MAX_ABS_ERROR
+    print("Member predictions: match the forest's trees")
+
+
+def test_node_arrays():
+    """Children are stored as int32 and inference structures only."""
+    X, y = rent_data(500)
+    compact = CompactTreeEnsemble.from_model(GradientBoostingRegressor(n_estimators=20, random_state=0).fit(X, y))
+
+    assert compact.children.dtype == np.int32
+    assert compact.value.dtype == np.float32
+    assert compact.feature.dtype == np.uint8
+    assert len(compact.children) == 2 * compact.n_nodes
+    print(f"Node arrays: {compact.n_nodes} nodes in {compact.nbytes} bytes")
+
+
+def test_dataframe_model_no_warning():
+    """Building a compact copy of a boosting model fitted on a DataFrame raises no warning."""
+    X, y = rent_data(300)
+    frame = pd.DataFrame(X, columns=['property_type', 'bedrooms', 'bathrooms', 'area', 'furnished', 'region'])
+    model = GradientBoostingRegressor(n_estimators=10, random_state=0).fit(frame, y)
+
+    with warnings.catch_warnings():
+        warnings.simplefilter('error')
+        compact = CompactTreeEnsemble.from_model(model)
+    assert compact.verify(model)
+    print("DataFrame-fitted model: no warning")
+
+
+def test_unsupported_models():
+    """Models without a constant base or trees are left as they are."""
+    X, y = rent_data(300)
+    assert CompactTreeEnsemble.from_model(Ridge().fit(X, y)) is None
+    boosting = GradientBoostingRegressor(n_estimators=5, init=LinearRegression(), random_state=0).fit(X, y)
+    assert CompactTreeEnsemble.from_model(boosting) is None
+    print("Unsupported models: None")
+
+
+if __name__ == "__main__":
+    print("Testing RentVerse AI Service Compact Trees")
+    print("=" * 50)
+
+    tests = [
+        ("Matches scikit-learn", test_matches_sklearn),
+        ("Member Predictions", test_member_predictions),
+        ("Node Arrays", test_node_arrays),
+        ("DataFrame Model No Warning", test_dataframe_model_no_warning),
+        ("Unsupported Models", test_unsupported_models)
+    ]
+
+    results = []
+    for test_name, test_func in tests:
+        print(f"\n{test_name}:")
+        try:
+            test_func()
+            success = True
+        except AssertionError as e:
+            print(f"Assertion failed: {e}")
+            success = False
+        results.append((test_name, success))
+
+    print("\n" + "=" * 50)
+    print("Test Results Summary:")
+    for test_name, success in results:
+        status = "✅ PASSED" if success else "❌ FAILED"
+        print(f"{test_name}: {status}")
+
+    passed = sum(1 for _, success in results if success)
+    total = len(results)
+    print(f"\nOverall: {passed}/{total} tests passed")
@@ -0,0 +1,176 @@
+"""
+Test script for post-training model compression.
+
+Compresses small tree ensembles, and a deployment artifact trained on
+synthetic listings, in-process; no server needed.
+"""
+
+import logging
+import os
+import tempfile
+import warnings
+from statistics import NormalDist
+
+import joblib
+import numpy as np
+import pandas as pd
+from sklearn.ensemble import GradientBoostingRegressor, RandomForestRegressor
+from sklearn.metrics import r2_score
+from sklearn.preprocessing import MinMaxScaler
+
+from rentverse.models.ml_models import DEFAULT_MODEL_FILENAME, PropertyPricePredictionModel
+from rentverse.training.compression import COMPRESSION_REPORT_FILENAME, compress_model, model_structure, run_compression
+from rentverse.training.trainer import TrainingConfig, build_deployment_artifact, fit_preprocessor, split_dataset
+
+warnings.filterwarnings("ignore")
+logging.disable(logging.CRITICAL)
+
+EPSILON = 0.01
+PROPERTY = {
+    "property_type": "Condo",
+    "bedrooms": 3,
+    "bathrooms": 2,
+    "area": 1200,
+    "furnished": "Fully Furnished",
+    "location": "KLCC, Kuala Lumpur"
+}
+AREAS = {
+    "Kuala Lumpur": ["KLCC", "Mont Kiara", "Cheras", "Bangsar"],
+    "Selangor": ["Petaling Jaya", "Shah Alam", "Subang Jaya"],
+    "Penang": ["Georgetown", "Bayan Lepas"],
+    "Johor": ["Johor Bahru", "Skudai"]
+}
+
+
+def write_listings(path, n=1500, seed=0):
+    """Raw listings CSV in the scraped format: prices in RM, areas in sq ft."""
+    rng = np.random.default_rng(seed)
+    states = rng.choice(list(AREAS), n)
+    bedrooms = rng.integers(1, 6, n)
+    area = rng.integers(400, 3000, n)
+    multiplier = np.array([{"Kuala Lumpur": 1.6, "Selangor": 1.2}.get(state, 0.9) for state in states])
+    price = (300 + area * 1.1 * multiplier + bedrooms * 150 + rng.normal(0, 150, n)).clip(300)
+    pd.DataFrame({
+        "price": [f"RM {p:,.0f}" for p in price],
+        "property_type": rng.choice(["Apartment", "Condo", "House", "Townhouse"], n),
+        "bedrooms": bedrooms,
+        "bathrooms": np.clip(bedrooms - rng.integers(0, 2, n), 1, 4),
+        "area": [f"{a} sqft" for a in area],
+        "furnished": rng.choice(["Fully Furnished", "Partly Furnished", "Unfurnished"], n),
+        "location": [f"{rng.choice(AREAS[state])}, {state}" for state in states]
+    }).to_csv(path, index=False)
+
+
+def regression_data(n, seed=0):
+    rng = np.random.default_rng(seed)
+    X = rng.random((n, 6))
+    y = 1000 + 3000 * X[:, 0] + 500 * np.sin(6 * X[:, 1]) + rng.normal(0, 100, n)
+    return X, y
+
+
+def test_compress_model_within_epsilon():
+    """Forests and boosted ensembles shrink while test R² stays within epsilon."""
+    X, y = regression_data(2000)
+    X_test, y_test = regression_data(500, seed=1)
+    models = [
+        RandomForestRegressor(n_estimators=40, min_samples_leaf=2, random_state=0),
+        GradientBoostingRegressor(n_estimators=80, max_depth=5, random_state=0)
+    ]
+
+    for model in models:
+        model.fit(X, y)
+        compressed, summary = compress_model(model, X_test, y_test, epsilon=EPSILON)
+        baseline = r2_score(y_test, model.predict(X_test))
+        r2 = r2_score(y_test, compressed.predict(X_test))
+
+        assert abs(summary['baseline_r2'] - baseline) < 1e-12
+        assert r2 >= baseline - EPSILON - 1e-9, (type(model).__name__, baseline, r2)
+        assert abs(summary['compressed_r2'] - r2) < 1e-12
+        before, after = model_structure(model), model_structure(compressed)
+        assert after['total_nodes'] < before['total_nodes'], (before, after)
+        # The original is left untouched
+        assert model_structure(model) == before
+        print(f"{type(model).__name__}: R² {baseline:.4f} -> {r2:.4f}, "
+              f"{before['total_nodes']} -> {after['total_nodes']} nodes")
+
+
+def test_run_compression_artifact():
+    """A compressed deployment artifact stays within epsilon, loads and serves residual intervals."""
+    with tempfile.TemporaryDirectory() as workdir:
+        data_path = os.path.join(workdir, "listings.csv")
+        write_listings(data_path)
+        config = TrainingConfig(
+            data_path=data_path,
+            output_dir=os.path.join(workdir, "models"),
+            reports_dir=os.path.join(workdir, "reports"),
+            cache_dir=None,
+            latency_repeats=20
+        )
+
+        preprocessor, df_processed = fit_preprocessor(pd.read_csv(data_path), config)
+        split = split_dataset(df_processed, config)
+        scaler = MinMaxScaler()
+        X_train = scaler.fit_transform(split.X_train)
+        forest = RandomForestRegressor(n_estimators=40, random_state=0).fit(X_train, np.log1p(split.y_train))
+        artifact = build_deployment_artifact(
+            preprocessor, "Random Forest", {"model": forest, "test_rmse": 1.0}, scaler, use_log_transform=True
+        )
+        artifact_path = os.path.join(workdir, "artifact.pkl")
+        joblib.dump(artifact, artifact_path)
+
+        output_dir = os.path.join(workdir, "compressed")
+        result = run_compression(artifact_path, config, os.path.join(output_dir, DEFAULT_MODEL_FILENAME), EPSILON)
+
+        summary = result['summary']
+        assert summary['supported']
+        assert summary['compressed_r2'] >= summary['baseline_r2'] - EPSILON - 1e-9, summary
+        report = pd.read_csv(result['paths']['report'])
+        assert result['paths']['report'].endswith(COMPRESSION_REPORT_FILENAME)
+        assert report['Stage'].tolist() == ['before', 'after']
+        assert report['Total Nodes'].iloc[1] <= report['Total Nodes'].iloc[0]
+
+        written = joblib.load(result['paths']['artifact'])
+        assert written['interval_method'] == 'residual'
+        rmse = written['performance_metrics']['test_rmse']
+        assert rmse > 1.0 and abs(written['performance_metrics']['test_r2'] - summary['compressed_r2']) < 1e-9
+
+        model = PropertyPricePredictionModel(output_dir)
+        prediction = model.predict_single(PROPERTY, quantiles=[0.25])
+        assert prediction['interval_method'] == 'residual'
+        point = prediction['predicted_price']
+        for q, value in prediction['quantiles'].items():
+            expected = max(point + NormalDist().inv_cdf(float(q)) * rmse, 0.0)
+            assert abs(value - expected) < 1e-6, (q, value, expected)
+        print(f"Artifact: R² {summary['baseline_r2']:.4f} -> {summary['compressed_r2']:.4f}, "
+              f"RM {prediction['price_range']['min']:,.0f} - {prediction['price_range']['max']:,.0f}")
+
+
+if __name__ == "__main__":
+    print("Testing RentVerse AI Service Model Compression")
+    print("=" * 50)
+
+    tests = [
+        ("Compress Model Within Epsilon", test_compress_model_within_epsilon),
+        ("Run Compression Artifact", test_run_compression_artifact)
+    ]
+
+    results = []
+    for test_name, test_func in tests:
+        print(f"\n{test_name}:")
+        try:
+            test_func()
+            success = True
+        except AssertionError as e:
+            print(f"Assertion failed: {e}")
+            success = False
+        results.append((test_name, success))
+
+    print("\n" + "=" * 50)
+    print("Test Results Summary:")
+    for test_name, success in results:
+        status = "✅ PASSED" if success else "❌ FAILED"
+        print(f"{test_name}: {status}")
+
+    passed = sum(1 for _, success in results if success)
+    total = len(results)
+    print(f"\nOverall: {passed}/{total} tests passed")
@@ -0,0 +1,112 @@
+"""
+Test script for ETag revalidation of the model information endpoints.
+
+Runs the service in-process with FastAPI's TestClient, no server needed.
+"""
+
+import logging
+import os
+import tempfile
+import warnings
+
+import joblib
+from fastapi.testclient import TestClient
+
+from rentverse.api.conditional import etag_matches
+from rentverse.main import app
+from rentverse.models import ml_models
+from rentverse.models.ml_models import DEFAULT_MODEL_FILENAME
+
+warnings.filterwarnings("ignore")
+logging.disable(logging.CRITICAL)
+
+ENDPOINTS = ["/api/v1/health/model", "/api/v1/predict/model-info"]
+
+
+def test_etag_matches():
+    """If-None-Match matches the ETag in a list, weakly or with a wildcard."""
+    etag = '"abc"'
+    assert etag_matches('"abc"', etag)
+    assert etag_matches('"xyz", W/"abc"', etag)
+    assert etag_matches('*', etag)
+    assert not etag_matches('"abcd"', etag)
+    assert not etag_matches(None, etag) and not etag_matches('', etag)
+    print("ETag matching: lists, weak tags and wildcard")
+
+
+def test_not_modified():
+    """A matching If-None-Match gets 304 with an empty body and the same ETag."""
+    ml_models.reload_ml_model()
+    client = TestClient(app)
+    for url in ENDPOINTS:
+        first = client.get(url)
+        assert first.status_code == 200 and first.json()
+        etag = first.headers["ETag"]
+        assert etag.startswith('"') and "max-age" in first.headers["Cache-Control"]
+
+        revalidated = client.get(url, headers={"If-None-Match": etag})
+        assert revalidated.status_code == 304
+        assert revalidated.content == b""
+        assert revalidated.headers["ETag"] == etag
+
+        stale = client.get(url, headers={"If-None-Match": '"something-else"'})
+        assert stale.status_code == 200 and stale.content == first.content
+        print(f"{url}: 304 for {etag}")
+
+
+def test_etag_changes_after_reload():
+    """Reloading a different model changes the ETag, so clients get the new body."""
+    shipped = ml_models.reload_ml_model()
+    client = TestClient(app)
+    before = {url: client.get(url).headers["ETag"] for url in ENDPOINTS}
+
+    with tempfile.TemporaryDirectory() as model_dir:
+        artifact = dict(shipped.pipeline_components)
+        artifact["model_name"] = "Retrained Model"
+        joblib.dump(artifact, os.path.join(model_dir, DEFAULT_MODEL_FILENAME))
+        try:
+            ml_models.reload_ml_model(model_dir)
+            for url in ENDPOINTS:
+                response = client.get(url, headers={"If-None-Match": before[url]})
+                assert response.status_code == 200
+                assert response.headers["ETag"] != before[url]
+                assert "Retrained Model" in response.text
+        finally:
+            ml_models.reload_ml_model()
+
+    # The same artifact again gives the same ETag
+    for url in ENDPOINTS:
+        assert client.get(url, headers={"If-None-Match": before[url]}).status_code == 304
+    print("Reload: new ETag for a different model, old one valid again after restoring")
+
+
+if __name__ == "__main__":
+    print("Testing RentVerse AI Service Conditional Responses")
+    print("=" * 50)
+
+    tests = [
+        ("ETag Matching", test_etag_matches),
+        ("Not Modified", test_not_modified),
+        ("ETag Changes After Reload", test_etag_changes_after_reload)
+    ]
+
+    results = []
+    for test_name, test_func in tests:
+        print(f"\n{test_name}:")
+        try:
+            test_func()
+            success = True
+        except AssertionError as e:
+            print(f"Assertion failed: {e}")
+            success = False
+        results.append((test_name, success))
+
+    print("\n" + "=" * 50)
+    print("Test Results Summary:")
+    for test_name, success in results:
+        status = "✅ PASSED" if success else "❌ FAILED"
+        print(f"{test_name}: {status}")
+
+    passed = sum(1 for _, success in results if success)
+    total = len(results)
+    print(f"\nOverall: {passed}/{total} tests passed")
@@ -0,0 +1,165 @@
+"""
+Test script for input drift detection.
+
+Runs the DriftMonitor in-process on synthetic encoded features, no server needed.
+"""
+
+import math
+
+import numpy as np
+import pandas as pd
+from sklearn.preprocessing import LabelEncoder, MinMaxScaler
+
+from rentverse.models.drift import MIN_SAMPLES, PSI_ALERT, DriftMonitor, drift_baseline, psi
+
+FEATURES = ['area', 'region']
+REGIONS = ['johor', 'kuala lumpur', 'penang', 'selangor']
+
+
+def training_frame(n=2000, seed=0):
+    """Encoded training features: area in sq ft and a region code."""
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({
+        'area': rng.uniform(500, 2500, n),
+        'region': rng.integers(0, len(REGIONS), n).astype(float)
+    })
+
+
+def make_monitor(window_seconds=3600.0):
+    """Monitor with a baseline, encoders and a MinMax scaler fitted on the training frame."""
+    train = training_frame()
+    encoders = {'region': LabelEncoder().fit(REGIONS)}
+    scaler = MinMaxScaler().fit(train[FEATURES])
+    baseline = drift_baseline(train, FEATURES, encoders)
+    return DriftMonitor(FEATURES, encoders, baseline, scaler, window_seconds=window_seconds)
+
+
+def observe(monitor, frame, regions):
+    monitor.observe({'region': regions}, frame[FEATURES])
+
+
+def test_psi():
+    """PSI is zero for the expected distribution and matches the formula otherwise."""
+    expected = np.array([0.25, 0.25, 0.5])
+    assert psi(expected, np.array([25, 25, 50])) < 1e-12
+    assert psi(expected, np.zeros(3)) == 0.0
+
+    observed = np.array([50, 25, 25])
+    manual = sum((o - e) * math.log(o / e) for o, e in zip([0.5, 0.25, 0.25], expected))
+    assert abs(psi(expected, observed) - manual) < 1e-12
+
+    # An empty bin is floored instead of giving an infinite score
+    assert np.isfinite(psi(expected, np.array([0, 50, 50])))
+    print(f"PSI: {psi(expected, observed):.4f} for a shift of a quarter of the mass")
+
+
+def test_baseline():
+    """Numeric features get decile bins of equal share, categorical ones the class shares."""
+    train = training_frame()
+    baseline = drift_baseline(train, FEATURES, {'region': LabelEncoder().fit(REGIONS)})
+
+    area = baseline['features']['area']
+    assert area['kind'] == 'numeric' and len(area['edges']) == 9
+    assert np.allclose(area['proportions'], 0.1, atol=0.01)
+    region = baseline['features']['region']
+    assert region['kind'] == 'categorical' and len(region['proportions']) == len(REGIONS)
+    assert abs(sum(region['proportions']) - 1.0) < 1e-9
+    assert baseline['rows'] == len(train)
+    print(f"Baseline: {len(area['edges']) + 1} area bins, {len(REGIONS)} region classes")
+
+
+def test_psi_alert_waits_for_min_samples():
+    """A shifted distribution is scored from the first row but alerts only after MIN_SAMPLES rows."""
+    monitor = make_monitor()
+    shifted = training_frame(MIN_SAMPLES - 1, seed=1)
+    shifted['area'] = shifted['area'] * 0.3 + 500
+    observe(monitor, shifted, ['johor'] * len(shifted))
+
+    stats = monitor.get_stats()
+    assert stats['recent_rows'] == MIN_SAMPLES - 1
+    assert stats['features']['area']['psi'] >= PSI_ALERT
+    assert stats['alerts'] == [] and stats['status'] == 'ok'
+
+    observe(monitor, shifted.iloc[:1], ['johor'])
+    stats = monitor.get_stats()
+    assert stats['status'] == 'drift'
+    assert any(alert.startswith('area: PSI') and '(alert)' in alert for alert in stats['alerts'])
+    print(f"PSI alert: {stats['alerts']}")
+
+
+def test_unknown_categories_wait_for_min_samples():
+    """Unknown categories are counted from the first row but alert only after MIN_SAMPLES rows."""
+    monitor = make_monitor()
+    frame = training_frame(MIN_SAMPLES, seed=2)
+    regions = ['atlantis'] * (MIN_SAMPLES // 2) + ['unknown'] * (MIN_SAMPLES // 2)
+
+    observe(monitor, frame.iloc[:10], regions[:10])
+    stats = monitor.get_stats()
+    assert stats['features']['region']['unknown_rate'] == 1.0
+    assert not any('unknown categories' in alert for alert in stats['alerts'])
+
+    observe(monitor, frame.iloc[10:], regions[10:])
+    stats = monitor.get_stats()
+    assert stats['features']['region']['unknown_total'] == MIN_SAMPLES
+    assert 'region: 100.0% unknown categories' in stats['alerts']
+
+    # Known regions in the same volume do not alert
+    clean = make_monitor()
+    observe(clean, frame, [REGIONS[int(code)] for code in frame['region']])
+    assert clean.get_stats()['features']['region']['unknown_rate'] == 0.0
+    print(f"Unknown categories: alert after {MIN_SAMPLES} rows")
+
+
+def test_out_of_range_and_windows():
+    """Values outside the scaler's training range are counted, and old windows age out."""
+    monitor = make_monitor(window_seconds=60.0)
+    frame = training_frame(100, seed=3)
+    frame.loc[:24, 'area'] = 10000.0
+    observe(monitor, frame, ['penang'] * len(frame))
+
+    stats = monitor.get_stats()
+    assert stats['features']['area']['out_of_range_rate'] == 0.25
+    assert 'out_of_range_rate' not in stats['features']['region']
+
+    # One window later the rows are in the previous window, two windows later they are gone
+    monitor.window_started_at -= 60.0
+    assert monitor.get_stats()['recent_rows'] == 100
+    monitor.window_started_at -= 60.0
+    stats = monitor.get_stats()
+    assert stats['recent_rows'] == 0 and stats['rows'] == 100
+    assert stats['features']['area']['out_of_range_rate'] == 0.0
+    print("Out of range: 25% counted, aged out after two windows")
+
+
+if __name__ == "__main__":
+    print("Testing RentVerse AI Service Drift Detection")
+    print("=" * 50)
+
+    tests = [
+        ("PSI", test_psi),
+        ("Baseline", test_baseline),
+        ("PSI Alert Waits For MIN_SAMPLES", test_psi_alert_waits_for_min_samples),
+        ("Unknown Categories Wait For MIN_SAMPLES", test_unknown_categories_wait_for_min_samples),
+        ("Out Of Range And Windows", test_out_of_range_and_windows)
+    ]
+
+    results = []
+    for test_name, test_func in tests:
+        print(f"\n{test_name}:")
+        try:
+            test_func()
+            success = True
+        except AssertionError as e:
+            print(f"Assertion failed: {e}")
+            success = False
+        results.append((test_name, success))
+
+    print("\n" + "=" * 50)
+    print("Test Results Summary:")
+    for test_name, success in results:
+        status = "✅ PASSED" if success else "❌ FAILED"
+        print(f"{test_name}: {status}")
+
+    passed = sum(1 for _, success in results if success)
+    total = len(results)
+    print(f"\nOverall: {passed}/{total} tests passed")
@@ -0,0 +1,117 @@
+"""
+Test script for the serving cost report and SLO-based model selection.
+
+Runs rentverse.training.evaluation in-process, no server needed.
+"""
+
+import logging
+
+import numpy as np
+import pandas as pd
+from sklearn.ensemble import RandomForestRegressor
+from sklearn.linear_model import Ridge
+from sklearn.metrics import mean_absolute_error, mean_squared_error, r2_score
+
+from rentverse.training.evaluation import (
+    ACCURACY_COLUMN,
+    LATENCY_COLUMN,
+    pareto_front,
+    select_model,
+    serving_report
+)
+
+logging.disable(logging.CRITICAL)
+
+
+def make_report():
+    """A report whose accuracy and latency trade off, with one dominated and one tied model."""
+    return pd.DataFrame({
+        'Model': ['Forest', 'Boosting', 'Ridge', 'Slow Ridge', 'Tie'],
+        ACCURACY_COLUMN: [0.90, 0.85, 0.70, 0.70, 0.85],
+        LATENCY_COLUMN: [5.0, 1.0, 0.2, 3.0, 1.0]
+    })
+
+
+def test_pareto_front():
+    """Only models that no other model is at least as good as on both axes are on the front."""
+    flags = pareto_front(make_report())
+    assert flags.tolist() == [True, True, True, False, True]
+
+    single = pareto_front(make_report().iloc[:1])
+    assert single.tolist() == [True]
+    print(f"Pareto front: {flags.sum()} of {len(flags)} models")
+
+
+def test_select_model_slo():
+    """The most accurate model within the p99 budget wins; without one, the fastest."""
+    report = make_report()
+    assert select_model(report) == 'Forest'
+    assert select_model(report, latency_slo_ms=10.0) == 'Forest'
+    assert select_model(report, latency_slo_ms=2.0) in ('Boosting', 'Tie')
+    assert select_model(report, latency_slo_ms=0.5) == 'Ridge'
+    assert select_model(report, latency_slo_ms=0.01) == 'Ridge'
+    print("SLO selection: most accurate within budget, fastest otherwise")
+
+
+def test_serving_report():
+    """The report times every trained model, ranks by accuracy and flags the front and the SLO."""
+    rng = np.random.default_rng(0)
+    X = rng.normal(size=(400, 4))
+    y = X @ np.array([3.0, -2.0, 1.0, 0.5]) + 0.3 * np.sin(3 * X[:, 0]) + rng.normal(0, 0.1, 400)
+    X_train, X_test, y_train, y_test = X[:300], X[300:], y[:300], y[300:]
+
+    results, artifacts = {}, {}
+    for name, model in [('Ridge', Ridge()), ('Random Forest', RandomForestRegressor(n_estimators=10, random_state=0))]:
+        model.fit(X_train, y_train)
+        predicted = model.predict(X_test)
+        results[name] = {
+            'model': model,
+            'test_r2': r2_score(y_test, predicted),
+            'test_rmse': float(np.sqrt(mean_squared_error(y_test, predicted))),
+            'test_mae': mean_absolute_error(y_test, predicted)
+        }
+        artifacts[name] = {'model': model}
+    results['Failed'] = None
+
+    report = serving_report('enhanced', results, artifacts, X_test, latency_slo_ms=1000.0, repeats=20)
+
+    assert report['Model'].tolist() == sorted(results.keys() - {'Failed'}, key=lambda m: -results[m]['test_r2'])
+    assert (report['Pipeline'] == 'enhanced').all()
+    assert (report[LATENCY_COLUMN] > 0).all() and (report['Artifact Size (MB)'] > 0).all()
+    assert report['Pareto Optimal'].tolist() == pareto_front(report).tolist()
+    assert report['Meets SLO'].all()
+    # Trees are timed as the compact copy the service runs
+    assert dict(zip(report['Model'], report['Served As'])) == {'Ridge': 'as trained', 'Random Forest': 'compact'}
+    print(report[['Model', 'Served As', ACCURACY_COLUMN, LATENCY_COLUMN, 'Pareto Optimal']].to_string(index=False))
+
+
+if __name__ == "__main__":
+    print("Testing RentVerse AI Service Serving Report")
+    print("=" * 50)
+
+    tests = [
+        ("Pareto Front", test_pareto_front),
+        ("SLO Selection", test_select_model_slo),
+        ("Serving Report", test_serving_report)
+    ]
+
+    results = []
+    for test_name, test_func in tests:
+        print(f"\n{test_name}:")
+        try:
+            test_func()
+            success = True
+        except AssertionError as e:
+            print(f"Assertion failed: {e}")
+            success = False
+        results.append((test_name, success))
+
+    print("\n" + "=" * 50)
+    print("Test Results Summary:")
+    for test_name, success in results:
+        status = "✅ PASSED" if success else "❌ FAILED"
+        print(f"{test_name}: {status}")
+
+    passed = sum(1 for _, success in results if success)
+    total = len(results)
+    print(f"\nOverall: {passed}/{total} tests passed")
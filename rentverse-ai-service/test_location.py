@@ -0,0 +1,139 @@
+"""
+Test script for the precompiled location engine.
+
+Runs LocationEngine in-process, no server needed.
+"""
+
+import pickle
+import threading
+
+import pandas as pd
+
+from rentverse.utils.location import LocationEngine
+from rentverse.utils.preprocessor import ImprovedDataPreprocessor
+
+# Locations used in the notebook, and listings written the same way
+NOTEBOOK_LOCATIONS = [
+    "KLCC, Kuala Lumpur",
+    "Petaling Jaya, Selangor",
+    "Johor Bahru, Johor"
+]
+LISTING_LOCATIONS = NOTEBOOK_LOCATIONS + [
+    "Mont Kiara, Kuala Lumpur",
+    "Cheras, Kuala Lumpur ",
+    "Georgetown, Penang",
+    "Bayan Lepas, Pulau Pinang",
+    "Kota Kinabalu, Sabah",
+    "Kuching, Sarawak",
+    "Ipoh, Perak",
+    "Ayer Keroh, Melaka",
+    "Seremban, Negeri Sembilan",
+    "Taman Desa, Jalan Klang Lama, Kuala Lumpur",
+    "Shah Alam, Selangor.",
+    "Penang",
+    "Putrajaya"
+]
+
+
+def legacy_regions(locations):
+    """Regions as the preprocessor parses them during fit."""
+    preprocessor = ImprovedDataPreprocessor(verbose=False)
+    return [preprocessor._parse_location(location) for location in locations]
+
+
+def test_matches_legacy_parse():
+    """Every location whose legacy parse is a known region maps to that same region."""
+    expected = legacy_regions(LISTING_LOCATIONS)
+    engine = LocationEngine(set(expected))
+
+    assert [engine.region(location) for location in LISTING_LOCATIONS] == expected
+    assert engine.regions(pd.Series(LISTING_LOCATIONS)).tolist() == expected
+    assert engine.region(None) == "unknown"
+    print(f"Legacy parse: {len(expected)} locations, {len(set(expected))} regions")
+
+
+def test_resolves_unparsed_locations():
+    """Locations whose last part is not a region resolve through the gazetteer, rightmost hit first."""
+    engine = LocationEngine(set(legacy_regions(LISTING_LOCATIONS)), keywords=["klcc", "mont kiara"])
+
+    assert engine.region("Mont Kiara") == "kuala lumpur"
+    assert engine.region("Condo near KLCC") == "kuala lumpur"
+    assert engine.region("Cheras, Kajang") == "selangor"
+    # Word-bounded: 'pj' inside a word is not Petaling Jaya
+    assert engine.region("Apjx") == "apjx"
+    assert engine.matched_keywords("Mont Kiara Residences, KLCC") == {"klcc", "mont kiara"}
+    assert not engine.has_keyword("Ipoh, Perak")
+    print("Gazetteer fallback: resolved")
+
+
+def test_concurrent_lookups():
+    """Threads looking up through a full cache get the same regions and consistent counters."""
+    locations = [f"Unit {i}, {LISTING_LOCATIONS[i % len(LISTING_LOCATIONS)]}" for i in range(400)]
+    expected = legacy_regions(locations)
+    engine = LocationEngine(set(expected), cache_size=64)
+    errors = []
+
+    def worker():
+        try:
+            for _ in range(5):
+                if [engine.region(location) for location in locations] != expected:
+                    errors.append("region mismatch")
+        except Exception as e:
+            errors.append(repr(e))
+
+    threads = [threading.Thread(target=worker) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    stats = engine.get_stats()
+    assert not errors, errors[:3]
+    assert stats['cache_hits'] + stats['cache_misses'] == 8 * 5 * len(locations)
+    assert stats['cache_size'] <= 64
+    print(f"Concurrent lookups: {stats['cache_misses']} misses, hit rate {stats['hit_rate']:.2f}")
+
+
+def test_pickle_drops_cache():
+    """A pickled engine comes back with an empty cache and a working lock."""
+    engine = LocationEngine(set(legacy_regions(LISTING_LOCATIONS)))
+    engine.regions(pd.Series(LISTING_LOCATIONS))
+
+    restored = pickle.loads(pickle.dumps(engine))
+    assert restored.get_stats()['cache_size'] == 0
+    assert restored.region("KLCC, Kuala Lumpur") == "kuala lumpur"
+    assert restored.get_stats()['cache_size'] == 1
+    print("Pickle: cache dropped, lookups work")
+
+
+if __name__ == "__main__":
+    print("Testing RentVerse AI Service Location Engine")
+    print("=" * 50)
+
+    tests = [
+        ("Matches Legacy Parse", test_matches_legacy_parse),
+        ("Resolves Unparsed Locations", test_resolves_unparsed_locations),
+        ("Concurrent Lookups", test_concurrent_lookups),
+        ("Pickle Drops Cache", test_pickle_drops_cache)
+    ]
+
+    results = []
+    for test_name, test_func in tests:
+        print(f"\n{test_name}:")
+        try:
+            test_func()
+            success = True
+        except AssertionError as e:
+            print(f"Assertion failed: {e}")
+            success = False
+        results.append((test_name, success))
+
+    print("\n" + "=" * 50)
+    print("Test Results Summary:")
+    for test_name, success in results:
+        status = "✅ PASSED" if success else "❌ FAILED"
+        print(f"{test_name}: {status}")
+
+    passed = sum(1 for _, success in results if success)
+    total = len(results)
+    print(f"\nOverall: {passed}/{total} tests passed")
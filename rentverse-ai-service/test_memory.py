@@ -0,0 +1,167 @@
+"""
+Test script for memory accounting and the admin memory endpoints.
+
+Sizes the loaded model and diffs tracemalloc snapshots through the admin
+endpoints, in-process with FastAPI's TestClient; no server needed.
+"""
+
+import logging
+import sys
+import tracemalloc
+import warnings
+
+import numpy as np
+from fastapi.testclient import TestClient
+
+from rentverse.config import get_settings
+from rentverse.main import app
+from rentverse.models import ml_models
+from rentverse.utils.memory import deep_sizeof, get_allocation_tracker
+
+warnings.filterwarnings("ignore")
+logging.disable(logging.CRITICAL)
+
+TOKEN = "memory-test-token"
+HEADERS = {"X-Admin-Token": TOKEN}
+
+# Kept alive between snapshots so the diff has something to find
+_retained = []
+
+
+def with_admin_token(test):
+    """Run a test with admin endpoints enabled and tracing stopped afterwards."""
+    settings = get_settings()
+    previous = settings.admin_token
+    settings.admin_token = TOKEN
+    try:
+        test()
+    finally:
+        settings.admin_token = previous
+        get_allocation_tracker().stop()
+        _retained.clear()
+
+
+def test_deep_sizeof():
+    """Buffers are counted once per owner and shared objects once per seen set."""
+    array = np.zeros(100000)
+    assert deep_sizeof(array) >= array.nbytes
+    # A view counts its base, not a second copy
+    assert deep_sizeof([array, array[:10]]) < 2 * array.nbytes
+    assert deep_sizeof({"a": array, "b": array}) < 2 * array.nbytes
+
+    seen = set()
+    first = deep_sizeof({"values": array}, seen)
+    second = deep_sizeof({"values": array}, seen)
+    assert first >= array.nbytes and second < array.nbytes
+    print(f"deep_sizeof: {first:,} bytes, {second:,} when already seen")
+
+
+def test_memory_report():
+    """Each component of the loaded model is sized once and the total is their sum."""
+    model = ml_models.reload_ml_model()
+    report = model.memory_report()
+    components = report['components']
+
+    assert set(components) >= {'model', 'scaler', 'encoders', 'location_engine', 'pipeline_components'}
+    assert all(isinstance(size, int) and size >= 0 for size in components.values())
+    assert report['total_bytes'] == sum(components.values())
+    assert components['model'] > 0 and report['model_version'] == model.model_version
+    # Components extracted from the artifact are not counted again under it
+    assert components['pipeline_components'] < deep_sizeof(model.pipeline_components)
+    print(f"Memory report: {report['total_bytes'] / 1024 ** 2:.1f} MB, "
+          f"model {components['model'] / 1024 ** 2:.1f} MB")
+
+
+def test_memory_endpoint():
+    """/admin/memory needs the admin token and reports process, model and queue memory."""
+    client = TestClient(app)
+    settings = get_settings()
+    previous = settings.admin_token
+    settings.admin_token = None
+    try:
+        assert client.get("/api/v1/admin/memory").status_code == 404
+    finally:
+        settings.admin_token = previous
+
+    def run():
+        assert client.get("/api/v1/admin/memory", headers={"X-Admin-Token": "wrong"}).status_code == 403
+        response = client.get("/api/v1/admin/memory", headers=HEADERS)
+        assert response.status_code == 200
+        body = response.json()
+        assert set(body) >= {"process", "model", "queues", "tracemalloc"}
+        if sys.platform.startswith("linux"):
+            assert body["process"]["rss_bytes"] > 0
+        assert body["model"]["total_bytes"] > 0
+        assert "admission" in body["queues"] and not body["tracemalloc"]["tracing"]
+        print(f"Memory endpoint: RSS {body['process']['rss_bytes'] / 1024 ** 2:.0f} MB")
+
+    with_admin_token(run)
+
+
+def test_tracemalloc_diff():
+    """A diff between snapshots finds retained allocations; DELETE stops tracing."""
+    client = TestClient(app)
+
+    def run():
+        response = client.post("/api/v1/admin/memory/snapshots", params={"label": "before"}, headers=HEADERS)
+        assert response.status_code == 200 and response.json()["label"] == "before"
+        assert tracemalloc.is_tracing()
+
+        _retained.extend(bytearray(1024) for _ in range(4096))
+        client.post("/api/v1/admin/memory/snapshots", params={"label": "after"}, headers=HEADERS)
+
+        diff = client.get("/api/v1/admin/memory/diff", params={"base": "before", "target": "after"},
+                          headers=HEADERS).json()
+        assert diff["traced_growth_bytes"] >= 4 * 1024 ** 2
+        top = diff["top"][0]
+        assert top["location"][0].startswith(__file__) and top["size_diff_bytes"] >= 4 * 1024 ** 2, top
+
+        # Without a target a new snapshot is taken; files can be grouped too
+        latest = client.get("/api/v1/admin/memory/diff", params={"base": "before", "group_by": "filename", "limit": 3},
+                            headers=HEADERS).json()
+        assert len(latest["top"]) <= 3 and latest["target"]["label"] not in ("before", "after")
+
+        missing = client.get("/api/v1/admin/memory/diff", params={"base": "nope"}, headers=HEADERS)
+        assert missing.status_code == 404
+        stats = client.get("/api/v1/admin/memory", headers=HEADERS).json()["tracemalloc"]
+        assert stats["tracing"] and [s["label"] for s in stats["snapshots"]][:2] == ["before", "after"]
+
+        assert client.delete("/api/v1/admin/memory/snapshots", headers=HEADERS).json()["tracing"] is False
+        assert not tracemalloc.is_tracing()
+        assert get_allocation_tracker().snapshots() == []
+        print(f"Diff: {diff['traced_growth_bytes'] / 1024 ** 2:.1f} MB traced growth at {top['location'][0]}")
+
+    with_admin_token(run)
+
+
+if __name__ == "__main__":
+    print("Testing RentVerse AI Service Memory Accounting")
+    print("=" * 50)
+
+    tests = [
+        ("Deep Sizeof", test_deep_sizeof),
+        ("Memory Report", test_memory_report),
+        ("Memory Endpoint", test_memory_endpoint),
+        ("Tracemalloc Diff", test_tracemalloc_diff)
+    ]
+
+    results = []
+    for test_name, test_func in tests:
+        print(f"\n{test_name}:")
+        try:
+            test_func()
+            success = True
+        except AssertionError as e:
+            print(f"Assertion failed: {e}")
+            success = False
+        results.append((test_name, success))
+
+    print("\n" + "=" * 50)
+    print("Test Results Summary:")
+    for test_name, success in results:
+        status = "✅ PASSED" if success else "❌ FAILED"
+        print(f"{test_name}: {status}")
+
+    passed = sum(1 for _, success in results if success)
+    total = len(results)
+    print(f"\nOverall: {passed}/{total} tests passed")
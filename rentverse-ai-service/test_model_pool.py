@@ -0,0 +1,213 @@
+"""
+Test script for the region-partitioned model pool.
+
+Builds small Random Forest region artifacts on the shipped preprocessor and
+scaler, and routes requests through a ModelPool in-process; no server needed.
+"""
+
+import logging
+import os
+import tempfile
+import warnings
+
+import joblib
+import numpy as np
+import pandas as pd
+from sklearn.ensemble import RandomForestRegressor
+
+from rentverse.models.ml_models import DEFAULT_MODEL_FILENAME, PropertyPricePredictionModel
+from rentverse.models.pool import ModelPool, region_dirname
+
+warnings.filterwarnings("ignore")
+logging.disable(logging.CRITICAL)
+
+PROPERTY = {
+    "property_type": "Condo",
+    "bedrooms": 3,
+    "bathrooms": 2,
+    "area": 1200,
+    "furnished": "Fully Furnished",
+    "location": "KLCC, Kuala Lumpur"
+}
+LOCATIONS = {
+    "kuala_lumpur": "KLCC, Kuala Lumpur",
+    "selangor": "Petaling Jaya, Selangor",
+    "penang": "Georgetown, Penang",
+    "johor": "Johor Bahru, Johor"
+}
+
+_global = None
+
+
+def global_model():
+    """The model shipped in the package directory, loaded once."""
+    global _global
+    if _global is None:
+        _global = PropertyPricePredictionModel()
+    return _global
+
+
+def write_region_artifacts(regions_dir, regions, seed=0):
+    """Save a small Random Forest per region on the shipped preprocessor and scaler."""
+    shipped = global_model()
+    rng = np.random.default_rng(seed)
+    for i, region in enumerate(regions):
+        rows = pd.DataFrame({
+            "property_type": rng.choice(["Apartment", "Condo", "House"], 300),
+            "bedrooms": rng.integers(1, 5, 300),
+            "bathrooms": rng.integers(1, 3, 300),
+            "area": rng.integers(400, 2500, 300).astype(float),
+            "furnished": rng.choice(["Fully Furnished", "Unfurnished"], 300),
+            "location": LOCATIONS[region]
+        })
+        # Every region prices differently, so the serving model shows in the predictions
+        price = (1000 + 500 * i) + rows["area"] * 1.2 + rng.normal(0, 50, 300)
+        features = shipped.preprocessor.transform(rows)[shipped.feature_names]
+        forest = RandomForestRegressor(n_estimators=5, max_depth=6, random_state=0)
+        forest.fit(shipped.scaler.transform(features), price)
+
+        artifact = dict(shipped.pipeline_components)
+        artifact.update(model=forest, model_name="Region Forest", use_log_transform=False,
+                        performance_metrics={"test_rmse": 100.0})
+        os.makedirs(os.path.join(regions_dir, region))
+        joblib.dump(artifact, os.path.join(regions_dir, region, DEFAULT_MODEL_FILENAME))
+
+
+def region_model_bytes(regions_dir, region):
+    """Bytes the pool accounts for one region model."""
+    return PropertyPricePredictionModel(os.path.join(regions_dir, region)).memory_report()["total_bytes"]
+
+
+def test_lazy_load():
+    """Region models load on their first request; other regions are served by the global model."""
+    with tempfile.TemporaryDirectory() as regions_dir:
+        write_region_artifacts(regions_dir, ["kuala_lumpur", "selangor"])
+        pool = ModelPool(global_model(), regions_dir)
+
+        assert sorted(pool.available) == ["kuala_lumpur", "selangor"]
+        assert pool.get_stats()["resident"] == {} and pool.loads == 0
+
+        model = pool.select(LOCATIONS["kuala_lumpur"])
+        assert model is not global_model() and model.model_version == "Region Forest [kuala_lumpur]"
+        assert pool.select("Mont Kiara, Kuala Lumpur") is model
+        assert (pool.loads, pool.misses, pool.hits) == (1, 1, 1)
+        assert list(pool.get_stats()["resident"]) == ["kuala_lumpur"]
+
+        assert pool.select(LOCATIONS["johor"]) is global_model()
+        assert pool.fallbacks == 1 and pool.loads == 1
+    print("Lazy load: one load on first request, global model for other regions")
+
+
+def test_lru_eviction():
+    """Loading past the budget evicts the least recently used region model."""
+    with tempfile.TemporaryDirectory() as regions_dir:
+        write_region_artifacts(regions_dir, ["kuala_lumpur", "selangor", "penang"])
+        nbytes = region_model_bytes(regions_dir, "kuala_lumpur")
+        # Room for two region models, not three
+        pool = ModelPool(global_model(), regions_dir, memory_budget=int(nbytes * 2.5))
+
+        pool.select(LOCATIONS["kuala_lumpur"])
+        pool.select(LOCATIONS["selangor"])
+        pool.select(LOCATIONS["kuala_lumpur"])
+        pool.select(LOCATIONS["penang"])
+
+        stats = pool.get_stats()
+        assert set(stats["resident"]) == {"kuala_lumpur", "penang"}
+        assert stats["evictions"] == 1
+        assert stats["resident_bytes"] <= pool.memory_budget
+        assert [e["region"] for e in stats["events"] if e["event"] == "evict"] == ["selangor"]
+
+        # An evicted region loads again on its next request
+        assert pool.select(LOCATIONS["selangor"]).model_version == "Region Forest [selangor]"
+        assert pool.loads == 4 and set(pool.get_stats()["resident"]) == {"penang", "selangor"}
+    print(f"LRU eviction: budget {pool.memory_budget / 1024:,.0f} KB, {pool.evictions} evictions")
+
+
+def test_fallback_to_global():
+    """Regions without an artifact, with a broken one or over the budget are served by the global model."""
+    with tempfile.TemporaryDirectory() as regions_dir:
+        write_region_artifacts(regions_dir, ["kuala_lumpur"])
+        os.makedirs(os.path.join(regions_dir, "selangor"))
+        os.makedirs(os.path.join(regions_dir, "penang"))
+        with open(os.path.join(regions_dir, "penang", DEFAULT_MODEL_FILENAME), "wb") as f:
+            f.write(b"not a pickle")
+
+        pool = ModelPool(global_model(), regions_dir)
+        # A directory without an artifact is not a region model
+        assert sorted(pool.available) == ["kuala_lumpur", "penang"]
+        assert pool.select(LOCATIONS["selangor"]) is global_model()
+
+        assert pool.select(LOCATIONS["penang"]) is global_model()
+        assert pool.load_failures == 1 and "penang" in pool.get_stats()["failed"]
+        # Not retried until retry_seconds have passed
+        assert pool.select(LOCATIONS["penang"]) is global_model()
+        assert pool.load_failures == 1
+
+        tiny = ModelPool(global_model(), regions_dir, memory_budget=1024)
+        assert tiny.select(LOCATIONS["kuala_lumpur"]) is global_model()
+        assert [e["event"] for e in tiny.get_stats()["events"]] == ["over_budget"]
+        assert tiny.get_stats()["resident"] == {}
+
+        # Without region models the pool routes nothing
+        empty = ModelPool(global_model(), os.path.join(regions_dir, "missing"))
+        assert not empty.routing and empty.select(LOCATIONS["kuala_lumpur"]) is global_model()
+    print("Fallback: missing, broken and over-budget regions use the global model")
+
+
+def test_partition_and_map_batch_order():
+    """Batches are split by serving model and put back in input order."""
+    with tempfile.TemporaryDirectory() as regions_dir:
+        write_region_artifacts(regions_dir, ["kuala_lumpur", "selangor"])
+        pool = ModelPool(global_model(), regions_dir)
+        regions = ["selangor", "johor", "kuala_lumpur", "selangor", "kuala_lumpur", "johor"]
+        items = [{**PROPERTY, "location": LOCATIONS[region]} for region in regions]
+
+        groups = pool.partition([item["location"] for item in items])
+        served = {model.model_version: positions.tolist() for model, positions in groups}
+        assert served == {
+            "Region Forest [selangor]": [0, 3],
+            global_model().model_version: [1, 5],
+            "Region Forest [kuala_lumpur]": [2, 4]
+        }
+
+        results, _ = pool.map_batch(items, lambda model, part: model.predict_batch(part))
+        assert [r["batch_index"] for r in results] == list(range(len(items)))
+        for item, result in zip(items, results):
+            model = pool.select(item["location"])
+            assert result["model_version"] == model.model_version
+            assert np.isclose(result["predicted_price"], model.predict_single(item)["predicted_price"], rtol=1e-9)
+        assert region_dirname("Kuala Lumpur") == "kuala_lumpur"
+    print(f"Partition: {len(groups)} groups, results in input order")
+
+
+if __name__ == "__main__":
+    print("Testing RentVerse AI Service Model Pool")
+    print("=" * 50)
+
+    tests = [
+        ("Lazy Load", test_lazy_load),
+        ("LRU Eviction", test_lru_eviction),
+        ("Fallback To Global", test_fallback_to_global),
+        ("Partition And Map Batch Order", test_partition_and_map_batch_order)
+    ]
+
+    results = []
+    for test_name, test_func in tests:
+        print(f"\n{test_name}:")
+        try:
+            test_func()
+            success = True
+        except AssertionError as e:
+            print(f"Assertion failed: {e}")
+            success = False
+        results.append((test_name, success))
+
+    print("\n" + "=" * 50)
+    print("Test Results Summary:")
+    for test_name, success in results:
+        status = "✅ PASSED" if success else "❌ FAILED"
+        print(f"{test_name}: {status}")
+
+    passed = sum(1 for _, success in results if success)
+    total = len(results)
+    print(f"\nOverall: {passed}/{total} tests passed")
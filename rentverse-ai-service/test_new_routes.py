@@ -63,6 +63,214 @@ def test_listing_approval():
         print(f"Error testing listing approval: {e}")
         return False
 
+def test_listing_approval_batch():
+    """Test the batch listing approval classification endpoint."""
+    url = f"{BASE_URL}/api/v1/classify/approval/batch"
+    
+    listing = {
+        "property_type": "Condominium",
+        "bedrooms": 3,
+        "bathrooms": 2,
+        "area": 1200,
+        "furnished": "Yes",
+        "location": "KLCC, Kuala Lumpur",
+        "asking_price": 4500.0,
+        "facilities": ["Swimming Pool", "Gym", "Security"]
+    }
+    payload = {"listings": [listing, {**listing, "asking_price": 9000.0}]}
+    
+    try:
+        response = requests.post(url, json=payload)
+        print(f"Batch Listing Approval Test:")
+        print(f"Status Code: {response.status_code}")
+        print(f"Response: {json.dumps(response.json(), indent=2)}")
+        print("-" * 50)
+        
+        if response.status_code != 200:
+            return False
+        
+        # Each batch result must match the single-item endpoint
+        single = requests.post(f"{BASE_URL}/api/v1/classify/approval", json=listing).json()
+        first = dict(response.json()["results"][0])
+        first.pop("batch_index")
+        return first == single
+    except Exception as e:
+        print(f"Error testing batch listing approval: {e}")
+        return False
+
+def test_columnar_prediction():
+    """Test the columnar batch prediction endpoint against the batch endpoint."""
+    url = f"{BASE_URL}/api/v1/predict/columnar"
+    
+    properties = [
+        {"property_type": "Condominium", "bedrooms": 3, "bathrooms": 2, "area": 1200,
+         "furnished": "Yes", "location": "KLCC, Kuala Lumpur"},
+        {"property_type": "Apartment", "bedrooms": 2, "bathrooms": 1, "area": 850,
+         "furnished": "No", "location": "Georgetown, Penang"},
+        {"property_type": "Townhouse", "bedrooms": 4, "bathrooms": 3, "area": 1800,
+         "furnished": "Partial", "location": "Johor Bahru, Johor"}
+    ]
+    payload = {field: [prop[field] for prop in properties] for field in properties[0]}
+    
+    try:
+        response = requests.post(url, json=payload)
+        print(f"Columnar Prediction Test:")
+        print(f"Status Code: {response.status_code}")
+        print(f"Response: {json.dumps(response.json(), indent=2)}")
+        print("-" * 50)
+        
+        if response.status_code != 200:
+            return False
+        
+        # Each column entry must match the batch endpoint's prediction for that property
+        batch = requests.post(f"{BASE_URL}/api/v1/predict/batch", json={"properties": properties}).json()
+        columns = response.json()
+        return columns["count"] == len(properties) and all(
+            abs(columns["predicted_price"][i] - item["predicted_price"]) < 1e-6 and
+            abs(columns["price_min"][i] - item["price_range"]["min"]) < 1e-6 and
+            abs(columns["price_max"][i] - item["price_range"]["max"]) < 1e-6
+            for i, item in enumerate(batch["predictions"])
+        )
+    except Exception as e:
+        print(f"Error testing columnar prediction: {e}")
+        return False
+
+def test_columnar_binary_encodings():
+    """Test Arrow and MessagePack bodies and responses of the columnar endpoint."""
+    url = f"{BASE_URL}/api/v1/predict/columnar"
+    
+    payload = {
+        "property_type": ["Condominium", "Apartment"],
+        "bedrooms": [3, 2],
+        "bathrooms": [2, 1],
+        "area": [1200.0, 850.0],
+        "furnished": ["Yes", "No"],
+        "location": ["KLCC, Kuala Lumpur", "Georgetown, Penang"]
+    }
+    
+    try:
+        import msgpack
+        import pyarrow as pa
+        
+        expected = requests.post(url, json=payload).json()["predicted_price"]
+        
+        # Arrow body, MessagePack response
+        sink = pa.BufferOutputStream()
+        table = pa.table(payload)
+        with pa.ipc.new_stream(sink, table.schema) as writer:
+            writer.write_table(table)
+        arrow_response = requests.post(url, data=sink.getvalue().to_pybytes(), headers={
+            "Content-Type": "application/vnd.apache.arrow.stream", "Accept": "application/msgpack"
+        })
+        from_arrow = msgpack.unpackb(arrow_response.content, raw=False)["predicted_price"]
+        
+        # MessagePack body, Arrow response
+        msgpack_response = requests.post(url, data=msgpack.packb(payload), headers={
+            "Content-Type": "application/msgpack", "Accept": "application/vnd.apache.arrow.stream"
+        })
+        from_msgpack = pa.ipc.open_stream(msgpack_response.content).read_all().column("predicted_price").to_pylist()
+        
+        unsupported_body = requests.post(url, data="a,b", headers={"Content-Type": "text/csv"})
+        unacceptable = requests.post(url, json=payload, headers={"Accept": "text/csv"})
+        malformed = requests.post(url, data=b"\xc1", headers={"Content-Type": "application/msgpack"})
+        
+        print(f"Columnar Binary Encodings Test:")
+        print(f"Arrow -> MessagePack: {arrow_response.status_code}, MessagePack -> Arrow: {msgpack_response.status_code}")
+        print(f"text/csv body: {unsupported_body.status_code}, Accept text/csv: {unacceptable.status_code}")
+        print(f"Malformed MessagePack: {malformed.status_code} {malformed.text}")
+        print("-" * 50)
+        
+        return (
+            arrow_response.status_code == 200 and msgpack_response.status_code == 200 and
+            all(abs(a - b) < 1e-6 for a, b in zip(from_arrow, expected)) and
+            all(abs(a - b) < 1e-6 for a, b in zip(from_msgpack, expected)) and
+            unsupported_body.status_code == 415 and
+            unacceptable.status_code == 406 and
+            malformed.status_code == 400 and "Invalid MessagePack body: FormatError" in malformed.text
+        )
+    except ImportError as e:
+        print(f"Skipping binary encodings test ({e})")
+        return True
+    except Exception as e:
+        print(f"Error testing columnar binary encodings: {e}")
+        return False
+
+def test_prediction_explanation():
+    """Test the prediction explanation endpoint."""
+    url = f"{BASE_URL}/api/v1/predict/explain"
+    
+    payload = {
+        "property_type": "Condominium",
+        "bedrooms": 3,
+        "bathrooms": 2,
+        "area": 1200,
+        "furnished": "Yes",
+        "location": "KLCC, Kuala Lumpur"
+    }
+    
+    try:
+        response = requests.post(url, json=payload)
+        print(f"Prediction Explanation Test:")
+        print(f"Status Code: {response.status_code}")
+        print(f"Response: {json.dumps(response.json(), indent=2)}")
+        print("-" * 50)
+        
+        if response.status_code != 200:
+            return False
+        
+        # The effects add up to the predicted price minus the base price,
+        # and the predicted price is the one /predict/single returns
+        explanation = response.json()
+        effects = sum(item["effect"] for item in explanation["contributions"])
+        single = requests.post(f"{BASE_URL}/api/v1/predict/single", json=payload).json()
+        return (
+            abs(explanation["base_price"] + effects - explanation["predicted_price"]) < 0.05 and
+            abs(explanation["predicted_price"] - single["predicted_price"]) < 0.05
+        )
+    except Exception as e:
+        print(f"Error testing prediction explanation: {e}")
+        return False
+
+def test_comparables():
+    """Test the comparable listings endpoint."""
+    url = f"{BASE_URL}/api/v1/predict/comparables?k=5"
+    
+    payload = {
+        "property_type": "Townhouse",
+        "bedrooms": 3,
+        "bathrooms": 2,
+        "area": 1600,
+        "furnished": "Fully Furnished",
+        "location": "Mont Kiara, Kuala Lumpur"
+    }
+    
+    try:
+        response = requests.post(url, json=payload)
+        print(f"Comparables Test:")
+        print(f"Status Code: {response.status_code}")
+        print(f"Response: {json.dumps(response.json(), indent=2)}")
+        print("-" * 50)
+        
+        # Artifacts without stored listings have no comparables index
+        if response.status_code == 503:
+            return "no comparable listings" in response.text
+        if response.status_code != 200:
+            return False
+        
+        # Every comparable shares the categories it was matched on, nearest first
+        result = response.json()
+        comparables = result["comparables"]
+        matched_on = result["price_distribution"]["matched_on"]
+        distances = [item["distance"] for item in comparables]
+        return (
+            len(comparables) == 5 and distances == sorted(distances) and
+            all(len({item[col] for item in comparables}) == 1 for col in matched_on) and
+            ("region" not in matched_on or comparables[0]["region"] == "kuala lumpur")
+        )
+    except Exception as e:
+        print(f"Error testing comparables: {e}")
+        return False
+
 def test_health_check():
     """Test the health check endpoint."""
     url = f"{BASE_URL}/api/v1/health/"
@@ -104,7 +312,12 @@ if __name__ == "__main__":
         ("Root Endpoint", test_root_endpoint),
         ("Health Check", test_health_check),
         ("Price Prediction", test_price_prediction),
-        ("Listing Approval", test_listing_approval)
+        ("Listing Approval", test_listing_approval),
+        ("Batch Listing Approval", test_listing_approval_batch),
+        ("Columnar Prediction", test_columnar_prediction),
+        ("Columnar Binary Encodings", test_columnar_binary_encodings),
+        ("Prediction Explanation", test_prediction_explanation),
+        ("Comparables", test_comparables)
     ]
     
     results = []
@@ -0,0 +1,200 @@
+"""
+Test script for deterministic prediction intervals.
+
+Loads the shipped model, and a small Random Forest artifact built on the
+shipped preprocessor and scaler, in-process; no server needed.
+"""
+
+import logging
+import os
+import tempfile
+import warnings
+from statistics import NormalDist
+
+import joblib
+import numpy as np
+import pandas as pd
+from sklearn.ensemble import RandomForestRegressor
+
+from rentverse.core.exceptions import PredictionError
+from rentverse.models.ml_models import DEFAULT_MODEL_FILENAME, PropertyPricePredictionModel
+
+warnings.filterwarnings("ignore")
+logging.disable(logging.CRITICAL)
+
+PROPERTY = {
+    "property_type": "Condo",
+    "bedrooms": 3,
+    "bathrooms": 2,
+    "area": 1200,
+    "furnished": "Fully Furnished",
+    "location": "KLCC, Kuala Lumpur"
+}
+
+_shipped = None
+
+
+def shipped_model():
+    """The model shipped in the package directory, loaded once."""
+    global _shipped
+    if _shipped is None:
+        _shipped = PropertyPricePredictionModel()
+    return _shipped
+
+
+def synthetic_rows(n, seed=0):
+    """Validated property rows with a price that grows with area and bedrooms."""
+    rng = np.random.default_rng(seed)
+    rows = pd.DataFrame({
+        "property_type": rng.choice(["Apartment", "Condo", "House", "Townhouse"], n),
+        "bedrooms": rng.integers(1, 6, n),
+        "bathrooms": rng.integers(1, 4, n),
+        "area": rng.integers(400, 3000, n).astype(float),
+        "furnished": rng.choice(["Fully Furnished", "Partly Furnished", "Unfurnished"], n),
+        "location": rng.choice(["KLCC, Kuala Lumpur", "Petaling Jaya, Selangor", "Johor Bahru, Johor"], n)
+    })
+    price = 500 + rows["area"] * 1.5 + rows["bedrooms"] * 200 + rng.normal(0, 150, n)
+    return rows, price.to_numpy()
+
+
+def write_forest_artifact(directory):
+    """Save a log-target Random Forest on the shipped preprocessor and scaler to a directory."""
+    shipped = shipped_model()
+    rows, price = synthetic_rows(600)
+    features = shipped.preprocessor.transform(rows)[shipped.feature_names]
+    scaled = shipped.scaler.transform(features)
+    forest = RandomForestRegressor(n_estimators=25, max_depth=8, random_state=0).fit(scaled, np.log1p(price))
+
+    artifact = dict(shipped.pipeline_components)
+    artifact.update(
+        model=forest,
+        model_name="Random Forest",
+        use_log_transform=True,
+        performance_metrics={"test_rmse": 200.0}
+    )
+    joblib.dump(artifact, os.path.join(directory, DEFAULT_MODEL_FILENAME))
+    return forest, scaled
+
+
+def test_ensemble_intervals():
+    """Bagged ensembles take their quantiles over the per-tree predictions of the same pass."""
+    with tempfile.TemporaryDirectory() as directory:
+        forest, _ = write_forest_artifact(directory)
+        model = PropertyPricePredictionModel(directory)
+
+        result = model.predict_single(PROPERTY, quantiles=[0.05, 0.95])
+        again = model.predict_single(PROPERTY, quantiles=[0.05, 0.95])
+
+    assert result["interval_method"] == "ensemble"
+    assert list(result["quantiles"]) == ["0.05", "0.1", "0.9", "0.95"]
+    values = list(result["quantiles"].values())
+    assert values == sorted(values)
+    assert result["price_range"] == {"min": result["quantiles"]["0.1"], "max": result["quantiles"]["0.9"]}
+    assert values[0] <= result["predicted_price"] <= values[-1]
+    assert 0.0 <= result["confidence_score"] <= 1.0
+
+    # The mean of the trees is the forest's own prediction
+    features = model.preprocessor.transform(pd.DataFrame([PROPERTY]))[model.feature_names]
+    expected = np.expm1(forest.predict(model.scaler.transform(features)))[0]
+    assert abs(result["predicted_price"] - expected) < 1e-4 * expected
+
+    # Deterministic: no noise in the range or the confidence
+    assert {k: v for k, v in again.items() if k != "timestamp"} == {k: v for k, v in result.items() if k != "timestamp"}
+    print(f"Ensemble: RM {result['price_range']['min']:,.0f} - {result['price_range']['max']:,.0f}")
+
+
+def test_residual_intervals():
+    """Boosted models get a normal interval from the test RMSE, or a relative spread without one."""
+    model = shipped_model()
+    rmse = model.performance_metrics["test_rmse"]
+    result = model.predict_single(PROPERTY, quantiles=[0.25])
+
+    assert result["interval_method"] == "residual"
+    point = result["predicted_price"]
+    for q, value in result["quantiles"].items():
+        expected = max(point + NormalDist().inv_cdf(float(q)) * rmse, 0.0)
+        assert abs(value - expected) < 1e-6, (q, value, expected)
+
+    metrics = model.performance_metrics
+    try:
+        model.performance_metrics = {}
+        fallback = model.predict_single(PROPERTY)
+    finally:
+        model.performance_metrics = metrics
+    spread = fallback["price_range"]["max"] - fallback["predicted_price"]
+    assert abs(spread - NormalDist().inv_cdf(0.9) * 0.15 * fallback["predicted_price"]) < 1e-6
+    print(f"Residual: RM {result['price_range']['min']:,.0f} - {result['price_range']['max']:,.0f}")
+
+
+def test_quantile_validation():
+    """Requested quantiles are merged with the default interval, sorted and deduplicated; others are refused."""
+    model = shipped_model()
+    result = model.predict_single(PROPERTY, quantiles=[0.9, 0.5, 0.5])
+    assert list(result["quantiles"]) == ["0.1", "0.5", "0.9"]
+
+    for invalid in ([0.0], [1.0], [1.5], [-0.1]):
+        for predict in (model.predict_single, lambda data, quantiles: model.predict_batch([data], quantiles)):
+            try:
+                predict(PROPERTY, quantiles=invalid)
+                raise AssertionError(f"quantiles {invalid} were accepted")
+            except PredictionError as e:
+                assert "between 0 and 1" in str(e)
+    print("Validation: out-of-range quantiles refused")
+
+
+def test_batch_intervals():
+    """Batch rows match single predictions, intervals included, and invalid rows fail alone."""
+    with tempfile.TemporaryDirectory() as directory:
+        write_forest_artifact(directory)
+        model = PropertyPricePredictionModel(directory)
+
+        properties = [
+            PROPERTY,
+            {**PROPERTY, "bedrooms": -1},
+            {**PROPERTY, "area": 800, "location": "Petaling Jaya, Selangor"}
+        ]
+        results = model.predict_batch(properties, quantiles=[0.25, 0.75])
+        singles = [model.predict_single(properties[i], quantiles=[0.25, 0.75]) for i in (0, 2)]
+
+    assert [r["batch_index"] for r in results] == [0, 1, 2]
+    assert results[1]["status"] == "error"
+    for result, single in zip((results[0], results[2]), singles):
+        assert result["interval_method"] == single["interval_method"]
+        assert np.isclose(result["predicted_price"], single["predicted_price"], rtol=1e-9)
+        assert np.isclose(result["confidence_score"], single["confidence_score"], rtol=1e-9)
+        assert list(result["quantiles"]) == list(single["quantiles"])
+        assert np.allclose(list(result["quantiles"].values()), list(single["quantiles"].values()), rtol=1e-9)
+    print(f"Batch: {len(results)} rows, one error")
+
+
+if __name__ == "__main__":
+    print("Testing RentVerse AI Service Prediction Intervals")
+    print("=" * 50)
+
+    tests = [
+        ("Ensemble Intervals", test_ensemble_intervals),
+        ("Residual Intervals", test_residual_intervals),
+        ("Quantile Validation", test_quantile_validation),
+        ("Batch Intervals", test_batch_intervals)
+    ]
+
+    results = []
+    for test_name, test_func in tests:
+        print(f"\n{test_name}:")
+        try:
+            test_func()
+            success = True
+        except AssertionError as e:
+            print(f"Assertion failed: {e}")
+            success = False
+        results.append((test_name, success))
+
+    print("\n" + "=" * 50)
+    print("Test Results Summary:")
+    for test_name, success in results:
+        status = "✅ PASSED" if success else "❌ FAILED"
+        print(f"{test_name}: {status}")
+
+    passed = sum(1 for _, success in results if success)
+    total = len(results)
+    print(f"\nOverall: {passed}/{total} tests passed")
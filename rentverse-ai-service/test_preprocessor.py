@@ -0,0 +1,147 @@
+"""
+Test script for the vectorized and chunked preprocessor fits.
+
+Compares ImprovedDataPreprocessor's fit against a row-by-row reference built
+from its scalar cleaning methods, and the chunked fit against the in-memory
+one, in-process; no server needed.
+"""
+
+import os
+import tempfile
+import warnings
+
+import numpy as np
+import pandas as pd
+
+from rentverse.utils.preprocessor import ImprovedDataPreprocessor
+
+warnings.filterwarnings("ignore")
+
+RELATIVE_ACCURACY = 0.001
+
+
+def messy_listings(n, seed=0):
+    """Raw listings with formatted, numeric, missing and malformed values, in shuffled index order."""
+    rng = np.random.default_rng(seed)
+    prices = [f"RM {v:,}" for v in rng.integers(100, 12000, 500)] + ["", "n/a", "RM 1.2.3", None, np.nan, 2500, 3000.5]
+    areas = [f"{v} sq.ft" for v in rng.integers(100, 7000, 500)] + [None, "abc", 1200, 1e20, "-"]
+    locations = ["Mont Kiara, Kuala Lumpur", "Cheras, Kuala Lumpur ", "x, Selangor!", "Penang", None, "", ", ",
+                 "Ipoh,Perak", "a, b, Johor"]
+    return pd.DataFrame({
+        "price": rng.choice(np.array(prices, dtype=object), n),
+        "area": rng.choice(np.array(areas, dtype=object), n),
+        "location": rng.choice(np.array(locations, dtype=object), n),
+        "bedrooms": rng.choice([0, 1, 2, 3, 4, 5, np.nan], n),
+        "bathrooms": rng.choice([1, 2, 3, np.nan], n),
+        "property_type": rng.choice(np.array(["Condo", "House", None, "Villa"], dtype=object), n),
+        "furnished": rng.choice(np.array(["Fully", None, "Partly"], dtype=object), n),
+        "listing_url": "https://example.com"
+    }, index=rng.permutation(n))
+
+
+def row_wise_fit(preprocessor, df):
+    """Outlier bounds and categories as the original fit computed them, one row at a time."""
+    price = df["price"].apply(preprocessor._clean_price)
+    area = df["area"].apply(preprocessor._clean_area)
+    region = df["location"].apply(preprocessor._parse_location)
+    price_bound = price.quantile(preprocessor.price_percentile / 100)
+    area_bound = area.quantile(preprocessor.area_percentile / 100)
+
+    keep = (price <= price_bound) & (price >= 500) & (price <= 8000) & \
+        (area <= area_bound) & (area >= 200) & (area <= 5000)
+    kept = pd.DataFrame({"property_type": df["property_type"], "furnished": df["furnished"], "region": region})[keep]
+    categories = {col: sorted(kept[col].fillna("unknown").astype(str).unique()) for col in kept.columns}
+    return price_bound, area_bound, categories
+
+
+def classes(preprocessor):
+    return {col: list(encoder.classes_) for col, encoder in preprocessor.label_encoders.items()}
+
+
+def test_cleaning_matches_row_wise():
+    """Vectorized price, area and region cleaning gives what the scalar methods give per row."""
+    df = messy_listings(5000)
+    preprocessor = ImprovedDataPreprocessor(verbose=False)
+    prepared = preprocessor._prepare_frame(df)
+
+    pd.testing.assert_series_equal(prepared["price"], df["price"].apply(preprocessor._clean_price), check_dtype=False)
+    pd.testing.assert_series_equal(prepared["area"], df["area"].apply(preprocessor._clean_area), check_dtype=False)
+    pd.testing.assert_series_equal(prepared["region"], df["location"].apply(preprocessor._parse_location),
+                                   check_names=False)
+    assert "listing_url" not in prepared.columns
+    print(f"Cleaning: {prepared['region'].nunique()} regions, {prepared['price'].isna().sum()} unparsable prices")
+
+
+def test_fit_matches_row_wise():
+    """fit() finds the bounds and categories of the row-by-row fit."""
+    for seed in range(3):
+        df = messy_listings(20000, seed=seed)
+        preprocessor = ImprovedDataPreprocessor(verbose=False).fit(df)
+        price_bound, area_bound, categories = row_wise_fit(preprocessor, df)
+
+        assert preprocessor.price_upper_bound == price_bound
+        assert preprocessor.area_upper_bound == area_bound
+        assert classes(preprocessor) == categories
+        assert preprocessor.feature_names == ['property_type', 'bedrooms', 'bathrooms', 'area', 'furnished', 'region']
+    print(f"Fit: bounds RM {price_bound:,.0f} and {area_bound:,.0f} sqft, {len(categories['region'])} regions")
+
+
+def test_chunked_fit_matches_in_memory():
+    """fit_chunks and fit_csv get bounds within the sketch accuracy and the same encoders and output."""
+    df = messy_listings(30000, seed=3)
+    exact = ImprovedDataPreprocessor(verbose=False).fit(df)
+    chunked = ImprovedDataPreprocessor(verbose=False).fit_chunks(
+        lambda: (df.iloc[i:i + 4000] for i in range(0, len(df), 4000)), relative_accuracy=RELATIVE_ACCURACY
+    )
+
+    for name in ("price_upper_bound", "area_upper_bound"):
+        expected, found = getattr(exact, name), getattr(chunked, name)
+        assert abs(found - expected) <= 2 * RELATIVE_ACCURACY * expected, (name, expected, found)
+    assert classes(chunked) == classes(exact)
+    assert chunked.feature_names == exact.feature_names
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "listings.csv")
+        df.to_csv(path, index=False)
+        from_csv = ImprovedDataPreprocessor(verbose=False).fit_csv(path, chunksize=5000)
+        assert (from_csv.price_upper_bound, from_csv.area_upper_bound) == \
+            (chunked.price_upper_bound, chunked.area_upper_bound)
+        assert classes(from_csv) == classes(exact)
+
+    # Both fits encode features identically
+    probe = messy_listings(2000, seed=4)
+    pd.testing.assert_frame_equal(chunked.transform(probe.drop(columns="price")),
+                                  exact.transform(probe.drop(columns="price")))
+    print(f"Chunked: price bound {chunked.price_upper_bound:,.1f} vs {exact.price_upper_bound:,.1f}")
+
+
+if __name__ == "__main__":
+    print("Testing RentVerse AI Service Preprocessor Fits")
+    print("=" * 50)
+
+    tests = [
+        ("Cleaning Matches Row Wise", test_cleaning_matches_row_wise),
+        ("Fit Matches Row Wise", test_fit_matches_row_wise),
+        ("Chunked Fit Matches In Memory", test_chunked_fit_matches_in_memory)
+    ]
+
+    results = []
+    for test_name, test_func in tests:
+        print(f"\n{test_name}:")
+        try:
+            test_func()
+            success = True
+        except AssertionError as e:
+            print(f"Assertion failed: {e}")
+            success = False
+        results.append((test_name, success))
+
+    print("\n" + "=" * 50)
+    print("Test Results Summary:")
+    for test_name, success in results:
+        status = "✅ PASSED" if success else "❌ FAILED"
+        print(f"{test_name}: {status}")
+
+    passed = sum(1 for _, success in results if success)
+    total = len(results)
+    print(f"\nOverall: {passed}/{total} tests passed")
@@ -0,0 +1,213 @@
+"""
+Test script for the admin sampling profiler.
+
+Runs the profiler and the /admin/profile endpoint in-process, no server needed.
+"""
+
+import asyncio
+import threading
+import time
+
+import httpx
+from fastapi import FastAPI
+from fastapi.concurrency import run_in_threadpool
+
+from rentverse.api.routes import admin
+from rentverse.config import get_settings
+from rentverse.utils.profiler import RouteTagMiddleware, SamplingProfiler, profiling_active, stage
+
+TOKEN = "profiler-test-token"
+
+
+def busy(seconds):
+    """Burn CPU in Python frames for a number of seconds."""
+    deadline = time.perf_counter() + seconds
+    total = 0
+    while time.perf_counter() < deadline:
+        total += sum(range(200))
+    return total
+
+
+def make_app():
+    """App with the admin router and a route doing its work in a tagged stage."""
+    app = FastAPI()
+    app.include_router(admin.router, prefix="/api/v1")
+
+    @app.post("/api/v1/predict/work")
+    async def work(seconds: float = 0.3):
+        def run():
+            with stage('model'):
+                busy(seconds)
+        await run_in_threadpool(run)
+        return {"status": "success"}
+
+    app.add_middleware(RouteTagMiddleware)
+    return app
+
+
+async def call(app, method, url, **kwargs):
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        return await client.request(method, url, **kwargs)
+
+
+def with_admin_token(test):
+    """Run a test with admin endpoints enabled."""
+    settings = get_settings()
+    previous = settings.admin_token
+    settings.admin_token = TOKEN
+    try:
+        test()
+    finally:
+        settings.admin_token = previous
+
+
+def test_duration_bound():
+    """A profile samples for the requested time at the requested interval, then stops."""
+    stop = threading.Event()
+
+    def work():
+        while not stop.is_set():
+            busy(0.01)
+
+    worker = threading.Thread(target=work, name="busy-worker")
+    worker.start()
+    try:
+        profiler = SamplingProfiler(interval=0.01).run(0.2)
+    finally:
+        stop.set()
+        worker.join()
+
+    # The last sample is taken one interval before the deadline
+    assert 0.18 <= profiler.duration < 0.5, profiler.duration
+    assert 15 <= profiler.samples <= 21, profiler.samples
+    assert not profiling_active()
+    assert any("thread:busy-worker" in stack for stack in profiler.stacks)
+    # Stage blocks are free no-ops while no profile runs
+    with stage('model'):
+        pass
+    print(f"Duration: {profiler.samples} samples in {profiler.duration:.3f} s")
+
+
+def test_route_and_stage_tags():
+    """Samples of a request's tagged stage carry its route and stage."""
+    app = make_app()
+    headers = {"X-Admin-Token": TOKEN}
+
+    async def scenario():
+        profile = asyncio.ensure_future(call(
+            app, "GET", "/api/v1/admin/profile",
+            params={"seconds": 0.6, "interval_ms": 5, "format": "summary"}, headers=headers
+        ))
+        await asyncio.sleep(0.1)
+        work = await call(app, "POST", "/api/v1/predict/work", params={"seconds": 0.3})
+        return await profile, work
+
+    def test():
+        profile, work = asyncio.run(scenario())
+        assert work.status_code == 200
+        assert profile.status_code == 200
+        summary = profile.json()
+        tagged = summary["by_route_stage"].get("/api/v1/predict/work model", 0)
+        # The work ran for about half of the profile
+        assert tagged >= summary["samples"] // 4, summary["by_route_stage"]
+        print(f"Tags: {tagged} of {summary['samples']} samples in '/api/v1/predict/work model'")
+
+    with_admin_token(test)
+
+
+def test_collapsed_output():
+    """The default format is collapsed stacks with the sample count in a header."""
+    app = make_app()
+
+    def test():
+        response = asyncio.run(call(app, "GET", "/api/v1/admin/profile", params={"seconds": 0.05},
+                                    headers={"X-Admin-Token": TOKEN}))
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("text/plain")
+        assert int(response.headers["X-Profile-Samples"]) >= 1
+        for line in response.text.splitlines():
+            stack, count = line.rsplit(" ", 1)
+            assert stack.startswith("route:") and int(count) >= 1
+        print(f"Collapsed: {len(response.text.splitlines())} stacks")
+
+    with_admin_token(test)
+
+
+def test_refuses_concurrent_profile():
+    """A second profile while one is running answers 409, and the first still completes."""
+    app = make_app()
+    headers = {"X-Admin-Token": TOKEN}
+
+    async def scenario():
+        first = asyncio.ensure_future(call(app, "GET", "/api/v1/admin/profile",
+                                           params={"seconds": 0.4}, headers=headers))
+        await asyncio.sleep(0.1)
+        second = await call(app, "GET", "/api/v1/admin/profile", params={"seconds": 0.1}, headers=headers)
+        return await first, second
+
+    def test():
+        first, second = asyncio.run(scenario())
+        assert first.status_code == 200
+        assert second.status_code == 409
+        assert second.json()["detail"]["error"] == "Profile in progress"
+        # Free again afterwards
+        again = asyncio.run(call(app, "GET", "/api/v1/admin/profile", params={"seconds": 0.05}, headers=headers))
+        assert again.status_code == 200
+        print("Concurrent profile: 409")
+
+    with_admin_token(test)
+
+
+def test_admin_access():
+    """Admin endpoints are hidden without a token, need the right one and cap the duration."""
+    app = make_app()
+    assert get_settings().admin_token is None
+    disabled = asyncio.run(call(app, "GET", "/api/v1/admin/profile", params={"seconds": 0.05}))
+    assert disabled.status_code == 404
+
+    def test():
+        wrong = asyncio.run(call(app, "GET", "/api/v1/admin/profile", params={"seconds": 0.05},
+                                 headers={"X-Admin-Token": "wrong"}))
+        too_long = asyncio.run(call(app, "GET", "/api/v1/admin/profile",
+                                    params={"seconds": get_settings().profiler_max_seconds + 1},
+                                    headers={"X-Admin-Token": TOKEN}))
+        assert wrong.status_code == 403
+        assert too_long.status_code == 400
+        print("Access: 404 disabled, 403 wrong token, 400 too long")
+
+    with_admin_token(test)
+
+
+if __name__ == "__main__":
+    print("Testing RentVerse AI Service Profiler")
+    print("=" * 50)
+
+    tests = [
+        ("Duration Bound", test_duration_bound),
+        ("Route And Stage Tags", test_route_and_stage_tags),
+        ("Collapsed Output", test_collapsed_output),
+        ("Refuses Concurrent Profile", test_refuses_concurrent_profile),
+        ("Admin Access", test_admin_access)
+    ]
+
+    results = []
+    for test_name, test_func in tests:
+        print(f"\n{test_name}:")
+        try:
+            test_func()
+            success = True
+        except AssertionError as e:
+            print(f"Assertion failed: {e}")
+            success = False
+        results.append((test_name, success))
+
+    print("\n" + "=" * 50)
+    print("Test Results Summary:")
+    for test_name, success in results:
+        status = "✅ PASSED" if success else "❌ FAILED"
+        print(f"{test_name}: {status}")
+
+    passed = sum(1 for _, success in results if success)
+    total = len(results)
+    print(f"\nOverall: {passed}/{total} tests passed")
@@ -0,0 +1,173 @@
+"""
+Test script for graceful shutdown and in-flight request draining.
+
+Runs the ShutdownCoordinator and DrainMiddleware in-process, no server needed.
+"""
+
+import asyncio
+import logging
+import os
+import signal
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from rentverse.api.shutdown import DrainMiddleware, ShutdownCoordinator, install_signal_handlers
+
+logging.disable(logging.CRITICAL)
+
+
+def make_app(coordinator):
+    """App with a prediction route and a health route behind DrainMiddleware."""
+    app = FastAPI()
+    app.add_middleware(DrainMiddleware, get_coordinator=lambda: coordinator)
+
+    @app.post("/api/v1/predict/single")
+    async def predict():
+        return {"status": "success"}
+
+    @app.get("/api/v1/health/")
+    async def health():
+        return {"status": "draining" if coordinator.unready else "healthy"}
+
+    return app
+
+
+def test_refused_while_draining():
+    """While draining, new requests get 503 with Retry-After and Connection: close."""
+    coordinator = ShutdownCoordinator(drain_seconds=10.0)
+    with TestClient(make_app(coordinator)) as client:
+        assert client.post("/api/v1/predict/single").status_code == 200
+        coordinator.begin_drain()
+        response = client.post("/api/v1/predict/single")
+
+    assert response.status_code == 503
+    assert response.json()["detail"] == "draining"
+    assert 1 <= int(response.headers["Retry-After"]) <= 10
+    assert response.headers["Connection"] == "close"
+    assert coordinator.rejected == 1 and coordinator.completed == 1
+    print(f"Draining: 503, Retry-After {response.headers['Retry-After']}")
+
+
+def test_health_exempt_while_draining():
+    """Health checks are still answered while draining, so probes can see the state."""
+    coordinator = ShutdownCoordinator()
+    coordinator.begin_drain()
+    with TestClient(make_app(coordinator)) as client:
+        response = client.get("/api/v1/health/")
+
+    assert response.status_code == 200
+    assert response.json()["status"] == "draining"
+    assert response.headers["Connection"] == "close"
+    assert coordinator.rejected == 0
+    print("Health: served while draining")
+
+
+def test_connection_close_during_grace():
+    """During the grace period requests are served, but their connections close."""
+    coordinator = ShutdownCoordinator(grace_seconds=5.0)
+    with TestClient(make_app(coordinator)) as client:
+        before = client.post("/api/v1/predict/single")
+        coordinator.begin_grace()
+        during = client.post("/api/v1/predict/single")
+
+    assert before.status_code == 200 and before.headers.get("Connection") != "close"
+    assert during.status_code == 200 and during.headers["Connection"] == "close"
+    assert coordinator.state == "grace" and not coordinator.draining
+    assert coordinator.completed == 2 and coordinator.in_flight == 0
+    print("Grace: served with Connection: close")
+
+
+def test_drain_timeout_counts_abandoned():
+    """Requests still in flight at the deadline are counted as abandoned."""
+    async def scenario():
+        coordinator = ShutdownCoordinator(drain_seconds=0.1)
+        coordinator.request_started()
+        coordinator.request_started()
+        asyncio.get_running_loop().call_later(0.02, coordinator.request_finished)
+
+        assert await coordinator.drain() is False
+        assert coordinator.abandoned == 1 and coordinator.completed == 1
+        assert coordinator.state == "stopped" and coordinator.draining
+        assert 80 <= coordinator.drain_ms < 1000, coordinator.drain_ms
+
+        finished = ShutdownCoordinator(drain_seconds=5.0)
+        finished.request_started()
+        asyncio.get_running_loop().call_later(0.05, finished.request_finished)
+        assert await finished.drain() is True
+        assert finished.abandoned == 0 and finished.drain_ms < 1000
+
+    asyncio.run(scenario())
+    print("Drain deadline: 1 abandoned, 1 completed")
+
+
+def test_signal_drains_before_forwarding():
+    """The server's handler sees the signal only after the grace period and the drain."""
+    forwarded = []
+
+    async def scenario():
+        loop = asyncio.get_running_loop()
+        coordinator = ShutdownCoordinator(drain_seconds=5.0, grace_seconds=0.05)
+        done = asyncio.Event()
+
+        def server_handler(signum, frame):
+            forwarded.append((signum, coordinator.state, coordinator.in_flight, loop.time()))
+            done.set()
+
+        previous = signal.signal(signal.SIGUSR1, server_handler)
+        try:
+            assert install_signal_handlers(coordinator, loop, signals=(signal.SIGUSR1,),
+                                           grace_signals=(signal.SIGUSR1,))
+            coordinator.request_started()
+            loop.call_later(0.2, coordinator.request_finished)
+            started = loop.time()
+            os.kill(os.getpid(), signal.SIGUSR1)
+            await asyncio.sleep(0.01)
+            assert coordinator.state == "grace" and not forwarded
+
+            await asyncio.wait_for(done.wait(), 2)
+            return started, coordinator
+        finally:
+            signal.signal(signal.SIGUSR1, previous)
+
+    started, coordinator = asyncio.run(scenario())
+    [(signum, state, in_flight, at)] = forwarded
+    assert signum == signal.SIGUSR1
+    assert state == "stopped" and in_flight == 0
+    assert at - started >= 0.19, at - started
+    assert coordinator.completed == 1 and coordinator.abandoned == 0
+    print(f"Signal: passed on after {(at - started) * 1000:.0f} ms, once drained")
+
+
+if __name__ == "__main__":
+    print("Testing RentVerse AI Service Graceful Shutdown")
+    print("=" * 50)
+
+    tests = [
+        ("Refused While Draining", test_refused_while_draining),
+        ("Health Exempt While Draining", test_health_exempt_while_draining),
+        ("Connection Close During Grace", test_connection_close_during_grace),
+        ("Drain Timeout Counts Abandoned", test_drain_timeout_counts_abandoned),
+        ("Signal Drains Before Forwarding", test_signal_drains_before_forwarding)
+    ]
+
+    results = []
+    for test_name, test_func in tests:
+        print(f"\n{test_name}:")
+        try:
+            test_func()
+            success = True
+        except AssertionError as e:
+            print(f"Assertion failed: {e}")
+            success = False
+        results.append((test_name, success))
+
+    print("\n" + "=" * 50)
+    print("Test Results Summary:")
+    for test_name, success in results:
+        status = "✅ PASSED" if success else "❌ FAILED"
+        print(f"{test_name}: {status}")
+
+    passed = sum(1 for _, success in results if success)
+    total = len(results)
+    print(f"\nOverall: {passed}/{total} tests passed")
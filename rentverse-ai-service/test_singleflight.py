@@ -0,0 +1,172 @@
+"""
+Test script for in-flight request coalescing.
+
+Runs SingleFlight groups in-process, no server needed.
+"""
+
+import asyncio
+import threading
+
+from rentverse.utils.singleflight import SingleFlight
+
+
+class Blocking:
+    """A computation that blocks in the thread pool until released, counting its runs."""
+
+    def __init__(self, result=None, error=None):
+        self.result = result
+        self.error = error
+        self.release = threading.Event()
+        self.runs = 0
+
+    def __call__(self, *args):
+        self.runs += 1
+        self.release.wait(5)
+        if self.error is not None:
+            raise self.error
+        return {"args": args, "result": self.result}
+
+
+async def settle():
+    """Let waiters reach their await."""
+    for _ in range(3):
+        await asyncio.sleep(0)
+
+
+def test_coalescing():
+    """Concurrent callers of a key share one execution and its result."""
+    async def scenario():
+        group = SingleFlight("test")
+        fn = Blocking(result=42)
+        callers = [asyncio.ensure_future(group.do("key", fn, "a")) for _ in range(5)]
+        other = asyncio.ensure_future(group.do("other", fn, "b"))
+        await settle()
+        assert group.get_stats()['in_flight'] == 2
+
+        fn.release.set()
+        results = await asyncio.gather(*callers)
+        assert all(result is results[0] for result in results)
+        assert results[0] == {"args": ("a",), "result": 42}
+        assert (await other)["args"] == ("b",)
+
+        # A key of None never coalesces
+        await asyncio.gather(group.do(None, fn, "c"), group.do(None, fn, "c"))
+
+        stats = group.get_stats()
+        assert fn.runs == 4
+        assert (stats['calls'], stats['executions'], stats['coalesced']) == (8, 4, 4)
+        assert stats['saved_ratio'] == 0.5
+        return stats
+
+    stats = asyncio.run(scenario())
+    print(f"Coalescing: {stats['calls']} calls, {stats['executions']} executions")
+
+
+def test_shared_exception():
+    """Every coalesced caller gets the exception of the shared execution."""
+    async def scenario():
+        group = SingleFlight("test")
+        error = ValueError("model exploded")
+        fn = Blocking(error=error)
+        callers = [asyncio.ensure_future(group.do("key", fn)) for _ in range(3)]
+        await settle()
+        fn.release.set()
+
+        outcomes = await asyncio.gather(*callers, return_exceptions=True)
+        assert all(outcome is error for outcome in outcomes)
+        assert fn.runs == 1 and group.get_stats()['in_flight'] == 0
+
+    asyncio.run(scenario())
+    print("Shared exception: raised to every caller")
+
+
+def test_cancelled_waiter():
+    """Cancelling one caller leaves the shared computation running for the others."""
+    async def scenario():
+        group = SingleFlight("test")
+        fn = Blocking(result="done")
+        first = asyncio.ensure_future(group.do("key", fn))
+        second = asyncio.ensure_future(group.do("key", fn))
+        await settle()
+        shared = group._in_flight["key"]
+
+        first.cancel()
+        await asyncio.gather(first, return_exceptions=True)
+        assert first.cancelled()
+        assert not shared.cancelled() and "key" in group._in_flight
+
+        fn.release.set()
+        assert (await second)["result"] == "done"
+        assert fn.runs == 1
+
+        # A failure nobody waits for any more is still marked as retrieved
+        failing = Blocking(error=RuntimeError("unobserved"))
+        lone = asyncio.ensure_future(group.do("fail", failing))
+        await settle()
+        lone.cancel()
+        await asyncio.gather(lone, return_exceptions=True)
+        failing.release.set()
+        while "fail" in group._in_flight:
+            await asyncio.sleep(0.01)
+
+    asyncio.run(scenario())
+    print("Cancelled waiter: shared computation kept running")
+
+
+def test_forget_removes_key():
+    """Finished keys are forgotten, so the next call executes again."""
+    async def scenario():
+        group = SingleFlight("test")
+        fn = Blocking(result=1)
+        fn.release.set()
+        await group.do("key", fn)
+        assert group._in_flight == {}
+        await group.do("key", fn)
+        assert fn.runs == 2 and group.get_stats()['coalesced'] == 0
+
+        # A stale future does not remove the key's current computation
+        loop = asyncio.get_running_loop()
+        stale, current = loop.create_future(), loop.create_future()
+        stale.set_result(None)
+        group._in_flight["key"] = current
+        group._forget("key", stale)
+        assert group._in_flight["key"] is current
+        current.set_result(None)
+        group._forget("key", current)
+        assert "key" not in group._in_flight
+
+    asyncio.run(scenario())
+    print("Forget: keys removed once their computation finished")
+
+
+if __name__ == "__main__":
+    print("Testing RentVerse AI Service Request Coalescing")
+    print("=" * 50)
+
+    tests = [
+        ("Coalescing", test_coalescing),
+        ("Shared Exception", test_shared_exception),
+        ("Cancelled Waiter", test_cancelled_waiter),
+        ("Forget Removes Key", test_forget_removes_key)
+    ]
+
+    results = []
+    for test_name, test_func in tests:
+        print(f"\n{test_name}:")
+        try:
+            test_func()
+            success = True
+        except AssertionError as e:
+            print(f"Assertion failed: {e}")
+            success = False
+        results.append((test_name, success))
+
+    print("\n" + "=" * 50)
+    print("Test Results Summary:")
+    for test_name, success in results:
+        status = "✅ PASSED" if success else "❌ FAILED"
+        print(f"{test_name}: {status}")
+
+    passed = sum(1 for _, success in results if success)
+    total = len(results)
+    print(f"\nOverall: {passed}/{total} tests passed")
@@ -0,0 +1,123 @@
+"""
+Test script for the mergeable quantile sketch.
+
+Checks QuantileSketch's relative-error guarantee and merging against exact
+numpy quantiles in-process, no server needed.
+"""
+
+import math
+
+import numpy as np
+
+from rentverse.utils.sketches import QuantileSketch
+
+QUANTILES = [0.01, 0.1, 0.25, 0.5, 0.75, 0.9, 0.95, 0.99]
+
+
+def datasets():
+    """Skewed, wide-range and mixed-sign data with some exact zeros."""
+    rng = np.random.default_rng(0)
+    return {
+        "lognormal": rng.lognormal(8, 1, 20000),
+        "wide range": 10 ** rng.uniform(-6, 6, 20000),
+        "mixed sign": np.concatenate([rng.normal(0, 1000, 20000), np.zeros(500)])
+    }
+
+
+def assert_within(sketch, values, relative_accuracy):
+    """Every estimate is within relative_accuracy of the value at rank floor(q * (n - 1))."""
+    ordered = np.sort(values)
+    for q in QUANTILES:
+        expected = ordered[int(math.floor(q * (len(ordered) - 1)))]
+        found = sketch.quantile(q)
+        assert abs(found - expected) <= relative_accuracy * abs(expected) + 1e-12, (q, expected, found)
+
+
+def test_relative_error_bound():
+    """Quantile estimates stay within the configured relative accuracy."""
+    for relative_accuracy in (0.01, 0.001):
+        for name, values in datasets().items():
+            sketch = QuantileSketch(relative_accuracy)
+            sketch.add(values)
+            assert sketch.count == len(values)
+            assert_within(sketch, values, relative_accuracy)
+            assert sketch.quantile(0) == values.min() and sketch.quantile(1) == values.max()
+            # Memory grows with the logarithm of the value range, not the number of values
+            for store, magnitudes in ((sketch.positive, values[values > 0]), (sketch.negative, -values[values < 0])):
+                if store:
+                    span = math.log(magnitudes.max() / max(magnitudes.min(), sketch.min_value)) / sketch._log_gamma
+                    assert len(store) <= span + 2, (name, len(store), span)
+    print(f"Relative error: within bound for {len(datasets())} datasets at 1% and 0.1%")
+
+
+def test_merge_matches_single_sketch():
+    """Merging sketches of the parts gives the sketch of all the data."""
+    for name, values in datasets().items():
+        whole = QuantileSketch(0.01)
+        whole.add(values)
+
+        merged = QuantileSketch(0.01)
+        for part in np.array_split(values, 7):
+            sketch = QuantileSketch(0.01)
+            sketch.add(part)
+            merged.merge(sketch)
+
+        assert merged.to_dict() == whole.to_dict(), name
+        assert [merged.quantile(q) for q in QUANTILES] == [whole.quantile(q) for q in QUANTILES]
+        assert_within(merged, values, 0.01)
+
+    # Serialized sketches merge the same way, e.g. across workers
+    restored = QuantileSketch.from_dict(whole.to_dict())
+    assert restored.to_dict() == whole.to_dict()
+
+    try:
+        merged.merge(QuantileSketch(0.001))
+        assert False, "merging different accuracies should fail"
+    except ValueError:
+        pass
+    print(f"Merge: 7 parts match one sketch, {len(whole.positive) + len(whole.negative)} buckets")
+
+
+def test_empty_and_nan():
+    """NaNs are ignored and an empty sketch has no quantiles."""
+    sketch = QuantileSketch()
+    sketch.add([np.nan, np.nan])
+    assert sketch.count == 0 and math.isnan(sketch.quantile(0.5))
+    empty = QuantileSketch.from_dict(sketch.to_dict())
+    assert empty.count == 0 and math.isnan(empty.quantile(0.5))
+
+    sketch.add([1.0, np.nan, 3.0])
+    assert sketch.count == 2
+    print("Empty and NaN: ignored")
+
+
+if __name__ == "__main__":
+    print("Testing RentVerse AI Service Quantile Sketch")
+    print("=" * 50)
+
+    tests = [
+        ("Relative Error Bound", test_relative_error_bound),
+        ("Merge Matches Single Sketch", test_merge_matches_single_sketch),
+        ("Empty And NaN", test_empty_and_nan)
+    ]
+
+    results = []
+    for test_name, test_func in tests:
+        print(f"\n{test_name}:")
+        try:
+            test_func()
+            success = True
+        except AssertionError as e:
+            print(f"Assertion failed: {e}")
+            success = False
+        results.append((test_name, success))
+
+    print("\n" + "=" * 50)
+    print("Test Results Summary:")
+    for test_name, success in results:
+        status = "✅ PASSED" if success else "❌ FAILED"
+        print(f"{test_name}: {status}")
+
+    passed = sum(1 for _, success in results if success)
+    total = len(results)
+    print(f"\nOverall: {passed}/{total} tests passed")
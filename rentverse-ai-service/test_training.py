@@ -0,0 +1,121 @@
+"""
+Test script for the rentverse train pipeline.
+
+Trains on synthetic listings in-process, without the stage cache; no server
+needed.
+"""
+
+import logging
+import os
+import tempfile
+import warnings
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+from sklearn.ensemble import RandomForestRegressor
+from sklearn.linear_model import Ridge
+
+from rentverse.models.ml_models import PropertyPricePredictionModel
+from rentverse.training.trainer import TrainingConfig, evaluate_candidates, run_training
+from test_compression import PROPERTY, write_listings
+
+warnings.filterwarnings("ignore")
+logging.disable(logging.CRITICAL)
+
+
+def make_config(workdir, data_path):
+    """Small, single-process run without the stage cache."""
+    return TrainingConfig(
+        data_path=data_path,
+        output_dir=os.path.join(workdir, "models"),
+        reports_dir=os.path.join(workdir, "reports"),
+        n_jobs=1,
+        cv_folds=2,
+        compare_normalization=False,
+        cache_dir=None,
+        latency_repeats=10
+    )
+
+
+def test_run_training():
+    """A run writes the comparisons it returns, and both artifacts serve predictions."""
+    with tempfile.TemporaryDirectory() as workdir:
+        data_path = os.path.join(workdir, "listings.csv")
+        write_listings(data_path, n=600)
+        config = make_config(workdir, data_path)
+        result = run_training(config)
+
+        for key in ('standard_comparison', 'enhanced_comparison'):
+            written = pd.read_csv(result['paths'][key])
+            assert written['Model'].tolist() == result[key]['Model'].tolist()
+            assert np.allclose(written['Test R²'], result[key]['Test R²'])
+        assert result['best_standard_model'] in result['standard_comparison']['Model'].tolist()
+        assert set(result['serving_report']['Pipeline']) == {'standard', 'enhanced'}
+        assert result['normalization_comparison'] is None and result['cache'] is None
+
+        # The enhanced artifact is loaded first, the standard one once it is gone
+        model_dir = os.path.dirname(result['paths']['enhanced_artifact'])
+        enhanced = PropertyPricePredictionModel(model_dir)
+        os.remove(result['paths']['enhanced_artifact'])
+        standard = PropertyPricePredictionModel(model_dir)
+        assert enhanced.use_log_transform and not standard.use_log_transform
+        for model in (enhanced, standard):
+            prediction = model.predict_single(PROPERTY)
+            assert prediction['predicted_price'] > 0
+        print(f"Training: best {result['best_standard_model']} / {result['best_enhanced_model']}, "
+              f"RM {prediction['predicted_price']:,.0f}")
+
+
+def test_reproducible_scores():
+    """Candidates get the same metrics when scored again, inline or in a process pool."""
+    rng = np.random.default_rng(0)
+    X = rng.random((400, 6))
+    y = 1000 + 3000 * X[:, 0] + 500 * X[:, 1] + rng.normal(0, 100, 400)
+    candidates = {
+        'Ridge Regression': Ridge(alpha=1.0),
+        'Random Forest': RandomForestRegressor(n_estimators=20, max_depth=6, random_state=0)
+    }
+    config = TrainingConfig(data_path="unused.csv", cv_folds=3)
+
+    inline = evaluate_candidates(candidates, X[:300], X[300:], y[:300], y[300:], log_target=True, config=config)
+    again = evaluate_candidates(candidates, X[:300], X[300:], y[:300], y[300:], log_target=True, config=config)
+    with ProcessPoolExecutor(max_workers=2) as executor:
+        pooled = evaluate_candidates(candidates, X[:300], X[300:], y[:300], y[300:], log_target=True,
+                                     config=config, executor=executor)
+
+    for name in candidates:
+        for metric in ('test_r2', 'test_rmse', 'cv_mean', 'cv_std'):
+            assert inline[name][metric] == again[name][metric] == pooled[name][metric], (name, metric)
+    print(f"Reproducible: {len(candidates)} candidates, identical metrics")
+
+
+if __name__ == "__main__":
+    print("Testing RentVerse AI Service Training")
+    print("=" * 50)
+
+    tests = [
+        ("Run Training", test_run_training),
+        ("Reproducible Scores", test_reproducible_scores)
+    ]
+
+    results = []
+    for test_name, test_func in tests:
+        print(f"\n{test_name}:")
+        try:
+            test_func()
+            success = True
+        except AssertionError as e:
+            print(f"Assertion failed: {e}")
+            success = False
+        results.append((test_name, success))
+
+    print("\n" + "=" * 50)
+    print("Test Results Summary:")
+    for test_name, success in results:
+        status = "✅ PASSED" if success else "❌ FAILED"
+        print(f"{test_name}: {status}")
+
+    passed = sum(1 for _, success in results if success)
+    total = len(results)
+    print(f"\nOverall: {passed}/{total} tests passed")
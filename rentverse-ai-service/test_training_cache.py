@@ -0,0 +1,133 @@
+"""
+Test script for the content-addressed training stage cache.
+
+Runs StageCache and the cached preprocessing and split stages in-process on
+a temporary directory, no server needed.
+"""
+
+import logging
+import os
+import tempfile
+import warnings
+
+import numpy as np
+import pandas as pd
+
+from rentverse.training.cache import META_FILENAME, StageCache
+from rentverse.training.trainer import TrainingConfig, preprocess_stage, split_stage
+from test_compression import write_listings
+
+warnings.filterwarnings("ignore")
+logging.disable(logging.CRITICAL)
+
+
+def age_entry(cache, key, seconds_ago):
+    """Set an entry's last use to some seconds in the past, so the LRU order does not depend on timing."""
+    meta_path = cache.cache_dir / key / META_FILENAME
+    past = meta_path.stat().st_mtime - seconds_ago
+    os.utime(meta_path, (past, past))
+
+
+def test_stage_keys_invalidate():
+    """Changed data, preprocessing parameters or split settings miss the cache; unchanged ones hit it."""
+    with tempfile.TemporaryDirectory() as workdir:
+        data_path = os.path.join(workdir, "listings.csv")
+        write_listings(data_path, n=400)
+        cache = StageCache(os.path.join(workdir, "cache"))
+        config = TrainingConfig(data_path=data_path, cache_dir=str(cache.cache_dir))
+
+        _, computed, key = preprocess_stage(config, cache)
+        split, split_key = split_stage(computed, config, cache, key)
+        assert (cache.hits, cache.misses) == (0, 2)
+
+        _, cached, same_key = preprocess_stage(config, cache)
+        cached_split, same_split_key = split_stage(cached, config, cache, same_key)
+        assert (same_key, same_split_key) == (key, split_key) and cache.hits == 2
+        pd.testing.assert_frame_equal(cached, computed, check_dtype=False, check_index_type=False)
+        pd.testing.assert_frame_equal(cached_split.X_test, split.X_test, check_dtype=False, check_index_type=False)
+        assert np.array_equal(cached_split.y_train, split.y_train)
+
+        config.price_percentile = 80
+        _, _, percentile_key = preprocess_stage(config, cache)
+        config.price_percentile = 90
+        config.test_size = 0.3
+        _, test_size_key = split_stage(computed, config, cache, key)
+
+        write_listings(data_path, n=400, seed=1)
+        _, _, data_key = preprocess_stage(config, cache)
+
+        keys = {key, percentile_key, data_key}
+        assert len(keys) == 3 and test_size_key != split_key
+        assert cache.hits == 2 and cache.get_stats()['entries'] == 5
+    print(f"Keys: {len(keys)} preprocessing entries, 2 split entries")
+
+
+def test_size_cap_evicts_least_recently_used():
+    """Entries beyond max_bytes are evicted least recently used first; the newest always stays."""
+    with tempfile.TemporaryDirectory() as workdir:
+        array = np.arange(10000, dtype=float)  # 80 KB per entry
+        cache = StageCache(workdir, max_bytes=250 * 1024)
+
+        for i, name in enumerate(["a", "b", "c"]):
+            assert cache.put(name, {"values": array + i})
+            age_entry(cache, name, 30 - 10 * i)
+        # Reading "a" makes "b" the least recently used
+        assert cache.get("a")["values"][0] == 0.0
+
+        cache.put("d", {"values": array + 3})
+        stats = cache.get_stats()
+        assert [entry['key'] for entry in cache.entries()] == ["c", "a", "d"]
+        assert cache.get("b") is None
+        assert stats['bytes'] <= cache.max_bytes
+
+        # An entry larger than the cap is kept as the only one
+        cache.put("big", {"values": np.zeros(50000)})
+        assert [entry['key'] for entry in cache.entries()] == ["big"]
+    print(f"Eviction: {stats['entries']} entries, {stats['bytes'] / 1024:.0f} KB of {cache.max_bytes / 1024:.0f} KB")
+
+
+def test_unstorable_and_corrupt_entries():
+    """Object arrays are not cached, and unreadable entries are discarded as misses."""
+    with tempfile.TemporaryDirectory() as workdir:
+        cache = StageCache(workdir)
+        assert not cache.put("objects", {"values": np.array(["a", None], dtype=object)})
+        assert cache.get("objects") is None and cache.get_stats()['entries'] == 0
+
+        cache.put("broken", {"values": np.ones(3)})
+        (cache.cache_dir / "broken" / "values.npy").write_bytes(b"truncated")
+        assert cache.get("broken") is None
+        assert not (cache.cache_dir / "broken").exists()
+        assert cache.misses == 2
+    print("Unstorable and corrupt entries: not cached, discarded")
+
+
+if __name__ == "__main__":
+    print("Testing RentVerse AI Service Training Cache")
+    print("=" * 50)
+
+    tests = [
+        ("Stage Keys Invalidate", test_stage_keys_invalidate),
+        ("Size Cap Evicts Least Recently Used", test_size_cap_evicts_least_recently_used),
+        ("Unstorable And Corrupt Entries", test_unstorable_and_corrupt_entries)
+    ]
+
+    results = []
+    for test_name, test_func in tests:
+        print(f"\n{test_name}:")
+        try:
+            test_func()
+            success = True
+        except AssertionError as e:
+            print(f"Assertion failed: {e}")
+            success = False
+        results.append((test_name, success))
+
+    print("\n" + "=" * 50)
+    print("Test Results Summary:")
+    for test_name, success in results:
+        status = "✅ PASSED" if success else "❌ FAILED"
+        print(f"{test_name}: {status}")
+
+    passed = sum(1 for _, success in results if success)
+    total = len(results)
+    print(f"\nOverall: {passed}/{total} tests passed")
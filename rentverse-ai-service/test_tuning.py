@@ -0,0 +1,116 @@
+"""
+Test script for the successive-halving hyperparameter search.
+
+Runs the rung schedule and successive halving on a small synthetic matrix
+in-process, no server needed.
+"""
+
+import logging
+import math
+import tempfile
+import warnings
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+from sklearn.linear_model import Ridge
+
+from rentverse.training.tuning import (
+    SharedFolds,
+    TuningConfig,
+    halving_schedule,
+    sample_configurations,
+    successive_halving,
+    trials_frame
+)
+
+warnings.filterwarnings("ignore")
+logging.disable(logging.CRITICAL)
+
+# Ridge on noiseless linear data: the less regularization, the better every rung scores
+ALPHAS = [0.001, 0.01, 0.1, 1.0, 10.0, 100.0, 1000.0, 10000.0]
+
+
+def test_halving_schedule():
+    """Each rung has eta times the rows of the previous one and the last uses all of them."""
+    assert halving_schedule(9, 900, 100, 3) == [100, 300, 900]
+    assert halving_schedule(27, 900, 100, 3) == [100, 300, 900]
+    assert halving_schedule(10, 1000, 100, 3) == [111, 333, 1000]
+    # One configuration, or too few rows for a smaller rung: a single full rung
+    assert halving_schedule(1, 900, 100, 3) == [900]
+    assert halving_schedule(9, 50, 100, 3) == [50]
+    print(f"Schedule: {halving_schedule(9, 900, 100, 3)}")
+
+
+def test_sample_configurations():
+    """Sampled configurations are distinct and capped at the size of the space."""
+    space = {'alpha': [0.1, 1.0], 'fit_intercept': [True, False]}
+    rng = np.random.default_rng(0)
+    configs = sample_configurations(space, 10, rng)
+    assert len(configs) == 4
+    assert len({tuple(sorted(config.items())) for config in configs}) == 4
+    assert len(sample_configurations(space, 3, rng)) == 3
+    print(f"Sampling: {len(configs)} of {math.prod(len(v) for v in space.values())} combinations")
+
+
+def test_rung_promotion():
+    """Only the best 1/eta of each rung is promoted, failures are dropped, and the best reaches the end."""
+    rng = np.random.default_rng(0)
+    X = rng.random((1800, 5))
+    y = X @ np.array([3.0, -2.0, 1.0, 0.5, 4.0])
+    config = TuningConfig(data_path="unused.csv", cv_folds=2, eta=3, min_rows=100)
+
+    # A negative alpha fails to fit and must not be promoted
+    configs = {'Ridge Regression': [{'alpha': alpha} for alpha in ALPHAS + [-1.0]]}
+    with tempfile.TemporaryDirectory() as work_dir:
+        folds = SharedFolds(X, y, config.cv_folds, config.random_state, work_dir)
+        assert folds.max_rows == 900
+        trials = successive_halving({'Ridge Regression': Ridge()}, configs, folds, config)
+        # Workers memory-map the same folds and score identically
+        with ProcessPoolExecutor(max_workers=2) as executor:
+            pooled = successive_halving({'Ridge Regression': Ridge()}, configs, folds, config, executor)
+    assert [(t['rung'], t['cv_mean']) for t in pooled] == [(t['rung'], t['cv_mean']) for t in trials]
+
+    reached = {trial['params']['alpha']: (trial['rung'], trial['rows']) for trial in trials}
+    assert [alpha for alpha, (rung, _) in reached.items() if rung == 2] == [0.001]
+    assert sorted(alpha for alpha, (rung, _) in reached.items() if rung >= 1) == [0.001, 0.01, 0.1]
+    assert reached[0.001] == (2, 900) and reached[0.1] == (1, 300) and reached[10000.0] == (0, 100)
+    failed = next(trial for trial in trials if trial['params']['alpha'] == -1.0)
+    assert failed['rung'] == 0 and failed['cv_mean'] == -np.inf
+    assert [trial['params']['alpha'] for trial in trials if trial.get('finalist')] == [0.001]
+
+    frame = trials_frame(trials)
+    assert frame['Status'].tolist().count('finalist') == 1
+    assert frame.iloc[0]['Rung Reached'] == 2 and frame.iloc[0]['Training Rows'] == 900
+    print(f"Promotion: {len(trials)} configurations, rungs {[int(r) for r in frame['Rung Reached']]}")
+
+
+if __name__ == "__main__":
+    print("Testing RentVerse AI Service Hyperparameter Search")
+    print("=" * 50)
+
+    tests = [
+        ("Halving Schedule", test_halving_schedule),
+        ("Sample Configurations", test_sample_configurations),
+        ("Rung Promotion", test_rung_promotion)
+    ]
+
+    results = []
+    for test_name, test_func in tests:
+        print(f"\n{test_name}:")
+        try:
+            test_func()
+            success = True
+        except AssertionError as e:
+            print(f"Assertion failed: {e}")
+            success = False
+        results.append((test_name, success))
+
+    print("\n" + "=" * 50)
+    print("Test Results Summary:")
+    for test_name, success in results:
+        status = "✅ PASSED" if success else "❌ FAILED"
+        print(f"{test_name}: {status}")
+
+    passed = sum(1 for _, success in results if success)
+    total = len(results)
+    print(f"\nOverall: {passed}/{total} tests passed")